@@ -11,11 +11,18 @@ import pandas as pd
 import numpy as np
 import json
 
+from src.sketches import SketchCuantiles
+from src.series_tiempo import AgregadoTemporal
+from src.cache import configurar_cache, memorizar
+
 app = Flask(__name__, 
             template_folder='web_app/templates',
             static_folder='web_app/static')
 CORS(app)
 
+# Peticiones repetidas con los mismos datos reutilizan el análisis
+configurar_cache(maximo=64)
+
 @app.route('/')
 def index():
     return render_template('index.html')
@@ -40,7 +47,7 @@ def analizar():
         # Procesar facturas
         if facturas_data:
             facturas_df = procesar_facturas(facturas_data)
-            resultados['facturas'] = analizar_facturas(facturas_df)
+            resultados['facturas'] = analizar_facturas(facturas_df, data.get('backend', 'exacto'))
         
         # Procesar admisiones
         if admisiones_data:
@@ -89,24 +96,33 @@ def procesar_admisiones(admisiones_data):
     """Procesar datos de admisiones"""
     datos = admisiones_data.get('datos', [])
     df = pd.DataFrame(datos)
+    # Unificar variantes de nombres de aseguradoras y unidades
+    df = procesamiento.canonicalizar_categorias(df)
     return df
 
-def analizar_facturas(df):
+@memorizar(columnas=(), fijas=('valor_neto_num', 'tipO_PRESTACION', 'noM_PRESTACION', 'valoR_NETO'))
+def analizar_facturas(df, backend='exacto'):
     """Análisis estadístico de facturas con numpy/pandas"""
     if df.empty or 'valor_neto_num' not in df.columns:
         return {'exists': False}
     
     montos = df['valor_neto_num'].dropna()
     
+    # backend='sketch': mediana y cuartiles con memoria acotada, sin ordenar la columna
+    if backend == 'sketch':
+        q1, mediana, q3 = SketchCuantiles(semilla=0).update(montos).cuantiles([0.25, 0.5, 0.75])
+    else:
+        q1, mediana, q3 = np.percentile(montos, [25, 50, 75])
+    
     # Estadísticas con numpy
     stats = {
         'mean': float(np.mean(montos)),
-        'median': float(np.median(montos)),
+        'median': float(mediana),
         'std': float(np.std(montos, ddof=1)),
         'min': float(np.min(montos)),
         'max': float(np.max(montos)),
-        'q1': float(np.percentile(montos, 25)),
-        'q3': float(np.percentile(montos, 75)),
+        'q1': float(q1),
+        'q3': float(q3),
         'cv': float((np.std(montos, ddof=1) / np.mean(montos)) * 100)
     }
     
@@ -132,6 +148,8 @@ def analizar_facturas(df):
         'montos': montos.tolist()
     }
 
+@memorizar(columnas=(), fijas=('aseguradora', 'clasE_EPISODIO', 'staT_FACTURA',
+                              'fechA_CREACION', 'horA_CREACION'))
 def analizar_admisiones(df):
     """Análisis de admisiones"""
     if df.empty:
@@ -146,12 +164,19 @@ def analizar_admisiones(df):
     # Agrupar por estado
     por_estado = df['staT_FACTURA'].value_counts().to_dict() if 'staT_FACTURA' in df.columns else {}
     
+    # Admisiones por día de creación
+    por_dia = {}
+    if 'fechA_CREACION' in df.columns:
+        diario = AgregadoTemporal('fechA_CREACION', 'horA_CREACION', 'dia').update(df).tabla()
+        por_dia = {periodo.strftime('%Y-%m-%d'): int(n) for periodo, n in diario['n'].items()}
+    
     return {
         'exists': True,
         'total': len(df),
         'porAseguradora': por_aseguradora,
         'porClase': por_clase,
-        'porEstado': por_estado
+        'porEstado': por_estado,
+        'porDia': por_dia
     }
 
 if __name__ == '__main__':
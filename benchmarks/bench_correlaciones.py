@@ -0,0 +1,64 @@
+"""
+Benchmark: correlaciones_por_pares(metodo='spearman') vs DataFrame.corr('spearman')
+con nulos dispersos (cada columna con su propio patrón de faltantes)
+
+Uso: python benchmarks/bench_correlaciones.py
+"""
+import sys
+import os
+import io
+import time
+import tracemalloc
+import contextlib
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from correlaciones import correlaciones_por_pares
+
+
+def generar_datos(n_filas, n_columnas, proporcion_nulos=0.05, semilla=0):
+    """Genera columnas correlacionadas con nulos repartidos al azar celda a celda"""
+    rng = np.random.default_rng(semilla)
+    base = rng.normal(size=(n_filas, 1))
+    datos = base + rng.normal(size=(n_filas, n_columnas))
+    datos[rng.random(datos.shape) < proporcion_nulos] = np.nan
+    return pd.DataFrame(datos, columns=[f'variable_{i}' for i in range(n_columnas)])
+
+
+def medir(funcion, *args, repeticiones=1, **kwargs):
+    """Mejor tiempo de varias ejecuciones y pico de memoria, sin la salida por consola"""
+    tiempos = []
+    tracemalloc.start()
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            funcion(*args, **kwargs)
+        tiempos.append(time.perf_counter() - inicio)
+    pico = tracemalloc.get_traced_memory()[1] / 1e6
+    tracemalloc.stop()
+    return min(tiempos), pico
+
+
+if __name__ == "__main__":
+    # 'disperso_grande' es el caso con p grande y nulos dispersos: casi cada
+    # par de columnas tiene un patrón de faltantes distinto
+    escenarios = [
+        ('disperso', 5_000, 100),
+        ('disperso_grande', 20_000, 200),
+    ]
+    comparar_pandas = '--sin-pandas' not in sys.argv
+
+    print(f"{'escenario':<17}{'filas':>8}{'columnas':>10}{'pares (s)':>12}{'pico MB':>10}"
+          f"{'pandas (s)':>12}{'pico MB':>10}")
+    for nombre, n_filas, n_columnas in escenarios:
+        df = generar_datos(n_filas, n_columnas)
+        t_pares, m_pares = medir(correlaciones_por_pares, df, metodo='spearman')
+        if comparar_pandas:
+            t_pandas, m_pandas = medir(df.corr, method='spearman')
+            comparacion = f"{t_pandas:>12.2f}{m_pandas:>10.0f}"
+        else:
+            comparacion = f"{'-':>12}{'-':>10}"
+        print(f"{nombre:<17}{n_filas:>8}{n_columnas:>10}{t_pares:>12.2f}{m_pares:>10.0f}{comparacion}")
@@ -0,0 +1,60 @@
+"""
+Benchmark: dispersiones y pairplot con muchas filas
+(un marcador por fila vs densidad 2-D agregada con NumPy)
+
+Uso: python benchmarks/bench_graficas_agregadas.py
+"""
+import sys
+import os
+import time
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from reporte import configurar_reporte
+from visualizaciones import configurar_graficas, grafica_dispersion, pairplot_seaborn, dashboard_completo
+
+
+def generar_datos(n_filas, semilla=0):
+    """Genera episodios con edades, montos sesgados y duraciones"""
+    rng = np.random.default_rng(semilla)
+    return pd.DataFrame({'edaD_PACIENTE': rng.integers(0, 90, n_filas).astype(float),
+                         'montO_TOTAL': rng.lognormal(12, 1, n_filas).round(2),
+                         'duracioN_MINUTOS': rng.gamma(2, 60, n_filas).round(),
+                         'clasE_EPISODIO': rng.integers(1, 5, n_filas)})
+
+
+def medir(funcion):
+    """Tiempo de una ejecución y tamaño del archivo generado"""
+    with tempfile.TemporaryDirectory() as carpeta:
+        archivo = os.path.join(carpeta, 'grafica.png')
+        inicio = time.perf_counter()
+        funcion(archivo)
+        return time.perf_counter() - inicio, os.path.getsize(archivo) / 1e6
+
+
+if __name__ == "__main__":
+    configurar_reporte('silencio')
+    configurar_graficas(mostrar=False)
+    columnas = ['edaD_PACIENTE', 'montO_TOTAL', 'duracioN_MINUTOS']
+
+    for n_filas in (20_000, 200_000, 1_000_000):
+        df = generar_datos(n_filas)
+        casos = {
+            'dispersion': lambda archivo, agregar: grafica_dispersion(
+                df, 'edaD_PACIENTE', 'montO_TOTAL', 'clasE_EPISODIO', archivo, agregar=agregar),
+            'pairplot': lambda archivo, agregar: pairplot_seaborn(
+                df, columnas, 'clasE_EPISODIO', archivo, agregar=agregar),
+            'dashboard': lambda archivo, agregar: dashboard_completo(df, archivo, agregar=agregar)
+        }
+        for nombre, funcion in casos.items():
+            t_agregado, mb_agregado = medir(lambda archivo: funcion(archivo, True))
+            texto = f"{n_filas} filas, {nombre}: agregado={t_agregado:.2f}s ({mb_agregado:.1f} MB)"
+            # Un marcador por fila solo en el tamaño chico: con más filas tarda minutos
+            if n_filas <= 20_000:
+                t_puntos, mb_puntos = medir(lambda archivo: funcion(archivo, False))
+                texto += f" puntos={t_puntos:.2f}s ({mb_puntos:.1f} MB)"
+            print(texto)
@@ -0,0 +1,59 @@
+"""
+Benchmark: costo de formatear la salida en análisis por lotes
+(modo 'consola' con stdout redirigido vs modo 'silencio')
+
+Uso: python benchmarks/bench_modo_silencioso.py
+"""
+import sys
+import os
+import io
+import time
+import contextlib
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from reporte import modo_temporal
+from estadisticas import medidas_centralidad, medidas_dispersion
+from correlaciones import matriz_correlacion
+from filtros import resumen_filtros
+
+
+def generar_grupos(n_grupos, filas_por_grupo, semilla=0):
+    """Genera un DataFrame pequeño por grupo (caso típico de un lote)"""
+    rng = np.random.default_rng(semilla)
+    return [pd.DataFrame({'montO_TOTAL': rng.lognormal(12, 1, filas_por_grupo).round(2),
+                          'edaD_PACIENTE': rng.integers(0, 90, filas_por_grupo),
+                          'duracioN_MINUTOS': rng.integers(5, 240, filas_por_grupo)})
+            for _ in range(n_grupos)]
+
+
+def analizar_lote(grupos):
+    """Aplica los análisis de cada grupo del lote"""
+    for df in grupos:
+        medidas_centralidad(df, 'montO_TOTAL')
+        medidas_dispersion(df, 'montO_TOTAL')
+        matriz_correlacion(df)
+        resumen_filtros(df)
+
+
+def medir(modo, grupos, repeticiones=3):
+    """Mejor tiempo de varias ejecuciones en el modo indicado"""
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        with modo_temporal(modo), contextlib.redirect_stdout(io.StringIO()):
+            analizar_lote(grupos)
+        tiempos.append(time.perf_counter() - inicio)
+    return min(tiempos)
+
+
+if __name__ == "__main__":
+    for n_grupos, filas in [(500, 50), (200, 1_000)]:
+        grupos = generar_grupos(n_grupos, filas)
+        t_consola = medir('consola', grupos)
+        t_silencio = medir('silencio', grupos)
+        print(f"{n_grupos} grupos x {filas} filas: consola={t_consola:.3f}s "
+              f"silencio={t_silencio:.3f}s ({t_consola / t_silencio:.2f}x)")
@@ -0,0 +1,74 @@
+"""
+Benchmark: extracción de grupos en inferencia con 1.000 grupos
+(máscaras booleanas por grupo vs partición por código de grupo)
+
+Uso: python benchmarks/bench_particion_grupos.py
+"""
+import sys
+import os
+import time
+
+import numpy as np
+import pandas as pd
+from scipy.stats import f_oneway, kruskal, ttest_ind, mannwhitneyu
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from reporte import configurar_reporte
+from inferencia import test_anova, test_kruskal_wallis, test_t_student, test_mann_whitney
+
+
+def generar_datos(n_filas, n_grupos, semilla=0):
+    """Genera montos sesgados repartidos en n_grupos grupos"""
+    rng = np.random.default_rng(semilla)
+    return pd.DataFrame({'montO_TOTAL': rng.lognormal(12, 1, n_filas).round(2),
+                         'grupo': rng.integers(0, n_grupos, n_filas).astype(str)})
+
+
+def grupos_con_mascaras(df, columna, columna_grupos):
+    """Extracción anterior: un df[df[col] == g] por grupo"""
+    return [df[df[columna_grupos] == nombre][columna].dropna()
+            for nombre in df[columna_grupos].unique()]
+
+
+def medir(funcion, repeticiones=3):
+    """Mejor tiempo de varias ejecuciones"""
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        funcion()
+        tiempos.append(time.perf_counter() - inicio)
+    return min(tiempos)
+
+
+if __name__ == "__main__":
+    configurar_reporte('silencio')
+    df = generar_datos(200_000, 1_000)
+    g1, g2 = df['grupo'] == '1', df['grupo'] == '2'
+
+    casos = {
+        'anova': (lambda: f_oneway(*grupos_con_mascaras(df, 'montO_TOTAL', 'grupo')),
+                  lambda: test_anova.sin_cache(df, 'montO_TOTAL', 'grupo')),
+        'kruskal': (lambda: kruskal(*grupos_con_mascaras(df, 'montO_TOTAL', 'grupo')),
+                    lambda: test_kruskal_wallis.sin_cache(df, 'montO_TOTAL', 'grupo')),
+        # 100 comparaciones de pares de grupos
+        't_student': (lambda: [ttest_ind(df[df['grupo'] == str(i)]['montO_TOTAL'].dropna(),
+                                         df[df['grupo'] == str(i + 1)]['montO_TOTAL'].dropna())
+                               for i in range(100)],
+                      lambda: [test_t_student.sin_cache(df, 'montO_TOTAL', str(i), str(i + 1), 'grupo')
+                               for i in range(100)]),
+        'mann_whitney': (lambda: [mannwhitneyu(df[df['grupo'] == str(i)]['montO_TOTAL'].dropna(),
+                                               df[df['grupo'] == str(i + 1)]['montO_TOTAL'].dropna())
+                                  for i in range(100)],
+                         lambda: [test_mann_whitney.sin_cache(df, 'montO_TOTAL', str(i), str(i + 1), 'grupo')
+                                  for i in range(100)]),
+        # Filtros booleanos: sin copiar el DataFrame completo
+        't_student (filtros)': (lambda: ttest_ind(df[g1]['montO_TOTAL'].dropna(), df[g2]['montO_TOTAL'].dropna()),
+                                lambda: test_t_student.sin_cache(df, 'montO_TOTAL', g1, g2))
+    }
+
+    for nombre, (anterior, nuevo) in casos.items():
+        t_anterior = medir(anterior)
+        t_nuevo = medir(nuevo)
+        print(f"{nombre}: máscaras={t_anterior:.3f}s partición={t_nuevo:.3f}s "
+              f"({t_anterior / t_nuevo:.1f}x)")
@@ -0,0 +1,52 @@
+"""
+Benchmark: resumen_estadistico_completo vs resumen_estadistico_vectorizado
+sobre DataFrames anchos y altos
+
+Uso: python benchmarks/bench_resumen_estadistico.py
+"""
+import sys
+import os
+import io
+import time
+import contextlib
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from estadisticas import resumen_estadistico_completo, resumen_estadistico_vectorizado
+
+
+def generar_datos(n_filas, n_columnas, semilla=0):
+    """Genera montos log-normales con un 5% de nulos"""
+    rng = np.random.default_rng(semilla)
+    datos = rng.lognormal(12, 1, size=(n_filas, n_columnas)).round(2)
+    datos[rng.random(datos.shape) < 0.05] = np.nan
+    return pd.DataFrame(datos, columns=[f'montO_{i}' for i in range(n_columnas)])
+
+
+def medir(funcion, *args, repeticiones=3):
+    """Mejor tiempo de varias ejecuciones, sin la salida por consola"""
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            funcion(*args)
+        tiempos.append(time.perf_counter() - inicio)
+    return min(tiempos)
+
+
+if __name__ == "__main__":
+    escenarios = [
+        ('ancho', 20_000, 200),
+        ('alto', 2_000_000, 6),
+    ]
+    
+    print(f"{'escenario':<10}{'filas':>12}{'columnas':>10}{'actual (s)':>14}{'vectorizado (s)':>18}{'aceleración':>14}")
+    for nombre, n_filas, n_columnas in escenarios:
+        df = generar_datos(n_filas, n_columnas)
+        t_actual = medir(resumen_estadistico_completo, df)
+        t_vectorizado = medir(resumen_estadistico_vectorizado, df)
+        print(f"{nombre:<10}{n_filas:>12}{n_columnas:>10}{t_actual:>14.3f}{t_vectorizado:>18.3f}"
+              f"{t_actual / t_vectorizado:>13.1f}x")
@@ -21,12 +21,16 @@ import os
 sys.path.append(os.path.join(os.path.dirname(__file__), 'src'))
 
 from carga_datos import cargar_json, exportar_a_csv, exportar_a_excel, info_dataframe
-from procesamiento import imputar_media, normalizar_datos, estandarizar_datos
+from procesamiento import imputar_media, normalizar_datos, estandarizar_datos, canonicalizar_categorias
 from filtros import filtrar_por_rango, filtrar_por_categoria, filtrar_top_n, resumen_filtros
-from estadisticas import resumen_estadistico_completo, analisis_dispersion
+from estadisticas import resumen_estadistico_completo, analisis_dispersion, estadisticas_por_grupo, distintos_por_grupo
 from correlaciones import analisis_correlacion_completo, correlacion_spearman
+from bootstrap import bootstrap_correlacion, bootstrap_intervalos
 from visualizaciones import dashboard_completo, grafica_distribucion, diagrama_cajas, grafica_dispersion
-from inferencia import test_normalidad, test_anova, intervalo_confianza
+from inferencia import (test_normalidad, test_anova, intervalo_confianza, pruebas_por_lotes,
+                        normalidad_por_lotes, test_chi_cuadrado, comparaciones_permutacion)
+from series_tiempo import agregados_temporales
+from coocurrencia import coocurrencias_prestaciones
 
 import warnings
 warnings.filterwarnings('ignore')
@@ -89,6 +93,27 @@ def analisis_episodios(df):
     print("\n--- Distribución por Aseguradora ---")
     print(df['aseguradora'].value_counts().head(10))
     
+    # Resumen de montos por aseguradora y clase de episodio
+    if 'montO_TOTAL' in df.columns:
+        print("\n--- Monto Total por Aseguradora y Clase de Episodio ---")
+        tabla = estadisticas_por_grupo(df, ['aseguradora', 'clasE_EPISODIO'], ['montO_TOTAL'])
+        print(tabla[['n', 'media', 'mediana', 'Q1', 'Q3', 'n_outliers']])
+    
+    # Conteos y montos por día de creación, con ventana móvil de 7 días
+    if 'fechA_CREACION' in df.columns and 'montO_TOTAL' in df.columns:
+        print("\n--- Episodios y Monto Total por Día, Aseguradora y Clase ---")
+        series = agregados_temporales(df, 'fechA_CREACION', 'horA_CREACION',
+                                      ['aseguradora', 'clasE_EPISODIO'], ['montO_TOTAL'],
+                                      columnas_distintas=['doC_PACIENTE'])
+        print(series['dia'])
+        print("\n--- Ventana Móvil de 7 Días ---")
+        print(series['ventana_7'])
+    
+    # Pacientes únicos por aseguradora (HyperLogLog)
+    if 'doC_PACIENTE' in df.columns:
+        print("\n--- Pacientes Distintos por Aseguradora ---")
+        print(distintos_por_grupo(df, ['aseguradora'], 'doC_PACIENTE'))
+    
     # Estadísticas por clase de episodio
     print("\n--- Distribución por Clase de Episodio ---")
     print(df['clasE_EPISODIO'].value_counts())
@@ -148,6 +173,9 @@ def analisis_correlaciones(df):
         
         if 'duracioN_MINUTOS' in columnas_validas and 'montO_TOTAL' in columnas_validas:
             correlacion_spearman(df, 'duracioN_MINUTOS', 'montO_TOTAL')
+            
+            # Intervalos bootstrap: los montos son sesgados y el p-valor asintótico no basta
+            bootstrap_correlacion(df, 'duracioN_MINUTOS', 'montO_TOTAL', 'spearman', n_replicas=1000)
 
 
 def analisis_filtros(df):
@@ -193,14 +221,27 @@ def analisis_inferencial(df):
     # Intervalo de confianza
     if 'montO_TOTAL' in df.columns:
         intervalo_confianza(df, 'montO_TOTAL', 0.95)
+        intervalo_confianza(df, 'montO_TOTAL', 0.95, metodo='bootstrap')
     
     # ANOVA por clase de episodio
     if 'montO_TOTAL' in df.columns and 'clasE_EPISODIO' in df.columns:
         test_anova(df, 'montO_TOTAL', 'clasE_EPISODIO')
+        # Pares de clases por permutación de rangos (exacta en grupos chicos)
+        comparaciones_permutacion(df, 'montO_TOTAL', 'clasE_EPISODIO', 'rangos')
     
     # ANOVA por estado de factura
     if 'montO_TOTAL' in df.columns and 'staT_FACTURA' in df.columns:
         test_anova(df, 'montO_TOTAL', 'staT_FACTURA')
+    
+    # Todas las métricas contra todas las agrupaciones, con corrección de Holm
+    columnas_metricas = [col for col in ['montO_TOTAL', 'montO_CONSULTA', 'montO_MEDICAMENTOS',
+                                         'montO_EXAMENES', 'edaD_PACIENTE', 'duracioN_MINUTOS']
+                         if col in df.columns]
+    pruebas_por_lotes(df, columnas_metricas, correccion='holm')
+    
+    # Normalidad de todas las métricas por clase de episodio
+    if 'clasE_EPISODIO' in df.columns:
+        normalidad_por_lotes(df, columnas_metricas, 'clasE_EPISODIO')
 
 
 def analisis_prestaciones(df_prestaciones):
@@ -232,6 +273,19 @@ def analisis_prestaciones(df_prestaciones):
     if 'tipO_PRESTACION' in df_prestaciones.columns:
         print("\n--- Distribución por Tipo de Prestación ---")
         print(df_prestaciones['tipO_PRESTACION'].value_counts())
+    
+    # Intervalos bootstrap del valor neto por tipo (valores muy sesgados)
+    if 'valoR_NETO_NUM' in df_prestaciones.columns and 'tipO_PRESTACION' in df_prestaciones.columns:
+        bootstrap_intervalos(df_prestaciones, 'valoR_NETO_NUM', ('media', 'mediana', 'media_recortada'),
+                             percentiles=(90,), columna_grupos='tipO_PRESTACION', n_replicas=1000)
+    
+    # Prestaciones que aparecen juntas en un mismo episodio
+    if 'episodio' in df_prestaciones.columns and 'coD_PRESTACION' in df_prestaciones.columns:
+        coocurrencias_prestaciones(df_prestaciones, 'episodio', 'coD_PRESTACION', minimo=1, top=10)
+    
+    # Asociación entre aseguradora y prestación (tabla dispersa, categorías raras agrupadas)
+    if 'aseguradora' in df_prestaciones.columns and 'coD_PRESTACION' in df_prestaciones.columns:
+        test_chi_cuadrado(df_prestaciones, 'aseguradora', 'coD_PRESTACION', minimo=2)
 
 
 def main():
@@ -251,6 +305,9 @@ def main():
             print("✗ Error al cargar los datos. Verifica la ruta del archivo.")
             return
         
+        # Unificar nombres de aseguradoras y unidades organizativas
+        df = canonicalizar_categorias(df)
+        
         # Exportar a otros formatos
         exportar_a_csv(df, os.path.join('data', 'facturacion_medica.csv'))
         exportar_a_excel(df, os.path.join('data', 'facturacion_medica.xlsx'))
@@ -289,6 +346,13 @@ def main():
         # grafica_distribucion(df, 'montO_TOTAL')
         # diagrama_cajas(df, ['montO_TOTAL', 'edaD_PACIENTE', 'duracioN_MINUTOS'])
         
+        # Sin pantalla (servidores): todas las gráficas por clase de episodio a archivos
+        # (con caché: en la corrida siguiente solo se redibujan los segmentos que cambiaron)
+        # from cache_graficas import configurar_cache_graficas
+        # configurar_cache_graficas(directorio='cache_graficas', maximo_mb=500, maximo_dias=30)
+        # from graficas_lotes import renderizar_segmentos
+        # renderizar_segmentos(df, 'clasE_EPISODIO', directorio='graficas')
+        
         print("\n" + "="*80)
         print("✓ ANÁLISIS COMPLETADO EXITOSAMENTE")
         print("="*80 + "\n")
@@ -6,13 +6,39 @@ __version__ = "1.0.0"
 __author__ = "Proyecto Estructuras"
 
 # Importaciones principales
+from .reporte import (
+    configurar_reporte,
+    modo_reporte,
+    reporte_activo,
+    modo_temporal,
+    silencio,
+    reportar
+)
+
+from .cache import (
+    configurar_cache,
+    limpiar_cache,
+    estadisticas_cache,
+    huella_dataframe,
+    huella_valores,
+    memorizar
+)
+
+from .rangos import (
+    calcular_rangos,
+    rangos_columna,
+    matriz_rangos,
+    limpiar_rangos
+)
+
 from .carga_datos import (
     cargar_json,
     cargar_csv,
     cargar_excel,
     exportar_a_csv,
     exportar_a_excel,
-    info_dataframe
+    info_dataframe,
+    iterar_bloques
 )
 
 from .procesamiento import (
@@ -21,10 +47,13 @@ from .procesamiento import (
     imputar_media,
     imputar_mediana,
     imputar_moda,
-    ciclar_categorias
+    ciclar_categorias,
+    normalizar_texto,
+    canonicalizar_categorias
 )
 
 from .filtros import (
+    VistaFiltrada,
     filtrar_por_rango,
     filtrar_por_categoria,
     buscar_texto,
@@ -34,16 +63,61 @@ from .filtros import (
     resumen_filtros
 )
 
+from .sketches import (
+    SketchCuantiles,
+    cuartiles_desde_sketch,
+    sketches_por_dia,
+    combinar_rango,
+    guardar_sketches_diarios,
+    cargar_sketches_diarios,
+    SketchDistintos,
+    pares_por_codigo,
+    estimar_pares,
+    distintos_moviles,
+    distintos_por_codigo
+)
+
+from .acumuladores import (
+    AcumuladorMomentos,
+    acumular_momentos,
+    acumular_momentos_paralelo,
+    AcumuladorCovarianza,
+    acumular_covarianza,
+    covarianza_por_particion,
+    medidas_por_bloques,
+    analisis_dispersion_por_bloques
+)
+
+from .outliers import (
+    EstadoOutliers,
+    construir_estado_outliers,
+    filtrar_outliers_por_bloques
+)
+
+from .series_tiempo import (
+    marcas_de_tiempo,
+    inicio_periodo,
+    AgregadoTemporal,
+    agregados_temporales
+)
+
 from .estadisticas import (
     medidas_centralidad,
     medidas_dispersion,
     calcular_cuartiles,
     detectar_outliers,
     resumen_estadistico_completo,
+    resumen_estadistico_vectorizado,
+    imprimir_resumen_estadistico,
+    factorizar_claves,
+    estadisticas_por_grupo,
+    distintos_por_grupo,
     analisis_dispersion
 )
 
 from .correlaciones import (
+    correlaciones_por_pares,
+    top_correlaciones,
     correlacion_pearson,
     correlacion_spearman,
     matriz_correlacion,
@@ -51,7 +125,32 @@ from .correlaciones import (
     analisis_correlacion_completo
 )
 
+from .contingencia import (
+    TablaContingencia,
+    tabla_contingencia
+)
+
+from .coocurrencia import (
+    matriz_incidencia,
+    matrices_coocurrencia,
+    coocurrencias_prestaciones
+)
+
+from .bootstrap import (
+    bootstrap_correlacion,
+    bootstrap_matriz_correlacion,
+    bootstrap_intervalos
+)
+
+from .permutaciones import (
+    prueba_permutacion,
+    pruebas_permutacion
+)
+
 from .visualizaciones import (
+    configurar_graficas,
+    graficas_visibles,
+    muestra_estratificada,
     grafica_distribucion,
     diagrama_cajas,
     grafica_dispersion,
@@ -61,6 +160,18 @@ from .visualizaciones import (
     dashboard_completo
 )
 
+from .cache_graficas import (
+    configurar_cache_graficas,
+    limpiar_cache_graficas,
+    estadisticas_cache_graficas,
+    cachear_grafica
+)
+
+from .graficas_lotes import (
+    GRAFICAS_LOTE,
+    renderizar_segmentos
+)
+
 from .inferencia import (
     test_normalidad,
     test_t_student,
@@ -68,36 +179,83 @@ from .inferencia import (
     test_anova,
     test_kruskal_wallis,
     test_chi_cuadrado,
-    intervalo_confianza
+    intervalo_confianza,
+    ajustar_p_valores,
+    pruebas_por_lotes,
+    ParticionGrupos,
+    particion_grupos,
+    normalidad_por_lotes,
+    comparaciones_permutacion
 )
 
 __all__ = [
+    # Reporte
+    'configurar_reporte', 'modo_reporte', 'reporte_activo',
+    'modo_temporal', 'silencio', 'reportar',
+    
+    # Caché de resultados
+    'configurar_cache', 'limpiar_cache', 'estadisticas_cache', 'huella_dataframe',
+    'huella_valores', 'memorizar',
+    'calcular_rangos', 'rangos_columna', 'matriz_rangos', 'limpiar_rangos',
+    
     # Carga de datos
     'cargar_json', 'cargar_csv', 'cargar_excel',
-    'exportar_a_csv', 'exportar_a_excel', 'info_dataframe',
+    'exportar_a_csv', 'exportar_a_excel', 'info_dataframe', 'iterar_bloques',
     
     # Procesamiento
     'normalizar_datos', 'estandarizar_datos',
     'imputar_media', 'imputar_mediana', 'imputar_moda', 'ciclar_categorias',
+    'normalizar_texto', 'canonicalizar_categorias',
     
     # Filtros
-    'filtrar_por_rango', 'filtrar_por_categoria', 'buscar_texto',
+    'VistaFiltrada', 'filtrar_por_rango', 'filtrar_por_categoria', 'buscar_texto',
     'filtrar_top_n', 'filtrar_outliers', 'filtrar_multiples_condiciones', 'resumen_filtros',
     
+    # Sketches, acumuladores y outliers por bloques
+    'SketchCuantiles', 'cuartiles_desde_sketch', 'sketches_por_dia', 'combinar_rango',
+    'guardar_sketches_diarios', 'cargar_sketches_diarios',
+    'SketchDistintos', 'pares_por_codigo', 'estimar_pares',
+    'distintos_moviles', 'distintos_por_codigo',
+    'AcumuladorMomentos', 'acumular_momentos',
+    'acumular_momentos_paralelo', 'AcumuladorCovarianza', 'acumular_covarianza',
+    'covarianza_por_particion', 'medidas_por_bloques', 'analisis_dispersion_por_bloques',
+    'EstadoOutliers', 'construir_estado_outliers', 'filtrar_outliers_por_bloques',
+    
+    # Series de tiempo
+    'marcas_de_tiempo', 'inicio_periodo', 'AgregadoTemporal', 'agregados_temporales',
+    
     # Estadísticas
     'medidas_centralidad', 'medidas_dispersion', 'calcular_cuartiles',
     'detectar_outliers', 'resumen_estadistico_completo', 'analisis_dispersion',
+    'resumen_estadistico_vectorizado', 'imprimir_resumen_estadistico',
+    'factorizar_claves', 'estadisticas_por_grupo', 'distintos_por_grupo',
     
     # Correlaciones
+    'correlaciones_por_pares', 'top_correlaciones',
     'correlacion_pearson', 'correlacion_spearman', 'matriz_correlacion',
     'matriz_covarianza', 'analisis_correlacion_completo',
+    'bootstrap_correlacion', 'bootstrap_matriz_correlacion', 'bootstrap_intervalos',
+    
+    # Tablas de contingencia
+    'TablaContingencia', 'tabla_contingencia',
+    
+    # Co-ocurrencia de prestaciones
+    'matriz_incidencia', 'matrices_coocurrencia', 'coocurrencias_prestaciones',
     
     # Visualizaciones
     'grafica_distribucion', 'diagrama_cajas', 'grafica_dispersion',
     'grafica_relacional_seaborn', 'grafica_barras_categorias',
     'pairplot_seaborn', 'dashboard_completo',
+    'configurar_graficas', 'graficas_visibles', 'muestra_estratificada', 'GRAFICAS_LOTE', 'renderizar_segmentos',
+    'configurar_cache_graficas', 'limpiar_cache_graficas', 'estadisticas_cache_graficas',
+    'cachear_grafica',
     
     # Inferencia
     'test_normalidad', 'test_t_student', 'test_mann_whitney',
-    'test_anova', 'test_kruskal_wallis', 'test_chi_cuadrado', 'intervalo_confianza'
+    'test_anova', 'test_kruskal_wallis', 'test_chi_cuadrado', 'intervalo_confianza',
+    'ajustar_p_valores', 'pruebas_por_lotes', 'ParticionGrupos', 'particion_grupos',
+    'normalidad_por_lotes', 'comparaciones_permutacion',
+    
+    # Pruebas de permutación
+    'prueba_permutacion', 'pruebas_permutacion'
 ]
@@ -0,0 +1,454 @@
+"""
+Módulo de acumuladores combinables para estadísticas por bloques
+
+Cada acumulador se actualiza con update(bloque) y se combina con
+merge(otro) de forma exacta (fórmulas de Welford/Chan/Pébay), de modo que
+las mismas medidas se pueden calcular sobre cargas por bloques o repartir
+entre procesos y luego combinar.
+"""
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+import numpy as np
+
+try:
+    from .sketches import SketchCuantiles
+    from .carga_datos import iterar_bloques
+except ImportError:
+    from sketches import SketchCuantiles
+    from carga_datos import iterar_bloques
+
+
+class AcumuladorMomentos:
+    """
+    Acumulador de conteo, media, momentos centrados M2/M3/M4, mínimo,
+    máximo y suma de una variable numérica
+    """
+    
+    def __init__(self):
+        self.n = 0
+        self.media = 0.0
+        self.m2 = 0.0
+        self.m3 = 0.0
+        self.m4 = 0.0
+        self.minimo = np.inf
+        self.maximo = -np.inf
+        self.suma = 0.0
+    
+    def update(self, valores):
+        """
+        Agrega un bloque de valores (se ignoran los nulos)
+        
+        Args:
+            valores (array-like): Valores numéricos
+            
+        Returns:
+            AcumuladorMomentos: El propio acumulador
+        """
+        valores = np.asarray(valores, dtype=float).ravel()
+        valores = valores[~np.isnan(valores)]
+        if len(valores) == 0:
+            return self
+        
+        # Momentos exactos del bloque y combinación con lo acumulado
+        bloque = AcumuladorMomentos()
+        bloque.n = len(valores)
+        bloque.media = valores.mean()
+        desvios = valores - bloque.media
+        cuadrados = desvios * desvios
+        bloque.m2 = cuadrados.sum()
+        bloque.m3 = (cuadrados * desvios).sum()
+        bloque.m4 = (cuadrados * cuadrados).sum()
+        bloque.minimo = valores.min()
+        bloque.maximo = valores.max()
+        bloque.suma = valores.sum()
+        return self.merge(bloque)
+    
+    def merge(self, otro):
+        """
+        Combina otro acumulador en este (fórmulas de Pébay)
+        
+        Args:
+            otro (AcumuladorMomentos): Acumulador de otra parte de los datos
+            
+        Returns:
+            AcumuladorMomentos: El propio acumulador
+        """
+        if otro.n == 0:
+            return self
+        if self.n == 0:
+            self.__dict__.update(otro.__dict__)
+            return self
+        
+        na, nb = self.n, otro.n
+        n = na + nb
+        delta = otro.media - self.media
+        delta_n = delta / n
+        
+        m4 = (self.m4 + otro.m4
+              + delta * delta_n ** 3 * na * nb * (na * na - na * nb + nb * nb)
+              + 6 * delta_n ** 2 * (na * na * otro.m2 + nb * nb * self.m2)
+              + 4 * delta_n * (na * otro.m3 - nb * self.m3))
+        m3 = (self.m3 + otro.m3
+              + delta * delta_n ** 2 * na * nb * (na - nb)
+              + 3 * delta_n * (na * otro.m2 - nb * self.m2))
+        m2 = self.m2 + otro.m2 + delta * delta_n * na * nb
+        
+        self.n = n
+        self.media = self.media + delta_n * nb
+        self.m2, self.m3, self.m4 = m2, m3, m4
+        self.minimo = min(self.minimo, otro.minimo)
+        self.maximo = max(self.maximo, otro.maximo)
+        self.suma += otro.suma
+        return self
+    
+    def varianza(self):
+        """Varianza muestral (ddof=1, como pandas)"""
+        return self.m2 / (self.n - 1) if self.n > 1 else np.nan
+    
+    def desviacion_estandar(self):
+        """Desviación estándar muestral (ddof=1, como pandas)"""
+        return np.sqrt(self.varianza())
+    
+    def asimetria(self, corregida=True):
+        """
+        Coeficiente de asimetría
+        
+        Args:
+            corregida (bool): Aplicar la corrección de sesgo (como pandas.skew)
+            
+        Returns:
+            float: Asimetría
+        """
+        if self.n < 3 or self.m2 == 0:
+            return np.nan
+        g1 = np.sqrt(self.n) * self.m3 / self.m2 ** 1.5
+        if not corregida:
+            return g1
+        return g1 * np.sqrt(self.n * (self.n - 1)) / (self.n - 2)
+    
+    def curtosis(self, corregida=True):
+        """
+        Curtosis en exceso
+        
+        Args:
+            corregida (bool): Aplicar la corrección de sesgo (como pandas.kurt)
+            
+        Returns:
+            float: Curtosis en exceso
+        """
+        if self.n < 4 or self.m2 == 0:
+            return np.nan
+        g2 = self.n * self.m4 / self.m2 ** 2 - 3
+        if not corregida:
+            return g2
+        n = self.n
+        return ((n + 1) * g2 + 6) * (n - 1) / ((n - 2) * (n - 3))
+    
+    def medidas_dispersion(self):
+        """
+        Medidas de dispersión calculables con momentos
+        
+        Returns:
+            dict: varianza, desviacion_estandar, rango y coeficiente_variacion
+        """
+        std = self.desviacion_estandar()
+        return {
+            'varianza': self.varianza(),
+            'desviacion_estandar': std,
+            'rango': self.maximo - self.minimo if self.n else np.nan,
+            'coeficiente_variacion': (std / self.media) * 100 if self.media != 0 else 0
+        }
+
+
+class AcumuladorCovarianza:
+    """
+    Acumulador de medias y co-momentos de varias columnas (filas completas)
+    
+    Guarda n, el vector de medias y la matriz de co-momentos
+    C = sum((x - media)(x - media)^T). Cada bloque se resume con un producto
+    de matrices centrado y se combina con la fórmula de Chan:
+    C = Ca + Cb + delta delta^T * na * nb / n, exacta en cualquier orden.
+    
+    Args:
+        columnas (list): Columnas numéricas a acumular
+    """
+    
+    def __init__(self, columnas):
+        self.columnas = list(columnas)
+        p = len(self.columnas)
+        self.n = 0
+        self.media = np.zeros(p)
+        self.comomentos = np.zeros((p, p))
+    
+    def update(self, bloque):
+        """
+        Agrega un bloque (se ignoran las filas con algún nulo, como dropna().cov())
+        
+        Args:
+            bloque (pd.DataFrame | np.ndarray): Bloque con las columnas en orden
+            
+        Returns:
+            AcumuladorCovarianza: El propio acumulador
+        """
+        if isinstance(bloque, pd.DataFrame):
+            bloque = bloque[self.columnas].to_numpy(dtype=float, na_value=np.nan)
+        datos = np.asarray(bloque, dtype=float).reshape(-1, len(self.columnas))
+        datos = datos[~np.isnan(datos).any(axis=1)]
+        if len(datos) == 0:
+            return self
+        
+        parcial = AcumuladorCovarianza(self.columnas)
+        parcial.n = len(datos)
+        parcial.media = datos.mean(axis=0)
+        centrados = datos - parcial.media
+        parcial.comomentos = centrados.T @ centrados
+        return self.merge(parcial)
+    
+    def merge(self, otro):
+        """
+        Combina otro acumulador en este
+        
+        Args:
+            otro (AcumuladorCovarianza): Acumulador con las mismas columnas
+            
+        Returns:
+            AcumuladorCovarianza: El propio acumulador
+        """
+        if otro.columnas != self.columnas:
+            raise ValueError("Solo se pueden combinar acumuladores con las mismas columnas")
+        if otro.n == 0:
+            return self
+        if self.n == 0:
+            self.n = otro.n
+            self.media = otro.media.copy()
+            self.comomentos = otro.comomentos.copy()
+            return self
+        
+        n = self.n + otro.n
+        delta = otro.media - self.media
+        self.comomentos = self.comomentos + otro.comomentos + np.outer(delta, delta) * (self.n * otro.n / n)
+        self.media = self.media + delta * (otro.n / n)
+        self.n = n
+        return self
+    
+    def covarianza(self):
+        """
+        Matriz de covarianza muestral (ddof=1, como pandas)
+        
+        Returns:
+            pd.DataFrame: Matriz de covarianza
+        """
+        valores = self.comomentos / (self.n - 1) if self.n > 1 else np.full(self.comomentos.shape, np.nan)
+        return pd.DataFrame(valores, index=self.columnas, columns=self.columnas)
+    
+    def correlacion(self):
+        """
+        Matriz de correlación de Pearson
+        
+        Returns:
+            pd.DataFrame: Matriz de correlación
+        """
+        desviaciones = np.sqrt(np.diag(self.comomentos))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            valores = self.comomentos / np.outer(desviaciones, desviaciones)
+        valores = np.clip(valores, -1, 1)
+        if self.n < 2:
+            valores[:] = np.nan
+        return pd.DataFrame(valores, index=self.columnas, columns=self.columnas)
+
+
+def acumular_momentos(fuente, columnas=None, tamano_bloque=100_000):
+    """
+    Recorre una fuente por bloques acumulando momentos por columna
+    
+    Args:
+        fuente: DataFrame, lista de DataFrames o función que genera bloques
+        columnas (list): Columnas numéricas (None = las numéricas del primer bloque)
+        tamano_bloque (int): Filas por bloque si la fuente es un DataFrame
+        
+    Returns:
+        dict: Columna -> AcumuladorMomentos
+    """
+    acumuladores = {}
+    for bloque in iterar_bloques(fuente, tamano_bloque):
+        if columnas is None:
+            columnas = bloque.select_dtypes(include=[np.number]).columns.tolist()
+        for col in columnas:
+            acumuladores.setdefault(col, AcumuladorMomentos()).update(
+                bloque[col].to_numpy(dtype=float, na_value=np.nan))
+    return acumuladores
+
+
+def _acumular_bloque(argumentos):
+    """Tarea de un proceso: momentos de un bloque (debe ser de nivel módulo)"""
+    bloque, columnas = argumentos
+    return acumular_momentos([bloque], columnas)
+
+
+def acumular_momentos_paralelo(bloques, columnas=None, procesos=None):
+    """
+    Acumula momentos repartiendo los bloques entre procesos y combinando
+    los resultados en el orden de los bloques
+    
+    Args:
+        bloques (list): Lista de DataFrames
+        columnas (list): Columnas numéricas (None = las numéricas del primer bloque)
+        procesos (int): Número de procesos (default: núcleos disponibles)
+        
+    Returns:
+        dict: Columna -> AcumuladorMomentos
+    """
+    bloques = list(bloques)
+    if columnas is None and bloques:
+        columnas = bloques[0].select_dtypes(include=[np.number]).columns.tolist()
+    
+    acumuladores = {col: AcumuladorMomentos() for col in columnas or []}
+    with ProcessPoolExecutor(max_workers=procesos) as ejecutor:
+        for parcial in ejecutor.map(_acumular_bloque, [(bloque, columnas) for bloque in bloques]):
+            for col, acumulador in parcial.items():
+                acumuladores[col].merge(acumulador)
+    return acumuladores
+
+
+def acumular_covarianza(fuente, columnas=None, tamano_bloque=100_000):
+    """
+    Recorre una fuente por bloques acumulando la matriz de covarianza
+    
+    Args:
+        fuente: DataFrame, lista de DataFrames o función que genera bloques
+        columnas (list): Columnas numéricas (None = las numéricas del primer bloque)
+        tamano_bloque (int): Filas por bloque si la fuente es un DataFrame
+        
+    Returns:
+        AcumuladorCovarianza: Acumulador con todos los bloques
+    """
+    acumulador = None
+    for bloque in iterar_bloques(fuente, tamano_bloque):
+        if acumulador is None:
+            if columnas is None:
+                columnas = bloque.select_dtypes(include=[np.number]).columns.tolist()
+            acumulador = AcumuladorCovarianza(columnas)
+        acumulador.update(bloque)
+    return acumulador if acumulador is not None else AcumuladorCovarianza(columnas or [])
+
+
+def _acumular_covarianza_bloque(argumentos):
+    """Tarea de un proceso: covarianza de un bloque (debe ser de nivel módulo)"""
+    bloque, columnas = argumentos
+    return AcumuladorCovarianza(columnas).update(bloque)
+
+
+def covarianza_por_particion(df, columna_particion, columnas=None, procesos=None):
+    """
+    Covarianza de cada partición (p. ej. 'centrO_SANITARIO') calculada en
+    procesos separados, y la combinación exacta de todas
+    
+    Args:
+        df (pd.DataFrame): DataFrame con los datos
+        columna_particion (str): Columna que define las particiones
+        columnas (list): Columnas numéricas (None = todas las numéricas)
+        procesos (int): Número de procesos (default: núcleos disponibles)
+        
+    Returns:
+        tuple: (AcumuladorCovarianza total, dict partición -> AcumuladorCovarianza)
+    """
+    if columnas is None:
+        columnas = [col for col in df.select_dtypes(include=[np.number]).columns
+                    if col != columna_particion]
+    
+    particiones = {}
+    for nombre, bloque in df.groupby(columna_particion, sort=True, observed=True):
+        particiones[nombre] = bloque[columnas]
+    
+    total = AcumuladorCovarianza(columnas)
+    por_particion = {}
+    with ProcessPoolExecutor(max_workers=procesos) as ejecutor:
+        tareas = [(bloque, columnas) for bloque in particiones.values()]
+        for nombre, parcial in zip(particiones, ejecutor.map(_acumular_covarianza_bloque, tareas)):
+            por_particion[nombre] = parcial
+            total.merge(parcial)
+    return total, por_particion
+
+
+def medidas_por_bloques(fuente, columna, tamano_bloque=100_000, k=200):
+    """
+    Medidas de centralidad y dispersión de una columna leída por bloques.
+    La mediana y el IQR salen de un SketchCuantiles (exactos mientras el
+    sketch no compacta); la moda no se puede acumular y se omite.
+    
+    Args:
+        fuente: DataFrame, lista de DataFrames o función que genera bloques
+        columna (str): Columna a analizar
+        tamano_bloque (int): Filas por bloque si la fuente es un DataFrame
+        k (int): Precisión del sketch de cuantiles
+        
+    Returns:
+        dict: Mismas claves que medidas_centralidad y medidas_dispersion
+    """
+    acumulador = AcumuladorMomentos()
+    sketch = SketchCuantiles(k, semilla=0)
+    for bloque in iterar_bloques(fuente, tamano_bloque):
+        valores = bloque[columna].to_numpy(dtype=float, na_value=np.nan)
+        acumulador.update(valores)
+        sketch.update(valores)
+    
+    q1, mediana, q3 = sketch.cuantiles([0.25, 0.5, 0.75])
+    resultados = {
+        'n': acumulador.n,
+        'media': acumulador.media if acumulador.n else np.nan,
+        'mediana': mediana,
+        'moda': None
+    }
+    resultados.update(acumulador.medidas_dispersion())
+    resultados['rango_intercuartilico'] = q3 - q1
+    return resultados
+
+
+def analisis_dispersion_por_bloques(fuente, columna_x, columna_y, tamano_bloque=100_000):
+    """
+    Versión por bloques de analisis_dispersion: solo cuentan las filas con
+    ambas columnas presentes
+    
+    Args:
+        fuente: DataFrame, lista de DataFrames o función que genera bloques
+        columna_x (str): Primera columna
+        columna_y (str): Segunda columna
+        tamano_bloque (int): Filas por bloque si la fuente es un DataFrame
+        
+    Returns:
+        dict: Mismas métricas que analisis_dispersion
+    """
+    acumulador_x = AcumuladorMomentos()
+    acumulador_y = AcumuladorMomentos()
+    for bloque in iterar_bloques(fuente, tamano_bloque):
+        x = bloque[columna_x].to_numpy(dtype=float, na_value=np.nan)
+        y = bloque[columna_y].to_numpy(dtype=float, na_value=np.nan)
+        completos = ~(np.isnan(x) | np.isnan(y))
+        acumulador_x.update(x[completos])
+        acumulador_y.update(y[completos])
+    
+    return {
+        'n_observaciones': acumulador_x.n,
+        'media_x': acumulador_x.media,
+        'media_y': acumulador_y.media,
+        'std_x': acumulador_x.desviacion_estandar(),
+        'std_y': acumulador_y.desviacion_estandar(),
+        'rango_x': acumulador_x.maximo - acumulador_x.minimo,
+        'rango_y': acumulador_y.maximo - acumulador_y.minimo
+    }
+
+
+if __name__ == "__main__":
+    # Validación contra pandas con datos desplazados (caso difícil numéricamente)
+    rng = np.random.default_rng(0)
+    serie = pd.Series(1e9 + rng.lognormal(0, 1, 1_000_000))
+    
+    acumulador = AcumuladorMomentos()
+    for bloque in np.array_split(serie.to_numpy(), 97):
+        acumulador.update(bloque)
+    
+    print(f"media:     {acumulador.media:.6f} vs {serie.mean():.6f}")
+    print(f"varianza:  {acumulador.varianza():.10f} vs {serie.var():.10f}")
+    print(f"asimetría: {acumulador.asimetria():.10f} vs {serie.skew():.10f}")
+    print(f"curtosis:  {acumulador.curtosis():.10f} vs {serie.kurt():.10f}")
@@ -0,0 +1,587 @@
+"""
+Módulo de intervalos de confianza bootstrap para correlaciones y para
+estadísticos de una variable (media, mediana, media recortada, percentiles)
+
+Los p-valores asintóticos de Pearson y Spearman suponen normalidad o
+muestras grandes, algo poco fiable con montos de facturación sesgados.
+Aquí las réplicas se generan por bloques: cada bloque sortea una matriz
+de índices de remuestreo, la convierte en pesos (cuántas veces aparece
+cada fila) y calcula las correlaciones de todas las réplicas del bloque
+con productos de matrices. Los bloques se reparten entre procesos y cada
+uno tiene su propia semilla derivada de la semilla global, de modo que el
+resultado no depende del número de procesos.
+
+Se informan intervalos percentil y BCa (sesgo corregido y acelerado); la
+aceleración se estima con jackknife (por grupos en Spearman si hay muchas
+filas).
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+import numpy as np
+from scipy.special import ndtr, ndtri
+
+try:
+    from .reporte import reportar, reporte_activo
+    from .cache import memorizar
+    from .correlaciones import METODOS_CORRELACION, _interpretar_correlacion
+except ImportError:
+    from reporte import reportar, reporte_activo
+    from cache import memorizar
+    from correlaciones import METODOS_CORRELACION, _interpretar_correlacion
+
+
+# Máximo de pesos (réplicas x filas) en memoria por bloque
+MAXIMO_PESOS_BLOQUE = 5_000_000
+
+# Grupos del jackknife de Spearman para la aceleración BCa (con menos
+# filas, uno por fila); el de Pearson siempre deja fuera una fila a la vez
+GRUPOS_JACKKNIFE = 200
+
+
+def _preparar(datos, metodo):
+    """
+    Datos listos para calcular correlaciones ponderadas: columnas
+    estandarizadas (Pearson) u orden y grupos de empates (Spearman)
+    """
+    if metodo == 'pearson':
+        desviaciones = datos.std(axis=0)
+        desviaciones[desviaciones == 0] = 1
+        return {'metodo': metodo, 'datos': (datos - datos.mean(axis=0)) / desviaciones}
+
+    columnas = []
+    for j in range(datos.shape[1]):
+        orden = np.argsort(datos[:, j], kind='stable')
+        ordenados = datos[orden, j]
+        nuevo = np.ones(len(ordenados), dtype=bool)
+        nuevo[1:] = ordenados[1:] != ordenados[:-1]
+        columnas.append((orden, np.flatnonzero(nuevo), np.cumsum(nuevo) - 1))
+    return {'metodo': metodo, 'columnas': columnas}
+
+
+def _rangos_ponderados(pesos, orden, inicios, grupo):
+    """
+    Rangos promedio que tendría cada fila en las muestras con esos pesos
+    (filas repetidas cuentan como empates)
+    """
+    por_grupo = pesos[:, orden]
+    sin_empates = len(inicios) == pesos.shape[1]
+    if not sin_empates:
+        por_grupo = np.add.reduceat(por_grupo, inicios, axis=1)
+    anteriores = np.cumsum(por_grupo, axis=1) - por_grupo
+    ordenados = anteriores + (por_grupo + 1) / 2
+    rangos = np.empty_like(pesos)
+    rangos[:, orden] = ordenados if sin_empates else ordenados[:, grupo]
+    return rangos
+
+
+def _correlaciones_ponderadas(preparado, pesos):
+    """
+    Matrices de correlación de varias muestras dadas por sus pesos
+
+    Args:
+        preparado (dict): Resultado de _preparar
+        pesos (np.ndarray): Matriz réplicas x filas con el peso de cada fila
+
+    Returns:
+        np.ndarray: Arreglo réplicas x p x p
+    """
+    if preparado['metodo'] == 'pearson':
+        z = preparado['datos']
+        filas, columnas = np.triu_indices(z.shape[1])
+        return _correlaciones_desde_sumas(pesos.sum(axis=1), pesos @ z,
+                                          pesos @ (z[:, filas] * z[:, columnas]))
+
+    rangos = [_rangos_ponderados(pesos, *columna) for columna in preparado['columnas']]
+    filas, columnas = np.triu_indices(len(rangos))
+    sumas = np.column_stack([(pesos * r).sum(axis=1) for r in rangos])
+    cruzadas = np.column_stack([(pesos * rangos[i] * rangos[j]).sum(axis=1)
+                                for i, j in zip(filas, columnas)])
+    return _correlaciones_desde_sumas(pesos.sum(axis=1), sumas, cruzadas)
+
+
+def _correlaciones_desde_sumas(total, sumas, cruzadas):
+    """
+    Matrices de correlación a partir de los pesos totales, las sumas
+    ponderadas de cada columna y las de los productos cruzados (triángulo
+    superior, en el orden de np.triu_indices)
+    """
+    p = sumas.shape[1]
+    filas, columnas = np.triu_indices(p)
+    covarianzas = np.empty((len(total), p, p))
+    valores = cruzadas - sumas[:, filas] * sumas[:, columnas] / total[:, None]
+    covarianzas[:, filas, columnas] = valores
+    covarianzas[:, columnas, filas] = valores
+    varianzas = np.diagonal(covarianzas, axis1=1, axis2=2)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        correlaciones = covarianzas / np.sqrt(varianzas[:, :, None] * varianzas[:, None, :])
+    return np.clip(correlaciones, -1, 1)
+
+
+def _replicas_bloque(argumentos):
+    """Tarea de un proceso: correlaciones de un bloque de réplicas (debe ser de nivel módulo)"""
+    preparado, n, replicas, semilla = argumentos
+    pesos = _pesos_remuestreo(np.random.default_rng(semilla), n, replicas)
+    return _correlaciones_ponderadas(preparado, pesos)
+
+
+def _jackknife(preparado, n, grupos):
+    """
+    Correlaciones dejando fuera cada fila (Pearson, restando su aporte a las
+    sumas) o cada grupo de filas (Spearman, una fila por grupo si n <= grupos)
+    """
+    if preparado['metodo'] == 'pearson':
+        z = preparado['datos']
+        filas, columnas = np.triu_indices(z.shape[1])
+        productos = z[:, filas] * z[:, columnas]
+        return _correlaciones_desde_sumas(np.full(n, n - 1.0), z.sum(axis=0) - z,
+                                          productos.sum(axis=0) - productos)
+
+    grupos = min(grupos, n)
+    asignacion = np.arange(n) % grupos
+    por_bloque = max(1, MAXIMO_PESOS_BLOQUE // n)
+    estimaciones = []
+    for inicio in range(0, grupos, por_bloque):
+        seleccion = np.arange(inicio, min(inicio + por_bloque, grupos))
+        pesos = (asignacion[None, :] != seleccion[:, None]).astype(float)
+        estimaciones.append(_correlaciones_ponderadas(preparado, pesos))
+    return np.concatenate(estimaciones)
+
+
+def _intervalos_vector(replicas, estimado, jackknife, nivel_confianza):
+    """
+    Error estándar e intervalos percentil y BCa de varios estadísticos
+
+    Args:
+        replicas (np.ndarray): Réplicas x estadísticos
+        estimado (np.ndarray): Estimación de cada estadístico con la muestra
+        jackknife (np.ndarray): Estimaciones jackknife x estadísticos
+        nivel_confianza (float): Nivel de confianza
+
+    Returns:
+        dict: Arreglos con error_estandar y los límites de cada intervalo
+    """
+    alfa = 1 - nivel_confianza
+    z_alfa = ndtri(np.array([alfa / 2, 1 - alfa / 2]))
+    k = len(estimado)
+    resultado = {nombre: np.full(k, np.nan) for nombre in
+                 ('error_estandar', 'percentil_inferior', 'percentil_superior',
+                  'bca_inferior', 'bca_superior')}
+
+    # Sesgo: proporción de réplicas por debajo de la estimación
+    validas = (~np.isnan(replicas)).sum(axis=0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        z0 = ndtri((replicas < estimado).sum(axis=0) / validas)
+        # Aceleración: asimetría de las estimaciones jackknife
+        desvios = np.nanmean(jackknife, axis=0) - jackknife
+        aceleracion = (np.nansum(desvios ** 3, axis=0)
+                       / (6 * np.nansum(desvios ** 2, axis=0) ** 1.5))
+    aceleracion = np.nan_to_num(aceleracion)
+
+    for i in range(k):
+        muestra = replicas[:, i]
+        muestra = muestra[~np.isnan(muestra)]
+        if len(muestra) < 2:
+            continue
+        resultado['error_estandar'][i] = muestra.std(ddof=1)
+        (resultado['percentil_inferior'][i],
+         resultado['percentil_superior'][i]) = np.quantile(muestra, [alfa / 2, 1 - alfa / 2])
+        if np.isfinite(z0[i]):
+            ajuste = z0[i] + z_alfa
+            niveles = ndtr(z0[i] + ajuste / (1 - aceleracion[i] * ajuste))
+            resultado['bca_inferior'][i], resultado['bca_superior'][i] = np.quantile(muestra, niveles)
+    return resultado
+
+
+def _intervalos(replicas, estimado, jackknife, nivel_confianza):
+    """
+    Intervalos percentil y BCa de cada elemento de la matriz
+
+    Returns:
+        dict: Arreglos p x p con error_estandar y los límites de cada intervalo
+    """
+    p = estimado.shape[0]
+    filas, columnas = np.triu_indices(p)
+    planos = _intervalos_vector(replicas[:, filas, columnas], estimado[filas, columnas],
+                                jackknife[:, filas, columnas], nivel_confianza)
+    resultado = {}
+    for nombre, valores in planos.items():
+        matriz = np.full((p, p), np.nan)
+        matriz[filas, columnas] = matriz[columnas, filas] = valores
+        resultado[nombre] = matriz
+    return resultado
+
+
+def _ejecutar(tarea, argumentos, procesos):
+    """Aplica la tarea a cada argumento, en un pool de procesos si hay más de uno"""
+    if procesos == 1 or len(argumentos) <= 1 or (procesos is None and os.cpu_count() == 1):
+        return list(map(tarea, argumentos))
+    with ProcessPoolExecutor(max_workers=procesos) as ejecutor:
+        return list(ejecutor.map(tarea, argumentos))
+
+
+def _bloques_replicas(n, n_replicas, replicas_por_bloque):
+    """Tamaños de los bloques de réplicas con a lo sumo MAXIMO_PESOS_BLOQUE pesos cada uno"""
+    por_bloque = max(1, min(replicas_por_bloque, MAXIMO_PESOS_BLOQUE // max(n, 1)))
+    return [min(por_bloque, n_replicas - inicio) for inicio in range(0, n_replicas, por_bloque)]
+
+
+def _pesos_remuestreo(rng, n, replicas):
+    """Sortea índices de remuestreo y los convierte en pesos: veces que aparece cada fila en cada réplica"""
+    indices = rng.integers(0, n, size=(replicas, n))
+    desplazados = (indices + np.arange(replicas)[:, None] * n).ravel()
+    return np.bincount(desplazados, minlength=replicas * n).reshape(replicas, n).astype(float)
+
+
+def _bootstrap(datos, metodo, n_replicas, nivel_confianza, semilla, replicas_por_bloque, procesos):
+    """
+    Estimación, réplicas e intervalos de la matriz de correlación de datos
+    (filas completas), o None si el método o el nivel no son válidos
+    """
+    if metodo not in METODOS_CORRELACION:
+        reportar(f"✗ Método '{metodo}' no válido. Use {', '.join(METODOS_CORRELACION)}")
+        return None
+    if not 0 < nivel_confianza < 1:
+        reportar("✗ El nivel de confianza debe estar entre 0 y 1")
+        return None
+
+    n = len(datos)
+    preparado = _preparar(datos, metodo)
+    estimado = _correlaciones_ponderadas(preparado, np.ones((1, n)))[0]
+
+    # Bloques de réplicas con semillas independientes derivadas de la global
+    tamanos = _bloques_replicas(n, n_replicas, replicas_por_bloque)
+    semillas = np.random.SeedSequence(semilla).spawn(len(tamanos))
+    tareas = [(preparado, n, tamano, hijo) for tamano, hijo in zip(tamanos, semillas)]
+    replicas = np.concatenate(_ejecutar(_replicas_bloque, tareas, procesos))
+
+    intervalos = _intervalos(replicas, estimado, _jackknife(preparado, n, GRUPOS_JACKKNIFE),
+                             nivel_confianza)
+    np.fill_diagonal(estimado, np.where(np.isnan(np.diag(estimado)), np.nan, 1.0))
+    return estimado, intervalos
+
+
+@memorizar(columnas=('columna1', 'columna2'))
+def bootstrap_correlacion(df, columna1, columna2, metodo='pearson', n_replicas=2000,
+                          nivel_confianza=0.95, semilla=0, replicas_por_bloque=250, procesos=None):
+    """
+    Intervalos de confianza bootstrap (percentil y BCa) de la correlación
+    entre dos variables
+
+    Args:
+        df (pd.DataFrame): DataFrame con los datos
+        columna1 (str): Primera columna
+        columna2 (str): Segunda columna
+        metodo (str): 'pearson' o 'spearman'
+        n_replicas (int): Número de réplicas bootstrap
+        nivel_confianza (float): Nivel de confianza (default 0.95)
+        semilla (int): Semilla; el mismo valor da los mismos intervalos
+        replicas_por_bloque (int): Réplicas calculadas juntas en cada tarea
+        procesos (int): Número de procesos (default: núcleos disponibles)
+
+    Returns:
+        dict: Coeficiente, error estándar e intervalos percentil y BCa
+    """
+    if columna1 not in df.columns or columna2 not in df.columns:
+        reportar(f"✗ Una o ambas columnas no encontradas")
+        return None
+
+    datos = df[[columna1, columna2]].dropna().to_numpy(dtype=float)
+
+    if len(datos) < 3:
+        reportar(f"✗ No hay suficientes datos para calcular correlación")
+        return None
+
+    resultado = _bootstrap(datos, metodo, n_replicas, nivel_confianza, semilla,
+                           replicas_por_bloque, procesos)
+    if resultado is None:
+        return None
+    estimado, intervalos = resultado
+    coef = estimado[0, 1]
+    ic_percentil = (intervalos['percentil_inferior'][0, 1], intervalos['percentil_superior'][0, 1])
+    ic_bca = (intervalos['bca_inferior'][0, 1], intervalos['bca_superior'][0, 1])
+
+    if reporte_activo():
+        reportar(f"\n--- Bootstrap de Correlación ({metodo.capitalize()}, {n_replicas} réplicas) ---")
+        reportar(f"Variables: {columna1} vs {columna2}")
+        reportar(f"Coeficiente: {coef:.4f}")
+        reportar(f"Error estándar: {intervalos['error_estandar'][0, 1]:.4f}")
+        reportar(f"IC percentil ({nivel_confianza*100}%): [{ic_percentil[0]:.4f}, {ic_percentil[1]:.4f}]")
+        reportar(f"IC BCa ({nivel_confianza*100}%): [{ic_bca[0]:.4f}, {ic_bca[1]:.4f}]")
+        reportar(f"Interpretación: {_interpretar_correlacion(coef)}")
+
+        if ic_bca[0] > 0 or ic_bca[1] < 0:
+            reportar("El intervalo BCa no incluye 0")
+        else:
+            reportar("El intervalo BCa incluye 0")
+
+    return {
+        'coeficiente': coef,
+        'error_estandar': intervalos['error_estandar'][0, 1],
+        'ic_percentil': ic_percentil,
+        'ic_bca': ic_bca,
+        'n': len(datos),
+        'n_replicas': n_replicas,
+        'metodo': metodo,
+        'nivel_confianza': nivel_confianza
+    }
+
+
+@memorizar(columnas=('columnas',))
+def bootstrap_matriz_correlacion(df, columnas=None, metodo='pearson', n_replicas=2000,
+                                 nivel_confianza=0.95, semilla=0, replicas_por_bloque=250,
+                                 procesos=None):
+    """
+    Intervalos de confianza bootstrap de la matriz de correlación (filas
+    completas: cada réplica remuestrea filas con todas las columnas)
+
+    Args:
+        df (pd.DataFrame): DataFrame con los datos
+        columnas (list): Lista de columnas a analizar (opcional)
+        metodo (str): 'pearson' o 'spearman'
+        n_replicas (int): Número de réplicas bootstrap
+        nivel_confianza (float): Nivel de confianza (default 0.95)
+        semilla (int): Semilla; el mismo valor da los mismos intervalos
+        replicas_por_bloque (int): Réplicas calculadas juntas en cada tarea
+        procesos (int): Número de procesos (default: núcleos disponibles)
+
+    Returns:
+        dict: DataFrames 'coeficientes', 'error_estandar', 'percentil_inferior',
+            'percentil_superior', 'bca_inferior' y 'bca_superior', y n
+    """
+    if columnas is None:
+        columnas = df.select_dtypes(include=[np.number]).columns.tolist()
+
+    if len(columnas) < 2:
+        reportar("✗ Se necesitan al menos 2 columnas numéricas")
+        return None
+
+    datos = df[columnas].dropna().to_numpy(dtype=float)
+
+    if len(datos) < 3:
+        reportar(f"✗ No hay suficientes datos para calcular correlación")
+        return None
+
+    resultado = _bootstrap(datos, metodo, n_replicas, nivel_confianza, semilla,
+                           replicas_por_bloque, procesos)
+    if resultado is None:
+        return None
+    estimado, intervalos = resultado
+    resultado = {'coeficientes': pd.DataFrame(estimado, index=columnas, columns=columnas)}
+    for nombre, valores in intervalos.items():
+        resultado[nombre] = pd.DataFrame(valores, index=columnas, columns=columnas)
+
+    if reporte_activo():
+        filas, cols = np.triu_indices(len(columnas), k=1)
+        tabla = pd.DataFrame({
+            'variable1': [columnas[i] for i in filas],
+            'variable2': [columnas[j] for j in cols],
+            'coeficiente': estimado[filas, cols],
+            'bca_inferior': intervalos['bca_inferior'][filas, cols],
+            'bca_superior': intervalos['bca_superior'][filas, cols]
+        })
+        reportar(f"\n--- Bootstrap de Correlaciones ({metodo.capitalize()}, {n_replicas} réplicas, "
+                 f"IC BCa {nivel_confianza*100}%) ---")
+        reportar(tabla.to_string(index=False))
+
+    resultado['n'] = len(datos)
+    resultado['n_replicas'] = n_replicas
+    return resultado
+
+
+ESTADISTICOS_BOOTSTRAP = ('media', 'mediana', 'media_recortada')
+
+
+def _especificar(estadisticos, percentiles, proporcion_recorte):
+    """Lista de (nombre, tipo, parámetro) de los estadísticos pedidos (None si alguno no es válido)"""
+    especificacion = []
+    for estadistico in estadisticos:
+        if estadistico not in ESTADISTICOS_BOOTSTRAP:
+            reportar(f"✗ Estadístico '{estadistico}' no válido. Use {', '.join(ESTADISTICOS_BOOTSTRAP)}")
+            return None
+        if estadistico == 'mediana':
+            especificacion.append(('mediana', 'percentil', 0.5))
+        elif estadistico == 'media_recortada':
+            if not 0 <= proporcion_recorte < 0.5:
+                reportar("✗ La proporción de recorte debe estar entre 0 y 0.5")
+                return None
+            especificacion.append(('media_recortada', 'recortada', proporcion_recorte))
+        else:
+            especificacion.append(('media', 'media', None))
+    for percentil in percentiles:
+        if not 0 <= percentil <= 100:
+            reportar("✗ Los percentiles deben estar entre 0 y 100")
+            return None
+        especificacion.append((f'p{percentil:g}', 'percentil', percentil / 100))
+    return especificacion
+
+
+def _estadisticos_ponderados(ordenados, pesos, especificacion):
+    """
+    Estadísticos de varias muestras dadas por sus pesos sobre los valores
+    ordenados, sin reordenar cada réplica
+
+    Los estadísticos de orden salen de los pesos acumulados: el estadístico
+    de orden j de una réplica es el primer valor cuyo peso acumulado supera j.
+    Los percentiles interpolan como np.percentile y la media recortada
+    descarta int(proporción * n) valores de cada extremo, como
+    scipy.stats.trim_mean.
+
+    Args:
+        ordenados (np.ndarray): Valores de la muestra ordenados
+        pesos (np.ndarray): Réplicas x valores con el peso de cada valor
+        especificacion (list): Resultado de _especificar
+
+    Returns:
+        np.ndarray: Réplicas x estadísticos
+    """
+    n = len(ordenados)
+    acumulados = np.cumsum(pesos, axis=1)
+
+    def orden(j):
+        return ordenados[np.minimum((acumulados <= j).sum(axis=1), n - 1)]
+
+    resultado = np.empty((len(pesos), len(especificacion)))
+    for k, (_, tipo, parametro) in enumerate(especificacion):
+        if tipo == 'media':
+            resultado[:, k] = pesos @ ordenados / n
+        elif tipo == 'percentil':
+            posicion = (n - 1) * parametro
+            j = int(np.floor(posicion))
+            inferior = orden(j)
+            resultado[:, k] = inferior + (posicion - j) * (orden(min(j + 1, n - 1)) - inferior)
+        else:
+            g = int(parametro * n)
+            # Parte de cada valor (por sus repeticiones) que cae entre los órdenes g y n - g
+            dentro = np.clip(np.minimum(acumulados, n - g) - np.maximum(acumulados - pesos, g), 0, None)
+            resultado[:, k] = dentro @ ordenados / (n - 2 * g)
+    return resultado
+
+
+def _jackknife_estadisticos(ordenados, especificacion):
+    """
+    Estadísticos dejando fuera cada valor, en O(n) por estadístico: sin el
+    valor de la posición i, el estadístico de orden j es ordenados[j + (j >= i)]
+    """
+    n = len(ordenados)
+    i = np.arange(n)
+    resultado = np.empty((n, len(especificacion)))
+    for k, (_, tipo, parametro) in enumerate(especificacion):
+        if tipo == 'media':
+            resultado[:, k] = (ordenados.sum() - ordenados) / (n - 1)
+        elif tipo == 'percentil':
+            posicion = (n - 2) * parametro
+            j = int(np.floor(posicion))
+            inferior = ordenados[j + (j >= i)]
+            superior = ordenados[min(j + 1, n - 2) + (min(j + 1, n - 2) >= i)]
+            resultado[:, k] = inferior + (posicion - j) * (superior - inferior)
+        else:
+            g = int(parametro * (n - 1))
+            desde, hasta = g, n - 2 - g
+            prefijos = np.concatenate([[0.0], np.cumsum(ordenados)])
+            # Suma de los órdenes desde..hasta de la muestra sin el valor i
+            sumas = np.where(i > hasta, prefijos[hasta + 1] - prefijos[desde],
+                             np.where(i <= desde, prefijos[hasta + 2] - prefijos[desde + 1],
+                                      prefijos[hasta + 2] - prefijos[desde] - ordenados))
+            resultado[:, k] = sumas / (hasta - desde + 1)
+    return resultado
+
+
+def _estadisticos_bloque(argumentos):
+    """Tarea de un proceso: estadísticos de un bloque de réplicas (debe ser de nivel módulo)"""
+    ordenados, especificacion, replicas, semilla = argumentos
+    pesos = _pesos_remuestreo(np.random.default_rng(semilla), len(ordenados), replicas)
+    return _estadisticos_ponderados(ordenados, pesos, especificacion)
+
+
+@memorizar(columnas=('columna', 'columna_grupos'))
+def bootstrap_intervalos(df, columna, estadisticos=('media', 'mediana'), percentiles=(),
+                         proporcion_recorte=0.1, columna_grupos=None, n_replicas=2000,
+                         nivel_confianza=0.95, semilla=0, replicas_por_bloque=250, procesos=None):
+    """
+    Intervalos de confianza bootstrap (percentil y BCa) de la media, la
+    mediana, la media recortada y percentiles, por grupo en una sola llamada
+
+    Cada muestra se ordena una vez; las réplicas se sortean en bloques de
+    índices con memoria acotada y los bloques de todos los grupos se
+    reparten entre procesos. La aceleración BCa usa el jackknife exacto.
+
+    Args:
+        df (pd.DataFrame): DataFrame con los datos
+        columna (str): Columna numérica, p. ej. 'valoR_NETO'
+        estadisticos (tuple): 'media', 'mediana' y/o 'media_recortada'
+        percentiles (tuple): Percentiles adicionales (0-100), p. ej. (90, 99)
+        proporcion_recorte (float): Proporción recortada en cada extremo
+        columna_grupos (str): Columna categórica para un intervalo por grupo (opcional)
+        n_replicas (int): Número de réplicas bootstrap
+        nivel_confianza (float): Nivel de confianza (default 0.95)
+        semilla (int): Semilla; el mismo valor da los mismos intervalos
+        replicas_por_bloque (int): Réplicas calculadas juntas en cada tarea
+        procesos (int): Número de procesos (default: núcleos disponibles)
+
+    Returns:
+        pd.DataFrame: Una fila por (grupo, estadistico) con n, estimado,
+            error_estandar e intervalos percentil y BCa
+    """
+    if columna not in df.columns or (columna_grupos is not None and columna_grupos not in df.columns):
+        reportar(f"✗ Columna '{columna}' o '{columna_grupos}' no encontrada")
+        return None
+    if not 0 < nivel_confianza < 1:
+        reportar("✗ El nivel de confianza debe estar entre 0 y 1")
+        return None
+
+    especificacion = _especificar(estadisticos, percentiles, proporcion_recorte)
+    if especificacion is None:
+        return None
+    valores = pd.to_numeric(df[columna], errors='coerce')
+    if columna_grupos is None:
+        muestras = {None: valores.dropna().to_numpy(dtype=float)}
+    else:
+        muestras = {nombre: grupo.dropna().to_numpy(dtype=float)
+                    for nombre, grupo in valores.groupby(df[columna_grupos], sort=True)}
+    muestras = {nombre: np.sort(datos) for nombre, datos in muestras.items() if len(datos) >= 3}
+
+    if not muestras:
+        reportar(f"✗ No hay suficientes datos para el bootstrap")
+        return None
+
+    # Todos los bloques de todos los grupos van al mismo pool
+    semillas = np.random.SeedSequence(semilla).spawn(len(muestras))
+    tareas, duenos = [], []
+    for (nombre, ordenados), hijo in zip(muestras.items(), semillas):
+        tamanos = _bloques_replicas(len(ordenados), n_replicas, replicas_por_bloque)
+        for tamano, nieto in zip(tamanos, hijo.spawn(len(tamanos))):
+            tareas.append((ordenados, especificacion, tamano, nieto))
+            duenos.append(nombre)
+    bloques = _ejecutar(_estadisticos_bloque, tareas, procesos)
+
+    filas = []
+    for nombre, ordenados in muestras.items():
+        replicas = np.concatenate([bloque for bloque, dueno in zip(bloques, duenos) if dueno == nombre])
+        estimado = _estadisticos_ponderados(ordenados, np.ones((1, len(ordenados))), especificacion)[0]
+        intervalos = _intervalos_vector(replicas, estimado, _jackknife_estadisticos(ordenados, especificacion),
+                                        nivel_confianza)
+        for k, (estadistico, _, _) in enumerate(especificacion):
+            fila = {} if columna_grupos is None else {columna_grupos: nombre}
+            fila.update({'estadistico': estadistico, 'n': len(ordenados), 'estimado': estimado[k]})
+            fila.update({clave: valores_intervalo[k] for clave, valores_intervalo in intervalos.items()})
+            filas.append(fila)
+    tabla = pd.DataFrame(filas)
+
+    if reporte_activo():
+        reportar(f"\n--- Intervalos Bootstrap: {columna} ({n_replicas} réplicas, {nivel_confianza*100}%) ---")
+        reportar(tabla.to_string(index=False))
+
+    return tabla
+
+
+if __name__ == "__main__":
+    from carga_datos import cargar_json
+
+    # Cargar datos
+    df = cargar_json('../data/facturacion_medica.json')
+
+    if df is not None:
+        if 'edaD_PACIENTE' in df.columns and 'montO_TOTAL' in df.columns:
+            bootstrap_correlacion(df, 'edaD_PACIENTE', 'montO_TOTAL', 'spearman')
@@ -0,0 +1,255 @@
+"""
+Módulo de caché de resultados de análisis
+
+Los resultados se guardan con una clave formada por la función, la huella
+de los datos que lee (contenido de las columnas usadas, dtypes e índice),
+el resto de argumentos y la versión del código (VERSION_CACHE y el fuente
+de la función). Si el DataFrame se modifica o se reemplaza, o cambia el
+código, la huella cambia y el resultado se vuelve a calcular. La caché en memoria es
+LRU con tamaño máximo; opcionalmente se guarda también en disco (pickle).
+
+La caché está desactivada por defecto: se activa con configurar_cache().
+Un acierto devuelve el resultado sin volver a mostrarlo por consola.
+"""
+import os
+import copy
+import pickle
+import hashlib
+import inspect
+import functools
+from collections import OrderedDict
+
+import pandas as pd
+import numpy as np
+
+
+# Cambiar al modificar los cálculos de los análisis (también los de funciones
+# auxiliares, que no entran en el fuente de la función memorizada) para
+# invalidar la caché en disco
+VERSION_CACHE = 1
+
+_configuracion = {'activa': False, 'maximo': 128, 'directorio': None}
+
+_memoria = OrderedDict()
+
+_contadores = {'aciertos': 0, 'aciertos_disco': 0, 'fallos': 0}
+
+
+def configurar_cache(activa=True, maximo=128, directorio=None):
+    """
+    Activa o desactiva la caché de resultados
+
+    Args:
+        activa (bool): Usar la caché
+        maximo (int): Número máximo de resultados en memoria
+        directorio (str): Directorio para la caché en disco (opcional)
+    """
+    _configuracion.update({'activa': activa, 'maximo': int(maximo), 'directorio': directorio})
+    if directorio is not None:
+        os.makedirs(directorio, exist_ok=True)
+    while len(_memoria) > _configuracion['maximo']:
+        _memoria.popitem(last=False)
+
+
+def limpiar_cache(disco=False):
+    """
+    Vacía la caché en memoria (y la de disco si se indica)
+
+    Args:
+        disco (bool): Borrar también los archivos de la caché en disco
+    """
+    _memoria.clear()
+    for contador in _contadores:
+        _contadores[contador] = 0
+    directorio = _configuracion['directorio']
+    if disco and directorio is not None and os.path.isdir(directorio):
+        for archivo in os.listdir(directorio):
+            if archivo.endswith('.pkl'):
+                os.remove(os.path.join(directorio, archivo))
+
+
+def estadisticas_cache():
+    """
+    Uso de la caché desde la última limpieza
+
+    Returns:
+        dict: aciertos, aciertos_disco, fallos y entradas en memoria
+    """
+    return {**_contadores, 'entradas': len(_memoria)}
+
+
+def huella_valores(valores):
+    """
+    Huella del contenido de un array o Series
+
+    Args:
+        valores (array-like): Valores a identificar
+
+    Returns:
+        str: Huella hexadecimal
+    """
+    arreglo = np.asarray(valores) if not isinstance(valores, pd.Series) else valores.to_numpy()
+    if arreglo.dtype.kind in 'biufcmM':
+        datos = np.ascontiguousarray(arreglo).view(np.uint8)
+    else:
+        # Texto, objetos y extensiones: hash vectorizado de pandas
+        objetos = np.asarray(valores, dtype=object)
+        try:
+            datos = pd.util.hash_array(objetos).view(np.uint8)
+        except TypeError:
+            # Valores no hashables (listas, dicts): se usa su texto
+            datos = pd.util.hash_array(objetos.astype(str).astype(object)).view(np.uint8)
+    return hashlib.blake2b(datos, digest_size=16).hexdigest()
+
+
+def _huella_indice(indice):
+    if isinstance(indice, pd.RangeIndex):
+        return f"rango:{indice.start}:{indice.stop}:{indice.step}"
+    return huella_valores(indice.to_numpy())
+
+
+def huella_dataframe(df, columnas=None):
+    """
+    Huella del contenido de un DataFrame: cambia si cambian los valores,
+    los tipos, el índice o las columnas
+
+    Args:
+        df (pd.DataFrame): DataFrame (o VistaFiltrada)
+        columnas (list): Limitar la huella a estas columnas (None = todas)
+
+    Returns:
+        str: Huella hexadecimal
+    """
+    partes = []
+    # Una VistaFiltrada se identifica por su base y sus posiciones
+    if hasattr(df, 'base') and hasattr(df, 'posiciones'):
+        partes.append('vista:' + ('todas' if df.posiciones is None else huella_valores(df.posiciones)))
+        df = df.base
+
+    if columnas is None:
+        columnas = list(df.columns)
+    partes.append(repr(list(df.columns)))
+    partes.append(_huella_indice(df.index))
+    for col in columnas:
+        if col in df.columns:
+            partes.append(f"{col}:{df[col].dtype}:{huella_valores(df[col])}")
+    return hashlib.blake2b('|'.join(partes).encode('utf-8'), digest_size=16).hexdigest()
+
+
+def _columnas_usadas(argumentos, parametros_columnas, fijas=()):
+    """Columnas que lee la función según sus argumentos (None = todas)"""
+    if parametros_columnas is None:
+        return None
+    columnas = list(fijas)
+    for parametro in parametros_columnas:
+        valor = argumentos.get(parametro)
+        if valor is None:
+            return None
+        columnas.extend([valor] if isinstance(valor, str) else list(valor))
+    return columnas
+
+
+def _huella_codigo(funcion):
+    """Huella del código fuente de una función (vacía si no está disponible)"""
+    try:
+        fuente = inspect.getsource(funcion)
+    except (OSError, TypeError):
+        return ''
+    return hashlib.blake2b(fuente.encode('utf-8'), digest_size=16).hexdigest()
+
+
+def _clave(funcion, argumentos, parametros_columnas, codigo='', fijas=()):
+    """Clave de caché de una llamada"""
+    columnas = _columnas_usadas(argumentos, parametros_columnas, fijas)
+    partes = [f"{funcion.__module__}.{funcion.__qualname__}", f"version={VERSION_CACHE}", f"codigo={codigo}"]
+    for nombre, valor in argumentos.items():
+        if isinstance(valor, pd.DataFrame) or hasattr(valor, 'materializar'):
+            partes.append(f"{nombre}=df:{huella_dataframe(valor, columnas)}")
+        elif isinstance(valor, (pd.Series, np.ndarray)):
+            partes.append(f"{nombre}=arr:{huella_valores(valor)}")
+        else:
+            partes.append(f"{nombre}={valor!r}")
+    return hashlib.blake2b('|'.join(partes).encode('utf-8'), digest_size=20).hexdigest()
+
+
+def _leer_disco(clave):
+    directorio = _configuracion['directorio']
+    if directorio is None:
+        return None
+    ruta = os.path.join(directorio, f"{clave}.pkl")
+    if not os.path.exists(ruta):
+        return None
+    try:
+        with open(ruta, 'rb') as archivo:
+            return pickle.load(archivo)
+    except Exception:
+        return None
+
+
+def _guardar_disco(clave, resultado):
+    directorio = _configuracion['directorio']
+    if directorio is None:
+        return
+    try:
+        with open(os.path.join(directorio, f"{clave}.pkl"), 'wb') as archivo:
+            pickle.dump(resultado, archivo)
+    except Exception:
+        pass
+
+
+def _guardar_memoria(clave, resultado):
+    _memoria[clave] = resultado
+    _memoria.move_to_end(clave)
+    while len(_memoria) > _configuracion['maximo']:
+        _memoria.popitem(last=False)
+
+
+def memorizar(columnas=None, fijas=()):
+    """
+    Decorador que guarda en caché los resultados de una función de análisis
+
+    Args:
+        columnas (tuple): Parámetros con los nombres de las columnas que lee
+            la función; la huella se limita a esas columnas. Si no se indica,
+            o el argumento es None, se usan todas las columnas del DataFrame
+        fijas (tuple): Columnas que lee siempre, sin importar los argumentos
+            (con columnas=() la huella se limita a ellas)
+
+    Returns:
+        function: Decorador
+    """
+    def decorador(funcion):
+        firma = inspect.signature(funcion)
+        codigo = _huella_codigo(funcion)
+
+        @functools.wraps(funcion)
+        def envoltura(*args, **kwargs):
+            if not _configuracion['activa']:
+                return funcion(*args, **kwargs)
+
+            enlazados = firma.bind(*args, **kwargs)
+            enlazados.apply_defaults()
+            clave = _clave(funcion, enlazados.arguments, columnas, codigo, fijas)
+
+            if clave in _memoria:
+                _memoria.move_to_end(clave)
+                _contadores['aciertos'] += 1
+                return copy.deepcopy(_memoria[clave])
+
+            resultado = _leer_disco(clave)
+            if resultado is not None:
+                _contadores['aciertos_disco'] += 1
+                _guardar_memoria(clave, resultado)
+                return copy.deepcopy(resultado)
+
+            _contadores['fallos'] += 1
+            resultado = funcion(*args, **kwargs)
+            # Los resultados nulos (columna inexistente, etc.) no se guardan
+            if resultado is not None:
+                _guardar_memoria(clave, copy.deepcopy(resultado))
+                _guardar_disco(clave, resultado)
+            return resultado
+
+        envoltura.sin_cache = funcion
+        return envoltura
+    return decorador
@@ -0,0 +1,280 @@
+"""
+Módulo de caché de imágenes de gráficas
+
+Cada gráfica se identifica por la función, la huella de las columnas que
+lee (contenido, tipos e índice, como en la caché de resultados), el resto
+de argumentos y los parámetros globales de dibujo. Si ya existe una imagen
+con esa clave se copia a archivo_salida sin volver a dibujar; si no, se
+dibuja, se guarda y queda en la caché. Las imágenes más antiguas que
+maximo_dias se descartan, y si la carpeta supera maximo_mb se borran las
+de uso menos reciente (cada acierto actualiza la fecha del archivo).
+
+La caché está desactivada por defecto y no se usa mientras las gráficas
+se muestran en pantalla: está pensada para el renderizado por lotes.
+"""
+import os
+import time
+import shutil
+import hashlib
+import inspect
+import functools
+
+try:
+    from .reporte import reportar
+    from .cache import huella_dataframe, huella_valores
+except ImportError:
+    from reporte import reportar
+    from cache import huella_dataframe, huella_valores
+
+
+# Cambiar al modificar el dibujo de las gráficas para invalidar la caché
+VERSION_GRAFICAS = 1
+
+FORMATOS_IMAGEN = ('png', 'jpg', 'jpeg', 'svg', 'pdf')
+
+_configuracion = {'activa': False, 'directorio': 'cache_graficas', 'maximo_mb': 500, 'maximo_dias': 30}
+
+_contadores = {'aciertos': 0, 'fallos': 0, 'eliminadas': 0}
+
+
+def configurar_cache_graficas(activa=True, directorio='cache_graficas', maximo_mb=500, maximo_dias=30):
+    """
+    Activa o desactiva la caché de imágenes de gráficas
+
+    Args:
+        activa (bool): Usar la caché
+        directorio (str): Carpeta de las imágenes
+        maximo_mb (float): Tamaño máximo de la carpeta en MB
+        maximo_dias (float): Antigüedad máxima de una imagen sin usarse
+    """
+    _configuracion.update({'activa': activa, 'directorio': directorio,
+                           'maximo_mb': float(maximo_mb), 'maximo_dias': float(maximo_dias)})
+    if activa:
+        os.makedirs(directorio, exist_ok=True)
+        _podar()
+
+
+def configuracion_cache_graficas():
+    """
+    Configuración actual de la caché de gráficas (para replicarla en otros procesos)
+
+    Returns:
+        dict: Argumentos de configurar_cache_graficas
+    """
+    return dict(_configuracion)
+
+
+def contadores_cache_graficas():
+    """
+    Contadores de aciertos, fallos y eliminadas de este proceso (para
+    devolverlos desde otros procesos)
+
+    Returns:
+        dict: Copia de los contadores
+    """
+    return dict(_contadores)
+
+
+def sumar_contadores_cache_graficas(contadores):
+    """
+    Suma a los de este proceso los contadores de otro proceso
+
+    Args:
+        contadores (dict): Incrementos de aciertos, fallos y/o eliminadas
+    """
+    for contador, valor in contadores.items():
+        _contadores[contador] += valor
+
+
+def limpiar_cache_graficas():
+    """Borra todas las imágenes de la caché y reinicia los contadores"""
+    for contador in _contadores:
+        _contadores[contador] = 0
+    for ruta, _, _ in _imagenes():
+        _borrar(ruta)
+
+
+def estadisticas_cache_graficas():
+    """
+    Uso de la caché de gráficas desde la última limpieza
+
+    Los contadores son los de este proceso más los que renderizar_segmentos
+    recoge de sus procesos; la carpeta es compartida.
+
+    Returns:
+        dict: aciertos, fallos, eliminadas, imagenes y mb en la carpeta
+    """
+    imagenes = _imagenes()
+    return {**_contadores, 'imagenes': len(imagenes),
+            'mb': sum(tamano for _, tamano, _ in imagenes) / 1e6}
+
+
+def _imagenes():
+    """(ruta, bytes, fecha de último uso) de cada imagen de la caché"""
+    directorio = _configuracion['directorio']
+    if not os.path.isdir(directorio):
+        return []
+    imagenes = []
+    for entrada in os.scandir(directorio):
+        if (entrada.is_file() and entrada.name.rsplit('.', 1)[-1] in FORMATOS_IMAGEN
+                and '.tmp.' not in entrada.name):
+            try:
+                estado = entrada.stat()
+            except FileNotFoundError:
+                continue
+            imagenes.append((entrada.path, estado.st_size, estado.st_mtime))
+    return imagenes
+
+
+def _borrar(ruta):
+    """Borra una imagen; otro proceso puede haberla borrado antes"""
+    try:
+        os.remove(ruta)
+        return True
+    except FileNotFoundError:
+        return False
+
+
+def _vencida(fecha, ahora=None):
+    return (ahora or time.time()) - fecha > _configuracion['maximo_dias'] * 86400
+
+
+def _podar(conservar=None):
+    """
+    Borra las imágenes vencidas y, si la carpeta sigue excediendo
+    maximo_mb, las de uso menos reciente (salvo conservar, la recién guardada)
+    """
+    ahora = time.time()
+    vigentes = []
+    for ruta, tamano, fecha in _imagenes():
+        if _vencida(fecha, ahora):
+            _contadores['eliminadas'] += _borrar(ruta)
+        else:
+            vigentes.append((fecha, tamano, ruta))
+
+    total = sum(tamano for _, tamano, _ in vigentes)
+    for fecha, tamano, ruta in sorted(vigentes):
+        if total <= _configuracion['maximo_mb'] * 1e6:
+            break
+        if ruta == conservar:
+            continue
+        _contadores['eliminadas'] += _borrar(ruta)
+        total -= tamano
+
+
+def _columnas_grafica(argumentos, columnas, opcionales, fijas):
+    """Columnas que lee la gráfica (None = todas)"""
+    if columnas is None:
+        return None
+    usadas = list(fijas)
+    for parametro in columnas:
+        valor = argumentos.get(parametro)
+        if valor is None:
+            if parametro in opcionales:
+                continue
+            return None
+        usadas.extend([valor] if isinstance(valor, str) else list(valor))
+    return usadas
+
+
+def huella_grafica(funcion, argumentos, columnas=None, opcionales=(), fijas=(), parametros=None):
+    """
+    Clave de caché de una gráfica
+
+    Args:
+        funcion (function): Función que dibuja la gráfica
+        argumentos (dict): Argumentos de la llamada (sin archivo_salida)
+        columnas (tuple): Parámetros con los nombres de las columnas que lee
+            (None = todas las columnas del DataFrame)
+        opcionales (tuple): De esos parámetros, los que con None no leen nada
+        fijas (tuple): Columnas que lee siempre, sin importar los argumentos
+        parametros (dict): Parámetros globales de dibujo (dpi, umbrales, ...)
+
+    Returns:
+        str: Huella hexadecimal
+    """
+    usadas = _columnas_grafica(argumentos, columnas, opcionales, fijas)
+    partes = [f"{funcion.__module__}.{funcion.__qualname__}", f"version={VERSION_GRAFICAS}",
+              repr(sorted((parametros or {}).items()))]
+    for nombre, valor in argumentos.items():
+        if hasattr(valor, 'columns') or hasattr(valor, 'materializar'):
+            partes.append(f"{nombre}=df:{huella_dataframe(valor, usadas)}")
+        elif hasattr(valor, 'dtype'):
+            partes.append(f"{nombre}=arr:{huella_valores(valor)}")
+        else:
+            partes.append(f"{nombre}={valor!r}")
+    return hashlib.blake2b('|'.join(partes).encode('utf-8'), digest_size=20).hexdigest()
+
+
+def cachear_grafica(columnas=None, opcionales=(), fijas=(), omitir=None, parametros=None):
+    """
+    Decorador que guarda en caché la imagen de una función de gráficas con
+    parámetro archivo_salida
+
+    Con la caché activa la función decorada devuelve la ruta de la imagen
+    en la caché (la encuentre o la dibuje) y, si se indicó archivo_salida,
+    deja además una copia allí.
+
+    Args:
+        columnas (tuple): Parámetros con los nombres de las columnas que lee
+        opcionales (tuple): De esos parámetros, los que pueden ser None
+        fijas (tuple): Columnas que lee siempre
+        omitir (function): Sin argumentos; si devuelve True no se usa la caché
+            (por ejemplo mientras las gráficas se muestran en pantalla)
+        parametros (function): Sin argumentos; parámetros globales de dibujo
+            que forman parte de la clave
+
+    Returns:
+        function: Decorador
+    """
+    def decorador(funcion):
+        firma = inspect.signature(funcion)
+
+        @functools.wraps(funcion)
+        def envoltura(*args, **kwargs):
+            if not _configuracion['activa'] or (omitir is not None and omitir()):
+                return funcion(*args, **kwargs)
+
+            enlazados = firma.bind(*args, **kwargs)
+            enlazados.apply_defaults()
+            argumentos = dict(enlazados.arguments)
+            archivo_salida = argumentos.pop('archivo_salida', None)
+            formato = os.path.splitext(archivo_salida)[1].lstrip('.').lower() if archivo_salida else 'png'
+            clave = huella_grafica(funcion, argumentos, columnas, opcionales, fijas,
+                                   parametros() if parametros is not None else None)
+            ruta = os.path.join(_configuracion['directorio'], f"{clave}.{formato or 'png'}")
+
+            try:
+                if not _vencida(os.path.getmtime(ruta)):
+                    # Acierto: se marca como usada para la poda por tamaño
+                    os.utime(ruta)
+                    if archivo_salida:
+                        shutil.copyfile(ruta, archivo_salida)
+                        reportar(f"✓ Gráfica (caché) guardada en: {archivo_salida}")
+                    _contadores['aciertos'] += 1
+                    return ruta
+            except FileNotFoundError:
+                # No existe (o otro proceso la acaba de podar): se dibuja
+                pass
+
+            _contadores['fallos'] += 1
+            os.makedirs(_configuracion['directorio'], exist_ok=True)
+            # Se escribe en un temporal (con la extensión del formato, que decide
+            # cómo se guarda) y se renombra: otro proceso nunca lee una imagen a medias
+            temporal = f"{ruta}.{os.getpid()}.tmp.{formato or 'png'}"
+            enlazados.arguments['archivo_salida'] = archivo_salida or temporal
+            try:
+                if funcion(*enlazados.args, **enlazados.kwargs) is None:
+                    # Columna inexistente u otro error: no se guarda nada
+                    return None
+                if archivo_salida:
+                    shutil.copyfile(archivo_salida, temporal)
+                os.replace(temporal, ruta)
+            finally:
+                _borrar(temporal)
+            _podar(conservar=ruta)
+            return ruta
+
+        envoltura.sin_cache = funcion
+        return envoltura
+    return decorador
@@ -4,6 +4,11 @@ Módulo para carga de datos desde diferentes formatos (JSON, CSV, Excel)
 import pandas as pd
 import json
 
+try:
+    from .reporte import reportar, reporte_activo
+except ImportError:
+    from reporte import reportar, reporte_activo
+
 
 def cargar_json(ruta_archivo):
     """
@@ -19,10 +24,10 @@ def cargar_json(ruta_archivo):
         with open(ruta_archivo, 'r', encoding='utf-8') as file:
             datos = json.load(file)
         df = pd.DataFrame(datos)
-        print(f"✓ Datos cargados exitosamente desde JSON: {len(df)} registros")
+        reportar(f"✓ Datos cargados exitosamente desde JSON: {len(df)} registros")
         return df
     except Exception as e:
-        print(f"✗ Error al cargar JSON: {e}")
+        reportar(f"✗ Error al cargar JSON: {e}")
         return None
 
 
@@ -38,10 +43,10 @@ def cargar_csv(ruta_archivo):
     """
     try:
         df = pd.read_csv(ruta_archivo, encoding='utf-8')
-        print(f"✓ Datos cargados exitosamente desde CSV: {len(df)} registros")
+        reportar(f"✓ Datos cargados exitosamente desde CSV: {len(df)} registros")
         return df
     except Exception as e:
-        print(f"✗ Error al cargar CSV: {e}")
+        reportar(f"✗ Error al cargar CSV: {e}")
         return None
 
 
@@ -58,13 +63,34 @@ def cargar_excel(ruta_archivo, hoja=0):
     """
     try:
         df = pd.read_excel(ruta_archivo, sheet_name=hoja)
-        print(f"✓ Datos cargados exitosamente desde Excel: {len(df)} registros")
+        reportar(f"✓ Datos cargados exitosamente desde Excel: {len(df)} registros")
         return df
     except Exception as e:
-        print(f"✗ Error al cargar Excel: {e}")
+        reportar(f"✗ Error al cargar Excel: {e}")
         return None
 
 
+def iterar_bloques(fuente, tamano_bloque=100_000):
+    """
+    Genera bloques de un origen de datos
+    
+    Args:
+        fuente: DataFrame (se parte en bloques), lista de DataFrames o
+            función sin argumentos que devuelve un iterador de DataFrames
+        tamano_bloque (int): Filas por bloque cuando la fuente es un DataFrame
+        
+    Yields:
+        pd.DataFrame: Bloques de datos
+    """
+    if isinstance(fuente, pd.DataFrame):
+        for inicio in range(0, len(fuente), tamano_bloque):
+            yield fuente.iloc[inicio:inicio + tamano_bloque]
+    elif callable(fuente):
+        yield from fuente()
+    else:
+        yield from fuente
+
+
 def exportar_a_csv(df, ruta_archivo):
     """
     Exporta DataFrame a CSV
@@ -75,9 +101,9 @@ def exportar_a_csv(df, ruta_archivo):
     """
     try:
         df.to_csv(ruta_archivo, index=False, encoding='utf-8')
-        print(f"✓ Datos exportados exitosamente a CSV: {ruta_archivo}")
+        reportar(f"✓ Datos exportados exitosamente a CSV: {ruta_archivo}")
     except Exception as e:
-        print(f"✗ Error al exportar CSV: {e}")
+        reportar(f"✗ Error al exportar CSV: {e}")
 
 
 def exportar_a_excel(df, ruta_archivo, nombre_hoja='Datos'):
@@ -91,9 +117,9 @@ def exportar_a_excel(df, ruta_archivo, nombre_hoja='Datos'):
     """
     try:
         df.to_excel(ruta_archivo, sheet_name=nombre_hoja, index=False)
-        print(f"✓ Datos exportados exitosamente a Excel: {ruta_archivo}")
+        reportar(f"✓ Datos exportados exitosamente a Excel: {ruta_archivo}")
     except Exception as e:
-        print(f"✗ Error al exportar Excel: {e}")
+        reportar(f"✗ Error al exportar Excel: {e}")
 
 
 def info_dataframe(df):
@@ -103,18 +129,21 @@ def info_dataframe(df):
     Args:
         df (pd.DataFrame): DataFrame a analizar
     """
-    print("\n" + "="*60)
-    print("INFORMACIÓN DEL DATAFRAME")
-    print("="*60)
-    print(f"Dimensiones: {df.shape[0]} filas x {df.shape[1]} columnas")
-    print(f"\nColumnas: {list(df.columns)}")
-    print(f"\nTipos de datos:")
-    print(df.dtypes)
-    print(f"\nValores nulos:")
-    print(df.isnull().sum())
-    print(f"\nPrimeras 5 filas:")
-    print(df.head())
-    print("="*60 + "\n")
+    if not reporte_activo():
+        return
+    
+    reportar("\n" + "="*60)
+    reportar("INFORMACIÓN DEL DATAFRAME")
+    reportar("="*60)
+    reportar(f"Dimensiones: {df.shape[0]} filas x {df.shape[1]} columnas")
+    reportar(f"\nColumnas: {list(df.columns)}")
+    reportar(f"\nTipos de datos:")
+    reportar(df.dtypes)
+    reportar(f"\nValores nulos:")
+    reportar(df.isnull().sum())
+    reportar(f"\nPrimeras 5 filas:")
+    reportar(df.head())
+    reportar("="*60 + "\n")
 
 
 if __name__ == "__main__":
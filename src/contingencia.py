@@ -0,0 +1,187 @@
+"""
+Módulo de tablas de contingencia para variables de alta cardinalidad
+
+Los conteos se construyen factorizando cada variable y contando los códigos
+combinados con bincount (o con np.unique si la tabla densa no cabe), y se
+guardan en una matriz dispersa. Chi², V de Cramér y los residuos solo
+recorren las celdas observadas: como las frecuencias esperadas salen de los
+totales marginales, chi² = sum(O² / E) - n sobre las celdas con O > 0, sin
+construir la matriz de esperados.
+"""
+import pandas as pd
+import numpy as np
+from scipy import sparse, stats
+
+
+# Máximo de celdas para contar con bincount sobre la tabla completa
+MAXIMO_CELDAS_DENSAS = 5_000_000
+
+ETIQUETA_OTROS = 'OTROS'
+
+
+def _factorizar(serie, minimo, etiqueta_otros):
+    """
+    Códigos ordenados de una variable, agrupando en etiqueta_otros las
+    categorías con menos de `minimo` registros
+    """
+    codigos, etiquetas = pd.factorize(serie, sort=True)
+    if minimo <= 1:
+        return codigos, pd.Index(etiquetas)
+
+    conteos = np.bincount(codigos[codigos >= 0], minlength=len(etiquetas))
+    frecuentes = conteos >= minimo
+    if frecuentes.all():
+        return codigos, pd.Index(etiquetas)
+
+    # Renumerar las frecuentes y mandar las raras a un código final
+    nuevos = np.cumsum(frecuentes) - 1
+    nuevos[~frecuentes] = frecuentes.sum()
+    recodificados = np.where(codigos >= 0, nuevos[np.maximum(codigos, 0)], -1)
+    return recodificados, pd.Index(list(etiquetas[frecuentes]) + [etiqueta_otros])
+
+
+class TablaContingencia:
+    """
+    Tabla de contingencia dispersa con sus totales marginales
+
+    Args:
+        conteos (sparse.csr_matrix): Conteos filas x columnas
+        filas (pd.Index): Etiquetas de las filas
+        columnas (pd.Index): Etiquetas de las columnas
+    """
+
+    def __init__(self, conteos, filas, columnas):
+        self.conteos = sparse.csr_matrix(conteos)
+        self.conteos.eliminate_zeros()
+        self.filas = filas
+        self.columnas = columnas
+        self.totales_fila = np.asarray(self.conteos.sum(axis=1)).ravel()
+        self.totales_columna = np.asarray(self.conteos.sum(axis=0)).ravel()
+        self.n = self.totales_fila.sum()
+
+    @property
+    def forma(self):
+        """Número de filas y columnas con algún registro"""
+        return int((self.totales_fila > 0).sum()), int((self.totales_columna > 0).sum())
+
+    def densa(self):
+        """
+        Tabla como DataFrame denso (solo para tablas pequeñas)
+
+        Returns:
+            pd.DataFrame: Conteos con las etiquetas de filas y columnas
+        """
+        return pd.DataFrame(self.conteos.toarray().astype(np.int64), index=self.filas, columns=self.columnas)
+
+    def _celdas(self):
+        """Fila, columna, observado y esperado de cada celda con conteo"""
+        coo = self.conteos.tocoo()
+        esperados = self.totales_fila[coo.row] * self.totales_columna[coo.col] / self.n
+        return coo.row, coo.col, coo.data.astype(float), esperados
+
+    def chi_cuadrado(self, correccion=True):
+        """
+        Prueba chi² de independencia (como scipy.stats.chi2_contingency)
+
+        Args:
+            correccion (bool): Corrección de Yates si hay un solo grado de libertad
+
+        Returns:
+            tuple: (chi², p-valor, grados de libertad)
+        """
+        filas, columnas = self.forma
+        gl = (filas - 1) * (columnas - 1)
+        if gl == 0:
+            return 0.0, 1.0, 0
+
+        if gl == 1 and correccion:
+            # Tabla 2x2: se usan las 4 celdas, también las vacías
+            observados = self.conteos[self.totales_fila > 0][:, self.totales_columna > 0].toarray()
+            esperados = np.outer(observados.sum(axis=1), observados.sum(axis=0)) / self.n
+            diferencia = observados - esperados
+            ajuste = np.minimum(0.5, np.abs(diferencia))
+            chi2 = np.sum((np.abs(diferencia) - ajuste) ** 2 / esperados)
+        else:
+            _, _, observados, esperados = self._celdas()
+            # sum((O - E)² / E) = sum(O² / E) - n, y las celdas vacías no suman a O² / E
+            chi2 = max(np.sum(observados ** 2 / esperados) - self.n, 0.0)
+        return chi2, stats.chi2.sf(chi2, gl), gl
+
+    def cramer_v(self, chi2=None):
+        """
+        V de Cramér (asociación entre 0 y 1)
+
+        Args:
+            chi2 (float): Estadístico chi² sin corrección (se calcula si no se da)
+
+        Returns:
+            float: V de Cramér
+        """
+        if chi2 is None:
+            chi2 = self.chi_cuadrado(correccion=False)[0]
+        minimo = min(self.forma) - 1
+        return np.sqrt(chi2 / (self.n * minimo)) if minimo > 0 else np.nan
+
+    def residuos(self, top=None):
+        """
+        Residuos de Pearson y ajustados de las celdas observadas (las vacías
+        tienen residuo de Pearson -sqrt(E) y no se listan)
+
+        Args:
+            top (int): Devolver solo las celdas con mayor |residuo ajustado|
+
+        Returns:
+            pd.DataFrame: fila, columna, observado, esperado, residuo y
+                residuo_ajustado, ordenado por |residuo_ajustado|
+        """
+        filas, columnas, observados, esperados = self._celdas()
+        residuo = (observados - esperados) / np.sqrt(esperados)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            ajustado = residuo / np.sqrt((1 - self.totales_fila[filas] / self.n)
+                                         * (1 - self.totales_columna[columnas] / self.n))
+        tabla = pd.DataFrame({
+            'fila': self.filas[filas],
+            'columna': self.columnas[columnas],
+            'observado': observados.astype(np.int64),
+            'esperado': esperados,
+            'residuo': residuo,
+            'residuo_ajustado': ajustado
+        })
+        orden = np.argsort(-np.abs(np.nan_to_num(ajustado)), kind='stable')
+        if top is not None:
+            orden = orden[:top]
+        return tabla.iloc[orden].reset_index(drop=True)
+
+
+def tabla_contingencia(df, columna1, columna2, minimo=0, etiqueta_otros=ETIQUETA_OTROS):
+    """
+    Tabla de contingencia dispersa de dos variables categóricas (se ignoran
+    las filas con algún nulo, como pd.crosstab)
+
+    Args:
+        df (pd.DataFrame): DataFrame con los datos
+        columna1 (str): Variable de las filas
+        columna2 (str): Variable de las columnas
+        minimo (int): Categorías con menos registros se agrupan en etiqueta_otros
+        etiqueta_otros (str): Etiqueta de las categorías agrupadas
+
+    Returns:
+        TablaContingencia: Conteos dispersos y totales marginales
+    """
+    codigos1, filas = _factorizar(df[columna1], minimo, etiqueta_otros)
+    codigos2, columnas = _factorizar(df[columna2], minimo, etiqueta_otros)
+    validos = (codigos1 >= 0) & (codigos2 >= 0)
+    n_filas, n_columnas = max(len(filas), 1), max(len(columnas), 1)
+    combinados = codigos1[validos].astype(np.int64) * n_columnas + codigos2[validos]
+
+    if n_filas * n_columnas <= MAXIMO_CELDAS_DENSAS:
+        conteos = np.bincount(combinados, minlength=n_filas * n_columnas)
+        celdas = np.flatnonzero(conteos)
+        valores = conteos[celdas]
+    else:
+        # Tabla demasiado grande para un bincount completo: solo celdas presentes
+        celdas, valores = np.unique(combinados, return_counts=True)
+
+    matriz = sparse.csr_matrix((valores, (celdas // n_columnas, celdas % n_columnas)),
+                               shape=(len(filas), len(columnas)))
+    return TablaContingencia(matriz, filas, columnas)
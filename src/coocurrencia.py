@@ -0,0 +1,159 @@
+"""
+Módulo de co-ocurrencia de prestaciones dentro de los episodios
+
+Se construye una matriz dispersa de incidencia episodio x prestación (CSR,
+1 si la prestación aparece en el episodio) y a partir de ella, con un
+producto de matrices dispersas, las co-ocurrencias entre prestaciones, su
+lift y su correlación (phi). Solo se guardan los pares que aparecen juntos
+al menos una vez, así que funciona con decenas de miles de códigos sin
+crear matrices densas.
+"""
+import pandas as pd
+import numpy as np
+from scipy import sparse
+
+try:
+    from .reporte import reportar, reporte_activo
+    from .cache import memorizar
+except ImportError:
+    from reporte import reportar, reporte_activo
+    from cache import memorizar
+
+
+def matriz_incidencia(df, columna_episodio='episodio', columna_prestacion='coD_PRESTACION'):
+    """
+    Matriz dispersa episodio x prestación (se ignoran las repeticiones y
+    las filas con algún nulo)
+
+    Args:
+        df (pd.DataFrame): Prestaciones expandidas (una fila por prestación)
+        columna_episodio (str): Columna del episodio
+        columna_prestacion (str): Columna del código de prestación
+
+    Returns:
+        tuple: (sparse.csr_matrix de 0/1, pd.Index de episodios, pd.Index de prestaciones)
+    """
+    datos = df[[columna_episodio, columna_prestacion]].dropna()
+    filas, episodios = pd.factorize(datos[columna_episodio])
+    columnas, prestaciones = pd.factorize(datos[columna_prestacion])
+
+    incidencia = sparse.csr_matrix((np.ones(len(filas)), (filas, columnas)),
+                                   shape=(len(episodios), len(prestaciones)))
+    # Las prestaciones repetidas en un episodio se suman al construir: se deja 1
+    incidencia.data[:] = 1.0
+    return incidencia, pd.Index(episodios), pd.Index(prestaciones)
+
+
+def _lift_correlacion(juntos, soporte_i, soporte_j, n):
+    """Lift y correlación phi de pares con sus episodios en común y sus soportes"""
+    lift = juntos * n / (soporte_i * soporte_j)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        correlacion = ((n * juntos - soporte_i * soporte_j)
+                       / np.sqrt(soporte_i * soporte_j * (n - soporte_i) * (n - soporte_j)))
+    return lift, correlacion
+
+
+def matrices_coocurrencia(incidencia):
+    """
+    Co-ocurrencias, lift y correlación phi entre prestaciones
+
+    Las tres matrices tienen el patrón de dispersión de las co-ocurrencias:
+    los pares que nunca aparecen juntos no se guardan (su lift es 0 y su
+    correlación es negativa o nula).
+
+    Args:
+        incidencia (sparse.csr_matrix): Matriz episodio x prestación de 0/1
+
+    Returns:
+        dict: 'conteos', 'lift' y 'correlacion' (sparse.csr_matrix prestación
+            x prestación; la diagonal de conteos es el número de episodios
+            de cada prestación) y 'n_episodios'
+    """
+    n = incidencia.shape[0]
+    conteos = (incidencia.T @ incidencia).tocsr()
+    conteos.sum_duplicates()
+    soporte = conteos.diagonal()
+
+    # Para cada valor guardado, los soportes de su fila y su columna
+    filas = np.repeat(np.arange(conteos.shape[0]), np.diff(conteos.indptr))
+    valores_lift, valores_correlacion = _lift_correlacion(conteos.data, soporte[filas],
+                                                          soporte[conteos.indices], n)
+    lift = conteos.copy()
+    lift.data = valores_lift
+    correlacion = conteos.copy()
+    correlacion.data = valores_correlacion
+
+    return {'conteos': conteos, 'lift': lift, 'correlacion': correlacion, 'n_episodios': n}
+
+
+@memorizar(columnas=('columna_episodio', 'columna_prestacion'))
+def coocurrencias_prestaciones(df, columna_episodio='episodio', columna_prestacion='coD_PRESTACION',
+                               minimo=2, top=20):
+    """
+    Pares de prestaciones que aparecen en los mismos episodios
+
+    Args:
+        df (pd.DataFrame): Prestaciones expandidas (una fila por prestación)
+        columna_episodio (str): Columna del episodio
+        columna_prestacion (str): Columna del código de prestación
+        minimo (int): Mínimo de episodios en común para incluir un par
+        top (int): Pares a mostrar
+
+    Returns:
+        pd.DataFrame: prestacion1, prestacion2, episodios (en común),
+            soporte1, soporte2, lift y correlacion, ordenado por episodios y lift
+    """
+    if columna_episodio not in df.columns or columna_prestacion not in df.columns:
+        reportar(f"✗ Columnas '{columna_episodio}' o '{columna_prestacion}' no encontradas")
+        return None
+
+    incidencia, _, prestaciones = matriz_incidencia(df, columna_episodio, columna_prestacion)
+
+    if incidencia.shape[0] == 0:
+        reportar(f"✗ No hay prestaciones para analizar")
+        return None
+
+    matrices = matrices_coocurrencia(incidencia)
+    n = matrices['n_episodios']
+    soporte = matrices['conteos'].diagonal()
+    # Cada par una vez: triángulo superior sin la diagonal (las tres matrices
+    # comparten patrón, así que sus valores quedan alineados)
+    pares, lift, correlacion = (sparse.triu(matrices[nombre], k=1).tocoo()
+                                for nombre in ('conteos', 'lift', 'correlacion'))
+    seleccion = pares.data >= minimo
+    i, j = pares.row[seleccion], pares.col[seleccion]
+    juntos = pares.data[seleccion]
+    lift, correlacion = lift.data[seleccion], correlacion.data[seleccion]
+
+    tabla = pd.DataFrame({
+        'prestacion1': prestaciones[i],
+        'prestacion2': prestaciones[j],
+        'episodios': juntos.astype(np.int64),
+        'soporte1': soporte[i].astype(np.int64),
+        'soporte2': soporte[j].astype(np.int64),
+        'lift': lift,
+        'correlacion': correlacion
+    })
+    tabla = tabla.sort_values(['episodios', 'lift'], ascending=False, ignore_index=True)
+
+    if reporte_activo():
+        reportar(f"\n--- Co-ocurrencia de Prestaciones ({n} episodios, "
+                 f"{len(prestaciones)} prestaciones) ---")
+        reportar(f"Pares con al menos {minimo} episodios en común: {len(tabla)}")
+        if len(tabla) > 0:
+            reportar(tabla.head(top).to_string(index=False))
+
+    return tabla
+
+
+if __name__ == "__main__":
+    from carga_datos import cargar_json
+
+    # Cargar datos
+    df = cargar_json('../data/facturacion_medica.json')
+
+    if df is not None and 'prestaciones' in df.columns:
+        prestaciones = df[['episodio', 'prestaciones']].explode('prestaciones').dropna()
+        detalle = pd.json_normalize(prestaciones['prestaciones'].tolist())
+        detalle['episodio'] = prestaciones['episodio'].to_numpy()
+        coocurrencias_prestaciones(detalle)
@@ -3,11 +3,40 @@ Módulo para análisis de correlaciones y covarianza
 """
 import pandas as pd
 import numpy as np
-from scipy.stats import spearmanr, pearsonr
+from scipy import stats
+from scipy.stats import pearsonr
 import seaborn as sns
-import matplotlib.pyplot as plt
 
+try:
+    from .reporte import reportar, reporte_activo
+    from .cache import memorizar
+    from .rangos import matriz_rangos
+    from .acumuladores import acumular_covarianza
+    from .visualizaciones import _nueva_figura, _finalizar, _cachear
+except ImportError:
+    from reporte import reportar, reporte_activo
+    from cache import memorizar
+    from rangos import matriz_rangos
+    from acumuladores import acumular_covarianza
+    from visualizaciones import _nueva_figura, _finalizar, _cachear
 
+
+METODOS_CORRELACION = ('pearson', 'spearman')
+
+# Máximo de valores de las matrices de rangos que Spearman tiene a la vez por bloque
+MAXIMO_VALORES_BLOQUE = 2_000_000
+
+
+def _interpretar_correlacion(coef):
+    """Clasifica la fuerza de una correlación por su valor absoluto"""
+    if abs(coef) < 0.3:
+        return "Correlación débil"
+    elif abs(coef) < 0.7:
+        return "Correlación moderada"
+    return "Correlación fuerte"
+
+
+@memorizar(columnas=('columna1', 'columna2'))
 def correlacion_pearson(df, columna1, columna2):
     """
     Calcula la correlación de Pearson entre dos variables
@@ -21,34 +50,29 @@ def correlacion_pearson(df, columna1, columna2):
         dict: Coeficiente de correlación y p-valor
     """
     if columna1 not in df.columns or columna2 not in df.columns:
-        print(f"✗ Una o ambas columnas no encontradas")
+        reportar(f"✗ Una o ambas columnas no encontradas")
         return None
     
     # Eliminar valores nulos
     df_limpio = df[[columna1, columna2]].dropna()
     
     if len(df_limpio) < 2:
-        print(f"✗ No hay suficientes datos para calcular correlación")
+        reportar(f"✗ No hay suficientes datos para calcular correlación")
         return None
     
     coef, p_valor = pearsonr(df_limpio[columna1], df_limpio[columna2])
     
-    print(f"\n--- Correlación de Pearson ---")
-    print(f"Variables: {columna1} vs {columna2}")
-    print(f"Coeficiente: {coef:.4f}")
-    print(f"P-valor: {p_valor:.4f}")
-    print(f"Interpretación: ", end="")
-    
-    if abs(coef) < 0.3:
-        print("Correlación débil")
-    elif abs(coef) < 0.7:
-        print("Correlación moderada")
-    else:
-        print("Correlación fuerte")
+    if reporte_activo():
+        reportar(f"\n--- Correlación de Pearson ---")
+        reportar(f"Variables: {columna1} vs {columna2}")
+        reportar(f"Coeficiente: {coef:.4f}")
+        reportar(f"P-valor: {p_valor:.4f}")
+        reportar(f"Interpretación: {_interpretar_correlacion(coef)}")
     
     return {'coeficiente': coef, 'p_valor': p_valor}
 
 
+@memorizar(columnas=('columna1', 'columna2'))
 def correlacion_spearman(df, columna1, columna2):
     """
     Calcula la correlación de Spearman (no paramétrica) entre dos variables
@@ -62,42 +86,192 @@ def correlacion_spearman(df, columna1, columna2):
         dict: Coeficiente de correlación y p-valor
     """
     if columna1 not in df.columns or columna2 not in df.columns:
-        print(f"✗ Una o ambas columnas no encontradas")
+        reportar(f"✗ Una o ambas columnas no encontradas")
         return None
     
     # Eliminar valores nulos
     df_limpio = df[[columna1, columna2]].dropna()
     
     if len(df_limpio) < 2:
-        print(f"✗ No hay suficientes datos para calcular correlación")
+        reportar(f"✗ No hay suficientes datos para calcular correlación")
         return None
     
-    coef, p_valor = spearmanr(df_limpio[columna1], df_limpio[columna2])
+    # Mismo cálculo que la matriz, con los rangos de la caché
+    pares = correlaciones_por_pares(df, [columna1, columna2], 'spearman')
+    coef = pares['coeficientes'].iat[0, 1]
+    p_valor = pares['p_valores'].iat[0, 1]
+    
+    if reporte_activo():
+        reportar(f"\n--- Correlación de Spearman ---")
+        reportar(f"Variables: {columna1} vs {columna2}")
+        reportar(f"Coeficiente: {coef:.4f}")
+        reportar(f"P-valor: {p_valor:.4f}")
+        reportar(f"Interpretación: {_interpretar_correlacion(coef)}")
+        
+        if p_valor < 0.05:
+            reportar("Correlación estadísticamente significativa (p < 0.05)")
+        else:
+            reportar("Correlación NO estadísticamente significativa (p >= 0.05)")
     
-    print(f"\n--- Correlación de Spearman ---")
-    print(f"Variables: {columna1} vs {columna2}")
-    print(f"Coeficiente: {coef:.4f}")
-    print(f"P-valor: {p_valor:.4f}")
-    print(f"Interpretación: ", end="")
+    return {'coeficiente': coef, 'p_valor': p_valor}
+
+
+def _pearson_completo(x, y):
+    """
+    Pearson de todas las columnas de x contra todas las de y usando, en cada
+    par, solo las filas donde ambas tienen dato (con productos de matrices)
     
-    if abs(coef) < 0.3:
-        print("Correlación débil")
-    elif abs(coef) < 0.7:
-        print("Correlación moderada")
-    else:
-        print("Correlación fuerte")
+    Args:
+        x (np.ndarray): Matriz n x p con NaN en los faltantes
+        y (np.ndarray): Matriz n x q con NaN en los faltantes
+        
+    Returns:
+        tuple: (coeficientes p x q, n p x q)
+    """
+    mascara_x = ~np.isnan(x)
+    mascara_y = ~np.isnan(y)
+    if mascara_x.all() and mascara_y.all():
+        # Sin faltantes todos los pares usan las mismas filas: un solo producto
+        x = x - x.mean(axis=0)
+        y = y - y.mean(axis=0)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            coeficientes = (x.T @ y) / np.sqrt(np.outer((x * x).sum(axis=0), (y * y).sum(axis=0)))
+        n = np.full(coeficientes.shape, len(x), dtype=np.int64)
+        if len(x) < 2:
+            coeficientes[:] = np.nan
+        return np.clip(coeficientes, -1, 1), n
+    
+    # Centrar cada columna reduce la cancelación en las sumas de productos
+    # (una columna sin datos queda en 0, sin el aviso de nanmean)
+    x = np.where(mascara_x, x, 0.0)
+    y = np.where(mascara_y, y, 0.0)
+    x = np.where(mascara_x, x - x.sum(axis=0) / np.maximum(mascara_x.sum(axis=0), 1), 0.0)
+    y = np.where(mascara_y, y - y.sum(axis=0) / np.maximum(mascara_y.sum(axis=0), 1), 0.0)
+    mascara_x = mascara_x.astype(float)
+    mascara_y = mascara_y.astype(float)
+    
+    n = mascara_x.T @ mascara_y
+    suma_x = x.T @ mascara_y
+    suma_y = mascara_x.T @ y
+    with np.errstate(divide='ignore', invalid='ignore'):
+        covarianza = x.T @ y - suma_x * suma_y / n
+        varianza_x = (x * x).T @ mascara_y - suma_x ** 2 / n
+        varianza_y = mascara_x.T @ (y * y) - suma_y ** 2 / n
+        coeficientes = covarianza / np.sqrt(varianza_x * varianza_y)
+    
+    coeficientes[(n < 2) | (varianza_x <= 0) | (varianza_y <= 0)] = np.nan
+    return np.clip(coeficientes, -1, 1), n.astype(np.int64)
+
+
+def _orden_rangos(rangos):
+    """
+    Orden de cada columna por su rango y, para cada posición del orden, la
+    primera y la última posición de su grupo de empates (nulos al final)
+    """
+    n = len(rangos)
+    orden = np.argsort(np.where(np.isnan(rangos), np.inf, rangos), axis=0)
+    ordenados = np.take_along_axis(rangos, orden, axis=0)
+    posiciones = np.arange(n)[:, np.newaxis]
+    distinto = ordenados[1:] != ordenados[:-1]
+    empieza = np.vstack([np.ones((1, rangos.shape[1]), dtype=bool), distinto])
+    termina = np.vstack([distinto, np.ones((1, rangos.shape[1]), dtype=bool)])
+    inicio = np.maximum.accumulate(np.where(empieza, posiciones, 0), axis=0)
+    fin = np.minimum.accumulate(np.where(termina, posiciones, n - 1)[::-1], axis=0)[::-1]
+    return orden, ordenados, inicio, fin
+
+
+def _rangos_sin_filas(orden, ordenados, inicio, fin, quitadas):
+    """
+    Rangos de cada columna dentro de un subconjunto de sus filas, sin volver
+    a ordenar: a cada rango se le restan las filas quitadas por debajo de su
+    grupo de empates y la mitad de las quitadas dentro de él
     
-    if p_valor < 0.05:
-        print("Correlación estadísticamente significativa (p < 0.05)")
-    else:
-        print("Correlación NO estadísticamente significativa (p >= 0.05)")
+    Args:
+        orden, ordenados, inicio, fin (np.ndarray): De _orden_rangos, n x k
+        quitadas (np.ndarray): Filas a quitar de cada columna (n x k)
+        
+    Returns:
+        np.ndarray: Rangos n x k en el orden original de las filas (en las
+            filas quitadas el valor no tiene sentido)
+    """
+    quitadas = np.take_along_axis(quitadas, orden, axis=0).astype(np.int32)
+    acumuladas = np.cumsum(quitadas, axis=0)
+    debajo = np.take_along_axis(acumuladas - quitadas, inicio, axis=0)
+    empatadas = np.take_along_axis(acumuladas, fin, axis=0) - debajo
+    rangos = np.empty(ordenados.shape)
+    np.put_along_axis(rangos, orden, ordenados - debajo - empatadas / 2, axis=0)
+    return rangos
+
+
+def _pearson_rangos(a, b, mascara):
+    """
+    Pearson columna a columna de dos matrices de rangos 1..m (con empates
+    promediados) sobre las filas de la máscara
+
+    Returns:
+        tuple: (coeficientes, n) de cada columna
+    """
+    n = mascara.sum(axis=0)
+    # Rangos 1..m: la media es exactamente (m + 1) / 2
+    centro = (n + 1) / 2
+    a = np.where(mascara, a - centro, 0.0)
+    b = np.where(mascara, b - centro, 0.0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        varianza_a = (a * a).sum(axis=0)
+        varianza_b = (b * b).sum(axis=0)
+        coeficientes = (a * b).sum(axis=0) / np.sqrt(varianza_a * varianza_b)
+    coeficientes[(n < 2) | (varianza_a <= 0) | (varianza_b <= 0)] = np.nan
+    return np.clip(coeficientes, -1, 1), n
+
+
+def _spearman_completo(datos, rangos_propios):
+    """
+    Spearman por pares con filas completas de cada par. Si todas las
+    columnas tienen los mismos nulos es un Pearson sobre los rangos de la
+    caché. Si no, los rangos de cada columna dentro de las filas de la otra
+    se obtienen de sus rangos propios restando las filas que faltan (sin
+    volver a ordenar), por bloques de columnas: la memoria es de unas pocas
+    matrices n x p, sin importar cuántos patrones de nulos haya
     
-    return {'coeficiente': coef, 'p_valor': p_valor}
+    Args:
+        datos (np.ndarray): Matriz n x p con NaN en los faltantes
+        rangos_propios (np.ndarray): Rangos de cada columna sobre sus valores no nulos
+        
+    Returns:
+        tuple: (coeficientes p x p, n p x p)
+    """
+    validos = ~np.isnan(datos)
+    n_filas, p = datos.shape
+    if (validos == validos[:, :1]).all():
+        return _pearson_completo(rangos_propios, rangos_propios)
+    
+    orden, ordenados, inicio, fin = _orden_rangos(rangos_propios)
+    coeficientes = np.full((p, p), np.nan)
+    n = np.zeros((p, p), dtype=np.int64)
+    por_bloque = max(1, MAXIMO_VALORES_BLOQUE // max(n_filas, 1))
+    for i in range(p):
+        for inicio_bloque in range(i, p, por_bloque):
+            columnas = np.arange(inicio_bloque, min(inicio_bloque + por_bloque, p))
+            k = len(columnas)
+            # Rangos de i dentro de las filas de cada columna del bloque
+            unica = [np.broadcast_to(matriz[:, [i]], (n_filas, k)) for matriz in (orden, ordenados, inicio, fin)]
+            rangos_i = _rangos_sin_filas(*unica, validos[:, [i]] & ~validos[:, columnas])
+            # Rangos de cada columna del bloque dentro de las filas de i
+            bloque = (slice(None), columnas)
+            rangos_j = _rangos_sin_filas(orden[bloque], ordenados[bloque], inicio[bloque], fin[bloque],
+                                         validos[:, columnas] & ~validos[:, [i]])
+            coeficientes[i, columnas], n[i, columnas] = _pearson_rangos(
+                rangos_i, rangos_j, validos[:, columnas] & validos[:, [i]])
+            coeficientes[columnas, i] = coeficientes[i, columnas]
+            n[columnas, i] = n[i, columnas]
+    return coeficientes, n
 
 
-def matriz_correlacion(df, columnas=None, metodo='pearson'):
+@memorizar(columnas=('columnas',))
+def correlaciones_por_pares(df, columnas=None, metodo='pearson'):
     """
-    Calcula la matriz de correlación para múltiples variables
+    Coeficientes, p-valores y número de observaciones de todos los pares de
+    columnas, usando en cada par todas las filas donde ambas tienen dato
     
     Args:
         df (pd.DataFrame): DataFrame con los datos
@@ -105,34 +279,108 @@ def matriz_correlacion(df, columnas=None, metodo='pearson'):
         metodo (str): 'pearson' o 'spearman'
         
     Returns:
-        pd.DataFrame: Matriz de correlación
+        dict: Matrices 'coeficientes', 'p_valores' y 'n' (pd.DataFrame)
     """
+    if metodo not in METODOS_CORRELACION:
+        reportar(f"✗ Método '{metodo}' no válido. Use 'pearson' o 'spearman'")
+        return None
+    
     if columnas is None:
         columnas = df.select_dtypes(include=[np.number]).columns.tolist()
     
-    df_subset = df[columnas].dropna()
-    
+    datos = df[columnas].to_numpy(dtype=float, na_value=np.nan)
     if metodo == 'pearson':
-        matriz = df_subset.corr(method='pearson')
-    elif metodo == 'spearman':
-        matriz = df_subset.corr(method='spearman')
+        coeficientes, n = _pearson_completo(datos, datos)
     else:
-        print(f"✗ Método '{metodo}' no válido. Use 'pearson' o 'spearman'")
+        coeficientes, n = _spearman_completo(datos, matriz_rangos(df, columnas))
+    # Diagonal exacta en 1 (NaN si la columna es constante o no tiene datos)
+    np.fill_diagonal(coeficientes, np.where(np.isnan(np.diag(coeficientes)), np.nan, 1.0))
+    
+    # Prueba t con n - 2 grados de libertad (la misma de pearsonr y spearmanr)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        grados = n - 2
+        t = coeficientes * np.sqrt(grados / (1 - coeficientes ** 2))
+        p_valores = 2 * stats.t.sf(np.abs(t), grados)
+    p_valores[grados < 1] = np.nan
+    
+    return {
+        'coeficientes': pd.DataFrame(coeficientes, index=columnas, columns=columnas),
+        'p_valores': pd.DataFrame(p_valores, index=columnas, columns=columnas),
+        'n': pd.DataFrame(n, index=columnas, columns=columnas)
+    }
+
+
+def top_correlaciones(resultado, k=5):
+    """
+    Pares de columnas con las correlaciones más fuertes en valor absoluto
+    
+    Args:
+        resultado (dict | pd.DataFrame): Resultado de correlaciones_por_pares
+            o una matriz de correlación
+        k (int): Número de pares
+        
+    Returns:
+        pd.DataFrame: columna1, columna2, coeficiente (y p_valor y n si están
+            disponibles), de mayor a menor correlación absoluta
+    """
+    matriz = resultado['coeficientes'] if isinstance(resultado, dict) else resultado
+    columnas = matriz.columns
+    filas, cols = np.triu_indices(len(columnas), k=1)
+    coeficientes = matriz.to_numpy()[filas, cols]
+    fuerza = np.nan_to_num(np.abs(coeficientes), nan=-1.0)
+    
+    # argpartition deja los k mayores sin ordenar todo el triángulo
+    k = min(k, len(fuerza))
+    mejores = np.argpartition(-fuerza, k - 1)[:k] if 0 < k < len(fuerza) else np.arange(k)
+    mejores = mejores[np.argsort(-fuerza[mejores], kind='stable')]
+    
+    top = pd.DataFrame({
+        'columna1': columnas[filas[mejores]],
+        'columna2': columnas[cols[mejores]],
+        'coeficiente': coeficientes[mejores]
+    })
+    if isinstance(resultado, dict):
+        top['p_valor'] = resultado['p_valores'].to_numpy()[filas[mejores], cols[mejores]]
+        top['n'] = resultado['n'].to_numpy()[filas[mejores], cols[mejores]]
+    return top
+
+
+@memorizar(columnas=('columnas',))
+def matriz_correlacion(df, columnas=None, metodo='pearson'):
+    """
+    Calcula la matriz de correlación para múltiples variables
+    Cada par usa todas las filas donde ambas columnas tienen dato
+    
+    Args:
+        df (pd.DataFrame): DataFrame con los datos
+        columnas (list): Lista de columnas a analizar (opcional)
+        metodo (str): 'pearson' o 'spearman'
+        
+    Returns:
+        pd.DataFrame: Matriz de correlación
+    """
+    resultado = correlaciones_por_pares(df, columnas, metodo)
+    if resultado is None:
         return None
+    matriz = resultado['coeficientes']
     
-    print(f"\n--- Matriz de Correlación ({metodo.capitalize()}) ---")
-    print(matriz)
+    if reporte_activo():
+        reportar(f"\n--- Matriz de Correlación ({metodo.capitalize()}) ---")
+        reportar(matriz)
     
     return matriz
 
 
-def matriz_covarianza(df, columnas=None):
+@memorizar(columnas=('columnas',))
+def matriz_covarianza(df, columnas=None, tamano_bloque=100_000):
     """
-    Calcula la matriz de covarianza para múltiples variables
+    Calcula la matriz de covarianza para múltiples variables (filas
+    completas), acumulando co-momentos por bloques
     
     Args:
         df (pd.DataFrame): DataFrame con los datos
         columnas (list): Lista de columnas a analizar (opcional)
+        tamano_bloque (int): Filas por bloque
         
     Returns:
         pd.DataFrame: Matriz de covarianza
@@ -140,15 +388,16 @@ def matriz_covarianza(df, columnas=None):
     if columnas is None:
         columnas = df.select_dtypes(include=[np.number]).columns.tolist()
     
-    df_subset = df[columnas].dropna()
-    matriz = df_subset.cov()
+    matriz = acumular_covarianza(df[columnas], columnas, tamano_bloque).covarianza()
     
-    print(f"\n--- Matriz de Covarianza ---")
-    print(matriz)
+    if reporte_activo():
+        reportar(f"\n--- Matriz de Covarianza ---")
+        reportar(matriz)
     
     return matriz
 
 
+@_cachear(columnas=('columnas',))
 def visualizar_matriz_correlacion(df, columnas=None, metodo='pearson', archivo_salida=None):
     """
     Visualiza la matriz de correlación como un mapa de calor
@@ -158,25 +407,26 @@ def visualizar_matriz_correlacion(df, columnas=None, metodo='pearson', archivo_s
         columnas (list): Lista de columnas a analizar (opcional)
         metodo (str): 'pearson' o 'spearman'
         archivo_salida (str): Ruta para guardar la imagen (opcional)
+        
+    Returns:
+        Figure: Figura generada (ya cerrada)
     """
     matriz = matriz_correlacion(df, columnas, metodo)
     
     if matriz is None:
         return
     
-    plt.figure(figsize=(10, 8))
+    fig = _nueva_figura(figsize=(10, 8))
+    ax = fig.subplots()
     sns.heatmap(matriz, annot=True, fmt='.2f', cmap='coolwarm', center=0,
-                square=True, linewidths=1, cbar_kws={"shrink": 0.8})
-    plt.title(f'Matriz de Correlación ({metodo.capitalize()})', fontsize=16, fontweight='bold')
-    plt.tight_layout()
+                square=True, linewidths=1, cbar_kws={"shrink": 0.8}, ax=ax)
+    ax.set_title(f'Matriz de Correlación ({metodo.capitalize()})', fontsize=16, fontweight='bold')
+    fig.tight_layout()
     
-    if archivo_salida:
-        plt.savefig(archivo_salida, dpi=300, bbox_inches='tight')
-        print(f"✓ Gráfica guardada en: {archivo_salida}")
-    
-    plt.show()
+    return _finalizar(fig, archivo_salida)
 
 
+@_cachear(columnas=('columnas',))
 def visualizar_matriz_covarianza(df, columnas=None, archivo_salida=None):
     """
     Visualiza la matriz de covarianza como un mapa de calor
@@ -185,25 +435,26 @@ def visualizar_matriz_covarianza(df, columnas=None, archivo_salida=None):
         df (pd.DataFrame): DataFrame con los datos
         columnas (list): Lista de columnas a analizar (opcional)
         archivo_salida (str): Ruta para guardar la imagen (opcional)
+        
+    Returns:
+        Figure: Figura generada (ya cerrada)
     """
     matriz = matriz_covarianza(df, columnas)
     
     if matriz is None:
         return
     
-    plt.figure(figsize=(10, 8))
+    fig = _nueva_figura(figsize=(10, 8))
+    ax = fig.subplots()
     sns.heatmap(matriz, annot=True, fmt='.2e', cmap='viridis',
-                square=True, linewidths=1, cbar_kws={"shrink": 0.8})
-    plt.title('Matriz de Covarianza', fontsize=16, fontweight='bold')
-    plt.tight_layout()
+                square=True, linewidths=1, cbar_kws={"shrink": 0.8}, ax=ax)
+    ax.set_title('Matriz de Covarianza', fontsize=16, fontweight='bold')
+    fig.tight_layout()
     
-    if archivo_salida:
-        plt.savefig(archivo_salida, dpi=300, bbox_inches='tight')
-        print(f"✓ Gráfica guardada en: {archivo_salida}")
-    
-    plt.show()
+    return _finalizar(fig, archivo_salida)
 
 
+@memorizar(columnas=('columnas',))
 def analisis_correlacion_completo(df, columnas=None):
     """
     Realiza un análisis completo de correlaciones
@@ -215,49 +466,50 @@ def analisis_correlacion_completo(df, columnas=None):
     if columnas is None:
         columnas = df.select_dtypes(include=[np.number]).columns.tolist()
     
-    print("\n" + "="*80)
-    print("ANÁLISIS DE CORRELACIONES COMPLETO")
-    print("="*80)
+    reportar("\n" + "="*80)
+    reportar("ANÁLISIS DE CORRELACIONES COMPLETO")
+    reportar("="*80)
     
-    # Matriz de correlación Pearson
-    print("\n" + "-"*80)
-    matriz_pearson = matriz_correlacion(df, columnas, 'pearson')
+    # Matriz de correlación Pearson (con p-valores y n de cada par)
+    reportar("\n" + "-"*80)
+    pares_pearson = correlaciones_por_pares(df, columnas, 'pearson')
+    matriz_pearson = pares_pearson['coeficientes']
+    if reporte_activo():
+        reportar(f"\n--- Matriz de Correlación (Pearson) ---")
+        reportar(matriz_pearson)
     
     # Matriz de correlación Spearman
-    print("\n" + "-"*80)
+    reportar("\n" + "-"*80)
     matriz_spearman = matriz_correlacion(df, columnas, 'spearman')
     
     # Matriz de covarianza
-    print("\n" + "-"*80)
+    reportar("\n" + "-"*80)
     matriz_cov = matriz_covarianza(df, columnas)
     
     # Correlaciones más fuertes
-    print("\n" + "-"*80)
-    print("CORRELACIONES MÁS FUERTES (Pearson)")
-    print("-"*80)
-    
-    # Obtener pares de correlaciones más altas (excluyendo diagonal)
-    correlaciones = []
-    for i in range(len(matriz_pearson.columns)):
-        for j in range(i+1, len(matriz_pearson.columns)):
-            col1 = matriz_pearson.columns[i]
-            col2 = matriz_pearson.columns[j]
-            coef = matriz_pearson.iloc[i, j]
-            correlaciones.append((col1, col2, coef))
+    reportar("\n" + "-"*80)
+    reportar("CORRELACIONES MÁS FUERTES (Pearson)")
+    reportar("-"*80)
     
-    # Ordenar por valor absoluto
-    correlaciones.sort(key=lambda x: abs(x[2]), reverse=True)
+    # Pares de correlaciones más altas (triángulo superior, sin la diagonal)
+    top = top_correlaciones(pares_pearson, k=5)
+    correlaciones = list(zip(top['columna1'], top['columna2'], top['coeficiente']))
     
-    print(f"\nTop 5 correlaciones:")
-    for i, (col1, col2, coef) in enumerate(correlaciones[:5], 1):
-        print(f"{i}. {col1} vs {col2}: {coef:.4f}")
+    if reporte_activo():
+        reportar(f"\nTop 5 correlaciones:")
+        for i, fila in enumerate(top.itertuples(index=False), 1):
+            reportar(f"{i}. {fila.columna1} vs {fila.columna2}: {fila.coeficiente:.4f} "
+                     f"(p={fila.p_valor:.4f}, n={fila.n})")
     
-    print("\n" + "="*80 + "\n")
+    reportar("\n" + "="*80 + "\n")
     
     return {
         'pearson': matriz_pearson,
         'spearman': matriz_spearman,
-        'covarianza': matriz_cov
+        'covarianza': matriz_cov,
+        'p_valores': pares_pearson['p_valores'],
+        'n_pares': pares_pearson['n'],
+        'top_correlaciones': correlaciones
     }
 
 
@@ -5,7 +5,22 @@ import pandas as pd
 import numpy as np
 from scipy import stats
 
+try:
+    from .sketches import SketchCuantiles, cuartiles_desde_sketch, pares_por_codigo, estimar_pares
+    from .reporte import reportar, reporte_activo
+    from .cache import memorizar
+except ImportError:
+    from sketches import SketchCuantiles, cuartiles_desde_sketch, pares_por_codigo, estimar_pares
+    from reporte import reportar, reporte_activo
+    from cache import memorizar
 
+
+# Backends para cuartiles: 'exacto' ordena la columna, 'sketch' usa un
+# SketchCuantiles con memoria acotada y error de rango ~1% (k=200)
+BACKENDS_CUANTILES = ('exacto', 'sketch')
+
+
+@memorizar(columnas=('columna',))
 def medidas_centralidad(df, columna):
     """
     Calcula medidas de centralidad (media, mediana, moda)
@@ -18,11 +33,11 @@ def medidas_centralidad(df, columna):
         dict: Diccionario con las medidas de centralidad
     """
     if columna not in df.columns:
-        print(f"✗ Columna '{columna}' no encontrada")
+        reportar(f"✗ Columna '{columna}' no encontrada")
         return None
     
     if not pd.api.types.is_numeric_dtype(df[columna]):
-        print(f"✗ Columna '{columna}' no es numérica")
+        reportar(f"✗ Columna '{columna}' no es numérica")
         return None
     
     resultados = {
@@ -31,14 +46,16 @@ def medidas_centralidad(df, columna):
         'moda': df[columna].mode()[0] if not df[columna].mode().empty else None
     }
     
-    print(f"\n--- Medidas de Centralidad: {columna} ---")
-    print(f"Media: {resultados['media']:.2f}")
-    print(f"Mediana: {resultados['mediana']:.2f}")
-    print(f"Moda: {resultados['moda']:.2f}" if resultados['moda'] is not None else "Moda: No disponible")
+    if reporte_activo():
+        reportar(f"\n--- Medidas de Centralidad: {columna} ---")
+        reportar(f"Media: {resultados['media']:.2f}")
+        reportar(f"Mediana: {resultados['mediana']:.2f}")
+        reportar(f"Moda: {resultados['moda']:.2f}" if resultados['moda'] is not None else "Moda: No disponible")
     
     return resultados
 
 
+@memorizar(columnas=('columna',))
 def medidas_dispersion(df, columna):
     """
     Calcula medidas de dispersión (varianza, desviación estándar, rango, coeficiente de variación)
@@ -51,11 +68,11 @@ def medidas_dispersion(df, columna):
         dict: Diccionario con las medidas de dispersión
     """
     if columna not in df.columns:
-        print(f"✗ Columna '{columna}' no encontrada")
+        reportar(f"✗ Columna '{columna}' no encontrada")
         return None
     
     if not pd.api.types.is_numeric_dtype(df[columna]):
-        print(f"✗ Columna '{columna}' no es numérica")
+        reportar(f"✗ Columna '{columna}' no es numérica")
         return None
     
     resultados = {
@@ -66,78 +83,94 @@ def medidas_dispersion(df, columna):
         'coeficiente_variacion': (df[columna].std() / df[columna].mean()) * 100 if df[columna].mean() != 0 else 0
     }
     
-    print(f"\n--- Medidas de Dispersión: {columna} ---")
-    print(f"Varianza: {resultados['varianza']:.2f}")
-    print(f"Desviación Estándar: {resultados['desviacion_estandar']:.2f}")
-    print(f"Rango: {resultados['rango']:.2f}")
-    print(f"Rango Intercuartílico (IQR): {resultados['rango_intercuartilico']:.2f}")
-    print(f"Coeficiente de Variación: {resultados['coeficiente_variacion']:.2f}%")
+    if reporte_activo():
+        reportar(f"\n--- Medidas de Dispersión: {columna} ---")
+        reportar(f"Varianza: {resultados['varianza']:.2f}")
+        reportar(f"Desviación Estándar: {resultados['desviacion_estandar']:.2f}")
+        reportar(f"Rango: {resultados['rango']:.2f}")
+        reportar(f"Rango Intercuartílico (IQR): {resultados['rango_intercuartilico']:.2f}")
+        reportar(f"Coeficiente de Variación: {resultados['coeficiente_variacion']:.2f}%")
     
     return resultados
 
 
-def calcular_cuartiles(df, columna):
+@memorizar(columnas=('columna',))
+def calcular_cuartiles(df, columna, backend='exacto', k=200):
     """
     Calcula cuartiles y percentiles de una columna
     
     Args:
         df (pd.DataFrame): DataFrame con los datos
         columna (str): Columna a analizar
+        backend (str): 'exacto' o 'sketch' (aproximado, memoria acotada)
+        k (int): Precisión del sketch si backend='sketch'
         
     Returns:
         dict: Diccionario con los cuartiles
     """
     if columna not in df.columns:
-        print(f"✗ Columna '{columna}' no encontrada")
+        reportar(f"✗ Columna '{columna}' no encontrada")
         return None
     
     if not pd.api.types.is_numeric_dtype(df[columna]):
-        print(f"✗ Columna '{columna}' no es numérica")
+        reportar(f"✗ Columna '{columna}' no es numérica")
         return None
     
-    resultados = {
-        'minimo': df[columna].min(),
-        'Q1': df[columna].quantile(0.25),
-        'Q2_mediana': df[columna].quantile(0.50),
-        'Q3': df[columna].quantile(0.75),
-        'maximo': df[columna].max(),
-        'P10': df[columna].quantile(0.10),
-        'P90': df[columna].quantile(0.90)
-    }
+    if backend == 'sketch':
+        resultados = cuartiles_desde_sketch(SketchCuantiles(k, semilla=0).update(df[columna]))
+    elif backend == 'exacto':
+        resultados = {
+            'minimo': df[columna].min(),
+            'Q1': df[columna].quantile(0.25),
+            'Q2_mediana': df[columna].quantile(0.50),
+            'Q3': df[columna].quantile(0.75),
+            'maximo': df[columna].max(),
+            'P10': df[columna].quantile(0.10),
+            'P90': df[columna].quantile(0.90)
+        }
+    else:
+        reportar(f"✗ Backend '{backend}' no válido. Use {', '.join(BACKENDS_CUANTILES)}")
+        return None
     
-    print(f"\n--- Cuartiles y Percentiles: {columna} ---")
-    print(f"Mínimo: {resultados['minimo']:.2f}")
-    print(f"Q1 (25%): {resultados['Q1']:.2f}")
-    print(f"Q2 (Mediana 50%): {resultados['Q2_mediana']:.2f}")
-    print(f"Q3 (75%): {resultados['Q3']:.2f}")
-    print(f"Máximo: {resultados['maximo']:.2f}")
-    print(f"P10: {resultados['P10']:.2f}")
-    print(f"P90: {resultados['P90']:.2f}")
+    if reporte_activo():
+        reportar(f"\n--- Cuartiles y Percentiles: {columna} ---")
+        reportar(f"Mínimo: {resultados['minimo']:.2f}")
+        reportar(f"Q1 (25%): {resultados['Q1']:.2f}")
+        reportar(f"Q2 (Mediana 50%): {resultados['Q2_mediana']:.2f}")
+        reportar(f"Q3 (75%): {resultados['Q3']:.2f}")
+        reportar(f"Máximo: {resultados['maximo']:.2f}")
+        reportar(f"P10: {resultados['P10']:.2f}")
+        reportar(f"P90: {resultados['P90']:.2f}")
     
     return resultados
 
 
-def detectar_outliers(df, columna):
+@memorizar(columnas=('columna',))
+def detectar_outliers(df, columna, backend='exacto', k=200):
     """
     Detecta outliers usando el método IQR
     
     Args:
         df (pd.DataFrame): DataFrame con los datos
         columna (str): Columna a analizar
+        backend (str): 'exacto' o 'sketch' para calcular Q1 y Q3
+        k (int): Precisión del sketch si backend='sketch'
         
     Returns:
         pd.DataFrame: DataFrame con los outliers detectados
     """
     if columna not in df.columns:
-        print(f"✗ Columna '{columna}' no encontrada")
+        reportar(f"✗ Columna '{columna}' no encontrada")
         return None
     
     if not pd.api.types.is_numeric_dtype(df[columna]):
-        print(f"✗ Columna '{columna}' no es numérica")
+        reportar(f"✗ Columna '{columna}' no es numérica")
         return None
     
-    Q1 = df[columna].quantile(0.25)
-    Q3 = df[columna].quantile(0.75)
+    if backend == 'sketch':
+        Q1, Q3 = SketchCuantiles(k, semilla=0).update(df[columna]).cuantiles([0.25, 0.75])
+    else:
+        Q1, Q3 = df[columna].quantile([0.25, 0.75])
     IQR = Q3 - Q1
     
     limite_inferior = Q1 - 1.5 * IQR
@@ -145,14 +178,16 @@ def detectar_outliers(df, columna):
     
     outliers = df[(df[columna] < limite_inferior) | (df[columna] > limite_superior)]
     
-    print(f"\n--- Detección de Outliers: {columna} ---")
-    print(f"Límite Inferior: {limite_inferior:.2f}")
-    print(f"Límite Superior: {limite_superior:.2f}")
-    print(f"Outliers detectados: {len(outliers)} de {len(df)} ({(len(outliers)/len(df)*100):.2f}%)")
+    if reporte_activo():
+        reportar(f"\n--- Detección de Outliers: {columna} ---")
+        reportar(f"Límite Inferior: {limite_inferior:.2f}")
+        reportar(f"Límite Superior: {limite_superior:.2f}")
+        reportar(f"Outliers detectados: {len(outliers)} de {len(df)} ({(len(outliers)/len(df)*100):.2f}%)")
     
     return outliers
 
 
+@memorizar(columnas=('columnas_numericas',))
 def resumen_estadistico_completo(df, columnas_numericas=None):
     """
     Genera un resumen estadístico completo de las columnas numéricas
@@ -160,32 +195,358 @@ def resumen_estadistico_completo(df, columnas_numericas=None):
     Args:
         df (pd.DataFrame): DataFrame con los datos
         columnas_numericas (list): Lista de columnas a analizar (opcional)
+        
+    Returns:
+        dict: Por columna, los resultados de centralidad, dispersión,
+            cuartiles y el DataFrame de outliers
     """
     if columnas_numericas is None:
         columnas_numericas = df.select_dtypes(include=[np.number]).columns.tolist()
     
-    print("\n" + "="*80)
-    print("RESUMEN ESTADÍSTICO COMPLETO")
-    print("="*80)
+    reportar("\n" + "="*80)
+    reportar("RESUMEN ESTADÍSTICO COMPLETO")
+    reportar("="*80)
     
+    resumen = {}
     for col in columnas_numericas:
-        print(f"\n{'='*80}")
-        print(f"COLUMNA: {col}")
-        print(f"{'='*80}")
+        reportar(f"\n{'='*80}")
+        reportar(f"COLUMNA: {col}")
+        reportar(f"{'='*80}")
         
-        medidas_centralidad(df, col)
-        medidas_dispersion(df, col)
-        calcular_cuartiles(df, col)
+        resumen[col] = {
+            'centralidad': medidas_centralidad(df, col),
+            'dispersion': medidas_dispersion(df, col),
+            'cuartiles': calcular_cuartiles(df, col)
+        }
         
         # Detectar outliers
         outliers = detectar_outliers(df, col)
-        if outliers is not None and len(outliers) > 0:
-            print(f"\nEjemplos de outliers:")
-            print(outliers[[col]].head())
+        resumen[col]['outliers'] = outliers
+        if reporte_activo() and outliers is not None and len(outliers) > 0:
+            reportar(f"\nEjemplos de outliers:")
+            reportar(outliers[[col]].head())
+    
+    reportar("\n" + "="*80 + "\n")
+    
+    return resumen
+
+
+# Percentiles que calcula el motor vectorizado (P10, Q1, mediana, Q3, P90)
+PERCENTILES_RESUMEN = (0.10, 0.25, 0.50, 0.75, 0.90)
+
+
+def _cuantiles_ordenados(valores, inicios, conteos, q):
+    """Cuantil con interpolación lineal (como pandas) de segmentos ordenados"""
+    posicion = (conteos - 1) * q
+    inferior = np.floor(posicion).astype(np.int64)
+    superior = np.ceil(posicion).astype(np.int64)
+    fraccion = posicion - inferior
+    validos = conteos > 0
+    resultado = np.full(len(conteos), np.nan)
+    bajo = valores[inicios[validos] + inferior[validos]]
+    alto = valores[inicios[validos] + superior[validos]]
+    resultado[validos] = bajo + (alto - bajo) * fraccion[validos]
+    return resultado
+
+
+def _modas_ordenadas(valores, segmentos, n_segmentos):
+    """Moda (la menor en caso de empate) de cada segmento ordenado"""
+    modas = np.full(n_segmentos, np.nan)
+    if len(valores) == 0:
+        return modas
+    
+    # Corridas de valores iguales dentro de cada segmento
+    nueva = np.ones(len(valores), dtype=bool)
+    nueva[1:] = (valores[1:] != valores[:-1]) | (segmentos[1:] != segmentos[:-1])
+    inicios = np.flatnonzero(nueva)
+    largos = np.diff(np.append(inicios, len(valores)))
+    segmento_corrida = segmentos[inicios]
+    
+    # Por segmento: corrida más larga y, en empate, la primera (menor valor)
+    orden = np.lexsort((inicios, -largos, segmento_corrida))
+    primeras = orden[np.r_[True, np.diff(segmento_corrida[orden]) != 0]]
+    modas[segmento_corrida[primeras]] = valores[inicios[primeras]]
+    return modas
+
+
+def _estadisticas_segmentos(valores, segmentos, n_segmentos, factor_iqr=1.5):
+    """
+    Calcula todas las medidas del resumen para segmentos de datos ordenados
+    
+    Args:
+        valores (np.ndarray): Valores sin nulos, ordenados dentro de cada segmento
+        segmentos (np.ndarray): Segmento de cada valor (no decreciente)
+        n_segmentos (int): Número total de segmentos
+        factor_iqr (float): Factor del IQR para los límites de outliers
+        
+    Returns:
+        dict: Arrays con una posición por segmento
+    """
+    conteos = np.bincount(segmentos, minlength=n_segmentos)
+    inicios = np.concatenate([[0], np.cumsum(conteos)[:-1]])
+    hay_datos = conteos > 0
+    
+    with np.errstate(invalid='ignore', divide='ignore'):
+        suma = np.bincount(segmentos, weights=valores, minlength=n_segmentos)
+        media = np.where(hay_datos, suma / np.maximum(conteos, 1), np.nan)
+        desvios = valores - media[segmentos]
+        m2 = np.bincount(segmentos, weights=desvios * desvios, minlength=n_segmentos)
+        varianza = np.where(conteos > 1, m2 / np.maximum(conteos - 1, 1), np.nan)
+        desviacion = np.sqrt(varianza)
+        
+        p10, q1, mediana, q3, p90 = (_cuantiles_ordenados(valores, inicios, conteos, q)
+                                     for q in PERCENTILES_RESUMEN)
+        minimo = np.full(n_segmentos, np.nan)
+        maximo = np.full(n_segmentos, np.nan)
+        minimo[hay_datos] = valores[inicios[hay_datos]]
+        maximo[hay_datos] = valores[inicios[hay_datos] + conteos[hay_datos] - 1]
+        
+        iqr = q3 - q1
+        limite_inferior = q1 - factor_iqr * iqr
+        limite_superior = q3 + factor_iqr * iqr
+        es_outlier = (valores < limite_inferior[segmentos]) | (valores > limite_superior[segmentos])
+        n_outliers = np.bincount(segmentos, weights=es_outlier, minlength=n_segmentos).astype(np.int64)
+        
+        coeficiente = np.where(media != 0, desviacion / media * 100, 0.0)
+        porcentaje = np.where(hay_datos, n_outliers / np.maximum(conteos, 1) * 100, np.nan)
+    
+    return {
+        'n': conteos,
+        'media': media,
+        'mediana': mediana,
+        'moda': _modas_ordenadas(valores, segmentos, n_segmentos),
+        'varianza': varianza,
+        'desviacion_estandar': desviacion,
+        'minimo': minimo,
+        'maximo': maximo,
+        'rango': maximo - minimo,
+        'P10': p10,
+        'Q1': q1,
+        'Q3': q3,
+        'P90': p90,
+        'rango_intercuartilico': iqr,
+        'coeficiente_variacion': coeficiente,
+        'limite_inferior': limite_inferior,
+        'limite_superior': limite_superior,
+        'n_outliers': n_outliers,
+        'porcentaje_outliers': porcentaje
+    }
+
+
+@memorizar(columnas=('columnas_numericas',))
+def resumen_estadistico_vectorizado(df, columnas_numericas=None, mostrar=False):
+    """
+    Calcula centralidad, dispersión, cuartiles y outliers (IQR) de todas las
+    columnas numéricas en una sola pasada sobre un bloque 2-D de NumPy:
+    un único ordenamiento por columna sirve para mediana, cuartiles,
+    percentiles, moda, mínimo, máximo y conteo de outliers
+    
+    Args:
+        df (pd.DataFrame): DataFrame con los datos
+        columnas_numericas (list): Lista de columnas a analizar (opcional)
+        mostrar (bool): Imprimir el resultado con imprimir_resumen_estadistico
+        
+    Returns:
+        pd.DataFrame: Tabla con una fila por columna y una columna por medida
+    """
+    if columnas_numericas is None:
+        columnas_numericas = df.select_dtypes(include=[np.number]).columns.tolist()
+    
+    columnas = []
+    for col in columnas_numericas:
+        if col not in df.columns:
+            reportar(f"✗ Columna '{col}' no encontrada")
+        elif not pd.api.types.is_numeric_dtype(df[col]):
+            reportar(f"✗ Columna '{col}' no es numérica")
+        else:
+            columnas.append(col)
+    
+    bloque = df[columnas].to_numpy(dtype=float, na_value=np.nan)
+    n_filas = bloque.shape[0]
+    
+    # Cada columna ordenada en una fila contigua; los nulos quedan al final
+    ordenados = np.sort(np.ascontiguousarray(bloque.T), axis=1).ravel()
+    validos = ~np.isnan(ordenados)
+    segmentos = np.repeat(np.arange(len(columnas)), n_filas)[validos]
+    
+    medidas = _estadisticas_segmentos(ordenados[validos], segmentos, len(columnas))
+    tabla = pd.DataFrame(medidas, index=pd.Index(columnas, name='columna'))
     
-    print("\n" + "="*80 + "\n")
+    if mostrar:
+        imprimir_resumen_estadistico(tabla)
+    
+    return tabla
+
+
+def factorizar_claves(df, claves):
+    """
+    Asigna un código de grupo a cada fila combinando una o varias columnas
+    Las filas con algún nulo en las claves quedan con código -1 (como groupby)
+    
+    Args:
+        df (pd.DataFrame): DataFrame con los datos
+        claves (list): Columnas que definen los grupos
+        
+    Returns:
+        tuple: (códigos por fila, pd.MultiIndex o pd.Index con las etiquetas de cada grupo)
+    """
+    codigos_claves = []
+    etiquetas_claves = []
+    for clave in claves:
+        codigos, etiquetas = pd.factorize(df[clave], sort=True)
+        codigos_claves.append(codigos)
+        etiquetas_claves.append(etiquetas)
+    
+    validos = np.all([codigos >= 0 for codigos in codigos_claves], axis=0)
+    dimensiones = [max(len(etiquetas), 1) for etiquetas in etiquetas_claves]
+    combinados = np.full(len(df), -1, dtype=np.int64)
+    combinados[validos] = np.ravel_multi_index([codigos[validos] for codigos in codigos_claves], dimensiones)
+    
+    # Se renumeran solo las combinaciones presentes, en orden de las claves
+    codigos, combinaciones = pd.factorize(combinados[validos], sort=True)
+    codigos_grupo = np.full(len(df), -1, dtype=np.int64)
+    codigos_grupo[validos] = codigos
+    
+    posiciones = np.unravel_index(combinaciones, dimensiones)
+    niveles = [etiquetas.take(posicion) for etiquetas, posicion in zip(etiquetas_claves, posiciones)]
+    if len(claves) == 1:
+        return codigos_grupo, pd.Index(niveles[0], name=claves[0])
+    return codigos_grupo, pd.MultiIndex.from_arrays(niveles, names=claves)
+
+
+@memorizar(columnas=('claves', 'columnas_numericas'))
+def estadisticas_por_grupo(df, claves, columnas_numericas=None, mostrar=False):
+    """
+    Calcula el resumen estadístico completo (centralidad, dispersión,
+    cuartiles y outliers IQR) de cada grupo definido por una o varias claves,
+    sin recorrer los grupos en Python: las claves se factorizan una vez y
+    todos los pares (columna, grupo) se ordenan con un único lexsort
+    
+    Args:
+        df (pd.DataFrame): DataFrame con los datos
+        claves (str | list): Columna(s) que definen los grupos
+        columnas_numericas (list): Lista de columnas a analizar (opcional)
+        mostrar (bool): Imprimir la tabla resultante
+        
+    Returns:
+        pd.DataFrame: Tabla indexada por (claves..., columna) con las mismas
+            medidas que resumen_estadistico_vectorizado
+    """
+    if isinstance(claves, str):
+        claves = [claves]
+    
+    faltantes = [clave for clave in claves if clave not in df.columns]
+    if faltantes:
+        reportar(f"✗ Columnas de agrupación no encontradas: {faltantes}")
+        return None
+    
+    if columnas_numericas is None:
+        columnas_numericas = [col for col in df.select_dtypes(include=[np.number]).columns
+                              if col not in claves]
+    columnas = [col for col in columnas_numericas
+                if col in df.columns and pd.api.types.is_numeric_dtype(df[col])]
+    
+    codigos, grupos = factorizar_claves(df, claves)
+    n_grupos = len(grupos)
+    
+    # Segmento = columna * n_grupos + grupo, para todas las columnas a la vez
+    bloque = df[columnas].to_numpy(dtype=float, na_value=np.nan)
+    segmentos = (np.arange(len(columnas)) * n_grupos)[np.newaxis, :] + codigos[:, np.newaxis]
+    validos = ~np.isnan(bloque) & (codigos >= 0)[:, np.newaxis]
+    valores = bloque[validos]
+    segmentos = segmentos[validos]
+    orden = np.lexsort((valores, segmentos))
+    
+    medidas = _estadisticas_segmentos(valores[orden], segmentos[orden], len(columnas) * n_grupos)
+    
+    niveles = [np.tile(np.arange(n_grupos), len(columnas)), np.repeat(np.arange(len(columnas)), n_grupos)]
+    if isinstance(grupos, pd.MultiIndex):
+        indice = pd.MultiIndex.from_arrays(
+            [grupos.get_level_values(i).take(niveles[0]) for i in range(grupos.nlevels)]
+            + [pd.Index(columnas).take(niveles[1])],
+            names=claves + ['columna'])
+    else:
+        indice = pd.MultiIndex.from_arrays([grupos.take(niveles[0]), pd.Index(columnas).take(niveles[1])],
+                                           names=claves + ['columna'])
+    tabla = pd.DataFrame(medidas, index=indice)
+    
+    if mostrar and reporte_activo():
+        reportar(f"\n--- Estadísticas por Grupo: {', '.join(claves)} ({n_grupos} grupos) ---")
+        reportar(tabla)
+    
+    return tabla
+
+
+@memorizar(columnas=('claves', 'columna'))
+def distintos_por_grupo(df, claves, columna, precision=12, mostrar=False):
+    """
+    Cuenta valores distintos de una columna (p. ej. pacientes) por grupo
+    con sketches HyperLogLog, sin guardar los valores de cada grupo. Cada
+    grupo guarda solo sus registros no vacíos, así que miles de grupos
+    chicos no ocupan 2^precision bytes cada uno. El error relativo típico
+    es 1.04 / sqrt(2^precision) (1.6% con 12)
+    
+    Args:
+        df (pd.DataFrame): DataFrame con los datos
+        claves (str | list): Columna(s) que definen los grupos
+        columna (str): Columna cuyos valores distintos se cuentan
+        precision (int): Precisión de los sketches (entre 4 y 18)
+        mostrar (bool): Imprimir la tabla resultante
+        
+    Returns:
+        pd.DataFrame: Tabla indexada por las claves con n (registros) y distintos
+    """
+    if isinstance(claves, str):
+        claves = [claves]
+    
+    faltantes = [col for col in claves + [columna] if col not in df.columns]
+    if faltantes:
+        reportar(f"✗ Columnas no encontradas: {faltantes}")
+        return None
+    
+    codigos, grupos = factorizar_claves(df, claves)
+    codigos_pares, _, rangos = pares_por_codigo(df[columna], codigos, precision)
+    
+    tabla = pd.DataFrame({
+        'n': np.bincount(codigos[codigos >= 0], minlength=len(grupos)),
+        'distintos': np.round(estimar_pares(codigos_pares, rangos, len(grupos), precision)).astype(np.int64)
+    }, index=grupos)
+    
+    if mostrar and reporte_activo():
+        reportar(f"\n--- Valores Distintos de {columna} por {', '.join(claves)} ---")
+        reportar(tabla)
+    
+    return tabla
+
+
+def imprimir_resumen_estadistico(tabla):
+    """
+    Muestra en consola una tabla de resumen estadístico
+    
+    Args:
+        tabla (pd.DataFrame): Resultado de resumen_estadistico_vectorizado
+    """
+    if not reporte_activo():
+        return
+    
+    reportar("\n" + "="*80)
+    reportar("RESUMEN ESTADÍSTICO COMPLETO")
+    reportar("="*80)
+    
+    for col, fila in tabla.iterrows():
+        reportar(f"\n--- {col} (n={int(fila['n'])}) ---")
+        reportar(f"Media: {fila['media']:.2f} | Mediana: {fila['mediana']:.2f} | Moda: {fila['moda']:.2f}")
+        reportar(f"Desviación Estándar: {fila['desviacion_estandar']:.2f} | Varianza: {fila['varianza']:.2f} | "
+              f"CV: {fila['coeficiente_variacion']:.2f}%")
+        reportar(f"Mínimo: {fila['minimo']:.2f} | Q1: {fila['Q1']:.2f} | Q3: {fila['Q3']:.2f} | "
+              f"Máximo: {fila['maximo']:.2f} | P10: {fila['P10']:.2f} | P90: {fila['P90']:.2f}")
+        reportar(f"Outliers (IQR): {int(fila['n_outliers'])} ({fila['porcentaje_outliers']:.2f}%) "
+              f"fuera de [{fila['limite_inferior']:.2f}, {fila['limite_superior']:.2f}]")
+    
+    reportar("\n" + "="*80 + "\n")
 
 
+@memorizar(columnas=('columna_x', 'columna_y'))
 def analisis_dispersion(df, columna_x, columna_y):
     """
     Analiza la dispersión entre dos variables
@@ -199,11 +560,11 @@ def analisis_dispersion(df, columna_x, columna_y):
         dict: Métricas de dispersión
     """
     if columna_x not in df.columns or columna_y not in df.columns:
-        print(f"✗ Una o ambas columnas no encontradas")
+        reportar(f"✗ Una o ambas columnas no encontradas")
         return None
     
     if not pd.api.types.is_numeric_dtype(df[columna_x]) or not pd.api.types.is_numeric_dtype(df[columna_y]):
-        print(f"✗ Ambas columnas deben ser numéricas")
+        reportar(f"✗ Ambas columnas deben ser numéricas")
         return None
     
     # Eliminar valores nulos
@@ -219,16 +580,17 @@ def analisis_dispersion(df, columna_x, columna_y):
         'rango_y': df_limpio[columna_y].max() - df_limpio[columna_y].min()
     }
     
-    print(f"\n--- Análisis de Dispersión: {columna_x} vs {columna_y} ---")
-    print(f"N° Observaciones: {resultados['n_observaciones']}")
-    print(f"\n{columna_x}:")
-    print(f"  Media: {resultados['media_x']:.2f}")
-    print(f"  Desv. Est.: {resultados['std_x']:.2f}")
-    print(f"  Rango: {resultados['rango_x']:.2f}")
-    print(f"\n{columna_y}:")
-    print(f"  Media: {resultados['media_y']:.2f}")
-    print(f"  Desv. Est.: {resultados['std_y']:.2f}")
-    print(f"  Rango: {resultados['rango_y']:.2f}")
+    if reporte_activo():
+        reportar(f"\n--- Análisis de Dispersión: {columna_x} vs {columna_y} ---")
+        reportar(f"N° Observaciones: {resultados['n_observaciones']}")
+        reportar(f"\n{columna_x}:")
+        reportar(f"  Media: {resultados['media_x']:.2f}")
+        reportar(f"  Desv. Est.: {resultados['std_x']:.2f}")
+        reportar(f"  Rango: {resultados['rango_x']:.2f}")
+        reportar(f"\n{columna_y}:")
+        reportar(f"  Media: {resultados['media_y']:.2f}")
+        reportar(f"  Desv. Est.: {resultados['std_y']:.2f}")
+        reportar(f"  Rango: {resultados['rango_y']:.2f}")
     
     return resultados
 
@@ -1,11 +1,149 @@
 """
 Módulo para búsqueda y filtrado de datos
+
+Los filtros pueden devolver una VistaFiltrada (perezoso=True): una selección
+de posiciones sobre el DataFrame original que se compone con otros filtros
+sin copiar datos y que se materializa solo cuando se necesita.
 """
 import pandas as pd
 import numpy as np
 
+try:
+    from .sketches import SketchCuantiles
+    from .reporte import reportar, reporte_activo
+except ImportError:
+    from sketches import SketchCuantiles
+    from reporte import reportar, reporte_activo
+
+
+METODOS_OUTLIERS = ('iqr', 'zscore', 'mad')
+
+
+class VistaFiltrada:
+    """
+    Vista perezosa sobre un DataFrame: guarda el DataFrame base y un vector
+    de posiciones seleccionadas, sin copiar las filas.
+    
+    Expone la parte de la interfaz de DataFrame que usan los módulos de
+    análisis (columns, len, df[columna], df[[columnas]], df[mascara],
+    select_dtypes), de modo que estadisticas, correlaciones e inferencia
+    pueden calcular directamente sobre la selección. Cualquier otro atributo
+    se resuelve sobre la vista materializada.
+    
+    Args:
+        base (pd.DataFrame | VistaFiltrada): Datos de origen
+        posiciones (np.ndarray): Posiciones seleccionadas (None = todas)
+    """
+    
+    def __init__(self, base, posiciones=None):
+        if isinstance(base, VistaFiltrada):
+            if posiciones is not None:
+                posiciones = base._posiciones_absolutas(posiciones)
+            else:
+                posiciones = base.posiciones
+            base = base.base
+        self.base = base
+        self.posiciones = None if posiciones is None else np.asarray(posiciones, dtype=np.intp)
+    
+    def _posiciones_absolutas(self, relativas):
+        """Traduce posiciones relativas a la vista en posiciones del DataFrame base"""
+        relativas = np.asarray(relativas, dtype=np.intp)
+        if self.posiciones is None:
+            return relativas
+        return self.posiciones[relativas]
+    
+    def __len__(self):
+        return len(self.base) if self.posiciones is None else len(self.posiciones)
+    
+    def __repr__(self):
+        return f"VistaFiltrada({len(self)} de {len(self.base)} registros, {self.base.shape[1]} columnas)"
+    
+    @property
+    def columns(self):
+        return self.base.columns
+    
+    @property
+    def dtypes(self):
+        return self.base.dtypes
+    
+    @property
+    def shape(self):
+        return (len(self), self.base.shape[1])
+    
+    @property
+    def index(self):
+        return self.base.index if self.posiciones is None else self.base.index[self.posiciones]
+    
+    def seleccionar(self, mascara):
+        """
+        Compone un filtro booleano sobre la vista sin copiar datos
+        
+        Args:
+            mascara (array-like): Máscara booleana del largo de la vista (los
+                nulos de una máscara 'boolean' cuentan como False, como en pandas)
+            
+        Returns:
+            VistaFiltrada: Nueva vista con la selección compuesta
+        """
+        if isinstance(mascara, (pd.Series, pd.api.extensions.ExtensionArray)):
+            mascara = mascara.to_numpy(dtype=bool, na_value=False)
+        mascara = np.asarray(mascara, dtype=bool)
+        if len(mascara) != len(self):
+            raise ValueError(f"La máscara tiene {len(mascara)} elementos y la vista {len(self)}")
+        return VistaFiltrada(self.base, self._posiciones_absolutas(np.flatnonzero(mascara)))
+    
+    def tomar(self, posiciones):
+        """
+        Selecciona filas por posición relativa a la vista
+        
+        Args:
+            posiciones (array-like): Posiciones dentro de la vista
+            
+        Returns:
+            VistaFiltrada: Nueva vista con las filas indicadas
+        """
+        return VistaFiltrada(self, posiciones)
+    
+    def select_dtypes(self, *args, **kwargs):
+        return VistaFiltrada(self.base.select_dtypes(*args, **kwargs), self.posiciones)
+    
+    def __getitem__(self, clave):
+        # Máscara booleana: se compone como un filtro más
+        if (isinstance(clave, (pd.Series, np.ndarray, pd.api.extensions.ExtensionArray))
+                and pd.api.types.is_bool_dtype(clave.dtype)):
+            return self.seleccionar(clave)
+        
+        # Una o varias columnas: solo se copian las columnas pedidas
+        datos = self.base[clave]
+        if self.posiciones is None:
+            return datos
+        return datos.take(self.posiciones)
+    
+    def materializar(self):
+        """
+        Construye el DataFrame con las filas seleccionadas
+        
+        Returns:
+            pd.DataFrame: Copia con las filas de la vista
+        """
+        if self.posiciones is None:
+            return self.base.copy()
+        return self.base.take(self.posiciones)
+    
+    def __getattr__(self, nombre):
+        if nombre.startswith('_') or nombre in ('base', 'posiciones'):
+            raise AttributeError(nombre)
+        return getattr(self.materializar(), nombre)
+
+
+def _aplicar_mascara(df, mascara, perezoso):
+    """Aplica una máscara booleana devolviendo DataFrame o VistaFiltrada"""
+    if perezoso or isinstance(df, VistaFiltrada):
+        return VistaFiltrada(df).seleccionar(mascara)
+    return df[mascara]
 
-def filtrar_por_rango(df, columna, min_valor, max_valor):
+
+def filtrar_por_rango(df, columna, min_valor, max_valor, perezoso=False):
     """
     Filtra registros por rango de valores
     
@@ -14,20 +152,22 @@ def filtrar_por_rango(df, columna, min_valor, max_valor):
         columna (str): Columna a filtrar
         min_valor: Valor mínimo
         max_valor: Valor máximo
+        perezoso (bool): Devolver una VistaFiltrada en lugar de una copia
         
     Returns:
-        pd.DataFrame: DataFrame filtrado
+        pd.DataFrame | VistaFiltrada: DataFrame filtrado
     """
     if columna not in df.columns:
-        print(f"✗ Columna '{columna}' no encontrada")
+        reportar(f"✗ Columna '{columna}' no encontrada")
         return df
     
-    df_filtrado = df[(df[columna] >= min_valor) & (df[columna] <= max_valor)]
-    print(f"✓ Filtrado por rango en '{columna}': {len(df_filtrado)} registros de {len(df)}")
+    serie = df[columna]
+    df_filtrado = _aplicar_mascara(df, (serie >= min_valor) & (serie <= max_valor), perezoso)
+    reportar(f"✓ Filtrado por rango en '{columna}': {len(df_filtrado)} registros de {len(df)}")
     return df_filtrado
 
 
-def filtrar_por_categoria(df, columna, valores):
+def filtrar_por_categoria(df, columna, valores, perezoso=False):
     """
     Filtra registros por valores categóricos específicos
     
@@ -35,23 +175,24 @@ def filtrar_por_categoria(df, columna, valores):
         df (pd.DataFrame): DataFrame con los datos
         columna (str): Columna a filtrar
         valores (list): Lista de valores a incluir
+        perezoso (bool): Devolver una VistaFiltrada en lugar de una copia
         
     Returns:
-        pd.DataFrame: DataFrame filtrado
+        pd.DataFrame | VistaFiltrada: DataFrame filtrado
     """
     if columna not in df.columns:
-        print(f"✗ Columna '{columna}' no encontrada")
+        reportar(f"✗ Columna '{columna}' no encontrada")
         return df
     
     if not isinstance(valores, list):
         valores = [valores]
     
-    df_filtrado = df[df[columna].isin(valores)]
-    print(f"✓ Filtrado por categoría en '{columna}': {len(df_filtrado)} registros de {len(df)}")
+    df_filtrado = _aplicar_mascara(df, df[columna].isin(valores), perezoso)
+    reportar(f"✓ Filtrado por categoría en '{columna}': {len(df_filtrado)} registros de {len(df)}")
     return df_filtrado
 
 
-def buscar_texto(df, columna, texto, case_sensitive=False):
+def buscar_texto(df, columna, texto, case_sensitive=False, perezoso=False):
     """
     Busca texto en una columna
     
@@ -60,20 +201,22 @@ def buscar_texto(df, columna, texto, case_sensitive=False):
         columna (str): Columna donde buscar
         texto (str): Texto a buscar
         case_sensitive (bool): Si la búsqueda distingue mayúsculas
+        perezoso (bool): Devolver una VistaFiltrada en lugar de una copia
         
     Returns:
-        pd.DataFrame: DataFrame con resultados
+        pd.DataFrame | VistaFiltrada: DataFrame con resultados
     """
     if columna not in df.columns:
-        print(f"✗ Columna '{columna}' no encontrada")
+        reportar(f"✗ Columna '{columna}' no encontrada")
         return df
     
-    df_filtrado = df[df[columna].astype(str).str.contains(texto, case=case_sensitive, na=False)]
-    print(f"✓ Búsqueda de '{texto}' en '{columna}': {len(df_filtrado)} registros encontrados")
+    mascara = df[columna].astype(str).str.contains(texto, case=case_sensitive, na=False)
+    df_filtrado = _aplicar_mascara(df, mascara, perezoso)
+    reportar(f"✓ Búsqueda de '{texto}' en '{columna}': {len(df_filtrado)} registros encontrados")
     return df_filtrado
 
 
-def filtrar_top_n(df, columna, n=10, ascendente=False):
+def filtrar_top_n(df, columna, n=10, ascendente=False, perezoso=False):
     """
     Obtiene los top N registros según una columna
     
@@ -82,63 +225,84 @@ def filtrar_top_n(df, columna, n=10, ascendente=False):
         columna (str): Columna para ordenar
         n (int): Número de registros a obtener
         ascendente (bool): Orden ascendente o descendente
+        perezoso (bool): Devolver una VistaFiltrada en lugar de una copia
         
     Returns:
-        pd.DataFrame: DataFrame con top N registros
+        pd.DataFrame | VistaFiltrada: DataFrame con top N registros
     """
     if columna not in df.columns:
-        print(f"✗ Columna '{columna}' no encontrada")
+        reportar(f"✗ Columna '{columna}' no encontrada")
         return df
     
-    df_top = df.nlargest(n, columna) if not ascendente else df.nsmallest(n, columna)
+    if perezoso or isinstance(df, VistaFiltrada):
+        # Se ordena solo la columna y se guardan las posiciones elegidas
+        serie = df[columna].reset_index(drop=True)
+        seleccion = serie.nlargest(n) if not ascendente else serie.nsmallest(n)
+        df_top = VistaFiltrada(df).tomar(seleccion.index.to_numpy())
+    else:
+        df_top = df.nlargest(n, columna) if not ascendente else df.nsmallest(n, columna)
     orden = "menores" if ascendente else "mayores"
-    print(f"✓ Top {n} {orden} valores en '{columna}'")
+    reportar(f"✓ Top {n} {orden} valores en '{columna}'")
     return df_top
 
 
-def filtrar_outliers(df, columna, metodo='iqr', umbral=1.5):
+def filtrar_outliers(df, columna, metodo='iqr', umbral=1.5, perezoso=False, backend='exacto'):
     """
-    Filtra outliers usando el método IQR o Z-score
+    Filtra outliers usando el método IQR, Z-score o MAD
     
     Args:
         df (pd.DataFrame): DataFrame con los datos
         columna (str): Columna a analizar
-        metodo (str): 'iqr' o 'zscore'
-        umbral (float): Umbral para detección (1.5 para IQR, 3 para Z-score)
+        metodo (str): 'iqr', 'zscore' o 'mad'
+        umbral (float): Umbral para detección (1.5 para IQR, 3 para Z-score, 3.5 para MAD)
+        perezoso (bool): Devolver una VistaFiltrada en lugar de una copia
+        backend (str): 'exacto' o 'sketch' para los cuartiles del método IQR
         
     Returns:
-        pd.DataFrame: DataFrame sin outliers
+        pd.DataFrame | VistaFiltrada: DataFrame sin outliers
     """
     if columna not in df.columns:
-        print(f"✗ Columna '{columna}' no encontrada")
+        reportar(f"✗ Columna '{columna}' no encontrada")
         return df
     
     if not pd.api.types.is_numeric_dtype(df[columna]):
-        print(f"✗ Columna '{columna}' no es numérica")
+        reportar(f"✗ Columna '{columna}' no es numérica")
         return df
     
-    df_filtrado = df.copy()
+    if metodo not in METODOS_OUTLIERS:
+        reportar(f"✗ Método '{metodo}' no válido. Use {', '.join(METODOS_OUTLIERS)}")
+        # Sin filtrar, pero con el mismo tipo de resultado que un filtrado válido
+        return _aplicar_mascara(df, np.ones(len(df), dtype=bool), perezoso)
+    
+    serie = df[columna]
     
     if metodo == 'iqr':
-        Q1 = df[columna].quantile(0.25)
-        Q3 = df[columna].quantile(0.75)
+        if backend == 'sketch':
+            Q1, Q3 = SketchCuantiles(semilla=0).update(serie).cuantiles([0.25, 0.75])
+        else:
+            Q1, Q3 = serie.quantile([0.25, 0.75])
         IQR = Q3 - Q1
         limite_inferior = Q1 - umbral * IQR
         limite_superior = Q3 + umbral * IQR
-        df_filtrado = df[(df[columna] >= limite_inferior) & (df[columna] <= limite_superior)]
+        df_filtrado = _aplicar_mascara(df, (serie >= limite_inferior) & (serie <= limite_superior), perezoso)
         
     elif metodo == 'zscore':
-        media = df[columna].mean()
-        std = df[columna].std()
-        z_scores = np.abs((df[columna] - media) / std)
-        df_filtrado = df[z_scores < umbral]
+        media = serie.mean()
+        std = serie.std()
+        z_scores = np.abs((serie - media) / std)
+        df_filtrado = _aplicar_mascara(df, z_scores < umbral, perezoso)
+        
+    elif metodo == 'mad':
+        mediana = serie.median()
+        mad = 1.4826 * (serie - mediana).abs().median()
+        df_filtrado = _aplicar_mascara(df, (serie - mediana).abs() <= umbral * mad, perezoso)
     
     outliers_removidos = len(df) - len(df_filtrado)
-    print(f"✓ Outliers removidos de '{columna}': {outliers_removidos} registros")
+    reportar(f"✓ Outliers removidos de '{columna}': {outliers_removidos} registros")
     return df_filtrado
 
 
-def filtrar_multiples_condiciones(df, condiciones):
+def filtrar_multiples_condiciones(df, condiciones, perezoso=False):
     """
     Aplica múltiples condiciones de filtrado
     
@@ -147,31 +311,35 @@ def filtrar_multiples_condiciones(df, condiciones):
         condiciones (dict): Diccionario con condiciones
             Ejemplo: {'monto_total': {'min': 100, 'max': 1000},
                      'categoria': ['Emergencia', 'Quirófano']}
+        perezoso (bool): Devolver una VistaFiltrada en lugar de una copia
         
     Returns:
-        pd.DataFrame: DataFrame filtrado
+        pd.DataFrame | VistaFiltrada: DataFrame filtrado
     """
-    df_filtrado = df.copy()
+    # Las condiciones se combinan en una sola máscara y se aplican una vez
+    mascara = np.ones(len(df), dtype=bool)
     
     for columna, condicion in condiciones.items():
         if columna not in df.columns:
-            print(f"✗ Columna '{columna}' no encontrada")
+            reportar(f"✗ Columna '{columna}' no encontrada")
             continue
         
+        serie = df[columna]
         if isinstance(condicion, dict):
             # Filtro por rango
             if 'min' in condicion:
-                df_filtrado = df_filtrado[df_filtrado[columna] >= condicion['min']]
+                mascara &= np.asarray(serie >= condicion['min'], dtype=bool)
             if 'max' in condicion:
-                df_filtrado = df_filtrado[df_filtrado[columna] <= condicion['max']]
+                mascara &= np.asarray(serie <= condicion['max'], dtype=bool)
         elif isinstance(condicion, list):
             # Filtro por categorías
-            df_filtrado = df_filtrado[df_filtrado[columna].isin(condicion)]
+            mascara &= np.asarray(serie.isin(condicion), dtype=bool)
         else:
             # Filtro por valor único
-            df_filtrado = df_filtrado[df_filtrado[columna] == condicion]
+            mascara &= np.asarray(serie == condicion, dtype=bool)
     
-    print(f"✓ Filtrado con múltiples condiciones: {len(df_filtrado)} registros de {len(df)}")
+    df_filtrado = _aplicar_mascara(df, mascara, perezoso)
+    reportar(f"✓ Filtrado con múltiples condiciones: {len(df_filtrado)} registros de {len(df)}")
     return df_filtrado
 
 
@@ -183,18 +351,24 @@ def resumen_filtros(df, columna_agrupacion=None):
         df (pd.DataFrame): DataFrame con los datos
         columna_agrupacion (str): Columna para agrupar (opcional)
     """
-    print("\n" + "="*60)
-    print("RESUMEN DE DATOS")
-    print("="*60)
-    print(f"Total de registros: {len(df)}")
+    if not reporte_activo():
+        return
+    
+    if isinstance(df, VistaFiltrada):
+        df = df.materializar()
+    
+    reportar("\n" + "="*60)
+    reportar("RESUMEN DE DATOS")
+    reportar("="*60)
+    reportar(f"Total de registros: {len(df)}")
     
     if columna_agrupacion and columna_agrupacion in df.columns:
-        print(f"\nAgrupación por '{columna_agrupacion}':")
-        print(df[columna_agrupacion].value_counts())
+        reportar(f"\nAgrupación por '{columna_agrupacion}':")
+        reportar(df[columna_agrupacion].value_counts())
     
-    print("\nEstadísticas numéricas:")
-    print(df.describe())
-    print("="*60 + "\n")
+    reportar("\nEstadísticas numéricas:")
+    reportar(df.describe())
+    reportar("="*60 + "\n")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,189 @@
+"""
+Módulo de renderizado por lotes: el conjunto completo de gráficas
+(dashboard, distribuciones, cajas y mapas de calor) de muchos segmentos,
+directo a archivos y sin pantalla
+
+Cada segmento es una tarea de un pool de procesos. Los procesos usan el
+backend no interactivo Agg y las gráficas se crean sin mostrarse, como
+figuras sueltas que se cierran al guardarse, así que no se acumulan
+figuras abiertas aunque se rendericen miles.
+
+Con la caché de gráficas activa, las gráficas de un segmento cuyos datos
+no cambiaron desde la corrida anterior se copian de la caché en lugar de
+volver a dibujarse.
+"""
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+
+import matplotlib.pyplot as plt
+
+try:
+    from .reporte import reportar, reporte_activo, silencio
+    from .visualizaciones import (configurar_graficas, graficas_visibles, dashboard_completo,
+                                  grafica_distribucion, diagrama_cajas, COLUMNAS_DASHBOARD)
+    from .correlaciones import visualizar_matriz_correlacion, visualizar_matriz_covarianza
+    from .cache_graficas import (configurar_cache_graficas, configuracion_cache_graficas,
+                                 contadores_cache_graficas, sumar_contadores_cache_graficas)
+except ImportError:
+    from reporte import reportar, reporte_activo, silencio
+    from visualizaciones import (configurar_graficas, graficas_visibles, dashboard_completo,
+                                 grafica_distribucion, diagrama_cajas, COLUMNAS_DASHBOARD)
+    from correlaciones import visualizar_matriz_correlacion, visualizar_matriz_covarianza
+    from cache_graficas import (configurar_cache_graficas, configuracion_cache_graficas,
+                                contadores_cache_graficas, sumar_contadores_cache_graficas)
+
+
+GRAFICAS_LOTE = ('dashboard', 'distribuciones', 'cajas', 'correlacion', 'covarianza')
+
+# Columnas numéricas de las distribuciones, las cajas y los mapas de calor
+COLUMNAS_GRAFICAS = ('montO_TOTAL', 'edaD_PACIENTE', 'duracioN_MINUTOS')
+
+
+def nombre_archivo(segmento):
+    """
+    Nombre seguro para archivos a partir de la etiqueta de un segmento
+
+    Args:
+        segmento: Etiqueta del segmento
+
+    Returns:
+        str: Solo letras, dígitos, '-', '_' y '.'
+    """
+    nombre = re.sub(r'[^\w.-]+', '_', str(segmento)).strip('._')
+    return nombre or 'segmento'
+
+
+def _iniciar_proceso(cache):
+    """
+    Inicializador de los procesos: backend sin pantalla, sin salida por
+    consola y la misma caché de gráficas que el proceso principal
+    """
+    plt.switch_backend('Agg')
+    configurar_graficas(mostrar=False)
+    configurar_cache_graficas(**cache)
+
+
+def _renderizar_segmento(argumentos):
+    """
+    Tarea de un proceso: todas las gráficas de un segmento (debe ser de
+    nivel módulo)
+
+    Returns:
+        tuple: (segmento, rutas generadas, errores como 'gráfica: mensaje',
+            incrementos de los contadores de la caché de gráficas en la tarea)
+    """
+    segmento, datos, carpeta, graficas, columnas, formato = argumentos
+    os.makedirs(carpeta, exist_ok=True)
+    numericas = [col for col in columnas if col in datos.columns]
+
+    def ruta(nombre):
+        return os.path.join(carpeta, f"{nombre}.{formato}")
+
+    trabajos = []
+    if 'dashboard' in graficas:
+        trabajos.append(('dashboard', lambda: dashboard_completo(datos, ruta('dashboard')), ruta('dashboard')))
+    if 'distribuciones' in graficas:
+        for col in numericas:
+            destino = ruta(f"distribucion_{nombre_archivo(col)}")
+            trabajos.append((f"distribucion {col}",
+                             lambda col=col, destino=destino: grafica_distribucion(datos, col, archivo_salida=destino),
+                             destino))
+    if 'cajas' in graficas and numericas:
+        trabajos.append(('cajas', lambda: diagrama_cajas(datos, numericas, ruta('cajas')), ruta('cajas')))
+    if 'correlacion' in graficas and len(numericas) >= 2:
+        trabajos.append(('correlacion', lambda: visualizar_matriz_correlacion(datos, numericas, 'pearson',
+                                                                             ruta('correlacion')),
+                         ruta('correlacion')))
+    if 'covarianza' in graficas and len(numericas) >= 2:
+        trabajos.append(('covarianza', lambda: visualizar_matriz_covarianza(datos, numericas, ruta('covarianza')),
+                         ruta('covarianza')))
+
+    anterior = graficas_visibles()
+    configurar_graficas(mostrar=False)
+    contadores = contadores_cache_graficas()
+    rutas, errores = [], []
+    try:
+        with silencio():
+            for nombre, trabajo, destino in trabajos:
+                try:
+                    if trabajo() is not None:
+                        rutas.append(destino)
+                except Exception as e:
+                    errores.append(f"{nombre}: {e}")
+    finally:
+        configurar_graficas(mostrar=anterior)
+    incrementos = {contador: valor - contadores[contador]
+                   for contador, valor in contadores_cache_graficas().items()}
+    return segmento, rutas, errores, incrementos
+
+
+def renderizar_segmentos(df, columna_segmento=None, directorio='graficas', segmentos=None,
+                         graficas=GRAFICAS_LOTE, columnas=COLUMNAS_GRAFICAS, formato='png',
+                         procesos=None):
+    """
+    Renderiza el conjunto completo de gráficas de cada segmento en procesos
+    paralelos, sin abrir ventanas
+
+    Las gráficas de cada segmento quedan en directorio/<segmento>/ (con
+    columna_segmento=None se renderiza todo el DataFrame en directorio/total/).
+
+    Args:
+        df (pd.DataFrame): DataFrame con los datos
+        columna_segmento (str): Columna categórica que define los segmentos (opcional)
+        directorio (str): Carpeta de salida
+        segmentos (list): Segmentos a renderizar (None = todos)
+        graficas (tuple): Gráficas de GRAFICAS_LOTE a generar
+        columnas (tuple): Columnas numéricas de distribuciones, cajas y mapas de calor
+        formato (str): Formato de imagen ('png', 'pdf', 'svg', ...)
+        procesos (int): Número de procesos (default: núcleos disponibles)
+
+    Returns:
+        dict: Rutas generadas por segmento
+    """
+    desconocidas = [grafica for grafica in graficas if grafica not in GRAFICAS_LOTE]
+    if desconocidas:
+        reportar(f"✗ Gráficas no válidas: {', '.join(desconocidas)}. Use {', '.join(GRAFICAS_LOTE)}")
+        return None
+
+    if columna_segmento is not None and columna_segmento not in df.columns:
+        reportar(f"✗ Columna '{columna_segmento}' no encontrada")
+        return None
+
+    # Cada proceso recibe solo las columnas que grafica
+    usadas = [col for col in dict.fromkeys(list(columnas) + list(COLUMNAS_DASHBOARD)) if col in df.columns]
+    if columna_segmento is None:
+        partes = [('total', df[usadas])]
+    else:
+        partes = [(segmento, datos[usadas])
+                  for segmento, datos in df.groupby(columna_segmento, sort=True, observed=True)
+                  if segmentos is None or segmento in segmentos]
+
+    if not partes:
+        reportar(f"✗ No hay segmentos para renderizar")
+        return None
+
+    tareas = [(segmento, datos, os.path.join(directorio, nombre_archivo(segmento)), tuple(graficas),
+               tuple(columnas), formato) for segmento, datos in partes]
+
+    if procesos == 1 or len(tareas) <= 1 or (procesos is None and os.cpu_count() == 1):
+        resultados = list(map(_renderizar_segmento, tareas))
+    else:
+        with ProcessPoolExecutor(max_workers=procesos, initializer=_iniciar_proceso,
+                                 initargs=(configuracion_cache_graficas(),)) as ejecutor:
+            resultados = list(ejecutor.map(_renderizar_segmento, tareas))
+        # Los contadores de la caché de cada proceso se pierden al cerrarse el pool
+        for _, _, _, incrementos in resultados:
+            sumar_contadores_cache_graficas(incrementos)
+
+    rutas = {segmento: generadas for segmento, generadas, _, _ in resultados}
+    for segmento, _, errores, _ in resultados:
+        for error in errores:
+            reportar(f"✗ Segmento '{segmento}', {error}")
+
+    if reporte_activo():
+        total = sum(len(generadas) for generadas in rutas.values())
+        reportar(f"\n--- Renderizado por Lotes ---")
+        reportar(f"Segmentos: {len(rutas)}, gráficas generadas: {total}, carpeta: {directorio}")
+
+    return rutas
@@ -1,12 +1,264 @@
 """
 Módulo para estadísticas inferenciales
 """
+import os
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+
 import pandas as pd
 import numpy as np
 from scipy import stats
-from scipy.stats import chi2_contingency, mannwhitneyu, kruskal, f_oneway, ttest_ind
+from scipy.special import log_ndtr
+from scipy.stats import mannwhitneyu, f_oneway, ttest_ind
+
+try:
+    from .reporte import reportar, reporte_activo, silencio
+    from .cache import memorizar, huella_valores
+    from .rangos import calcular_rangos, rangos_columna
+    from .acumuladores import AcumuladorMomentos
+    from .contingencia import tabla_contingencia, MAXIMO_CELDAS_DENSAS
+    from .bootstrap import bootstrap_intervalos
+    from .permutaciones import prueba_permutacion, pruebas_permutacion, ESTADISTICOS_PERMUTACION
+except ImportError:
+    from reporte import reportar, reporte_activo, silencio
+    from cache import memorizar, huella_valores
+    from rangos import calcular_rangos, rangos_columna
+    from acumuladores import AcumuladorMomentos
+    from contingencia import tabla_contingencia, MAXIMO_CELDAS_DENSAS
+    from bootstrap import bootstrap_intervalos
+    from permutaciones import prueba_permutacion, pruebas_permutacion, ESTADISTICOS_PERMUTACION
+
+
+# Agrupaciones categóricas que se prueban por defecto en pruebas_por_lotes
+AGRUPACIONES_PRUEBAS = ('clasE_EPISODIO', 'staT_FACTURA', 'aseguradora', 'tipO_PRESTACION')
+
+CORRECCIONES = ('holm', 'bh')
+
+METODOS_INTERVALO = ('t', 'bootstrap')
+
+METODOS_DOS_GRUPOS = ('asintotico', 'permutacion')
+
+# Máximo de particiones por grupo guardadas en caché
+MAXIMO_PARTICIONES = 32
+
+# Máximo de celdas de una tabla de contingencia que se muestra completa
+MAXIMO_CELDAS_REPORTE = 400
+
+# Tamaño máximo de muestra para Shapiro-Wilk (límite del p-valor de scipy)
+MAXIMO_SHAPIRO = 5000
+
+_particiones = OrderedDict()
+
+
+class ParticionGrupos:
+    """
+    Filas de cada grupo de una columna categórica: un único argsort estable
+    por código de grupo y los límites de cada grupo en ese orden
+    
+    Las filas con grupo nulo no pertenecen a ningún grupo (como groupby).
+    
+    Args:
+        codigos (np.ndarray): Código de grupo de cada fila (-1 = nulo)
+        nombres (pd.Index): Etiqueta de cada código
+    """
+    
+    def __init__(self, codigos, nombres):
+        self.codigos = codigos
+        self.nombres = pd.Index(nombres)
+        validas = np.flatnonzero(codigos >= 0)
+        self.orden = validas[np.argsort(codigos[validas], kind='stable')]
+        self.conteos = np.bincount(codigos[validas], minlength=len(self.nombres))
+        self.limites = np.concatenate([[0], np.cumsum(self.conteos)])
+    
+    def posiciones(self, nombre):
+        """
+        Posiciones (en orden original) de las filas de un grupo
+        
+        Args:
+            nombre: Etiqueta del grupo
+            
+        Returns:
+            np.ndarray: Posiciones de las filas (vacío si el grupo no existe)
+        """
+        codigo = self.nombres.get_indexer([nombre])[0]
+        if codigo < 0:
+            return np.empty(0, dtype=np.int64)
+        return self.orden[self.limites[codigo]:self.limites[codigo + 1]]
+    
+    def dividir(self, valores):
+        """
+        Valores de cada grupo, sin los nulos
+        
+        Args:
+            valores (np.ndarray): Un valor numérico por fila
+            
+        Returns:
+            list: Un np.ndarray por grupo, en el orden de nombres
+        """
+        ordenados = np.asarray(valores, dtype=float)[self.orden]
+        return [grupo[~np.isnan(grupo)] for grupo in np.split(ordenados, self.limites[1:-1])]
+
+
+def particion_grupos(df, columna_grupos):
+    """
+    Partición de las filas por grupo, desde la caché si la columna no cambió
+    
+    Args:
+        df (pd.DataFrame): DataFrame con los datos
+        columna_grupos (str): Columna categórica que define los grupos
+        
+    Returns:
+        ParticionGrupos: Partición de las filas
+    """
+    clave = huella_valores(df[columna_grupos])
+    if clave in _particiones:
+        _particiones.move_to_end(clave)
+        return _particiones[clave]
+    
+    particion = ParticionGrupos(*pd.factorize(df[columna_grupos]))
+    _particiones[clave] = particion
+    while len(_particiones) > MAXIMO_PARTICIONES:
+        _particiones.popitem(last=False)
+    return particion
+
+
+def _dos_grupos(df, columna, grupo1_filtro, grupo2_filtro, columna_grupos):
+    """
+    Valores no nulos de los dos grupos a comparar y sus máscaras por fila
+    
+    Con columna_grupos los grupos son etiquetas de esa columna y se toman
+    de su partición; si no, son filtros booleanos sobre las filas.
+    """
+    valores = df[columna].to_numpy(dtype=float, na_value=np.nan)
+    particion = particion_grupos(df, columna_grupos) if columna_grupos is not None else None
+    filtros = []
+    for grupo in (grupo1_filtro, grupo2_filtro):
+        if particion is None:
+            filtros.append(np.asarray(grupo, dtype=bool))
+        else:
+            filtro = np.zeros(len(valores), dtype=bool)
+            filtro[particion.posiciones(grupo)] = True
+            filtros.append(filtro)
+    grupos = [valores[filtro & ~np.isnan(valores)] for filtro in filtros]
+    return grupos[0], grupos[1], filtros[0], filtros[1]
+
+
+def _validar_metodo_dos_grupos(metodo):
+    """True si el método de una prueba de dos grupos existe (si no, lo reporta)"""
+    if metodo not in METODOS_DOS_GRUPOS:
+        reportar(f"✗ Método '{metodo}' no válido. Use {', '.join(METODOS_DOS_GRUPOS)}")
+        return False
+    return True
 
 
+def _detalle_permutacion(permutacion):
+    """Texto con el tipo de p-valor de permutación para el reporte"""
+    if permutacion is None:
+        return ""
+    if permutacion['exacta']:
+        return f" (permutación exacta, {permutacion['n_permutaciones']} asignaciones)"
+    parada = ", parada temprana" if permutacion['parada_temprana'] else ""
+    return f" (Monte Carlo, {permutacion['n_permutaciones']} permutaciones{parada})"
+
+
+def _rangos_muestra(df, columna, seleccion):
+    """
+    Rangos de los valores seleccionados de una columna. Si la selección
+    abarca todos los valores no nulos se usan los rangos de la caché
+    
+    Args:
+        df (pd.DataFrame): DataFrame con los datos
+        columna (str): Columna numérica
+        seleccion (np.ndarray): Máscara booleana de las filas de la muestra
+        
+    Returns:
+        tuple: (rangos de las filas seleccionadas, suma de t^3 - t de los empates)
+    """
+    valores = df[columna].to_numpy(dtype=float, na_value=np.nan)
+    seleccion = seleccion & ~np.isnan(valores)
+    if seleccion.sum() == (~np.isnan(valores)).sum():
+        rangos, empates = rangos_columna(df, columna)
+        return rangos[seleccion], empates
+    return calcular_rangos(valores[seleccion], empates=True)
+
+
+def _anderson_darling(valores):
+    """
+    Estadístico A² de Anderson-Darling contra la normal con media y
+    desviación estimadas, y su p-valor (D'Agostino y Stephens, 1986)
+    """
+    n = len(valores)
+    desviacion = valores.std(ddof=1)
+    if n < 3 or desviacion == 0:
+        return np.nan, np.nan
+    z = np.sort((valores - valores.mean()) / desviacion)
+    i = np.arange(1, n + 1)
+    a2 = -n - np.sum((2 * i - 1) * (log_ndtr(z) + log_ndtr(-z[::-1]))) / n
+    
+    # Corrección por parámetros estimados y p-valor aproximado
+    ajustado = a2 * (1 + 0.75 / n + 2.25 / n ** 2)
+    if ajustado >= 150:
+        # Fuera del rango de la aproximación: el p-valor es prácticamente 0
+        p_valor = 0.0
+    elif ajustado >= 0.6:
+        p_valor = np.exp(1.2937 - 5.709 * ajustado + 0.0186 * ajustado ** 2)
+    elif ajustado >= 0.34:
+        p_valor = np.exp(0.9177 - 4.279 * ajustado - 1.38 * ajustado ** 2)
+    elif ajustado >= 0.2:
+        p_valor = 1 - np.exp(-8.318 + 42.796 * ajustado - 59.938 * ajustado ** 2)
+    else:
+        p_valor = 1 - np.exp(-13.436 + 101.14 * ajustado - 223.73 * ajustado ** 2)
+    return a2, float(np.clip(p_valor, 0, 1))
+
+
+def _jarque_bera(acumulador):
+    """Estadístico de Jarque-Bera y su p-valor a partir de los momentos acumulados"""
+    asimetria = acumulador.asimetria(corregida=False)
+    curtosis = acumulador.curtosis(corregida=False)
+    jb = acumulador.n / 6 * (asimetria ** 2 + curtosis ** 2 / 4)
+    return jb, stats.chi2.sf(jb, 2)
+
+
+def _shapiro_submuestras(argumentos):
+    """Tarea de un proceso: Shapiro-Wilk de varias submuestras sin reemplazo (debe ser de nivel módulo)"""
+    valores, repeticiones, tamano, semilla = argumentos
+    rng = np.random.default_rng(semilla)
+    return np.array([stats.shapiro(rng.choice(valores, tamano, replace=False))
+                     for _ in range(repeticiones)])
+
+
+def _shapiro_por_lotes(muestras, repeticiones, tamano, semilla, procesos):
+    """
+    Shapiro-Wilk de cada muestra: exacto si cabe en `tamano`, si no sobre
+    `repeticiones` submuestras aleatorias repartidas entre procesos
+    
+    Returns:
+        list: Arreglo repeticiones x 2 (W, p-valor) por muestra
+    """
+    resultados = [None] * len(muestras)
+    tareas, posiciones = [], []
+    semillas = np.random.SeedSequence(semilla).spawn(len(muestras))
+    for i, valores in enumerate(muestras):
+        if len(valores) < 3:
+            resultados[i] = np.full((1, 2), np.nan)
+        elif len(valores) <= tamano:
+            resultados[i] = np.array([stats.shapiro(valores)])
+        else:
+            tareas.append((valores, repeticiones, tamano, semillas[i]))
+            posiciones.append(i)
+    
+    if procesos == 1 or len(tareas) <= 1 or (procesos is None and os.cpu_count() == 1):
+        calculados = map(_shapiro_submuestras, tareas)
+        for i, resultado in zip(posiciones, calculados):
+            resultados[i] = resultado
+    else:
+        with ProcessPoolExecutor(max_workers=procesos) as ejecutor:
+            for i, resultado in zip(posiciones, ejecutor.map(_shapiro_submuestras, tareas)):
+                resultados[i] = resultado
+    return resultados
+
+
+@memorizar(columnas=('columna',))
 def test_normalidad(df, columna):
     """
     Prueba de normalidad usando Shapiro-Wilk y Kolmogorov-Smirnov
@@ -19,115 +271,191 @@ def test_normalidad(df, columna):
         dict: Resultados de las pruebas
     """
     if columna not in df.columns:
-        print(f"✗ Columna '{columna}' no encontrada")
+        reportar(f"✗ Columna '{columna}' no encontrada")
         return None
     
     datos = df[columna].dropna()
     
     if len(datos) < 3:
-        print(f"✗ No hay suficientes datos para realizar la prueba")
+        reportar(f"✗ No hay suficientes datos para realizar la prueba")
         return None
     
-    # Shapiro-Wilk (mejor para muestras < 5000)
-    if len(datos) <= 5000:
-        stat_shapiro, p_shapiro = stats.shapiro(datos)
-    else:
-        stat_shapiro, p_shapiro = None, None
-    
-    # Kolmogorov-Smirnov
-    stat_ks, p_ks = stats.kstest(datos, 'norm', args=(datos.mean(), datos.std()))
+    valores = datos.to_numpy(dtype=float)
     
-    print(f"\n--- Pruebas de Normalidad: {columna} ---")
-    if stat_shapiro is not None:
-        print(f"Shapiro-Wilk: estadístico={stat_shapiro:.4f}, p-valor={p_shapiro:.4f}")
-        print(f"  Interpretación: {'Distribución NORMAL' if p_shapiro > 0.05 else 'Distribución NO NORMAL'}")
-    
-    print(f"Kolmogorov-Smirnov: estadístico={stat_ks:.4f}, p-valor={p_ks:.4f}")
-    print(f"  Interpretación: {'Distribución NORMAL' if p_ks > 0.05 else 'Distribución NO NORMAL'}")
+    if len(datos) <= MAXIMO_SHAPIRO:
+        # Shapiro-Wilk (mejor para muestras < 5000)
+        stat_shapiro, p_shapiro = stats.shapiro(valores)
+        # Kolmogorov-Smirnov
+        stat_ks, p_ks = stats.kstest(valores, 'norm', args=(datos.mean(), datos.std()))
+    else:
+        # Muestras grandes: KS con parámetros estimados no es válido; se usa
+        # la mediana de Shapiro-Wilk sobre submuestras
+        submuestras = _shapiro_por_lotes([valores], 20, MAXIMO_SHAPIRO, 0, 1)[0]
+        stat_shapiro, p_shapiro = np.median(submuestras, axis=0)
+        stat_ks, p_ks = None, None
+    
+    # Anderson-Darling y Jarque-Bera (válidos para cualquier tamaño)
+    stat_ad, p_ad = _anderson_darling(valores)
+    stat_jb, p_jb = _jarque_bera(AcumuladorMomentos().update(valores))
+    
+    if reporte_activo():
+        reportar(f"\n--- Pruebas de Normalidad: {columna} ---")
+        if len(datos) > MAXIMO_SHAPIRO:
+            reportar(f"Shapiro-Wilk (mediana de 20 submuestras de {MAXIMO_SHAPIRO}): "
+                     f"estadístico={stat_shapiro:.4f}, p-valor={p_shapiro:.4f}")
+        else:
+            reportar(f"Shapiro-Wilk: estadístico={stat_shapiro:.4f}, p-valor={p_shapiro:.4f}")
+        reportar(f"  Interpretación: {'Distribución NORMAL' if p_shapiro > 0.05 else 'Distribución NO NORMAL'}")
+        
+        if stat_ks is not None:
+            reportar(f"Kolmogorov-Smirnov: estadístico={stat_ks:.4f}, p-valor={p_ks:.4f}")
+            reportar(f"  Interpretación: {'Distribución NORMAL' if p_ks > 0.05 else 'Distribución NO NORMAL'}")
+        
+        reportar(f"Anderson-Darling: estadístico={stat_ad:.4f}, p-valor={p_ad:.4f}")
+        reportar(f"Jarque-Bera: estadístico={stat_jb:.4f}, p-valor={p_jb:.4f}")
     
     return {
         'shapiro_stat': stat_shapiro,
         'shapiro_p': p_shapiro,
         'ks_stat': stat_ks,
-        'ks_p': p_ks
+        'ks_p': p_ks,
+        'ad_stat': stat_ad,
+        'ad_p': p_ad,
+        'jb_stat': stat_jb,
+        'jb_p': p_jb
     }
 
 
-def test_t_student(df, columna, grupo1_filtro, grupo2_filtro):
+@memorizar(columnas=('columna', 'columna_grupos'))
+def test_t_student(df, columna, grupo1_filtro, grupo2_filtro, columna_grupos=None, metodo='asintotico',
+                   n_permutaciones=10_000, semilla=0):
     """
     Prueba t de Student para comparar medias de dos grupos
     
     Args:
         df (pd.DataFrame): DataFrame con los datos
         columna (str): Columna con valores numéricos
-        grupo1_filtro (pd.Series): Filtro booleano para grupo 1
-        grupo2_filtro (pd.Series): Filtro booleano para grupo 2
+        grupo1_filtro (pd.Series): Filtro booleano para grupo 1 (o su
+            etiqueta en columna_grupos)
+        grupo2_filtro (pd.Series): Filtro booleano para grupo 2 (o su
+            etiqueta en columna_grupos)
+        columna_grupos (str): Columna categórica de los grupos (opcional)
+        metodo (str): 'asintotico' (distribución t) o 'permutacion'
+            (exacta o Monte Carlo con parada temprana)
+        n_permutaciones (int): Máximo de permutaciones (solo con metodo='permutacion')
+        semilla (int): Semilla de las permutaciones
         
     Returns:
         dict: Resultados de la prueba
     """
-    grupo1 = df[grupo1_filtro][columna].dropna()
-    grupo2 = df[grupo2_filtro][columna].dropna()
+    if not _validar_metodo_dos_grupos(metodo):
+        return None
+    grupo1, grupo2, _, _ = _dos_grupos(df, columna, grupo1_filtro, grupo2_filtro, columna_grupos)
     
     if len(grupo1) < 2 or len(grupo2) < 2:
-        print(f"✗ No hay suficientes datos en los grupos")
+        reportar(f"✗ No hay suficientes datos en los grupos")
         return None
     
     # t-test independiente
     stat, p_valor = ttest_ind(grupo1, grupo2)
-    
-    print(f"\n--- Prueba t de Student: {columna} ---")
-    print(f"Grupo 1: n={len(grupo1)}, media={grupo1.mean():.2f}, std={grupo1.std():.2f}")
-    print(f"Grupo 2: n={len(grupo2)}, media={grupo2.mean():.2f}, std={grupo2.std():.2f}")
-    print(f"Estadístico t: {stat:.4f}")
-    print(f"P-valor: {p_valor:.4f}")
-    print(f"Interpretación: {'Diferencia SIGNIFICATIVA' if p_valor < 0.05 else 'NO hay diferencia significativa'}")
+    permutacion = None
+    if metodo == 'permutacion':
+        permutacion = prueba_permutacion(grupo1, grupo2, 'media', n_permutaciones, semilla=semilla)
+        p_valor = permutacion['p_valor']
+    
+    if reporte_activo():
+        reportar(f"\n--- Prueba t de Student: {columna} ---")
+        reportar(f"Grupo 1: n={len(grupo1)}, media={grupo1.mean():.2f}, std={grupo1.std(ddof=1):.2f}")
+        reportar(f"Grupo 2: n={len(grupo2)}, media={grupo2.mean():.2f}, std={grupo2.std(ddof=1):.2f}")
+        reportar(f"Estadístico t: {stat:.4f}")
+        reportar(f"P-valor: {p_valor:.4f}{_detalle_permutacion(permutacion)}")
+        reportar(f"Interpretación: {'Diferencia SIGNIFICATIVA' if p_valor < 0.05 else 'NO hay diferencia significativa'}")
     
     return {
         't_stat': stat,
         'p_valor': p_valor,
         'media_grupo1': grupo1.mean(),
-        'media_grupo2': grupo2.mean()
+        'media_grupo2': grupo2.mean(),
+        'metodo': metodo,
+        'n_permutaciones': permutacion['n_permutaciones'] if permutacion else None
     }
 
 
-def test_mann_whitney(df, columna, grupo1_filtro, grupo2_filtro):
+@memorizar(columnas=('columna', 'columna_grupos'))
+def test_mann_whitney(df, columna, grupo1_filtro, grupo2_filtro, columna_grupos=None, metodo='asintotico',
+                      n_permutaciones=10_000, semilla=0):
     """
     Prueba U de Mann-Whitney (alternativa no paramétrica a t-test)
     
     Args:
         df (pd.DataFrame): DataFrame con los datos
         columna (str): Columna con valores numéricos
-        grupo1_filtro (pd.Series): Filtro booleano para grupo 1
-        grupo2_filtro (pd.Series): Filtro booleano para grupo 2
+        grupo1_filtro (pd.Series): Filtro booleano para grupo 1 (o su
+            etiqueta en columna_grupos)
+        grupo2_filtro (pd.Series): Filtro booleano para grupo 2 (o su
+            etiqueta en columna_grupos)
+        columna_grupos (str): Columna categórica de los grupos (opcional)
+        metodo (str): 'asintotico' o 'permutacion' (permuta los rangos;
+            exacta también con empates)
+        n_permutaciones (int): Máximo de permutaciones (solo con metodo='permutacion')
+        semilla (int): Semilla de las permutaciones
         
     Returns:
         dict: Resultados de la prueba
     """
-    grupo1 = df[grupo1_filtro][columna].dropna()
-    grupo2 = df[grupo2_filtro][columna].dropna()
+    if not _validar_metodo_dos_grupos(metodo):
+        return None
+    grupo1, grupo2, filtro1, filtro2 = _dos_grupos(df, columna, grupo1_filtro, grupo2_filtro,
+                                                   columna_grupos)
     
     if len(grupo1) < 2 or len(grupo2) < 2:
-        print(f"✗ No hay suficientes datos en los grupos")
+        reportar(f"✗ No hay suficientes datos en los grupos")
         return None
     
-    stat, p_valor = mannwhitneyu(grupo1, grupo2, alternative='two-sided')
+    n1, n2 = len(grupo1), len(grupo2)
     
-    print(f"\n--- Prueba U de Mann-Whitney: {columna} ---")
-    print(f"Grupo 1: n={len(grupo1)}, mediana={grupo1.median():.2f}")
-    print(f"Grupo 2: n={len(grupo2)}, mediana={grupo2.median():.2f}")
-    print(f"Estadístico U: {stat:.4f}")
-    print(f"P-valor: {p_valor:.4f}")
-    print(f"Interpretación: {'Diferencia SIGNIFICATIVA' if p_valor < 0.05 else 'NO hay diferencia significativa'}")
+    solapados = (filtro1 & filtro2).any()
+    if not solapados:
+        rangos, empates = _rangos_muestra(df, columna, filtro1 | filtro2)
+    
+    if solapados or (min(n1, n2) <= 8 and empates == 0):
+        # Grupos que se solapan, o p-valor exacto: mannwhitneyu lo usa cuando
+        # el grupo menor tiene hasta 8 valores y no hay empates
+        stat, p_valor = mannwhitneyu(grupo1, grupo2, alternative='two-sided')
+    else:
+        # Aproximación normal con corrección por empates y continuidad,
+        # la misma de mannwhitneyu, sobre los rangos de ambos grupos juntos
+        en_grupo1 = filtro1[(filtro1 | filtro2) & df[columna].notna().to_numpy()]
+        stat = rangos[en_grupo1].sum() - n1 * (n1 + 1) / 2
+        n = n1 + n2
+        desviacion = np.sqrt(n1 * n2 / 12 * ((n + 1) - empates / (n * (n - 1))))
+        z = (max(stat, n1 * n2 - stat) - n1 * n2 / 2 - 0.5) / desviacion
+        p_valor = min(1.0, 2 * stats.norm.sf(z))
+    
+    permutacion = None
+    if metodo == 'permutacion':
+        permutacion = prueba_permutacion(grupo1, grupo2, 'rangos', n_permutaciones, semilla=semilla)
+        p_valor = permutacion['p_valor']
+    
+    if reporte_activo():
+        reportar(f"\n--- Prueba U de Mann-Whitney: {columna} ---")
+        reportar(f"Grupo 1: n={len(grupo1)}, mediana={np.median(grupo1):.2f}")
+        reportar(f"Grupo 2: n={len(grupo2)}, mediana={np.median(grupo2):.2f}")
+        reportar(f"Estadístico U: {stat:.4f}")
+        reportar(f"P-valor: {p_valor:.4f}{_detalle_permutacion(permutacion)}")
+        reportar(f"Interpretación: {'Diferencia SIGNIFICATIVA' if p_valor < 0.05 else 'NO hay diferencia significativa'}")
     
     return {
         'u_stat': stat,
         'p_valor': p_valor,
-        'mediana_grupo1': grupo1.median(),
-        'mediana_grupo2': grupo2.median()
+        'mediana_grupo1': np.median(grupo1),
+        'mediana_grupo2': np.median(grupo2),
+        'metodo': metodo,
+        'n_permutaciones': permutacion['n_permutaciones'] if permutacion else None
     }
 
 
+@memorizar(columnas=('columna', 'columna_grupos'))
 def test_anova(df, columna, columna_grupos):
     """
     Análisis de Varianza (ANOVA) para comparar medias de múltiples grupos
@@ -141,30 +469,30 @@ def test_anova(df, columna, columna_grupos):
         dict: Resultados de la prueba
     """
     if columna not in df.columns or columna_grupos not in df.columns:
-        print(f"✗ Una o ambas columnas no encontradas")
+        reportar(f"✗ Una o ambas columnas no encontradas")
         return None
     
-    grupos = []
-    nombres_grupos = df[columna_grupos].unique()
-    
-    for nombre_grupo in nombres_grupos:
-        grupo_datos = df[df[columna_grupos] == nombre_grupo][columna].dropna()
-        if len(grupo_datos) > 0:
-            grupos.append(grupo_datos)
+    # Grupos como cortes de la partición (un argsort por columna de grupos)
+    particion = particion_grupos(df, columna_grupos)
+    divididos = particion.dividir(df[columna].to_numpy(dtype=float, na_value=np.nan))
+    nombres_grupos = [nombre for nombre, grupo in zip(particion.nombres, divididos) if len(grupo) > 0]
+    grupos = [grupo for grupo in divididos if len(grupo) > 0]
     
     if len(grupos) < 2:
-        print(f"✗ Se necesitan al menos 2 grupos para ANOVA")
+        reportar(f"✗ Se necesitan al menos 2 grupos para ANOVA")
         return None
     
     stat, p_valor = f_oneway(*grupos)
     
-    print(f"\n--- ANOVA: {columna} por {columna_grupos} ---")
-    print(f"Número de grupos: {len(grupos)}")
-    for i, (nombre, grupo) in enumerate(zip(nombres_grupos, grupos)):
-        print(f"  {nombre}: n={len(grupo)}, media={grupo.mean():.2f}, std={grupo.std():.2f}")
-    print(f"Estadístico F: {stat:.4f}")
-    print(f"P-valor: {p_valor:.4f}")
-    print(f"Interpretación: {'Diferencia SIGNIFICATIVA entre grupos' if p_valor < 0.05 else 'NO hay diferencia significativa'}")
+    if reporte_activo():
+        reportar(f"\n--- ANOVA: {columna} por {columna_grupos} ---")
+        reportar(f"Número de grupos: {len(grupos)}")
+        for nombre, grupo in zip(nombres_grupos, grupos):
+            desviacion = grupo.std(ddof=1) if len(grupo) > 1 else np.nan
+            reportar(f"  {nombre}: n={len(grupo)}, media={grupo.mean():.2f}, std={desviacion:.2f}")
+        reportar(f"Estadístico F: {stat:.4f}")
+        reportar(f"P-valor: {p_valor:.4f}")
+        reportar(f"Interpretación: {'Diferencia SIGNIFICATIVA entre grupos' if p_valor < 0.05 else 'NO hay diferencia significativa'}")
     
     return {
         'f_stat': stat,
@@ -173,6 +501,7 @@ def test_anova(df, columna, columna_grupos):
     }
 
 
+@memorizar(columnas=('columna', 'columna_grupos'))
 def test_kruskal_wallis(df, columna, columna_grupos):
     """
     Prueba de Kruskal-Wallis (alternativa no paramétrica a ANOVA)
@@ -186,75 +515,112 @@ def test_kruskal_wallis(df, columna, columna_grupos):
         dict: Resultados de la prueba
     """
     if columna not in df.columns or columna_grupos not in df.columns:
-        print(f"✗ Una o ambas columnas no encontradas")
+        reportar(f"✗ Una o ambas columnas no encontradas")
         return None
     
-    grupos = []
-    nombres_grupos = df[columna_grupos].unique()
+    # Rangos de todos los valores con grupo, sumados por grupo con bincount
+    particion = particion_grupos(df, columna_grupos)
+    codigos, nombres_grupos = particion.codigos, particion.nombres
+    valores = df[columna].to_numpy(dtype=float, na_value=np.nan)
+    validos = (codigos >= 0) & ~np.isnan(valores)
+    rangos, empates = _rangos_muestra(df, columna, codigos >= 0)
+    codigos = codigos[validos]
     
-    for nombre_grupo in nombres_grupos:
-        grupo_datos = df[df[columna_grupos] == nombre_grupo][columna].dropna()
-        if len(grupo_datos) > 0:
-            grupos.append(grupo_datos)
+    conteos = np.bincount(codigos, minlength=len(nombres_grupos))
+    sumas = np.bincount(codigos, weights=rangos, minlength=len(nombres_grupos))
+    presentes = conteos > 0
     
-    if len(grupos) < 2:
-        print(f"✗ Se necesitan al menos 2 grupos para Kruskal-Wallis")
+    if presentes.sum() < 2:
+        reportar(f"✗ Se necesitan al menos 2 grupos para Kruskal-Wallis")
         return None
     
-    stat, p_valor = kruskal(*grupos)
-    
-    print(f"\n--- Kruskal-Wallis: {columna} por {columna_grupos} ---")
-    print(f"Número de grupos: {len(grupos)}")
-    for i, (nombre, grupo) in enumerate(zip(nombres_grupos, grupos)):
-        print(f"  {nombre}: n={len(grupo)}, mediana={grupo.median():.2f}")
-    print(f"Estadístico H: {stat:.4f}")
-    print(f"P-valor: {p_valor:.4f}")
-    print(f"Interpretación: {'Diferencia SIGNIFICATIVA entre grupos' if p_valor < 0.05 else 'NO hay diferencia significativa'}")
+    # Estadístico H con corrección por empates (el mismo de scipy.stats.kruskal)
+    n = len(rangos)
+    h = 12 / (n * (n + 1)) * np.sum(sumas[presentes] ** 2 / conteos[presentes]) - 3 * (n + 1)
+    correccion = 1 - empates / (n ** 3 - n)
+    stat = h / correccion if correccion > 0 else np.nan
+    p_valor = stats.chi2.sf(stat, presentes.sum() - 1)
+    
+    if reporte_activo():
+        divididos = particion.dividir(valores)
+        reportar(f"\n--- Kruskal-Wallis: {columna} por {columna_grupos} ---")
+        reportar(f"Número de grupos: {presentes.sum()}")
+        for codigo in np.flatnonzero(presentes):
+            reportar(f"  {nombres_grupos[codigo]}: n={conteos[codigo]}, mediana={np.median(divididos[codigo]):.2f}")
+        reportar(f"Estadístico H: {stat:.4f}")
+        reportar(f"P-valor: {p_valor:.4f}")
+        reportar(f"Interpretación: {'Diferencia SIGNIFICATIVA entre grupos' if p_valor < 0.05 else 'NO hay diferencia significativa'}")
     
     return {
         'h_stat': stat,
         'p_valor': p_valor,
-        'n_grupos': len(grupos)
+        'n_grupos': int(presentes.sum())
     }
 
 
-def test_chi_cuadrado(df, columna1, columna2):
+@memorizar(columnas=('columna1', 'columna2'))
+def test_chi_cuadrado(df, columna1, columna2, minimo=0):
     """
     Prueba Chi-cuadrado para independencia entre variables categóricas
     
+    La tabla se guarda dispersa y chi² se calcula solo con las celdas
+    observadas, así que sirve para variables con miles de categorías
+    (p. ej. aseguradora x coD_PRESTACION).
+    
     Args:
         df (pd.DataFrame): DataFrame con los datos
         columna1 (str): Primera variable categórica
         columna2 (str): Segunda variable categórica
+        minimo (int): Agrupar en 'OTROS' las categorías con menos registros
         
     Returns:
-        dict: Resultados de la prueba
+        dict: chi2_stat, p_valor, dof, cramer_v, tabla (TablaContingencia
+            dispersa) y tabla_contingencia (DataFrame denso, o None si la
+            tabla supera MAXIMO_CELDAS_DENSAS celdas)
     """
     if columna1 not in df.columns or columna2 not in df.columns:
-        print(f"✗ Una o ambas columnas no encontradas")
+        reportar(f"✗ Una o ambas columnas no encontradas")
         return None
     
-    tabla_contingencia = pd.crosstab(df[columna1], df[columna2])
+    tabla = tabla_contingencia(df, columna1, columna2, minimo)
     
-    chi2, p_valor, dof, expected = chi2_contingency(tabla_contingencia)
+    if tabla.n == 0:
+        reportar(f"✗ No hay datos para la tabla de contingencia")
+        return None
     
-    print(f"\n--- Prueba Chi-cuadrado: {columna1} vs {columna2} ---")
-    print(f"Tabla de contingencia:")
-    print(tabla_contingencia)
-    print(f"\nEstadístico Chi²: {chi2:.4f}")
-    print(f"Grados de libertad: {dof}")
-    print(f"P-valor: {p_valor:.4f}")
-    print(f"Interpretación: {'Variables DEPENDIENTES' if p_valor < 0.05 else 'Variables INDEPENDIENTES'}")
+    chi2, p_valor, dof = tabla.chi_cuadrado()
+    cramer_v = tabla.cramer_v()
+    celdas = len(tabla.filas) * len(tabla.columnas)
+    tabla_contingencia_densa = tabla.densa() if celdas <= MAXIMO_CELDAS_DENSAS else None
+    
+    if reporte_activo():
+        reportar(f"\n--- Prueba Chi-cuadrado: {columna1} vs {columna2} ---")
+        if celdas <= MAXIMO_CELDAS_REPORTE:
+            reportar(f"Tabla de contingencia:")
+            reportar(tabla_contingencia_densa)
+        else:
+            reportar(f"Tabla de contingencia: {len(tabla.filas)} x {len(tabla.columnas)} "
+                     f"({tabla.conteos.nnz} celdas con registros)")
+            reportar(f"Celdas con mayor residuo ajustado:")
+            reportar(tabla.residuos(top=10).to_string(index=False))
+        reportar(f"\nEstadístico Chi²: {chi2:.4f}")
+        reportar(f"Grados de libertad: {dof}")
+        reportar(f"P-valor: {p_valor:.4f}")
+        reportar(f"V de Cramér: {cramer_v:.4f}")
+        reportar(f"Interpretación: {'Variables DEPENDIENTES' if p_valor < 0.05 else 'Variables INDEPENDIENTES'}")
     
     return {
         'chi2_stat': chi2,
         'p_valor': p_valor,
         'dof': dof,
-        'tabla_contingencia': tabla_contingencia
+        'cramer_v': cramer_v,
+        'tabla_contingencia': tabla_contingencia_densa,
+        'tabla': tabla
     }
 
 
-def intervalo_confianza(df, columna, nivel_confianza=0.95):
+@memorizar(columnas=('columna',))
+def intervalo_confianza(df, columna, nivel_confianza=0.95, metodo='t', n_replicas=2000, semilla=0):
     """
     Calcula el intervalo de confianza para la media
     
@@ -262,37 +628,377 @@ def intervalo_confianza(df, columna, nivel_confianza=0.95):
         df (pd.DataFrame): DataFrame con los datos
         columna (str): Columna a analizar
         nivel_confianza (float): Nivel de confianza (default 0.95)
+        metodo (str): 't' (t de Student) o 'bootstrap' (BCa, sin suponer
+            normalidad; para la mediana o percentiles ver bootstrap_intervalos)
+        n_replicas (int): Réplicas bootstrap (solo con metodo='bootstrap')
+        semilla (int): Semilla del bootstrap
         
     Returns:
         dict: Intervalo de confianza
     """
+    if metodo not in METODOS_INTERVALO:
+        reportar(f"✗ Método '{metodo}' no válido. Use {', '.join(METODOS_INTERVALO)}")
+        return None
+
     if columna not in df.columns:
-        print(f"✗ Columna '{columna}' no encontrada")
+        reportar(f"✗ Columna '{columna}' no encontrada")
         return None
     
     datos = df[columna].dropna()
     
     if len(datos) < 2:
-        print(f"✗ No hay suficientes datos")
+        reportar(f"✗ No hay suficientes datos")
         return None
     
     media = datos.mean()
-    std_error = stats.sem(datos)
-    intervalo = stats.t.interval(nivel_confianza, len(datos)-1, loc=media, scale=std_error)
-    
-    print(f"\n--- Intervalo de Confianza ({nivel_confianza*100}%): {columna} ---")
-    print(f"Media: {media:.2f}")
-    print(f"Error estándar: {std_error:.2f}")
-    print(f"Intervalo: [{intervalo[0]:.2f}, {intervalo[1]:.2f}]")
+    if metodo == 't':
+        std_error = stats.sem(datos)
+        intervalo = stats.t.interval(nivel_confianza, len(datos)-1, loc=media, scale=std_error)
+    else:
+        with silencio():
+            tabla = bootstrap_intervalos(df, columna, estadisticos=('media',), n_replicas=n_replicas,
+                                         nivel_confianza=nivel_confianza, semilla=semilla)
+        if tabla is None:
+            reportar(f"✗ No hay suficientes datos")
+            return None
+        fila = tabla.iloc[0]
+        std_error = fila['error_estandar']
+        intervalo = (fila['bca_inferior'], fila['bca_superior'])
+    
+    if reporte_activo():
+        reportar(f"\n--- Intervalo de Confianza ({nivel_confianza*100}%, {metodo}): {columna} ---")
+        reportar(f"Media: {media:.2f}")
+        reportar(f"Error estándar: {std_error:.2f}")
+        reportar(f"Intervalo: [{intervalo[0]:.2f}, {intervalo[1]:.2f}]")
     
     return {
         'media': media,
         'std_error': std_error,
         'limite_inferior': intervalo[0],
-        'limite_superior': intervalo[1]
+        'limite_superior': intervalo[1],
+        'metodo': metodo
     }
 
 
+def ajustar_p_valores(p_valores, metodo='holm'):
+    """
+    Corrige p-valores por comparaciones múltiples (los NaN no cuentan)
+    
+    Args:
+        p_valores (array-like): P-valores sin corregir
+        metodo (str): 'holm' (Holm-Bonferroni, controla FWER) o 'bh'
+            (Benjamini-Hochberg, controla FDR)
+            
+    Returns:
+        np.ndarray: P-valores ajustados, en el mismo orden
+    """
+    if metodo not in CORRECCIONES:
+        raise ValueError(f"Corrección '{metodo}' no válida. Use {', '.join(CORRECCIONES)}")
+    
+    p_valores = np.asarray(p_valores, dtype=float)
+    ajustados = np.full(p_valores.shape, np.nan)
+    validos = np.flatnonzero(~np.isnan(p_valores))
+    m = len(validos)
+    if m == 0:
+        return ajustados
+    
+    orden = validos[np.argsort(p_valores[validos], kind='stable')]
+    ordenados = p_valores[orden]
+    if metodo == 'holm':
+        escalados = np.maximum.accumulate((m - np.arange(m)) * ordenados)
+    else:
+        escalados = np.minimum.accumulate((m / np.arange(1, m + 1) * ordenados)[::-1])[::-1]
+    ajustados[orden] = np.minimum(escalados, 1)
+    return ajustados
+
+
+@memorizar(columnas=('columnas', 'agrupaciones'))
+def pruebas_por_lotes(df, columnas=None, agrupaciones=None, correccion='holm', alfa=0.05):
+    """
+    ANOVA y Kruskal-Wallis de cada columna numérica contra cada agrupación
+    categórica, con corrección por comparaciones múltiples
+    
+    Cada agrupación se factoriza una sola vez; los conteos, sumas, sumas de
+    cuadrados y sumas de rangos de todas las columnas por grupo salen de un
+    bincount, y F y H se calculan para todas las columnas a la vez. La
+    corrección se aplica por separado a las pruebas ANOVA y a las de
+    Kruskal-Wallis (son dos alternativas para las mismas hipótesis).
+    
+    Args:
+        df (pd.DataFrame): DataFrame con los datos
+        columnas (list): Columnas numéricas (None = todas las numéricas)
+        agrupaciones (list): Columnas categóricas (None = las de
+            AGRUPACIONES_PRUEBAS que existan)
+        correccion (str): 'holm' o 'bh'
+        alfa (float): Nivel de significancia para los p-valores ajustados
+        
+    Returns:
+        pd.DataFrame: Una fila por (variable, agrupacion, prueba) con
+            estadistico, gl_entre, gl_dentro, n, n_grupos, p_valor,
+            p_ajustado y significativo
+    """
+    if correccion not in CORRECCIONES:
+        reportar(f"✗ Corrección '{correccion}' no válida. Use {', '.join(CORRECCIONES)}")
+        return None
+    
+    if agrupaciones is None:
+        agrupaciones = [col for col in AGRUPACIONES_PRUEBAS if col in df.columns]
+    if columnas is None:
+        columnas = [col for col in df.select_dtypes(include=[np.number]).columns
+                    if col not in agrupaciones]
+    
+    faltantes = [col for col in list(columnas) + list(agrupaciones) if col not in df.columns]
+    if faltantes:
+        reportar(f"✗ Columnas no encontradas: {', '.join(faltantes)}")
+        return None
+    
+    if not columnas or not agrupaciones:
+        reportar(f"✗ Se necesitan columnas numéricas y agrupaciones para las pruebas")
+        return None
+    
+    datos = df[columnas].to_numpy(dtype=float, na_value=np.nan)
+    p = len(columnas)
+    filas = []
+    
+    for agrupacion in agrupaciones:
+        codigos = particion_grupos(df, agrupacion).codigos
+        k_total = max(codigos.max() + 1, 1)
+        validos = (codigos >= 0)[:, None] & ~np.isnan(datos)
+        fila, col = np.nonzero(validos)
+        # Un índice (columna, grupo) por valor: todas las columnas en un bincount
+        indice = col * k_total + codigos[fila]
+        
+        def por_grupo(pesos=None):
+            return np.bincount(indice, weights=pesos, minlength=p * k_total).reshape(p, k_total)
+        
+        valores = datos[fila, col]
+        conteos = por_grupo()
+        n = conteos.sum(axis=1)
+        presentes = conteos > 0
+        n_grupos = presentes.sum(axis=1)
+        
+        # ANOVA con los valores centrados en la media de cada columna (evita
+        # la cancelación numérica con montos grandes)
+        medias = np.bincount(col, weights=valores, minlength=p) / np.maximum(n, 1)
+        centrados = valores - medias[col]
+        sumas = por_grupo(centrados)
+        cuadrados = por_grupo(centrados ** 2)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            explicada = np.where(presentes, sumas ** 2 / conteos, 0).sum(axis=1)
+            entre = explicada - sumas.sum(axis=1) ** 2 / n
+            dentro = cuadrados.sum(axis=1) - explicada
+            gl_entre, gl_dentro = n_grupos - 1, n - n_grupos
+            f_stat = (entre / gl_entre) / (dentro / gl_dentro)
+        p_anova = stats.f.sf(f_stat, gl_entre, gl_dentro)
+        
+        # Kruskal-Wallis: rangos de los valores con grupo (los de la caché si
+        # ninguna fila queda fuera) y sus sumas por grupo
+        if (codigos >= 0).all():
+            rangos = np.column_stack([rangos_columna(df, c)[0] for c in columnas])
+            empates = np.array([rangos_columna(df, c)[1] for c in columnas])
+        else:
+            rangos, empates = calcular_rangos(np.where(validos, datos, np.nan), empates=True)
+        sumas_rangos = por_grupo(rangos[fila, col])
+        with np.errstate(divide='ignore', invalid='ignore'):
+            h = (12 / (n * (n + 1)) * np.where(presentes, sumas_rangos ** 2 / conteos, 0).sum(axis=1)
+                 - 3 * (n + 1))
+            h_stat = h / (1 - empates / (n ** 3 - n))
+        p_kruskal = stats.chi2.sf(h_stat, gl_entre)
+        
+        for j, columna in enumerate(columnas):
+            if n_grupos[j] < 2:
+                continue
+            base = {'variable': columna, 'agrupacion': agrupacion, 'n': int(n[j]), 'n_grupos': int(n_grupos[j])}
+            filas.append({**base, 'prueba': 'anova', 'estadistico': f_stat[j], 'gl_entre': int(gl_entre[j]),
+                          'gl_dentro': int(gl_dentro[j]), 'p_valor': p_anova[j]})
+            filas.append({**base, 'prueba': 'kruskal', 'estadistico': h_stat[j], 'gl_entre': int(gl_entre[j]),
+                          'gl_dentro': np.nan, 'p_valor': p_kruskal[j]})
+    
+    columnas_tabla = ['variable', 'agrupacion', 'prueba', 'estadistico', 'gl_entre', 'gl_dentro',
+                      'n', 'n_grupos', 'p_valor']
+    tabla = pd.DataFrame(filas, columns=columnas_tabla)
+    tabla['p_ajustado'] = np.nan
+    for prueba, indices in tabla.groupby('prueba').groups.items():
+        tabla.loc[indices, 'p_ajustado'] = ajustar_p_valores(tabla.loc[indices, 'p_valor'], correccion)
+    tabla['significativo'] = tabla['p_ajustado'] < alfa
+    tabla = tabla.sort_values(['prueba', 'p_valor'], ignore_index=True)
+    
+    if reporte_activo():
+        reportar(f"\n--- Pruebas por Lotes ({len(columnas)} variables x {len(agrupaciones)} agrupaciones, "
+                 f"corrección {correccion}) ---")
+        reportar(f"Pruebas: {len(tabla)}, significativas (p ajustado < {alfa}): {int(tabla['significativo'].sum())}")
+        if len(tabla) > 0:
+            reportar(tabla.to_string(index=False))
+    
+    return tabla
+
+
+@memorizar(columnas=('columna', 'columna_grupos'))
+def comparaciones_permutacion(df, columna, columna_grupos, estadistico='media', pares=None,
+                              correccion='holm', alfa=0.05, n_permutaciones=10_000, semilla=0,
+                              procesos=None):
+    """
+    Pruebas de permutación de todos los pares de grupos (o de los pares
+    indicados), con corrección por comparaciones múltiples
+    
+    Cada comparación es una tarea del pool que permuta por bloques. Tras la
+    corrección, un p-valor se compara con umbrales entre alfa / número de
+    comparaciones (el primer paso de Holm y BH) y alfa (el último), así que
+    solo se detiene antes de tiempo si su intervalo queda claramente por
+    debajo del primero (significativo con cualquier corrección) o por encima
+    de alfa (nunca significativo); los que caen en medio usan todas las
+    permutaciones.
+    
+    Args:
+        df (pd.DataFrame): DataFrame con los datos
+        columna (str): Columna con valores numéricos
+        columna_grupos (str): Columna categórica de los grupos
+        estadistico (str): 'media' (t de Student) o 'rangos' (Mann-Whitney)
+        pares (list): Pares (grupo1, grupo2) a comparar (None = todos)
+        correccion (str): 'holm' o 'bh'
+        alfa (float): Nivel de significancia para los p-valores ajustados
+        n_permutaciones (int): Máximo de permutaciones por comparación
+        semilla (int): Semilla; el mismo valor da los mismos p-valores
+        procesos (int): Número de procesos (default: núcleos disponibles)
+        
+    Returns:
+        pd.DataFrame: Una fila por par con n1, n2, diferencia (de medias o
+            de rangos medios), p_valor, n_permutaciones, exacta, p_ajustado
+            y significativo
+    """
+    if correccion not in CORRECCIONES:
+        reportar(f"✗ Corrección '{correccion}' no válida. Use {', '.join(CORRECCIONES)}")
+        return None
+    if estadistico not in ESTADISTICOS_PERMUTACION:
+        reportar(f"✗ Estadístico '{estadistico}' no válido. Use {', '.join(ESTADISTICOS_PERMUTACION)}")
+        return None
+    
+    if columna not in df.columns or columna_grupos not in df.columns:
+        reportar(f"✗ Columnas '{columna}' o '{columna_grupos}' no encontradas")
+        return None
+    
+    particion = particion_grupos(df, columna_grupos)
+    grupos = dict(zip(particion.nombres, particion.dividir(df[columna].to_numpy(dtype=float, na_value=np.nan))))
+    if pares is None:
+        nombres = [nombre for nombre in sorted(grupos, key=str) if len(grupos[nombre]) >= 2]
+        pares = [(nombres[i], nombres[j]) for i in range(len(nombres)) for j in range(i + 1, len(nombres))]
+    pares = [(g1, g2) for g1, g2 in pares
+             if len(grupos.get(g1, ())) >= 2 and len(grupos.get(g2, ())) >= 2]
+    
+    if not pares:
+        reportar(f"✗ No hay pares de grupos con suficientes datos")
+        return None
+    
+    resultados = pruebas_permutacion([(grupos[g1], grupos[g2]) for g1, g2 in pares], estadistico,
+                                     n_permutaciones, (alfa / len(pares), alfa), semilla=semilla,
+                                     procesos=procesos)
+    
+    filas = []
+    for (g1, g2), resultado in zip(pares, resultados):
+        if estadistico == 'media':
+            diferencia = grupos[g1].mean() - grupos[g2].mean()
+        else:
+            rangos = calcular_rangos(np.concatenate([grupos[g1], grupos[g2]]))
+            diferencia = rangos[:len(grupos[g1])].mean() - rangos[len(grupos[g1]):].mean()
+        filas.append({'grupo1': g1, 'grupo2': g2, 'n1': len(grupos[g1]), 'n2': len(grupos[g2]),
+                      'diferencia': diferencia, 'p_valor': resultado['p_valor'],
+                      'n_permutaciones': resultado['n_permutaciones'], 'exacta': resultado['exacta']})
+    tabla = pd.DataFrame(filas)
+    tabla['p_ajustado'] = ajustar_p_valores(tabla['p_valor'], correccion)
+    tabla['significativo'] = tabla['p_ajustado'] < alfa
+    tabla = tabla.sort_values('p_valor', ignore_index=True)
+    
+    if reporte_activo():
+        reportar(f"\n--- Comparaciones por Permutación: {columna} por {columna_grupos} "
+                 f"({estadistico}, corrección {correccion}) ---")
+        reportar(f"Pares: {len(tabla)}, significativos (p ajustado < {alfa}): {int(tabla['significativo'].sum())}, "
+                 f"permutaciones usadas: {int(tabla['n_permutaciones'].sum())}")
+        reportar(tabla.to_string(index=False))
+    
+    return tabla
+
+
+@memorizar(columnas=('columnas', 'columna_grupos'))
+def normalidad_por_lotes(df, columnas=None, columna_grupos=None, repeticiones=20,
+                         tamano_submuestra=MAXIMO_SHAPIRO, alfa=0.05, semilla=0, procesos=None):
+    """
+    Pruebas de normalidad para muestras grandes de cada columna numérica
+    (y de cada grupo si se indica) en una sola llamada
+    
+    Jarque-Bera sale de los momentos acumulados (AcumuladorMomentos);
+    Anderson-Darling usa media y desviación estimadas con su corrección;
+    Shapiro-Wilk es exacto hasta tamano_submuestra valores y, por encima,
+    se resume sobre submuestras aleatorias calculadas en paralelo (mediana
+    de W y del p-valor, y proporción de submuestras que rechazan).
+    
+    Args:
+        df (pd.DataFrame): DataFrame con los datos
+        columnas (list): Columnas numéricas (None = todas las numéricas)
+        columna_grupos (str): Columna categórica para probar cada grupo (opcional)
+        repeticiones (int): Submuestras de Shapiro-Wilk por muestra grande
+        tamano_submuestra (int): Tamaño de cada submuestra (máximo 5000)
+        alfa (float): Nivel de significancia para la proporción de rechazos
+        semilla (int): Semilla de las submuestras
+        procesos (int): Número de procesos (default: núcleos disponibles)
+        
+    Returns:
+        pd.DataFrame: Una fila por (grupo, variable) con n, asimetria,
+            curtosis, jb_stat, jb_p, ad_stat, ad_p, shapiro_w, shapiro_p y
+            shapiro_rechazos
+    """
+    if not 3 <= tamano_submuestra <= MAXIMO_SHAPIRO:
+        reportar(f"✗ El tamaño de submuestra debe estar entre 3 y {MAXIMO_SHAPIRO}")
+        return None
+    
+    if columnas is None:
+        columnas = [col for col in df.select_dtypes(include=[np.number]).columns if col != columna_grupos]
+    
+    faltantes = [col for col in list(columnas) + [columna_grupos] if col is not None and col not in df.columns]
+    if faltantes:
+        reportar(f"✗ Columnas no encontradas: {', '.join(faltantes)}")
+        return None
+    
+    # Muestras: cada columna completa o cortada por la partición de grupos
+    muestras, etiquetas = [], []
+    particion = particion_grupos(df, columna_grupos) if columna_grupos is not None else None
+    for columna in columnas:
+        valores = df[columna].to_numpy(dtype=float, na_value=np.nan)
+        if particion is None:
+            muestras.append(valores[~np.isnan(valores)])
+            etiquetas.append({'variable': columna})
+        else:
+            for nombre, grupo in zip(particion.nombres, particion.dividir(valores)):
+                muestras.append(grupo)
+                etiquetas.append({columna_grupos: nombre, 'variable': columna})
+    
+    shapiro = _shapiro_por_lotes(muestras, repeticiones, tamano_submuestra, semilla, procesos)
+    
+    filas = []
+    for etiqueta, valores, submuestras in zip(etiquetas, muestras, shapiro):
+        if len(valores) < 3:
+            continue
+        momentos = AcumuladorMomentos().update(valores)
+        stat_jb, p_jb = _jarque_bera(momentos)
+        stat_ad, p_ad = _anderson_darling(valores)
+        filas.append({**etiqueta, 'n': len(valores),
+                      'asimetria': momentos.asimetria(corregida=False),
+                      'curtosis': momentos.curtosis(corregida=False),
+                      'jb_stat': stat_jb, 'jb_p': p_jb, 'ad_stat': stat_ad, 'ad_p': p_ad,
+                      'shapiro_w': np.median(submuestras[:, 0]), 'shapiro_p': np.median(submuestras[:, 1]),
+                      'shapiro_rechazos': np.mean(submuestras[:, 1] < alfa),
+                      'shapiro_submuestras': len(submuestras) if len(valores) > tamano_submuestra else 0})
+    
+    tabla = pd.DataFrame(filas)
+    
+    if reporte_activo():
+        reportar(f"\n--- Normalidad por Lotes ({len(columnas)} variables"
+                 f"{f' por {columna_grupos}' if columna_grupos else ''}) ---")
+        if len(tabla) > 0:
+            reportar(tabla.to_string(index=False))
+    
+    return tabla
+
+
 if __name__ == "__main__":
     from carga_datos import cargar_json
     
@@ -0,0 +1,277 @@
+"""
+Módulo para detección y filtrado de outliers sobre datos por bloques
+
+El filtrado se hace en dos pasadas: la primera construye un estado
+combinable por columna y grupo (sketch de cuantiles o momentos), la segunda
+filtra cada bloque con los límites resultantes. No es necesario tener toda
+la columna en memoria y los estados de distintos bloques o procesos se
+combinan con merge().
+"""
+import pandas as pd
+import numpy as np
+
+try:
+    from .sketches import SketchCuantiles, cuantil_ponderado
+    from .acumuladores import AcumuladorMomentos
+    from .carga_datos import iterar_bloques
+    from .reporte import reportar
+except ImportError:
+    from sketches import SketchCuantiles, cuantil_ponderado
+    from acumuladores import AcumuladorMomentos
+    from carga_datos import iterar_bloques
+    from reporte import reportar
+
+
+METODOS_OUTLIERS = ('iqr', 'zscore', 'mad')
+
+# Umbral por defecto de cada método
+UMBRALES_OUTLIERS = {'iqr': 1.5, 'zscore': 3.0, 'mad': 3.5}
+
+# Factor que hace la MAD comparable con la desviación estándar en datos normales
+FACTOR_MAD = 1.4826
+
+
+class EstadoOutliers:
+    """
+    Estado de la primera pasada: un resumen combinable por (grupo, columna)
+    
+    Para 'iqr' y 'mad' se usa un SketchCuantiles; para 'zscore' basta con
+    media y varianza. Los límites se obtienen con limites().
+    
+    Args:
+        columnas (list): Columnas numéricas (None = las numéricas del primer bloque)
+        metodo (str): 'iqr', 'zscore' o 'mad'
+        columna_grupo (str): Columna para calcular límites por grupo (opcional)
+        k (int): Precisión de los sketches de cuantiles
+        semilla (int): Semilla de los sketches
+    """
+    
+    def __init__(self, columnas=None, metodo='iqr', columna_grupo=None, k=200, semilla=0):
+        if metodo not in METODOS_OUTLIERS:
+            raise ValueError(f"Método '{metodo}' no válido. Use {', '.join(METODOS_OUTLIERS)}")
+        self.columnas = None if columnas is None else list(columnas)
+        self.metodo = metodo
+        self.columna_grupo = columna_grupo
+        self.k = k
+        self.semilla = semilla
+        self.estados = {}
+    
+    def _nuevo_estado(self):
+        if self.metodo == 'zscore':
+            return AcumuladorMomentos()
+        return SketchCuantiles(self.k, self.semilla)
+    
+    def update(self, bloque):
+        """
+        Agrega un bloque de datos al estado
+        
+        Args:
+            bloque (pd.DataFrame): Bloque con las columnas a analizar
+            
+        Returns:
+            EstadoOutliers: El propio estado
+        """
+        if self.columnas is None:
+            self.columnas = [col for col in bloque.select_dtypes(include=[np.number]).columns
+                             if col != self.columna_grupo]
+        
+        # Todas las columnas se convierten una sola vez y cada grupo es un tramo de filas
+        matriz = bloque[self.columnas].to_numpy(dtype=float, na_value=np.nan)
+        for grupo, valores in _dividir_por_grupo(bloque, self.columna_grupo, matriz):
+            for j, col in enumerate(self.columnas):
+                clave = (grupo, col)
+                if clave not in self.estados:
+                    self.estados[clave] = self._nuevo_estado()
+                self.estados[clave].update(valores[:, j])
+        return self
+    
+    def merge(self, otro):
+        """
+        Combina el estado construido sobre otra parte de los datos
+        
+        Args:
+            otro (EstadoOutliers): Estado con el mismo método y agrupación
+            
+        Returns:
+            EstadoOutliers: El propio estado
+        """
+        if (otro.metodo, otro.columna_grupo) != (self.metodo, self.columna_grupo):
+            raise ValueError("Solo se pueden combinar estados con el mismo método y columna de grupo")
+        
+        if self.columnas is None:
+            self.columnas = otro.columnas
+        for clave, estado in otro.estados.items():
+            if clave not in self.estados:
+                self.estados[clave] = self._nuevo_estado()
+            self.estados[clave].merge(estado)
+        return self
+    
+    def limites(self, umbral=None):
+        """
+        Calcula los límites de cada (grupo, columna)
+        
+        Args:
+            umbral (float): Umbral del método (default UMBRALES_OUTLIERS)
+            
+        Returns:
+            pd.DataFrame: Tabla indexada por (grupo, columna) con n, centro,
+                escala, limite_inferior y limite_superior
+        """
+        if umbral is None:
+            umbral = UMBRALES_OUTLIERS[self.metodo]
+        
+        filas = []
+        for (grupo, col), estado in self.estados.items():
+            if self.metodo == 'zscore':
+                centro = estado.media if estado.n else np.nan
+                escala = estado.desviacion_estandar()
+                inferior, superior = centro - umbral * escala, centro + umbral * escala
+            elif self.metodo == 'iqr':
+                q1, centro, q3 = estado.cuantiles([0.25, 0.5, 0.75])
+                escala = q3 - q1
+                inferior, superior = q1 - umbral * escala, q3 + umbral * escala
+            else:
+                centro = estado.cuantil(0.5)
+                escala = FACTOR_MAD * _desviacion_mediana(estado, centro)
+                inferior, superior = centro - umbral * escala, centro + umbral * escala
+            filas.append((grupo, col, estado.n, centro, escala, inferior, superior))
+        
+        tabla = pd.DataFrame(filas, columns=['grupo', 'columna', 'n', 'centro', 'escala',
+                                             'limite_inferior', 'limite_superior'])
+        return tabla.set_index(['grupo', 'columna'])
+    
+    def mascara(self, bloque, limites):
+        """
+        Marca las filas de un bloque que no son outliers en ninguna columna
+        Los valores nulos no se consideran outliers
+        
+        Args:
+            bloque (pd.DataFrame): Bloque a evaluar
+            limites (pd.DataFrame): Resultado de limites()
+            
+        Returns:
+            np.ndarray: Máscara booleana (True = se conserva la fila)
+        """
+        conservar = np.ones(len(bloque), dtype=bool)
+        
+        if self.columna_grupo is None:
+            codigos = np.zeros(len(bloque), dtype=np.intp)
+            grupos = [None]
+        else:
+            codigos, grupos = pd.factorize(bloque[self.columna_grupo], use_na_sentinel=False)
+        
+        for col in self.columnas:
+            claves = pd.MultiIndex.from_arrays([list(grupos), [col] * len(grupos)])
+            limites_col = limites.reindex(claves)
+            # Grupos sin estado no tienen límites: no se filtra nada
+            inferior = limites_col['limite_inferior'].fillna(-np.inf).to_numpy()[codigos]
+            superior = limites_col['limite_superior'].fillna(np.inf).to_numpy()[codigos]
+            valores = bloque[col].to_numpy(dtype=float, na_value=np.nan)
+            conservar &= np.isnan(valores) | ((valores >= inferior) & (valores <= superior))
+        return conservar
+
+
+def _dividir_por_grupo(bloque, columna_grupo, matriz):
+    """
+    Genera (grupo, filas de la matriz del grupo) usando un único
+    ordenamiento por código; la matriz se reordena una vez y cada grupo es
+    un tramo contiguo
+    """
+    if columna_grupo is None:
+        yield None, matriz
+        return
+    
+    codigos, grupos = pd.factorize(bloque[columna_grupo], use_na_sentinel=False)
+    orden = np.argsort(codigos, kind='stable')
+    ordenados = codigos[orden]
+    # Orden por columnas: el tramo de cada columna queda contiguo en memoria
+    ordenada = np.asfortranarray(matriz[orden])
+    cortes = np.flatnonzero(np.diff(ordenados)) + 1
+    for inicio, fin in zip(np.r_[0, cortes], np.r_[cortes, len(orden)]):
+        if fin > inicio:
+            yield grupos[ordenados[inicio]], ordenada[inicio:fin]
+
+
+def _desviacion_mediana(sketch, mediana):
+    """MAD aproximada a partir de los elementos ponderados de un sketch"""
+    if sketch.n == 0:
+        return np.nan
+    if sketch.exacto:
+        return float(np.median(np.abs(sketch.niveles[0] - mediana)))
+    
+    valores, pesos = sketch.items_ponderados()
+    desviaciones = np.abs(valores - mediana)
+    orden = np.argsort(desviaciones, kind='stable')
+    return float(cuantil_ponderado(desviaciones[orden], pesos[orden], [0.5])[0])
+
+
+def construir_estado_outliers(fuente, columnas=None, metodo='iqr', columna_grupo=None,
+                              tamano_bloque=100_000, k=200):
+    """
+    Primera pasada: construye el estado de outliers recorriendo la fuente
+    
+    Args:
+        fuente: DataFrame, lista de DataFrames o función que genera bloques
+        columnas (list): Columnas numéricas (None = todas las numéricas)
+        metodo (str): 'iqr', 'zscore' o 'mad'
+        columna_grupo (str): Columna para límites por grupo (opcional)
+        tamano_bloque (int): Filas por bloque si la fuente es un DataFrame
+        k (int): Precisión de los sketches de cuantiles
+        
+    Returns:
+        EstadoOutliers: Estado combinable con los resúmenes
+    """
+    estado = EstadoOutliers(columnas, metodo, columna_grupo, k=k)
+    for bloque in iterar_bloques(fuente, tamano_bloque):
+        estado.update(bloque)
+    return estado
+
+
+def filtrar_outliers_por_bloques(fuente, columnas=None, metodo='iqr', umbral=None,
+                                 columna_grupo=None, tamano_bloque=100_000, estado=None):
+    """
+    Filtra outliers en dos pasadas sobre datos por bloques
+    
+    Args:
+        fuente: DataFrame, lista de DataFrames o función que genera bloques
+            (debe poder recorrerse dos veces si no se entrega el estado)
+        columnas (list): Columnas numéricas (None = todas las numéricas)
+        metodo (str): 'iqr', 'zscore' o 'mad'
+        umbral (float): Umbral del método (default UMBRALES_OUTLIERS)
+        columna_grupo (str): Columna para límites por grupo, p. ej. 'tipO_PRESTACION'
+        tamano_bloque (int): Filas por bloque si la fuente es un DataFrame
+        estado (EstadoOutliers): Estado ya construido (omite la primera pasada)
+        
+    Yields:
+        pd.DataFrame: Bloques sin las filas con outliers
+    """
+    if estado is None:
+        estado = construir_estado_outliers(fuente, columnas, metodo, columna_grupo, tamano_bloque)
+    limites = estado.limites(umbral)
+    
+    total = 0
+    removidos = 0
+    for bloque in iterar_bloques(fuente, tamano_bloque):
+        conservar = estado.mascara(bloque, limites)
+        total += len(bloque)
+        removidos += int((~conservar).sum())
+        yield bloque[conservar]
+    
+    reportar(f"✓ Outliers removidos ({estado.metodo}, {len(estado.columnas)} columnas): {removidos} de {total} registros")
+
+
+if __name__ == "__main__":
+    from carga_datos import cargar_json
+    
+    # Cargar datos
+    df = cargar_json('../data/facturacion_medica.json')
+    
+    if df is not None:
+        columnas = ['montO_TOTAL', 'edaD_PACIENTE', 'duracioN_MINUTOS']
+        
+        # Límites IQR por clase de episodio construidos en bloques de 5 filas
+        estado = construir_estado_outliers(df, columnas, 'iqr', 'clasE_EPISODIO', tamano_bloque=5)
+        print(estado.limites())
+        
+        # Filtrado en dos pasadas
+        df_limpio = pd.concat(filtrar_outliers_por_bloques(df, columnas, 'mad', tamano_bloque=5))
@@ -0,0 +1,226 @@
+"""
+Módulo de pruebas de permutación para comparar dos grupos
+
+Con los totales fijos, la t de Student (varianza combinada) y la U de
+Mann-Whitney son funciones monótonas de la suma del grupo 1 (de los
+valores o de los rangos), así que cada permutación solo necesita esa
+suma. Las permutaciones se generan por bloques (una matriz réplicas x n
+permutada por filas, con memoria acotada) y los bloques se reparten
+entre procesos. Si el número de asignaciones posibles no supera el de
+permutaciones pedidas se enumeran todas y el p-valor es exacto; si no,
+se estima por Monte Carlo y se deja de permutar en cuanto el intervalo
+de confianza del p-valor queda claramente a un lado de alfa.
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+from itertools import combinations
+from math import comb
+
+import numpy as np
+from scipy import stats
+
+try:
+    from .reporte import reportar
+    from .rangos import calcular_rangos
+except ImportError:
+    from reporte import reportar
+    from rangos import calcular_rangos
+
+
+ESTADISTICOS_PERMUTACION = ('media', 'rangos')
+
+# Máximo de valores permutados en memoria por bloque (8 bytes cada uno)
+MAXIMO_VALORES_BLOQUE = 5_000_000
+
+
+def _preparar(grupo1, grupo2, estadistico):
+    """Valores combinados (o sus rangos) con el grupo 1 primero"""
+    if estadistico not in ESTADISTICOS_PERMUTACION:
+        raise ValueError(f"Estadístico '{estadistico}' no válido. Use {', '.join(ESTADISTICOS_PERMUTACION)}")
+    valores = np.concatenate([np.asarray(grupo1, dtype=float), np.asarray(grupo2, dtype=float)])
+    if estadistico == 'rangos':
+        valores = calcular_rangos(valores)
+    return valores
+
+
+def _distancias(sumas, valores, n1):
+    """Distancia de la suma del grupo 1 a su valor esperado (prueba bilateral)"""
+    return np.abs(sumas - n1 * valores.mean())
+
+
+def _exceden(distancias, observada):
+    """Permutaciones al menos tan extremas como la observada (con tolerancia de redondeo)"""
+    return int((distancias >= observada * (1 - 1e-12) - 1e-12).sum())
+
+
+def _bloque_permutaciones(argumentos):
+    """Tarea de un proceso: permutaciones que igualan o superan la distancia observada (debe ser de nivel módulo)"""
+    valores, n1, observada, replicas, semilla = argumentos
+    rng = np.random.default_rng(semilla)
+    permutados = rng.permuted(np.broadcast_to(valores, (replicas, len(valores))), axis=1)
+    return _exceden(_distancias(permutados[:, :n1].sum(axis=1), valores, n1), observada)
+
+
+def _exacta(valores, n1, observada):
+    """P-valor exacto enumerando todas las asignaciones del grupo más chico"""
+    n = len(valores)
+    m = min(n1, n - n1)
+    total = comb(n, m)
+    indices = np.fromiter((i for combinacion in combinations(range(n), m) for i in combinacion),
+                          dtype=np.int64, count=total * m).reshape(total, m)
+    sumas = valores[indices].sum(axis=1)
+    if m != n1:
+        # Se enumeró el grupo 2: la suma del grupo 1 es el total menos la suya
+        sumas = valores.sum() - sumas
+    return _exceden(_distancias(sumas, valores, n1), observada), total
+
+
+def _limites_p_valor(conteo, usadas, confianza):
+    """Intervalo de Clopper-Pearson del p-valor de Monte Carlo"""
+    alfa = 1 - confianza
+    inferior = stats.beta.ppf(alfa / 2, conteo, usadas - conteo + 1) if conteo > 0 else 0.0
+    superior = stats.beta.ppf(1 - alfa / 2, conteo + 1, usadas - conteo) if conteo < usadas else 1.0
+    return inferior, superior
+
+
+def _tareas_bloques(valores, n1, observada, n_permutaciones, permutaciones_por_bloque, semilla):
+    """Argumentos de cada bloque; el bloque i usa siempre la i-ésima semilla derivada"""
+    por_bloque = max(1, min(permutaciones_por_bloque, MAXIMO_VALORES_BLOQUE // len(valores)))
+    tamanos = [min(por_bloque, n_permutaciones - inicio) for inicio in range(0, n_permutaciones, por_bloque)]
+    if not isinstance(semilla, np.random.SeedSequence):
+        semilla = np.random.SeedSequence(semilla)
+    semillas = semilla.spawn(len(tamanos))
+    return [(valores, n1, observada, tamano, hijo) for tamano, hijo in zip(tamanos, semillas)]
+
+
+def _montecarlo(valores, n1, observada, n_permutaciones, alfa, confianza_parada, semilla,
+                permutaciones_por_bloque, ejecutor=None, procesos=1):
+    """
+    Permutaciones por bloques hasta agotar n_permutaciones o hasta que el
+    intervalo del p-valor excluya a alfa (alfa=None: sin parada temprana).
+    Con alfa=(mínimo, máximo) solo se detiene si el intervalo queda por
+    debajo del mínimo o por encima del máximo
+
+    Los bloques se calculan en tandas de `procesos` y se revisan en orden,
+    descartando los posteriores al de parada, así que el resultado no
+    depende del número de procesos.
+    """
+    tareas = _tareas_bloques(valores, n1, observada, n_permutaciones, permutaciones_por_bloque, semilla)
+    if alfa is not None:
+        minimo, maximo = (alfa, alfa) if np.isscalar(alfa) else alfa
+    conteo, usadas, detenida = 0, 0, False
+    for inicio in range(0, len(tareas), procesos):
+        tanda = tareas[inicio:inicio + procesos]
+        resultados = ejecutor.map(_bloque_permutaciones, tanda) if ejecutor is not None else \
+            map(_bloque_permutaciones, tanda)
+        for tarea, excedidas in zip(tanda, resultados):
+            conteo += excedidas
+            usadas += tarea[3]
+            if alfa is not None:
+                inferior, superior = _limites_p_valor(conteo, usadas, confianza_parada)
+                if superior < minimo or inferior > maximo:
+                    detenida = True
+                    break
+        if detenida:
+            break
+    return conteo, usadas, detenida
+
+
+def _resultado(valores, n1, n_permutaciones, alfa, confianza_parada, semilla,
+               permutaciones_por_bloque, ejecutor=None, procesos=1):
+    """Prueba completa sobre valores ya preparados"""
+    observada = _distancias(valores[:n1].sum(), valores, n1)
+    n = len(valores)
+    if comb(n, min(n1, n - n1)) <= n_permutaciones:
+        conteo, total = _exacta(valores, n1, observada)
+        return {'p_valor': conteo / total, 'ic_p_valor': (conteo / total, conteo / total),
+                'n_permutaciones': total, 'exacta': True, 'parada_temprana': False}
+
+    conteo, usadas, detenida = _montecarlo(valores, n1, observada, n_permutaciones, alfa,
+                                           confianza_parada, semilla, permutaciones_por_bloque,
+                                           ejecutor, procesos)
+    return {
+        # La permutación observada cuenta como una más (el p-valor nunca es 0)
+        'p_valor': (conteo + 1) / (usadas + 1),
+        'ic_p_valor': _limites_p_valor(conteo, usadas, confianza_parada),
+        'n_permutaciones': usadas,
+        'exacta': False,
+        'parada_temprana': detenida
+    }
+
+
+def _prueba_tarea(argumentos):
+    """Tarea de un proceso: una prueba completa en serie (debe ser de nivel módulo)"""
+    return _resultado(*argumentos)
+
+
+def prueba_permutacion(grupo1, grupo2, estadistico='media', n_permutaciones=10_000, alfa=0.05,
+                       confianza_parada=0.99, semilla=0, permutaciones_por_bloque=500, procesos=None):
+    """
+    Prueba de permutación bilateral de la diferencia entre dos grupos
+
+    Args:
+        grupo1 (array-like): Valores del grupo 1 (sin nulos)
+        grupo2 (array-like): Valores del grupo 2 (sin nulos)
+        estadistico (str): 'media' (equivale a la t de Student) o 'rangos'
+            (equivale a la U de Mann-Whitney)
+        n_permutaciones (int): Máximo de permutaciones; si las asignaciones
+            posibles no lo superan, se enumeran todas (p-valor exacto)
+        alfa (float | tuple): Nivel de significancia para la parada temprana
+            (None: usar siempre todas las permutaciones), o (mínimo, máximo)
+            para detenerse solo lejos de todo ese rango de umbrales
+        confianza_parada (float): Confianza del intervalo del p-valor que
+            debe excluir a alfa para detenerse
+        semilla (int): Semilla; el mismo valor da el mismo p-valor
+        permutaciones_por_bloque (int): Permutaciones calculadas juntas en cada tarea
+        procesos (int): Número de procesos (default: núcleos disponibles)
+
+    Returns:
+        dict: p_valor, ic_p_valor, n_permutaciones (usadas), exacta y parada_temprana
+    """
+    if estadistico not in ESTADISTICOS_PERMUTACION:
+        reportar(f"✗ Estadístico '{estadistico}' no válido. Use {', '.join(ESTADISTICOS_PERMUTACION)}")
+        return None
+    valores = _preparar(grupo1, grupo2, estadistico)
+    n1 = len(grupo1)
+    if n1 == 0 or n1 == len(valores):
+        reportar("✗ Los dos grupos deben tener al menos un valor")
+        return None
+
+    procesos = procesos or os.cpu_count() or 1
+    if procesos == 1 or comb(len(valores), min(n1, len(valores) - n1)) <= n_permutaciones:
+        return _resultado(valores, n1, n_permutaciones, alfa, confianza_parada, semilla,
+                          permutaciones_por_bloque)
+    with ProcessPoolExecutor(max_workers=procesos) as ejecutor:
+        return _resultado(valores, n1, n_permutaciones, alfa, confianza_parada, semilla,
+                          permutaciones_por_bloque, ejecutor, procesos)
+
+
+def pruebas_permutacion(pares, estadistico='media', n_permutaciones=10_000, alfa=0.05,
+                        confianza_parada=0.99, semilla=0, permutaciones_por_bloque=500, procesos=None):
+    """
+    Muchas pruebas de permutación a la vez: cada comparación es una tarea
+    que se resuelve en serie (con su parada temprana) en algún proceso
+
+    Args:
+        pares (list): Pares (grupo1, grupo2) de valores sin nulos
+        (resto): Como en prueba_permutacion
+
+    Returns:
+        list: Un resultado de prueba_permutacion por par, en el mismo orden
+    """
+    if estadistico not in ESTADISTICOS_PERMUTACION:
+        reportar(f"✗ Estadístico '{estadistico}' no válido. Use {', '.join(ESTADISTICOS_PERMUTACION)}")
+        return None
+    if any(len(grupo1) == 0 or len(grupo2) == 0 for grupo1, grupo2 in pares):
+        reportar("✗ Los dos grupos de cada par deben tener al menos un valor")
+        return None
+    semillas = np.random.SeedSequence(semilla).spawn(len(pares))
+    tareas = [(_preparar(grupo1, grupo2, estadistico), len(grupo1), n_permutaciones, alfa,
+               confianza_parada, hijo, permutaciones_por_bloque)
+              for (grupo1, grupo2), hijo in zip(pares, semillas)]
+
+    if procesos == 1 or len(tareas) <= 1 or (procesos is None and os.cpu_count() == 1):
+        return list(map(_prueba_tarea, tareas))
+    with ProcessPoolExecutor(max_workers=procesos) as ejecutor:
+        return list(ejecutor.map(_prueba_tarea, tareas))
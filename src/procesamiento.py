@@ -1,9 +1,22 @@
 """
 Módulo para procesamiento de datos: normalización, estandarización e imputación
 """
+import unicodedata
 import pandas as pd
 import numpy as np
 
+try:
+    from .reporte import reportar, reporte_activo
+except ImportError:
+    from reporte import reportar, reporte_activo
+
+
+# Columnas categóricas que se canonicalizan por defecto
+COLUMNAS_CANONICAS = ['aseguradora', 'uO_MEDICA', 'uO_TRATAMI']
+
+# Tabla de alias: nombre (se normaliza antes de comparar) -> nombre canónico
+ALIAS_CANONICOS = {}
+
 
 def normalizar_datos(df, columnas):
     """
@@ -24,11 +37,11 @@ def normalizar_datos(df, columnas):
             max_val = df[col].max()
             if max_val > min_val:
                 df_normalizado[f'{col}_normalizado'] = (df[col] - min_val) / (max_val - min_val)
-                print(f"✓ Columna '{col}' normalizada")
+                reportar(f"✓ Columna '{col}' normalizada")
             else:
-                print(f"✗ Columna '{col}' tiene valores constantes")
+                reportar(f"✗ Columna '{col}' tiene valores constantes")
         else:
-            print(f"✗ Columna '{col}' no encontrada o no es numérica")
+            reportar(f"✗ Columna '{col}' no encontrada o no es numérica")
     
     return df_normalizado
 
@@ -52,11 +65,11 @@ def estandarizar_datos(df, columnas):
             std = df[col].std()
             if std > 0:
                 df_estandarizado[f'{col}_estandarizado'] = (df[col] - media) / std
-                print(f"✓ Columna '{col}' estandarizada")
+                reportar(f"✓ Columna '{col}' estandarizada")
             else:
-                print(f"✗ Columna '{col}' tiene desviación estándar 0")
+                reportar(f"✗ Columna '{col}' tiene desviación estándar 0")
         else:
-            print(f"✗ Columna '{col}' no encontrada o no es numérica")
+            reportar(f"✗ Columna '{col}' no encontrada o no es numérica")
     
     return df_estandarizado
 
@@ -79,9 +92,9 @@ def imputar_media(df, columnas):
             media = df[col].mean()
             valores_nulos = df[col].isnull().sum()
             df_imputado[col].fillna(media, inplace=True)
-            print(f"✓ Columna '{col}': {valores_nulos} valores imputados con media={media:.2f}")
+            reportar(f"✓ Columna '{col}': {valores_nulos} valores imputados con media={media:.2f}")
         else:
-            print(f"✗ Columna '{col}' no encontrada o no es numérica")
+            reportar(f"✗ Columna '{col}' no encontrada o no es numérica")
     
     return df_imputado
 
@@ -104,9 +117,9 @@ def imputar_mediana(df, columnas):
             mediana = df[col].median()
             valores_nulos = df[col].isnull().sum()
             df_imputado[col].fillna(mediana, inplace=True)
-            print(f"✓ Columna '{col}': {valores_nulos} valores imputados con mediana={mediana:.2f}")
+            reportar(f"✓ Columna '{col}': {valores_nulos} valores imputados con mediana={mediana:.2f}")
         else:
-            print(f"✗ Columna '{col}' no encontrada o no es numérica")
+            reportar(f"✗ Columna '{col}' no encontrada o no es numérica")
     
     return df_imputado
 
@@ -130,11 +143,11 @@ def imputar_moda(df, columnas):
             valores_nulos = df[col].isnull().sum()
             if moda is not None:
                 df_imputado[col].fillna(moda, inplace=True)
-                print(f"✓ Columna '{col}': {valores_nulos} valores imputados con moda={moda}")
+                reportar(f"✓ Columna '{col}': {valores_nulos} valores imputados con moda={moda}")
             else:
-                print(f"✗ No se pudo calcular la moda para '{col}'")
+                reportar(f"✗ No se pudo calcular la moda para '{col}'")
         else:
-            print(f"✗ Columna '{col}' no encontrada")
+            reportar(f"✗ Columna '{col}' no encontrada")
     
     return df_imputado
 
@@ -165,13 +178,86 @@ def ciclar_categorias(df, columna):
         df_ciclado[f'{columna}_sin'] = np.sin(2 * np.pi * df_ciclado[f'{columna}_numerico'] / n_categorias)
         df_ciclado[f'{columna}_cos'] = np.cos(2 * np.pi * df_ciclado[f'{columna}_numerico'] / n_categorias)
         
-        print(f"✓ Columna '{columna}' ciclada ({n_categorias} categorías)")
+        reportar(f"✓ Columna '{columna}' ciclada ({n_categorias} categorías)")
     else:
-        print(f"✗ Columna '{columna}' no encontrada")
+        reportar(f"✗ Columna '{columna}' no encontrada")
     
     return df_ciclado
 
 
+def normalizar_texto(valor):
+    """
+    Normaliza un texto: mayúsculas, sin tildes y con espacios simples
+    La Ñ se conserva porque distingue palabras en español
+    
+    Args:
+        valor: Texto a normalizar
+        
+    Returns:
+        str: Texto normalizado
+    """
+    texto = unicodedata.normalize('NFD', str(valor).upper())
+    caracteres = []
+    for caracter in texto:
+        if unicodedata.combining(caracter):
+            # Solo se conserva la virgulilla de la Ñ
+            if not (caracter == '\u0303' and caracteres and caracteres[-1] == 'N'):
+                continue
+        caracteres.append(caracter)
+    return ' '.join(unicodedata.normalize('NFC', ''.join(caracteres)).split())
+
+
+def canonicalizar_categorias(df, columnas=None, alias=None, categorica=False):
+    """
+    Unifica variantes de nombres en columnas categóricas (espacios, mayúsculas,
+    tildes y alias). La columna se factoriza y solo se normalizan los valores
+    únicos; los códigos se propagan de vuelta a las filas, por lo que el costo
+    depende de la cardinalidad y no del número de registros.
+    
+    Args:
+        df (pd.DataFrame): DataFrame con los datos
+        columnas (list): Columnas a canonicalizar (default COLUMNAS_CANONICAS)
+        alias (dict): Tabla de alias nombre -> canónico (default ALIAS_CANONICOS)
+        categorica (bool): Devolver las columnas como pd.Categorical (si no,
+            conservan el tipo de texto de la columna original)
+        
+    Returns:
+        pd.DataFrame: DataFrame con columnas canonicalizadas
+    """
+    if columnas is None:
+        columnas = COLUMNAS_CANONICAS
+    if alias is None:
+        alias = ALIAS_CANONICOS
+    
+    alias_normalizados = {normalizar_texto(k): v for k, v in alias.items()}
+    df_canonico = df.copy()
+    
+    for col in columnas:
+        if col not in df.columns:
+            reportar(f"✗ Columna '{col}' no encontrada")
+            continue
+        
+        codigos, unicos = pd.factorize(df[col])
+        normalizados = [normalizar_texto(valor) for valor in unicos]
+        normalizados = [alias_normalizados.get(valor, valor) for valor in normalizados]
+        
+        # Mapa de cada valor único original a su valor canónico
+        mapa, canonicos = pd.factorize(pd.Index(normalizados, dtype=object))
+        nuevos_codigos = np.full(len(codigos), -1, dtype=np.intp)
+        validos = codigos >= 0
+        nuevos_codigos[validos] = mapa[codigos[validos]]
+        
+        valores = pd.Categorical.from_codes(nuevos_codigos, categories=canonicos)
+        if not categorica and not isinstance(df[col].dtype, pd.CategoricalDtype):
+            original = df[col].dtype
+            valores = valores.astype(original if pd.api.types.is_string_dtype(original) else object)
+        df_canonico[col] = pd.Series(valores, index=df.index, name=col)
+        
+        reportar(f"✓ Columna '{col}' canonicalizada: {len(unicos)} valores -> {len(canonicos)} canónicos")
+    
+    return df_canonico
+
+
 def resumen_procesamiento(df_original, df_procesado):
     """
     Muestra resumen del procesamiento de datos
@@ -180,15 +266,18 @@ def resumen_procesamiento(df_original, df_procesado):
         df_original (pd.DataFrame): DataFrame original
         df_procesado (pd.DataFrame): DataFrame procesado
     """
-    print("\n" + "="*60)
-    print("RESUMEN DEL PROCESAMIENTO")
-    print("="*60)
-    print(f"Columnas originales: {df_original.shape[1]}")
-    print(f"Columnas procesadas: {df_procesado.shape[1]}")
-    print(f"Nuevas columnas: {df_procesado.shape[1] - df_original.shape[1]}")
-    print(f"\nValores nulos originales: {df_original.isnull().sum().sum()}")
-    print(f"Valores nulos procesados: {df_procesado.isnull().sum().sum()}")
-    print("="*60 + "\n")
+    if not reporte_activo():
+        return
+    
+    reportar("\n" + "="*60)
+    reportar("RESUMEN DEL PROCESAMIENTO")
+    reportar("="*60)
+    reportar(f"Columnas originales: {df_original.shape[1]}")
+    reportar(f"Columnas procesadas: {df_procesado.shape[1]}")
+    reportar(f"Nuevas columnas: {df_procesado.shape[1] - df_original.shape[1]}")
+    reportar(f"\nValores nulos originales: {df_original.isnull().sum().sum()}")
+    reportar(f"Valores nulos procesados: {df_procesado.isnull().sum().sum()}")
+    reportar("="*60 + "\n")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,116 @@
+"""
+Módulo de rangos: cálculo vectorizado con empates y caché por columna
+
+Spearman, Mann-Whitney y Kruskal-Wallis trabajan sobre rangos. Los rangos
+de cada columna (sobre sus valores no nulos, promedio en los empates) se
+calculan una vez por contenido de la columna y se reutilizan mientras los
+datos no cambien; la caché tiene un tamaño máximo en número de valores.
+"""
+from collections import OrderedDict
+
+import numpy as np
+
+try:
+    from .cache import huella_valores
+except ImportError:
+    from cache import huella_valores
+
+
+# Máximo de valores guardados en la caché de rangos (8 bytes cada uno)
+MAXIMO_VALORES_RANGOS = 10_000_000
+
+_rangos = OrderedDict()
+
+
+def calcular_rangos(datos, empates=False):
+    """
+    Rangos por columna (promedio en empates, NaN se mantiene) con un único
+    argsort de toda la matriz
+
+    Args:
+        datos (np.ndarray): Matriz n x p (o vector) con NaN en los faltantes
+        empates (bool): Devolver también la suma de t^3 - t de los empates
+            de cada columna (corrección de Mann-Whitney y Kruskal-Wallis)
+
+    Returns:
+        np.ndarray | tuple: Rangos con la forma de datos, y si se pide el
+            término de empates por columna
+    """
+    datos = np.asarray(datos, dtype=float)
+    vector = datos.ndim == 1
+    x = np.ascontiguousarray(datos.reshape(len(datos), -1).T)
+    p, n = x.shape
+    faltantes = np.isnan(x)
+    # Los empates se promedian, así que no hace falta un orden estable; los
+    # NaN se ordenan como +inf porque argsort es mucho más lento con NaN
+    orden = np.argsort(np.where(faltantes, np.inf, x), axis=1)
+    ordenados = np.take_along_axis(x, orden, axis=1)
+
+    # Grupos de empates: cada fila de x empieza un grupo nuevo
+    nuevo = np.ones(ordenados.shape, dtype=bool)
+    nuevo[:, 1:] = ordenados[:, 1:] != ordenados[:, :-1]
+    nuevo = nuevo.ravel()
+    inicios = np.flatnonzero(nuevo)
+    fines = np.append(inicios[1:], nuevo.size) - 1
+    promedio = (inicios % n + fines % n) / 2 + 1
+    rangos = promedio[np.cumsum(nuevo) - 1].reshape(ordenados.shape)
+    rangos[np.isnan(ordenados)] = np.nan
+
+    resultado = np.empty_like(x)
+    np.put_along_axis(resultado, orden, rangos, axis=1)
+    resultado = resultado[0] if vector else resultado.T
+    if not empates:
+        return resultado
+
+    tamanos = (fines - inicios + 1).astype(float)
+    validos = ~np.isnan(ordenados.ravel()[inicios])
+    termino = np.bincount(inicios[validos] // n, weights=tamanos[validos] ** 3 - tamanos[validos],
+                          minlength=p)
+    return resultado, (termino[0] if vector else termino)
+
+
+def rangos_columna(df, columna):
+    """
+    Rangos de una columna sobre sus valores no nulos, desde la caché si
+    la columna no cambió
+
+    Args:
+        df (pd.DataFrame): DataFrame con los datos
+        columna (str): Columna numérica
+
+    Returns:
+        tuple: (rangos como np.ndarray con NaN en los nulos, suma de t^3 - t
+            de los empates)
+    """
+    valores = df[columna].to_numpy(dtype=float, na_value=np.nan)
+    clave = huella_valores(valores)
+    if clave in _rangos:
+        _rangos.move_to_end(clave)
+        return _rangos[clave]
+
+    resultado = calcular_rangos(valores, empates=True)
+    _rangos[clave] = resultado
+    while sum(len(rangos) for rangos, _ in _rangos.values()) > MAXIMO_VALORES_RANGOS and len(_rangos) > 1:
+        _rangos.popitem(last=False)
+    return resultado
+
+
+def matriz_rangos(df, columnas):
+    """
+    Rangos de varias columnas (cada una sobre sus propios valores no nulos)
+
+    Args:
+        df (pd.DataFrame): DataFrame con los datos
+        columnas (list): Columnas numéricas
+
+    Returns:
+        np.ndarray: Matriz n x p de rangos
+    """
+    if not columnas:
+        return np.empty((len(df), 0))
+    return np.column_stack([rangos_columna(df, col)[0] for col in columnas])
+
+
+def limpiar_rangos():
+    """Vacía la caché de rangos"""
+    _rangos.clear()
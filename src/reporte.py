@@ -0,0 +1,78 @@
+"""
+Módulo de reporte: controla cómo se muestran los resultados de los análisis
+
+Las funciones de análisis siempre devuelven sus resultados (dict, DataFrame
+o tablas); la salida por consola es solo una forma de mostrarlos. Con el
+modo 'silencio' no se formatea ni se imprime nada, lo que conviene en lotes
+y en la API; con 'logging' los mensajes van al logger 'facturacion_medica'.
+"""
+import logging
+from contextlib import contextmanager
+
+
+MODOS_REPORTE = ('consola', 'silencio', 'logging')
+
+logger = logging.getLogger('facturacion_medica')
+
+_modo = 'consola'
+
+
+def configurar_reporte(modo='consola'):
+    """
+    Define cómo se reportan los resultados en toda la librería
+
+    Args:
+        modo (str): 'consola' (print), 'silencio' o 'logging'
+    """
+    global _modo
+    if modo not in MODOS_REPORTE:
+        raise ValueError(f"Modo '{modo}' no válido. Use {', '.join(MODOS_REPORTE)}")
+    _modo = modo
+
+
+def modo_reporte():
+    """Devuelve el modo de reporte actual"""
+    return _modo
+
+
+def reporte_activo():
+    """True si los resultados se deben formatear y mostrar"""
+    return _modo != 'silencio'
+
+
+@contextmanager
+def modo_temporal(modo):
+    """
+    Cambia el modo de reporte dentro de un bloque with
+
+    Args:
+        modo (str): 'consola', 'silencio' o 'logging'
+    """
+    anterior = _modo
+    configurar_reporte(modo)
+    try:
+        yield
+    finally:
+        configurar_reporte(anterior)
+
+
+def silencio():
+    """Bloque with en el que no se muestra ningún resultado"""
+    return modo_temporal('silencio')
+
+
+def reportar(*valores, sep=' ', end='\n'):
+    """
+    Muestra un mensaje según el modo de reporte (misma firma que print)
+
+    Args:
+        *valores: Valores a mostrar
+        sep (str): Separador entre valores
+        end (str): Terminación del mensaje
+    """
+    if _modo == 'silencio':
+        return
+    if _modo == 'consola':
+        print(*valores, sep=sep, end=end)
+    else:
+        logger.info(sep.join(str(valor) for valor in valores).strip('\n'))
@@ -0,0 +1,409 @@
+"""
+Módulo de series de tiempo: conteos y sumas de montos por hora, día o
+semana, y ventanas móviles de 7 y 30 días
+
+Los agregados se guardan por cubeta (periodo y claves de agrupación) y se
+actualizan de forma incremental: agregar un bloque de datos, por ejemplo
+un día nuevo, suma sus cubetas a la tabla y, al leer las ventanas, solo
+se recalculan las que terminan desde el primer día que ese bloque toca.
+"""
+import pandas as pd
+import numpy as np
+
+try:
+    from .carga_datos import iterar_bloques
+    from .sketches import pares_por_codigo, estimar_pares, distintos_moviles
+except ImportError:
+    from carga_datos import iterar_bloques
+    from sketches import pares_por_codigo, estimar_pares, distintos_moviles
+
+
+FRECUENCIAS = ('hora', 'dia', 'semana')
+
+VENTANAS_MOVILES = (7, 30)
+
+
+def _convertir_unicos(valores, conversion):
+    """Aplica una conversión de texto solo a los valores únicos (horas y fechas se repiten mucho)"""
+    codigos, unicos = pd.factorize(np.asarray(valores, dtype=object), use_na_sentinel=False)
+    return conversion(pd.Series(unicos, dtype=object)).to_numpy()[codigos]
+
+
+def _a_duracion(horas):
+    """Horas HH:MM:SS como duraciones (formato fijo rápido; el resto con to_timedelta)"""
+    instantes = pd.to_datetime(horas, format='%H:%M:%S', errors='coerce')
+    duraciones = instantes - instantes.dt.normalize()
+    otras = duraciones.isna() & horas.notna()
+    if otras.any():
+        duraciones[otras] = pd.to_timedelta(horas[otras], errors='coerce')
+    return duraciones
+
+
+def marcas_de_tiempo(df, columna_fecha, columna_hora=None):
+    """
+    Combina fecha y hora en una marca de tiempo
+
+    Args:
+        df (pd.DataFrame): DataFrame con los datos
+        columna_fecha (str): Columna de fecha (YYYYMMDD o ISO)
+        columna_hora (str): Columna de hora HH:MM:SS (opcional)
+
+    Returns:
+        pd.Series: Marcas de tiempo (NaT si la fecha no es válida)
+    """
+    marcas = pd.Series(_convertir_unicos(df[columna_fecha], lambda unicos: pd.to_datetime(
+        unicos, errors='coerce', format='mixed')), index=df.index)
+    if columna_hora is not None and columna_hora in df.columns:
+        horas = pd.Series(_convertir_unicos(df[columna_hora], _a_duracion), index=df.index)
+        marcas = marcas + horas.fillna(pd.Timedelta(0))
+    return marcas
+
+
+def inicio_periodo(marcas, frecuencia):
+    """
+    Inicio del periodo (hora, día o semana desde el lunes) de cada marca
+
+    Args:
+        marcas (pd.Series): Marcas de tiempo
+        frecuencia (str): 'hora', 'dia' o 'semana'
+
+    Returns:
+        pd.Series: Inicio del periodo de cada marca
+    """
+    if frecuencia == 'hora':
+        return marcas.dt.floor('h')
+    if frecuencia == 'dia':
+        return marcas.dt.normalize()
+    if frecuencia == 'semana':
+        return marcas.dt.normalize() - pd.to_timedelta(marcas.dt.dayofweek, unit='D')
+    raise ValueError(f"Frecuencia '{frecuencia}' no válida. Use {', '.join(FRECUENCIAS)}")
+
+
+class AgregadoTemporal:
+    """
+    Conteo de registros, suma de montos y valores distintos aproximados
+    (HyperLogLog) por (periodo, claves)
+
+    Las cubetas son una tabla indexada por (periodo, claves) y cada bloque
+    se suma con un solo add(fill_value=0). Los distintos se guardan como un
+    sketch disperso por cubeta: pares (registro, rango) con el máximo de
+    cada registro. Con frecuencia 'dia' se obtienen también las ventanas
+    móviles, como sumas móviles sobre la tabla diaria y combinando los
+    sketches de sus días al leerlas; se guardan y después solo se
+    recalculan las que terminan desde el primer día modificado.
+
+    Args:
+        columna_fecha (str): Columna de fecha (YYYYMMDD o ISO)
+        columna_hora (str): Columna de hora HH:MM:SS (opcional)
+        frecuencia (str): 'hora', 'dia' o 'semana'
+        claves (list): Columnas de agrupación, p. ej. ['aseguradora']
+        columnas_monto (list): Columnas numéricas a sumar
+        ventanas (tuple): Días de las ventanas móviles (solo frecuencia 'dia')
+        columnas_distintas (list): Columnas cuyos valores distintos se cuentan,
+            p. ej. ['doC_PACIENTE']
+        precision (int): Precisión de los sketches de distintos
+    """
+
+    def __init__(self, columna_fecha, columna_hora=None, frecuencia='dia', claves=None,
+                 columnas_monto=None, ventanas=(), columnas_distintas=None, precision=12):
+        if frecuencia not in FRECUENCIAS:
+            raise ValueError(f"Frecuencia '{frecuencia}' no válida. Use {', '.join(FRECUENCIAS)}")
+        if ventanas and frecuencia != 'dia':
+            raise ValueError("Las ventanas móviles solo se calculan con frecuencia 'dia'")
+        self.columna_fecha = columna_fecha
+        self.columna_hora = columna_hora
+        self.frecuencia = frecuencia
+        self.claves = list(claves or [])
+        self.columnas_monto = list(columnas_monto or [])
+        self.ventanas = tuple(ventanas)
+        self.columnas_distintas = list(columnas_distintas or [])
+        self.precision = precision
+        self.cubetas = pd.DataFrame(columns=self.columnas, dtype=float,
+                                    index=self._indice_vacio('periodo'))
+        # Por columna: pares (periodo, claves..., registro, rango) ya reducidos y bloques pendientes
+        self.pares = {col: None for col in self.columnas_distintas}
+        self._pares_pendientes = {col: [] for col in self.columnas_distintas}
+        # Ventanas ya calculadas y, por ventana, primer día modificado desde entonces
+        self._ventanas = {}
+        self._modificado_desde = {}
+        self.ultimo_periodo = None
+
+    @property
+    def columnas(self):
+        """Columnas de cada cubeta: conteo y una suma por columna de monto"""
+        return ['n'] + self.columnas_monto
+
+    def _indice_vacio(self, nombre_periodo):
+        if not self.claves:
+            return pd.DatetimeIndex([], name=nombre_periodo)
+        return pd.MultiIndex.from_arrays([pd.DatetimeIndex([])] + [[] for _ in self.claves],
+                                         names=[nombre_periodo] + self.claves)
+
+    def _sumar(self, parcial, pares=None):
+        """Suma una tabla de cubetas (y los pares de sus sketches de distintos)"""
+        if parcial.empty:
+            return
+        self.cubetas = parcial.copy() if self.cubetas.empty else self.cubetas.add(parcial, fill_value=0)
+        for col, nuevos in (pares or {}).items():
+            self._agregar_pares(col, nuevos)
+
+        periodos = parcial.index.get_level_values(0)
+        primero, ultimo = periodos.min(), periodos.max()
+        for dias in self.ventanas:
+            if dias not in self._modificado_desde or primero < self._modificado_desde[dias]:
+                self._modificado_desde[dias] = primero
+        if self.ultimo_periodo is None or ultimo > self.ultimo_periodo:
+            self.ultimo_periodo = ultimo
+
+    def _agregar_pares(self, col, nuevos):
+        """Deja pendientes los pares de un bloque; se reducen cuando superan a los ya reducidos"""
+        pendientes = self._pares_pendientes[col]
+        pendientes.append(nuevos)
+        reducidos = 0 if self.pares[col] is None else len(self.pares[col])
+        if sum(len(bloque) for bloque in pendientes) > reducidos:
+            self._reducir_pares(col)
+
+    def _reducir_pares(self, col):
+        """Máximo rango por (cubeta, registro) de los pares reducidos y los pendientes"""
+        bloques = [self.pares[col]] if self.pares[col] is not None else []
+        todos = pd.concat(bloques + self._pares_pendientes[col], ignore_index=True)
+        self.pares[col] = todos.groupby(['periodo'] + self.claves + ['registro'], sort=False,
+                                        dropna=False)['rango'].max().reset_index()
+        self._pares_pendientes[col] = []
+
+    def _pares(self, col):
+        """Pares reducidos de una columna de distintos"""
+        if self._pares_pendientes[col]:
+            self._reducir_pares(col)
+        return self.pares[col]
+
+    def update(self, bloque, marcas=None):
+        """
+        Agrega un bloque de datos (se ignoran las filas sin fecha válida)
+
+        Args:
+            bloque (pd.DataFrame): Bloque con fecha, claves y montos
+            marcas (pd.Series): Marcas de tiempo del bloque ya calculadas con
+                marcas_de_tiempo (opcional; evita convertir las fechas de
+                nuevo cuando varios agregados leen el mismo bloque)
+
+        Returns:
+            AgregadoTemporal: El propio agregado
+        """
+        if marcas is None:
+            marcas = marcas_de_tiempo(bloque, self.columna_fecha, self.columna_hora)
+        periodos = inicio_periodo(marcas, self.frecuencia)
+        datos = pd.DataFrame({'periodo': periodos.to_numpy()})
+        for col in self.claves:
+            datos[col] = bloque[col].to_numpy()
+        datos['n'] = 1.0
+        for col in self.columnas_monto:
+            datos[col] = pd.to_numeric(bloque[col], errors='coerce').fillna(0).to_numpy(dtype=float)
+        datos = datos[datos['periodo'].notna()]
+
+        # Una agregación por bloque, ordenada: sumarla a las cubetas une índices ordenados
+        agrupado = datos.groupby(['periodo'] + self.claves, sort=True, dropna=False)
+        parcial = agrupado[self.columnas].sum()
+        pares = {}
+        if self.columnas_distintas:
+            # ngroup numera las cubetas en el mismo orden que parcial
+            codigos = agrupado.ngroup().to_numpy()
+            for col in self.columnas_distintas:
+                valores = bloque[col].to_numpy()[datos.index.to_numpy()]
+                cubetas, registros, rangos = pares_por_codigo(valores, codigos, self.precision)
+                pares[col] = parcial.index.take(cubetas).to_frame(index=False).assign(
+                    registro=registros, rango=rangos)
+        self._sumar(parcial, pares)
+        return self
+
+    def merge(self, otro):
+        """
+        Combina el agregado construido sobre otra parte de los datos
+
+        Args:
+            otro (AgregadoTemporal): Agregado con la misma configuración
+
+        Returns:
+            AgregadoTemporal: El propio agregado
+        """
+        configuracion = (self.frecuencia, self.claves, self.columnas_monto,
+                         self.columnas_distintas, self.precision)
+        if (otro.frecuencia, otro.claves, otro.columnas_monto,
+                otro.columnas_distintas, otro.precision) != configuracion:
+            raise ValueError("Solo se pueden combinar agregados con la misma configuración")
+        pares = {col: otro._pares(col) for col in self.columnas_distintas}
+        self._sumar(otro.cubetas, {col: tabla for col, tabla in pares.items() if tabla is not None})
+        return self
+
+    def _claves_pares(self, pares, con_periodo=True):
+        """Índice de cubetas (o solo de claves) de cada par, para ubicarlo con get_indexer"""
+        columnas = (['periodo'] if con_periodo else []) + self.claves
+        if len(columnas) == 1:
+            return pd.Index(pares[columnas[0]])
+        return pd.MultiIndex.from_frame(pares[columnas])
+
+    def _tabla_desde(self, tabla, nombre_periodo):
+        tabla = tabla.sort_index()
+        tabla.index = tabla.index.set_names([nombre_periodo] + self.claves)
+        tabla['n'] = tabla['n'].astype(np.int64)
+        for col in self.columnas_distintas:
+            tabla[f'distintos_{col}'] = np.round(tabla[f'distintos_{col}']).astype(np.int64)
+        return tabla
+
+    def tabla(self):
+        """
+        Tabla de cubetas
+
+        Returns:
+            pd.DataFrame: Indexada por (periodo, claves...) con n, sumas de
+                montos y distintos_<columna>
+        """
+        tabla = self.cubetas.copy()
+        for col in self.columnas_distintas:
+            pares = self._pares(col)
+            if pares is None:
+                tabla[f'distintos_{col}'] = 0.0
+                continue
+            cubetas = tabla.index.get_indexer(self._claves_pares(pares))
+            tabla[f'distintos_{col}'] = estimar_pares(cubetas, pares['rango'].to_numpy(), len(tabla),
+                                                      self.precision)
+        return self._tabla_desde(tabla, 'periodo')
+
+    def _calcular_ventana(self, dias, desde):
+        """
+        Ventanas de `dias` días que terminan entre desde y el último día con
+        datos (solo lee las cubetas y los pares de desde - dias + 1 en adelante)
+        """
+        inicio = desde - pd.Timedelta(days=dias - 1)
+        diarias = self.cubetas[self.cubetas.index.get_level_values(0) >= inicio]
+        fechas = pd.date_range(inicio, self.ultimo_periodo, freq='D')
+        posicion_dia = ((diarias.index.get_level_values(0) - inicio) // pd.Timedelta(days=1)).to_numpy()
+        if self.claves:
+            codigos, claves = _codigos_claves(diarias.index.droplevel(0))
+        else:
+            codigos, claves = np.zeros(len(diarias), dtype=np.intp), None
+        n_claves = codigos.max() + 1
+
+        # Matriz días x claves x columnas, sin huecos, y sumas móviles por diferencia de acumuladas
+        matriz = np.zeros((len(fechas) + 1, n_claves, len(self.columnas)))
+        matriz[posicion_dia + 1, codigos] = diarias.to_numpy(dtype=float)
+        acumuladas = matriz.cumsum(axis=0)
+        moviles = acumuladas[dias:] - acumuladas[:-dias]
+
+        # Solo las ventanas con algún registro
+        filas, cods = np.nonzero(moviles[:, :, 0] > 0)
+        fin = fechas[dias - 1 + filas]
+        if self.claves:
+            claves_filas = claves.take(cods)
+            indice = pd.MultiIndex.from_arrays(
+                [fin] + [claves_filas.get_level_values(i) for i in range(claves_filas.nlevels)],
+                names=['fin'] + self.claves)
+        else:
+            indice = pd.DatetimeIndex(fin, name='fin')
+        tabla = pd.DataFrame(moviles[filas, cods], index=indice, columns=self.columnas)
+
+        for col in self.columnas_distintas:
+            pares = self._pares(col)
+            if pares is None:
+                tabla[f'distintos_{col}'] = 0.0
+                continue
+            pares = pares[pares['periodo'] >= inicio]
+            tiempos = ((pares['periodo'] - inicio) // pd.Timedelta(days=1)).to_numpy()
+            codigos_pares = (claves.get_indexer(self._claves_pares(pares, con_periodo=False)) if self.claves
+                             else np.zeros(len(pares), dtype=np.intp))
+            estimaciones = distintos_moviles(tiempos, codigos_pares, pares['registro'].to_numpy(),
+                                             pares['rango'].to_numpy(), dias, len(fechas), n_claves,
+                                             self.precision)
+            tabla[f'distintos_{col}'] = estimaciones[dias - 1 + filas, cods]
+        return tabla
+
+    def ventana_movil(self, dias):
+        """
+        Totales de la ventana móvil de los últimos `dias` días que termina
+        en cada día, hasta el último día con datos
+
+        Args:
+            dias (int): Tamaño de la ventana (debe estar en ventanas)
+
+        Returns:
+            pd.DataFrame: Indexada por (fin, claves...) con n, sumas de
+                montos y distintos_<columna>
+        """
+        if dias not in self.ventanas:
+            raise ValueError(f"Ventana de {dias} días no calculada. Disponibles: {self.ventanas}")
+        if self.cubetas.empty:
+            vacia = pd.DataFrame(columns=self.columnas + [f'distintos_{col}' for col in self.columnas_distintas],
+                                 dtype=float, index=self._indice_vacio('fin'))
+            return self._tabla_desde(vacia, 'fin')
+
+        anterior = self._ventanas.get(dias)
+        desde = self._modificado_desde.pop(dias, None)
+        if anterior is not None and desde is None:
+            return anterior
+        if anterior is None:
+            desde = self.cubetas.index.get_level_values(0).min()
+        # Si no, solo cambian las ventanas que terminan desde el primer día modificado
+        nuevas = self._tabla_desde(self._calcular_ventana(dias, desde), 'fin')
+        if anterior is not None:
+            nuevas = pd.concat([anterior[anterior.index.get_level_values(0) < desde], nuevas]).sort_index()
+        self._ventanas[dias] = nuevas
+        return nuevas
+
+
+def _codigos_claves(claves):
+    """Código de cada combinación de claves (los nulos también son una clave) y las combinaciones"""
+    codigos = pd.Series(0, index=claves).groupby(level=list(range(claves.nlevels)), sort=False,
+                                                  dropna=False).ngroup().to_numpy()
+    primeros = np.unique(codigos, return_index=True)[1]
+    return codigos, claves[primeros]
+
+
+def agregados_temporales(fuente, columna_fecha, columna_hora=None, claves=None,
+                         columnas_monto=None, ventanas=VENTANAS_MOVILES, tamano_bloque=100_000,
+                         columnas_distintas=None, precision=12):
+    """
+    Conteos y sumas por hora, día y semana, y ventanas móviles diarias
+
+    Args:
+        fuente: DataFrame, lista de DataFrames o función que genera bloques
+        columna_fecha (str): Columna de fecha, p. ej. 'fechA_CREACION'
+        columna_hora (str): Columna de hora, p. ej. 'horA_CREACION' (opcional)
+        claves (list): Columnas de agrupación, p. ej. ['aseguradora']
+        columnas_monto (list): Columnas numéricas a sumar
+        ventanas (tuple): Días de las ventanas móviles
+        tamano_bloque (int): Filas por bloque si la fuente es un DataFrame
+        columnas_distintas (list): Columnas con conteo de distintos, p. ej. ['doC_PACIENTE']
+        precision (int): Precisión de los sketches de distintos
+
+    Returns:
+        dict: Tablas 'hora', 'dia', 'semana' y 'ventana_<dias>'
+    """
+    distintos = {'columnas_distintas': columnas_distintas, 'precision': precision}
+    agregados = {
+        'hora': AgregadoTemporal(columna_fecha, columna_hora, 'hora', claves, columnas_monto, **distintos),
+        'dia': AgregadoTemporal(columna_fecha, columna_hora, 'dia', claves, columnas_monto, ventanas, **distintos),
+        'semana': AgregadoTemporal(columna_fecha, columna_hora, 'semana', claves, columnas_monto, **distintos)
+    }
+    for bloque in iterar_bloques(fuente, tamano_bloque):
+        # Las fechas se convierten una vez por bloque para los tres agregados
+        marcas = marcas_de_tiempo(bloque, columna_fecha, columna_hora)
+        for agregado in agregados.values():
+            agregado.update(bloque, marcas)
+
+    resultados = {frecuencia: agregado.tabla() for frecuencia, agregado in agregados.items()}
+    for dias in ventanas:
+        resultados[f'ventana_{dias}'] = agregados['dia'].ventana_movil(dias)
+    return resultados
+
+
+if __name__ == "__main__":
+    from carga_datos import cargar_json
+
+    # Cargar datos
+    df = cargar_json('../data/facturacion_medica.json')
+
+    if df is not None:
+        resultados = agregados_temporales(df, 'fechA_CREACION', 'horA_CREACION',
+                                          ['aseguradora'], ['montO_TOTAL'])
+        print(resultados['dia'])
+        print(resultados['ventana_7'])
@@ -0,0 +1,705 @@
+"""
+Módulo de sketches: resúmenes compactos y combinables de columnas grandes
+"""
+import os
+import json
+
+import pandas as pd
+import numpy as np
+
+try:
+    from .reporte import reportar
+except ImportError:
+    from reporte import reportar
+
+
+class SketchCuantiles:
+    """
+    Sketch KLL para cuantiles aproximados con memoria acotada
+    
+    Mantiene una jerarquía de compactadores: el nivel h guarda elementos con
+    peso 2^h. Mientras no se compacta nada los cuantiles son exactos (misma
+    interpolación lineal que pandas); después el error de rango normalizado
+    es aproximadamente error_rango(). Dos sketches se combinan con merge(),
+    lo que permite construirlos por bloques o en procesos distintos.
+    
+    Args:
+        k (int): Capacidad del compactador superior (mayor k = más precisión)
+        semilla (int): Semilla para la elección aleatoria al compactar
+    """
+    
+    def __init__(self, k=200, semilla=None):
+        self.k = int(k)
+        self.n = 0
+        self.minimo = np.inf
+        self.maximo = -np.inf
+        self.niveles = [np.empty(0)]
+        self.semilla = semilla
+        self._rng = np.random.default_rng(semilla)
+    
+    def _capacidad(self, nivel):
+        profundidad = len(self.niveles) - nivel - 1
+        return max(2, int(np.ceil(self.k * (2 / 3) ** profundidad)))
+    
+    def _compactar(self):
+        """Compacta niveles hasta que el sketch respete su capacidad total"""
+        while sum(len(nivel) for nivel in self.niveles) > sum(self._capacidad(h) for h in range(len(self.niveles))):
+            for h, nivel in enumerate(self.niveles):
+                if len(nivel) >= self._capacidad(h):
+                    break
+            if h + 1 == len(self.niveles):
+                self.niveles.append(np.empty(0))
+            
+            datos = np.sort(self.niveles[h])
+            par = len(datos) - len(datos) % 2
+            desplazamiento = int(self._rng.integers(2))
+            self.niveles[h + 1] = np.concatenate([self.niveles[h + 1], datos[desplazamiento:par:2]])
+            self.niveles[h] = datos[par:]
+    
+    def update(self, valores):
+        """
+        Agrega valores al sketch (se ignoran los nulos)
+        
+        Args:
+            valores (array-like): Valores numéricos
+            
+        Returns:
+            SketchCuantiles: El propio sketch
+        """
+        valores = np.asarray(valores, dtype=float).ravel()
+        valores = valores[~np.isnan(valores)]
+        if len(valores) == 0:
+            return self
+        
+        self.n += len(valores)
+        self.minimo = min(self.minimo, valores.min())
+        self.maximo = max(self.maximo, valores.max())
+        self.niveles[0] = np.concatenate([self.niveles[0], valores])
+        self._compactar()
+        return self
+    
+    def merge(self, otro):
+        """
+        Combina otro sketch en este
+        
+        Args:
+            otro (SketchCuantiles): Sketch con el mismo k
+            
+        Returns:
+            SketchCuantiles: El propio sketch
+        """
+        if otro.k != self.k:
+            raise ValueError(f"No se pueden combinar sketches con k distinto ({self.k} y {otro.k})")
+        
+        while len(self.niveles) < len(otro.niveles):
+            self.niveles.append(np.empty(0))
+        for h, nivel in enumerate(otro.niveles):
+            self.niveles[h] = np.concatenate([self.niveles[h], nivel])
+        
+        self.n += otro.n
+        self.minimo = min(self.minimo, otro.minimo)
+        self.maximo = max(self.maximo, otro.maximo)
+        self._compactar()
+        return self
+    
+    @property
+    def exacto(self):
+        """True mientras el sketch conserva todos los valores"""
+        return len(self.niveles) == 1
+    
+    def items_ponderados(self):
+        """
+        Devuelve los elementos guardados ordenados y sus pesos
+        
+        Returns:
+            tuple: (valores, pesos) como arrays de NumPy
+        """
+        valores = np.concatenate(self.niveles)
+        pesos = np.concatenate([np.full(len(nivel), 2 ** h, dtype=np.int64)
+                                for h, nivel in enumerate(self.niveles)])
+        orden = np.argsort(valores, kind='stable')
+        return valores[orden], pesos[orden]
+    
+    def cuantiles(self, qs):
+        """
+        Calcula cuantiles aproximados
+        
+        Args:
+            qs (array-like): Cuantiles entre 0 y 1
+            
+        Returns:
+            np.ndarray: Valores de los cuantiles (NaN si el sketch está vacío)
+        """
+        qs = np.atleast_1d(np.asarray(qs, dtype=float))
+        if self.n == 0:
+            return np.full(len(qs), np.nan)
+        if self.exacto:
+            return np.quantile(self.niveles[0], qs)
+        
+        valores, pesos = self.items_ponderados()
+        resultado = cuantil_ponderado(valores, pesos, qs)
+        resultado[qs <= 0] = self.minimo
+        resultado[qs >= 1] = self.maximo
+        return resultado
+    
+    def cuantil(self, q):
+        """Calcula un único cuantil aproximado"""
+        return float(self.cuantiles([q])[0])
+    
+    def error_rango(self):
+        """
+        Error de rango normalizado aproximado (99% de confianza) del sketch
+        
+        Returns:
+            float: 0 mientras el sketch es exacto
+        """
+        return 0.0 if self.exacto else 2.296 / self.k ** 0.9723
+    
+    def tamano(self):
+        """Número de elementos guardados en el sketch"""
+        return sum(len(nivel) for nivel in self.niveles)
+    
+    def a_dict(self):
+        """
+        Representación serializable en JSON del sketch
+        
+        Returns:
+            dict: Parámetros, extremos y niveles del sketch
+        """
+        return {
+            'k': self.k,
+            'n': self.n,
+            'semilla': self.semilla,
+            'minimo': None if self.n == 0 else float(self.minimo),
+            'maximo': None if self.n == 0 else float(self.maximo),
+            'niveles': [nivel.tolist() for nivel in self.niveles]
+        }
+    
+    @classmethod
+    def desde_dict(cls, datos):
+        """
+        Reconstruye un sketch desde su representación a_dict()
+        
+        Args:
+            datos (dict): Sketch serializado
+            
+        Returns:
+            SketchCuantiles: Sketch reconstruido
+        """
+        sketch = cls(datos['k'], datos.get('semilla'))
+        sketch.n = datos['n']
+        if sketch.n:
+            sketch.minimo = datos['minimo']
+            sketch.maximo = datos['maximo']
+        sketch.niveles = [np.asarray(nivel, dtype=float) for nivel in datos['niveles']]
+        return sketch
+    
+    def guardar(self, ruta_archivo):
+        """
+        Guarda el sketch en un archivo JSON
+        
+        Args:
+            ruta_archivo (str): Ruta del archivo de destino
+        """
+        with open(ruta_archivo, 'w', encoding='utf-8') as archivo:
+            json.dump(self.a_dict(), archivo)
+    
+    @classmethod
+    def cargar(cls, ruta_archivo):
+        """
+        Carga un sketch guardado con guardar()
+        
+        Args:
+            ruta_archivo (str): Ruta del archivo JSON
+            
+        Returns:
+            SketchCuantiles: Sketch cargado
+        """
+        with open(ruta_archivo, 'r', encoding='utf-8') as archivo:
+            return cls.desde_dict(json.load(archivo))
+
+
+def cuantil_ponderado(valores, pesos, qs):
+    """
+    Cuantiles de una muestra ordenada con pesos (primer valor cuyo peso
+    acumulado alcanza q * total)
+    
+    Args:
+        valores (np.ndarray): Valores ordenados ascendentemente
+        pesos (np.ndarray): Peso de cada valor
+        qs (array-like): Cuantiles entre 0 y 1
+        
+    Returns:
+        np.ndarray: Valores de los cuantiles
+    """
+    acumulado = np.cumsum(pesos)
+    objetivo = np.asarray(qs, dtype=float) * acumulado[-1]
+    posiciones = np.searchsorted(acumulado, objetivo, side='left')
+    return valores[np.minimum(posiciones, len(valores) - 1)].astype(float)
+
+
+def cuartiles_desde_sketch(sketch):
+    """
+    Cuartiles y percentiles con las mismas claves que calcular_cuartiles
+    
+    Args:
+        sketch (SketchCuantiles): Sketch de la columna
+        
+    Returns:
+        dict: Mínimo, Q1, mediana, Q3, máximo, P10 y P90
+    """
+    p10, q1, mediana, q3, p90 = sketch.cuantiles([0.10, 0.25, 0.50, 0.75, 0.90])
+    return {
+        'minimo': sketch.minimo if sketch.n else np.nan,
+        'Q1': q1,
+        'Q2_mediana': mediana,
+        'Q3': q3,
+        'maximo': sketch.maximo if sketch.n else np.nan,
+        'P10': p10,
+        'P90': p90
+    }
+
+
+def sketches_por_dia(df, columna_fecha, columna_valor, k=200):
+    """
+    Construye un sketch de cuantiles por día
+    
+    Args:
+        df (pd.DataFrame): DataFrame con los datos
+        columna_fecha (str): Columna de fecha (ISO o YYYYMMDD)
+        columna_valor (str): Columna numérica a resumir
+        k (int): Precisión de los sketches
+        
+    Returns:
+        dict: 'YYYY-MM-DD' -> SketchCuantiles
+    """
+    fechas = pd.to_datetime(df[columna_fecha], errors='coerce', format='mixed').dt.strftime('%Y-%m-%d')
+    valores = pd.to_numeric(df[columna_valor], errors='coerce').to_numpy(dtype=float, na_value=np.nan)
+    
+    # Un único ordenamiento por código de día
+    codigos, dias = pd.factorize(fechas)
+    orden = np.argsort(codigos, kind='stable')
+    cortes = np.flatnonzero(np.diff(codigos[orden])) + 1
+    
+    sketches = {}
+    for posiciones in np.split(orden, cortes):
+        if len(posiciones) and codigos[posiciones[0]] >= 0:
+            sketches[dias[codigos[posiciones[0]]]] = SketchCuantiles(k, semilla=0).update(valores[posiciones])
+    return sketches
+
+
+def combinar_rango(sketches, desde=None, hasta=None):
+    """
+    Combina los sketches diarios de un rango de fechas (inclusivo)
+    
+    Args:
+        sketches (dict): 'YYYY-MM-DD' -> SketchCuantiles
+        desde (str): Primer día del rango (opcional)
+        hasta (str): Último día del rango (opcional)
+        
+    Returns:
+        SketchCuantiles: Sketch del rango completo
+    """
+    dias = sorted(dia for dia in sketches
+                  if (desde is None or dia >= desde) and (hasta is None or dia <= hasta))
+    k = next(iter(sketches.values())).k if sketches else 200
+    combinado = SketchCuantiles(k, semilla=0)
+    for dia in dias:
+        combinado.merge(sketches[dia])
+    return combinado
+
+
+def guardar_sketches_diarios(sketches, directorio, nombre):
+    """
+    Guarda un archivo JSON por día: <directorio>/<nombre>_<YYYY-MM-DD>.json
+    
+    Args:
+        sketches (dict): 'YYYY-MM-DD' -> SketchCuantiles
+        directorio (str): Directorio de destino
+        nombre (str): Prefijo de los archivos (p. ej. la columna)
+    """
+    os.makedirs(directorio, exist_ok=True)
+    for dia, sketch in sketches.items():
+        sketch.guardar(os.path.join(directorio, f"{nombre}_{dia}.json"))
+    reportar(f"✓ {len(sketches)} sketches diarios guardados en: {directorio}")
+
+
+def cargar_sketches_diarios(directorio, nombre, desde=None, hasta=None):
+    """
+    Carga los sketches diarios guardados con guardar_sketches_diarios
+    
+    Args:
+        directorio (str): Directorio con los archivos
+        nombre (str): Prefijo de los archivos
+        desde (str): Primer día a cargar (opcional)
+        hasta (str): Último día a cargar (opcional)
+        
+    Returns:
+        dict: 'YYYY-MM-DD' -> SketchCuantiles
+    """
+    prefijo = f"{nombre}_"
+    sketches = {}
+    for archivo in sorted(os.listdir(directorio)):
+        if not (archivo.startswith(prefijo) and archivo.endswith('.json')):
+            continue
+        dia = archivo[len(prefijo):-len('.json')]
+        if (desde is None or dia >= desde) and (hasta is None or dia <= hasta):
+            sketches[dia] = SketchCuantiles.cargar(os.path.join(directorio, archivo))
+    return sketches
+
+
+def _hash_valores(valores):
+    """
+    Hash de 64 bits estable (misma salida entre procesos y sesiones) del
+    texto de cada valor, así 7589711 y '7589711' cuentan como el mismo.
+    Solo se calcula el hash de los valores únicos.
+    """
+    codigos, unicos = pd.factorize(np.asarray(valores))
+    return pd.util.hash_array(np.asarray(unicos, dtype=str).astype(object), categorize=False)[codigos]
+
+
+def _longitud_bits(valores):
+    """Número de bits significativos de enteros sin signo de 64 bits"""
+    altos = (valores >> np.uint64(32)).astype(np.float64)
+    bajos = (valores & np.uint64(0xFFFFFFFF)).astype(np.float64)
+    # frexp es exacto para enteros de 32 bits: x = m * 2^e con m en [0.5, 1)
+    return np.where(altos > 0, 32 + np.frexp(altos)[1], np.frexp(bajos)[1])
+
+
+def posiciones_hll(valores, precision=12):
+    """
+    Registro y rango (posición del primer bit en 1) de cada valor para HyperLogLog
+
+    Args:
+        valores (array-like): Valores a contar (se ignoran los nulos)
+        precision (int): Bits usados para elegir el registro (m = 2^precision)
+
+    Returns:
+        tuple: (registros, rangos) como arrays de NumPy
+    """
+    valores = pd.Series(valores)
+    hashes = _hash_valores(valores[valores.notna()].to_numpy())
+    bits_restantes = 64 - precision
+    registros = (hashes >> np.uint64(bits_restantes)).astype(np.intp)
+    resto = hashes & np.uint64((1 << bits_restantes) - 1)
+    rangos = (bits_restantes + 1 - _longitud_bits(resto)).astype(np.uint8)
+    return registros, rangos
+
+
+def _validar_precision(precision):
+    if not 4 <= precision <= 18:
+        raise ValueError(f"Precisión {precision} no válida. Use un valor entre 4 y 18")
+
+
+def _maximo_por_clave(claves, rangos):
+    """Claves distintas (ordenadas) y el mayor rango de cada una"""
+    if len(claves) == 0:
+        return claves, rangos
+    orden = np.argsort(claves, kind='stable')
+    claves = claves[orden]
+    inicios = np.flatnonzero(np.r_[True, claves[1:] != claves[:-1]])
+    return claves[inicios], np.maximum.reduceat(rangos[orden], inicios)
+
+
+def pares_por_codigo(valores, codigos, precision=12):
+    """
+    Registros HyperLogLog no vacíos de cada grupo como pares (registro, rango)
+
+    Cada grupo guarda solo los registros que tocan sus valores, así que un
+    grupo con uno o dos valores ocupa uno o dos pares y no 2^precision bytes.
+
+    Args:
+        valores (array-like): Valores a contar (se ignoran los nulos)
+        codigos (np.ndarray): Código de grupo de cada valor (-1 = sin grupo)
+        precision (int): Bits usados para elegir el registro
+
+    Returns:
+        tuple: (codigos, registros, rangos) de los pares distintos con su
+            mayor rango, ordenados por código y registro
+    """
+    _validar_precision(precision)
+    valores = pd.Series(np.asarray(valores, dtype=object))
+    codigos = np.asarray(codigos)
+    validos = valores.notna().to_numpy() & (codigos >= 0)
+    registros, rangos = posiciones_hll(valores[validos].to_numpy(), precision)
+
+    # Un solo orden por la clave combinada (código, registro)
+    claves, rangos = _maximo_por_clave((codigos[validos].astype(np.int64) << precision) | registros, rangos)
+    return claves >> precision, claves & ((1 << precision) - 1), rangos
+
+
+def estimar_hll(no_vacios, suma, precision):
+    """
+    Estimación HyperLogLog (con conteo lineal para conteos pequeños) a
+    partir de los registros, vectorizada para muchos sketches a la vez
+
+    Args:
+        no_vacios (array-like): Registros no vacíos de cada sketch
+        suma (array-like): Suma de 2^-registro sobre los m registros
+        precision (int): Precisión de los sketches
+
+    Returns:
+        np.ndarray: Estimación del conteo de distintos de cada sketch
+    """
+    m = 1 << precision
+    alfa = 0.7213 / (1 + 1.079 / m)
+    estimacion = alfa * m * m / np.asarray(suma, dtype=float)
+    vacios = m - np.asarray(no_vacios)
+    lineal = m * np.log(m / np.maximum(vacios, 1))
+    return np.where((estimacion <= 2.5 * m) & (vacios > 0), lineal, estimacion)
+
+
+def estimar_pares(codigos, rangos, n_grupos, precision=12):
+    """
+    Conteo aproximado de distintos de cada grupo a partir de sus pares
+
+    Args:
+        codigos (np.ndarray): Código de grupo de cada par
+        rangos (np.ndarray): Mayor rango de cada par
+        n_grupos (int): Número de grupos
+        precision (int): Precisión de los sketches
+
+    Returns:
+        np.ndarray: Estimación de cada grupo (0 si no tiene valores)
+    """
+    no_vacios = np.bincount(codigos, minlength=n_grupos)
+    # Los registros vacíos aportan 2^0 = 1 cada uno
+    suma = ((1 << precision) - no_vacios) + np.bincount(
+        codigos, weights=np.ldexp(1.0, -rangos.astype(np.int64)), minlength=n_grupos)
+    return estimar_hll(no_vacios, suma, precision)
+
+
+class SketchDistintos:
+    """
+    Sketch HyperLogLog para contar valores distintos con memoria fija
+
+    Usa m = 2^precision registros. El error relativo típico (desviación
+    estándar) del conteo es 1.04 / sqrt(m): 1.6% con precision=12 (4 KB)
+    y 0.8% con precision=14 (16 KB). Para conteos pequeños se usa conteo
+    lineal, casi exacto. Dos sketches con la misma precisión se combinan
+    con merge() (máximo registro a registro), así que se pueden construir
+    por día, grupo o proceso y unirse después.
+
+    Mientras tiene pocos valores guarda solo los registros no vacíos, como
+    pares (registro, rango) ordenados por registro; con más de m / 5 pares
+    (cuando ya ocupan lo mismo que los m bytes) pasa a registros densos.
+    Las dos formas dan la misma estimación.
+
+    Args:
+        precision (int): Entre 4 y 18
+    """
+
+    def __init__(self, precision=12):
+        _validar_precision(precision)
+        self.precision = int(precision)
+        self.indices = np.empty(0, dtype=np.uint32)
+        self.rangos = np.empty(0, dtype=np.uint8)
+        self.registros = None
+
+    @classmethod
+    def desde_pares(cls, precision, indices, rangos):
+        """
+        Sketch a partir de pares (registro, rango) ya reducidos
+
+        Args:
+            precision (int): Precisión del sketch
+            indices (np.ndarray): Registros distintos, ordenados
+            rangos (np.ndarray): Mayor rango de cada registro
+
+        Returns:
+            SketchDistintos: Sketch disperso (o denso si supera el umbral)
+        """
+        sketch = cls(precision)
+        sketch.indices = np.asarray(indices, dtype=np.uint32)
+        sketch.rangos = np.asarray(rangos, dtype=np.uint8)
+        if len(sketch.indices) > sketch._umbral_denso():
+            sketch._densificar()
+        return sketch
+
+    @property
+    def denso(self):
+        """True si el sketch ya usa los m registros densos"""
+        return self.registros is not None
+
+    def _umbral_denso(self):
+        return (1 << self.precision) // 5
+
+    def _densificar(self):
+        self.registros = np.zeros(1 << self.precision, dtype=np.uint8)
+        self.registros[self.indices] = self.rangos
+        self.indices = np.empty(0, dtype=np.uint32)
+        self.rangos = np.empty(0, dtype=np.uint8)
+
+    def _agregar_pares(self, indices, rangos):
+        """Combina pares (registro, rango) en el sketch"""
+        if self.denso:
+            np.maximum.at(self.registros, indices, rangos)
+            return
+        self.indices, self.rangos = _maximo_por_clave(
+            np.concatenate([self.indices, np.asarray(indices, dtype=np.uint32)]),
+            np.concatenate([self.rangos, np.asarray(rangos, dtype=np.uint8)]))
+        if len(self.indices) > self._umbral_denso():
+            self._densificar()
+
+    def update(self, valores):
+        """
+        Agrega valores al sketch (se ignoran los nulos)
+
+        Args:
+            valores (array-like): Valores a contar
+
+        Returns:
+            SketchDistintos: El propio sketch
+        """
+        self._agregar_pares(*posiciones_hll(valores, self.precision))
+        return self
+
+    def merge(self, otro):
+        """
+        Combina otro sketch en este
+
+        Args:
+            otro (SketchDistintos): Sketch con la misma precisión
+
+        Returns:
+            SketchDistintos: El propio sketch
+        """
+        if otro.precision != self.precision:
+            raise ValueError(f"No se pueden combinar sketches con precisión distinta "
+                             f"({self.precision} y {otro.precision})")
+        if otro.denso:
+            if not self.denso:
+                self._densificar()
+            np.maximum(self.registros, otro.registros, out=self.registros)
+        else:
+            self._agregar_pares(otro.indices, otro.rangos)
+        return self
+
+    def copia(self):
+        """Copia independiente del sketch"""
+        sketch = SketchDistintos(self.precision)
+        sketch.indices = self.indices.copy()
+        sketch.rangos = self.rangos.copy()
+        if self.denso:
+            sketch.registros = self.registros.copy()
+        return sketch
+
+    def estimar(self):
+        """
+        Número aproximado de valores distintos
+
+        Returns:
+            float: Estimación del conteo de distintos
+        """
+        m = 1 << self.precision
+        if self.denso:
+            no_vacios = int(np.count_nonzero(self.registros))
+            suma = np.sum(np.ldexp(1.0, -self.registros.astype(np.int64)))
+        else:
+            no_vacios = len(self.indices)
+            suma = (m - no_vacios) + np.sum(np.ldexp(1.0, -self.rangos.astype(np.int64)))
+        return float(estimar_hll(no_vacios, suma, self.precision))
+
+    def error_relativo(self):
+        """Error relativo típico (una desviación estándar) de estimar()"""
+        return 1.04 / np.sqrt(1 << self.precision)
+
+    def a_dict(self):
+        """
+        Representación serializable en JSON del sketch
+
+        Returns:
+            dict: Precisión y registros (o pares registro-rango si es disperso)
+        """
+        if self.denso:
+            return {'precision': self.precision, 'registros': self.registros.tolist()}
+        return {'precision': self.precision, 'indices': self.indices.tolist(), 'rangos': self.rangos.tolist()}
+
+    @classmethod
+    def desde_dict(cls, datos):
+        """
+        Reconstruye un sketch desde su representación a_dict()
+
+        Args:
+            datos (dict): Sketch serializado
+
+        Returns:
+            SketchDistintos: Sketch reconstruido
+        """
+        if 'registros' in datos:
+            sketch = cls(datos['precision'])
+            sketch.registros = np.asarray(datos['registros'], dtype=np.uint8)
+            return sketch
+        return cls.desde_pares(datos['precision'], datos['indices'], datos['rangos'])
+
+
+def distintos_por_codigo(valores, codigos, n_grupos, precision=12):
+    """
+    Construye un SketchDistintos por grupo en una sola pasada
+
+    Los grupos con pocos valores quedan dispersos (solo sus pares), así que
+    la memoria crece con los valores y no con grupos x 2^precision.
+
+    Args:
+        valores (array-like): Valores a contar
+        codigos (np.ndarray): Código de grupo de cada valor (-1 = sin grupo)
+        n_grupos (int): Número de grupos
+        precision (int): Precisión de los sketches
+
+    Returns:
+        list: SketchDistintos de cada grupo, en orden de código
+    """
+    grupos, indices, rangos = pares_por_codigo(valores, codigos, precision)
+    limites = np.searchsorted(grupos, np.arange(n_grupos + 1))
+    return [SketchDistintos.desde_pares(precision, indices[inicio:fin], rangos[inicio:fin])
+            for inicio, fin in zip(limites[:-1], limites[1:])]
+
+
+def distintos_moviles(tiempos, codigos, registros, rangos, ventana, n_tiempos, n_grupos, precision=12):
+    """
+    Conteo aproximado de distintos en ventanas móviles a partir de los
+    sketches de cada periodo, sin construir un sketch por ventana
+
+    La ventana que termina en t combina los periodos t - ventana + 1 .. t.
+    Como 2^-r = 1 - suma de 2^-j para j = 1..r, la estimación solo necesita
+    saber, para cada umbral j, cuántos registros llegan a j en la ventana.
+    Cada par cubre un intervalo de fines de ventana (hasta que vence o hasta
+    el siguiente par del mismo registro y umbral), así que esos conteos se
+    acumulan con diferencias y una suma acumulada por grupo.
+
+    Args:
+        tiempos (np.ndarray): Periodo (0 .. n_tiempos - 1) de cada par
+        codigos (np.ndarray): Código de grupo de cada par
+        registros (np.ndarray): Registro de cada par
+        rangos (np.ndarray): Rango de cada par (máximo del periodo)
+        ventana (int): Periodos por ventana
+        n_tiempos (int): Número de periodos
+        n_grupos (int): Número de grupos
+        precision (int): Precisión de los sketches
+
+    Returns:
+        np.ndarray: Matriz n_tiempos x n_grupos con la estimación de la
+            ventana que termina en cada periodo
+    """
+    # Un elemento por par y umbral j = 1..rango
+    repeticiones = np.asarray(rangos, dtype=np.int64)
+    umbrales = np.arange(repeticiones.sum()) - np.repeat(np.cumsum(repeticiones) - repeticiones, repeticiones) + 1
+    tiempos = np.repeat(np.asarray(tiempos, dtype=np.int64), repeticiones)
+    codigos = np.repeat(np.asarray(codigos, dtype=np.int64), repeticiones)
+    registros = np.repeat(np.asarray(registros, dtype=np.int64), repeticiones)
+
+    orden = np.lexsort((tiempos, umbrales, registros, codigos))
+    tiempos, codigos, registros, umbrales = tiempos[orden], codigos[orden], registros[orden], umbrales[orden]
+    mismo = (codigos[1:] == codigos[:-1]) & (registros[1:] == registros[:-1]) & (umbrales[1:] == umbrales[:-1])
+    siguiente = np.where(np.r_[mismo, False], np.r_[tiempos[1:], 0], n_tiempos)
+    salida = np.minimum(np.minimum(tiempos + ventana, siguiente), n_tiempos)
+
+    def acumular(pesos):
+        tamano = (n_tiempos + 1) * n_grupos
+        diferencias = (np.bincount(tiempos * n_grupos + codigos, pesos, tamano)
+                       - np.bincount(salida * n_grupos + codigos, pesos, tamano))
+        return diferencias.reshape(n_tiempos + 1, n_grupos).cumsum(axis=0)[:n_tiempos]
+
+    no_vacios = acumular((umbrales == 1).astype(float))
+    suma = (1 << precision) - acumular(np.ldexp(1.0, -umbrales))
+    return estimar_hll(np.round(no_vacios), suma, precision)
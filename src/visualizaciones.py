@@ -1,17 +1,273 @@
 """
 Módulo para visualizaciones con Matplotlib y Seaborn
+
+Cada gráfica se dibuja sobre su propia figura con la API de objetos
+(Figure/Axes), sin depender del estado global de pyplot, y la figura se
+cierra al terminar. Con configurar_graficas(mostrar=False) no se abre
+ninguna ventana: las figuras no se registran en pyplot y solo se guardan
+en archivo (modo por lotes, ver graficas_lotes).
+
+Las dispersiones con muchas filas (más de UMBRAL_AGREGACION) no dibujan un
+marcador por fila: se agregan en un histograma 2-D con NumPy que se dibuja
+como imagen, y si hay una columna de color se superpone una muestra
+estratificada por categoría. El tiempo de dibujo y el tamaño del archivo
+dejan de crecer con el número de filas.
+
+Con la caché de gráficas activa (configurar_cache_graficas) y sin mostrar
+en pantalla, una gráfica cuyos datos y argumentos no cambiaron no se
+vuelve a dibujar: se copia la imagen guardada y se devuelve su ruta.
 """
 import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
+from matplotlib.figure import Figure
+from matplotlib.colors import LogNorm
+from matplotlib.lines import Line2D
 import seaborn as sns
 
+try:
+    from .reporte import reportar
+    from .cache_graficas import cachear_grafica
+except ImportError:
+    from reporte import reportar
+    from cache_graficas import cachear_grafica
+
 # Configuración de estilo
 sns.set_style("whitegrid")
 plt.rcParams['figure.figsize'] = (12, 6)
 plt.rcParams['font.size'] = 10
 
+# Resolución de las imágenes guardadas
+DPI_GRAFICAS = 300
+
+# Filas a partir de las cuales las dispersiones se dibujan agregadas
+UMBRAL_AGREGACION = 50_000
+
+# Celdas por eje de los histogramas 2-D
+CELDAS_AGREGACION = 200
+
+# Puntos por categoría superpuestos a la densidad cuando hay columna de color
+MUESTRA_SUPERPUESTA = 300
+
+# Columnas que usa el dashboard
+COLUMNAS_DASHBOARD = ('montO_TOTAL', 'edaD_PACIENTE', 'aseguradora', 'clasE_EPISODIO',
+                      'duracioN_MINUTOS', 'staT_FACTURA')
+
+_configuracion = {'mostrar': True}
+
+
+def configurar_graficas(mostrar=True):
+    """
+    Configura si las gráficas se muestran en pantalla
+
+    Args:
+        mostrar (bool): True para llamar a plt.show(); False para solo
+            guardar en archivo (servidores y renderizado por lotes)
+    """
+    _configuracion['mostrar'] = mostrar
+
+
+def graficas_visibles():
+    """Indica si las gráficas se muestran en pantalla"""
+    return _configuracion['mostrar']
+
+
+def _parametros_dibujo():
+    """Parámetros globales que cambian la imagen (parte de la clave de la caché de gráficas)"""
+    return {'dpi': DPI_GRAFICAS, 'umbral': UMBRAL_AGREGACION, 'celdas': CELDAS_AGREGACION,
+            'muestra': MUESTRA_SUPERPUESTA}
+
+
+def _cachear(columnas=None, opcionales=(), fijas=()):
+    """cachear_grafica para este módulo: sin caché mientras las gráficas se muestran"""
+    return cachear_grafica(columnas, opcionales, fijas, omitir=graficas_visibles,
+                           parametros=_parametros_dibujo)
+
+
+def _nueva_figura(**kwargs):
+    """
+    Figura nueva: de pyplot si se va a mostrar, o una Figure suelta (no
+    queda en el estado global de pyplot) si solo se guarda
+    """
+    if _configuracion['mostrar']:
+        return plt.figure(**kwargs)
+    return Figure(**kwargs)
+
+
+def _finalizar(fig, archivo_salida, etiqueta='Gráfica'):
+    """
+    Guarda la figura si se indicó un archivo, la muestra si corresponde y
+    la cierra
+
+    Returns:
+        Figure: La figura (ya cerrada, pero se puede volver a guardar)
+    """
+    if archivo_salida:
+        fig.savefig(archivo_salida, dpi=DPI_GRAFICAS, bbox_inches='tight')
+        reportar(f"✓ {etiqueta} guardada en: {archivo_salida}")
+    
+    if _configuracion['mostrar']:
+        plt.show()
+    plt.close(fig)
+    return fig
+
+
+def _usar_agregacion(n_filas, agregar):
+    """Si una dispersión se dibuja agregada (agregar=None: según UMBRAL_AGREGACION)"""
+    return n_filas > UMBRAL_AGREGACION if agregar is None else bool(agregar)
+
+
+def _numerica(serie):
+    """Valores de una columna como float, con NaN en lo no numérico"""
+    return pd.to_numeric(serie, errors='coerce').to_numpy(dtype=float, na_value=np.nan)
+
+
+def muestra_estratificada(df, columna=None, n_por_grupo=MUESTRA_SUPERPUESTA, semilla=0):
+    """
+    Muestra aleatoria de hasta n_por_grupo filas de cada categoría (las
+    filas con categoría nula se descartan), en el orden original
+
+    Args:
+        df (pd.DataFrame): DataFrame con los datos
+        columna (str): Columna categórica de los estratos (None = sin estratos)
+        n_por_grupo (int): Máximo de filas por categoría
+        semilla (int): Semilla de la muestra
+
+    Returns:
+        pd.DataFrame: Filas elegidas
+    """
+    if columna is None:
+        codigos = np.zeros(len(df), dtype=np.int64)
+    else:
+        codigos = pd.factorize(df[columna])[0]
+    # Orden aleatorio dentro de cada categoría y las primeras n de cada una
+    orden = np.lexsort((np.random.default_rng(semilla).random(len(df)), codigos))
+    ordenados = codigos[orden]
+    posicion = np.arange(len(orden)) - np.searchsorted(ordenados, ordenados, side='left')
+    elegidas = orden[(posicion < n_por_grupo) & (ordenados >= 0)]
+    return df.iloc[np.sort(elegidas)]
 
+
+def _dibujar_densidad(ax, x, y, cmap='viridis', barra=True, celdas=CELDAS_AGREGACION):
+    """
+    Histograma 2-D de los pares (x, y) finitos dibujado como imagen (escala
+    logarítmica, celdas vacías en blanco)
+
+    Returns:
+        AxesImage: La imagen, o None si no hay pares finitos
+    """
+    x, y = np.asarray(x, dtype=float), np.asarray(y, dtype=float)
+    validos = np.isfinite(x) & np.isfinite(y)
+    if not validos.any():
+        return None
+    conteos, bordes_x, bordes_y = np.histogram2d(x[validos], y[validos], bins=celdas)
+    imagen = ax.imshow(np.ma.masked_equal(conteos.T, 0), origin='lower', aspect='auto',
+                       interpolation='nearest', cmap=cmap,
+                       extent=(bordes_x[0], bordes_x[-1], bordes_y[0], bordes_y[-1]),
+                       norm=LogNorm(vmin=1, vmax=max(conteos.max(), 2)))
+    if barra:
+        ax.figure.colorbar(imagen, ax=ax, label='Registros')
+    return imagen
+
+
+def _dispersion_agregada(ax, df, columna_x, columna_y, hue, paleta):
+    """
+    Densidad de todos los pares y, si hay hue, una muestra estratificada por
+    categoría encima
+    """
+    con_hue = hue is not None and hue in df.columns
+    _dibujar_densidad(ax, _numerica(df[columna_x]), _numerica(df[columna_y]),
+                      cmap='Greys' if con_hue else 'viridis')
+    if con_hue:
+        muestra = muestra_estratificada(df[[columna_x, columna_y, hue]].dropna(), hue)
+        sns.scatterplot(data=muestra, x=columna_x, y=columna_y, hue=hue,
+                        palette=paleta, s=20, alpha=0.8, ax=ax)
+
+
+def _linea_agregada(ax, x, y, color=None, etiqueta=None, celdas=CELDAS_AGREGACION):
+    """
+    Media de y por valor de x (o por intervalo de x si hay más de `celdas`
+    valores distintos) con su banda de confianza del 95%, con bincount
+    """
+    validos = np.isfinite(x) & np.isfinite(y)
+    x, y = x[validos], y[validos]
+    if len(x) == 0:
+        return
+    unicos = np.unique(x)
+    if len(unicos) <= celdas:
+        centros, codigos = unicos, np.searchsorted(unicos, x)
+    else:
+        bordes = np.linspace(unicos[0], unicos[-1], celdas + 1)
+        centros = (bordes[:-1] + bordes[1:]) / 2
+        codigos = np.clip(np.searchsorted(bordes, x, side='right') - 1, 0, celdas - 1)
+    
+    # Sumas centradas en la media global (evita cancelación con montos grandes)
+    centrados = y - y.mean()
+    n = np.bincount(codigos, minlength=len(centros))
+    sumas = np.bincount(codigos, weights=centrados, minlength=len(centros))
+    cuadrados = np.bincount(codigos, weights=centrados ** 2, minlength=len(centros))
+    presentes = n > 0
+    n, sumas, cuadrados, centros = n[presentes], sumas[presentes], cuadrados[presentes], centros[presentes]
+    medias = sumas / n
+    with np.errstate(divide='ignore', invalid='ignore'):
+        error = np.sqrt(np.maximum(cuadrados - n * medias ** 2, 0) / (n - 1) / n)
+    medias = medias + y.mean()
+    
+    linea, = ax.plot(centros, medias, color=color, label=etiqueta)
+    ax.fill_between(centros, medias - 1.96 * error, medias + 1.96 * error,
+                    color=linea.get_color(), alpha=0.2, linewidth=0)
+
+
+def _pairplot_agregado(df_subset, hue):
+    """
+    Matriz de relaciones con densidades 2-D fuera de la diagonal e
+    histogramas en la diagonal (uno por categoría si hay hue)
+    """
+    numericas = [col for col in df_subset.columns
+                 if col != hue and pd.api.types.is_numeric_dtype(df_subset[col])]
+    p = len(numericas)
+    valores = {col: _numerica(df_subset[col]) for col in numericas}
+    
+    categorias, colores, codigos, muestra = [], [], None, None
+    if hue:
+        codigos, categorias = pd.factorize(df_subset[hue], sort=True)
+        colores = sns.color_palette('husl', len(categorias))
+        muestra = muestra_estratificada(df_subset, hue)
+        codigos_muestra = pd.Categorical(muestra[hue], categories=categorias).codes
+    
+    fig = _nueva_figura(figsize=(2.5 * p, 2.5 * p))
+    axes = fig.subplots(p, p, squeeze=False)
+    for i, fila in enumerate(numericas):
+        for j, col in enumerate(numericas):
+            ax = axes[i, j]
+            if i == j:
+                datos = valores[col]
+                finitos = np.isfinite(datos)
+                if not hue:
+                    ax.hist(datos[finitos], bins=50, color='steelblue', alpha=0.7)
+                elif finitos.any():
+                    bordes = np.histogram_bin_edges(datos[finitos], bins=50)
+                    for k, color in enumerate(colores):
+                        conteos, _ = np.histogram(datos[finitos & (codigos == k)], bins=bordes)
+                        ax.stairs(conteos, bordes, color=color, linewidth=1.5)
+            else:
+                _dibujar_densidad(ax, valores[col], valores[fila], cmap='Greys' if hue else 'viridis',
+                                  barra=False)
+                if hue:
+                    ax.scatter(_numerica(muestra[col]), _numerica(muestra[fila]), s=6, alpha=0.8,
+                               c=[colores[k] for k in codigos_muestra])
+            ax.set_xlabel(col if i == p - 1 else '')
+            ax.set_ylabel(fila if j == 0 else '')
+    
+    if hue:
+        fig.legend(handles=[Line2D([], [], marker='o', linestyle='', color=color, label=str(nombre))
+                            for nombre, color in zip(categorias, colores)],
+                   title=hue, loc='center left', bbox_to_anchor=(1.0, 0.5), frameon=False)
+    fig.tight_layout()
+    return fig
+
+
+@_cachear(columnas=('columna',))
 def grafica_distribucion(df, columna, bins=30, archivo_salida=None):
     """
     Crea un histograma para mostrar la distribución de datos
@@ -21,12 +277,16 @@ def grafica_distribucion(df, columna, bins=30, archivo_salida=None):
         columna (str): Columna a graficar
         bins (int): Número de intervalos
         archivo_salida (str): Ruta para guardar la imagen (opcional)
+        
+    Returns:
+        Figure: Figura generada (ya cerrada)
     """
     if columna not in df.columns:
-        print(f"✗ Columna '{columna}' no encontrada")
+        reportar(f"✗ Columna '{columna}' no encontrada")
         return
     
-    fig, axes = plt.subplots(1, 2, figsize=(15, 5))
+    fig = _nueva_figura(figsize=(15, 5))
+    axes = fig.subplots(1, 2)
     
     # Histograma
     axes[0].hist(df[columna].dropna(), bins=bins, edgecolor='black', alpha=0.7, color='steelblue')
@@ -42,15 +302,12 @@ def grafica_distribucion(df, columna, bins=30, archivo_salida=None):
     axes[1].set_title(f'Densidad de {columna}', fontsize=14, fontweight='bold')
     axes[1].grid(True, alpha=0.3)
     
-    plt.tight_layout()
-    
-    if archivo_salida:
-        plt.savefig(archivo_salida, dpi=300, bbox_inches='tight')
-        print(f"✓ Gráfica guardada en: {archivo_salida}")
+    fig.tight_layout()
     
-    plt.show()
+    return _finalizar(fig, archivo_salida)
 
 
+@_cachear(columnas=('columnas',))
 def diagrama_cajas(df, columnas=None, archivo_salida=None):
     """
     Crea diagramas de cajas (boxplot) para detectar outliers
@@ -59,6 +316,9 @@ def diagrama_cajas(df, columnas=None, archivo_salida=None):
         df (pd.DataFrame): DataFrame con los datos
         columnas (list): Lista de columnas a graficar
         archivo_salida (str): Ruta para guardar la imagen (opcional)
+        
+    Returns:
+        Figure: Figura generada (ya cerrada)
     """
     if columnas is None:
         columnas = df.select_dtypes(include=[np.number]).columns.tolist()
@@ -67,13 +327,14 @@ def diagrama_cajas(df, columnas=None, archivo_salida=None):
     columnas_validas = [col for col in columnas if col in df.columns]
     
     if not columnas_validas:
-        print("✗ No hay columnas válidas para graficar")
+        reportar("✗ No hay columnas válidas para graficar")
         return
     
     n_cols = len(columnas_validas)
     n_rows = (n_cols + 2) // 3
     
-    fig, axes = plt.subplots(n_rows, min(3, n_cols), figsize=(15, 5 * n_rows))
+    fig = _nueva_figura(figsize=(15, 5 * n_rows))
+    axes = fig.subplots(n_rows, min(3, n_cols))
     
     if n_cols == 1:
         axes = [axes]
@@ -90,16 +351,13 @@ def diagrama_cajas(df, columnas=None, archivo_salida=None):
     for idx in range(len(columnas_validas), len(axes)):
         axes[idx].set_visible(False)
     
-    plt.tight_layout()
-    
-    if archivo_salida:
-        plt.savefig(archivo_salida, dpi=300, bbox_inches='tight')
-        print(f"✓ Gráfica guardada en: {archivo_salida}")
+    fig.tight_layout()
     
-    plt.show()
+    return _finalizar(fig, archivo_salida)
 
 
-def grafica_dispersion(df, columna_x, columna_y, hue=None, archivo_salida=None):
+@_cachear(columnas=('columna_x', 'columna_y', 'hue'), opcionales=('hue',))
+def grafica_dispersion(df, columna_x, columna_y, hue=None, archivo_salida=None, agregar=None):
     """
     Crea gráfica de dispersión entre dos variables
     
@@ -109,36 +367,42 @@ def grafica_dispersion(df, columna_x, columna_y, hue=None, archivo_salida=None):
         columna_y (str): Variable en eje Y
         hue (str): Columna para colorear puntos (opcional)
         archivo_salida (str): Ruta para guardar la imagen (opcional)
+        agregar (bool): Dibujar la densidad por celdas en vez de un punto por
+            fila (None = solo con más de UMBRAL_AGREGACION filas)
+        
+    Returns:
+        Figure: Figura generada (ya cerrada)
     """
     if columna_x not in df.columns or columna_y not in df.columns:
-        print(f"✗ Una o ambas columnas no encontradas")
+        reportar(f"✗ Una o ambas columnas no encontradas")
         return
     
-    plt.figure(figsize=(10, 6))
+    fig = _nueva_figura(figsize=(10, 6))
+    ax = fig.subplots()
     
-    if hue and hue in df.columns:
+    if _usar_agregacion(len(df), agregar):
+        _dispersion_agregada(ax, df, columna_x, columna_y, hue, 'viridis')
+    elif hue and hue in df.columns:
         sns.scatterplot(data=df, x=columna_x, y=columna_y, hue=hue, 
-                       palette='viridis', s=100, alpha=0.7)
+                       palette='viridis', s=100, alpha=0.7, ax=ax)
     else:
         sns.scatterplot(data=df, x=columna_x, y=columna_y, 
-                       color='steelblue', s=100, alpha=0.7)
+                       color='steelblue', s=100, alpha=0.7, ax=ax)
     
-    plt.xlabel(columna_x, fontweight='bold', fontsize=12)
-    plt.ylabel(columna_y, fontweight='bold', fontsize=12)
-    plt.title(f'Análisis de Dispersión: {columna_x} vs {columna_y}', 
-             fontsize=14, fontweight='bold')
-    plt.grid(True, alpha=0.3)
+    ax.set_xlabel(columna_x, fontweight='bold', fontsize=12)
+    ax.set_ylabel(columna_y, fontweight='bold', fontsize=12)
+    ax.set_title(f'Análisis de Dispersión: {columna_x} vs {columna_y}', 
+                 fontsize=14, fontweight='bold')
+    ax.grid(True, alpha=0.3)
     
-    plt.tight_layout()
+    fig.tight_layout()
     
-    if archivo_salida:
-        plt.savefig(archivo_salida, dpi=300, bbox_inches='tight')
-        print(f"✓ Gráfica guardada en: {archivo_salida}")
-    
-    plt.show()
+    return _finalizar(fig, archivo_salida)
 
 
-def grafica_relacional_seaborn(df, columna_x, columna_y, hue=None, estilo='scatter', archivo_salida=None):
+@_cachear(columnas=('columna_x', 'columna_y', 'hue'), opcionales=('hue',))
+def grafica_relacional_seaborn(df, columna_x, columna_y, hue=None, estilo='scatter', archivo_salida=None,
+                               agregar=None):
     """
     Crea gráficas relacionales avanzadas con Seaborn
     
@@ -149,32 +413,49 @@ def grafica_relacional_seaborn(df, columna_x, columna_y, hue=None, estilo='scatt
         hue (str): Columna para colorear (opcional)
         estilo (str): 'scatter' o 'line'
         archivo_salida (str): Ruta para guardar la imagen (opcional)
+        agregar (bool): Con muchas filas, densidad por celdas ('scatter') o
+            media por intervalo de x con bincount ('line') en vez de seaborn
+            (None = solo con más de UMBRAL_AGREGACION filas)
+        
+    Returns:
+        Figure: Figura generada (ya cerrada)
     """
     if columna_x not in df.columns or columna_y not in df.columns:
-        print(f"✗ Una o ambas columnas no encontradas")
+        reportar(f"✗ Una o ambas columnas no encontradas")
         return
     
-    plt.figure(figsize=(12, 6))
-    
-    if estilo == 'scatter':
-        sns.relplot(data=df, x=columna_x, y=columna_y, hue=hue, 
-                   palette='deep', height=6, aspect=1.5, alpha=0.7)
+    # Mismo tamaño que relplot(height=6, aspect=1.5), pero en una sola figura
+    fig = _nueva_figura(figsize=(9, 6))
+    ax = fig.subplots()
+    
+    if _usar_agregacion(len(df), agregar):
+        if estilo == 'scatter':
+            _dispersion_agregada(ax, df, columna_x, columna_y, hue, 'deep')
+        elif estilo == 'line':
+            x, y = _numerica(df[columna_x]), _numerica(df[columna_y])
+            if hue and hue in df.columns:
+                codigos, categorias = pd.factorize(df[hue], sort=True)
+                for k, (nombre, color) in enumerate(zip(categorias, sns.color_palette('deep', len(categorias)))):
+                    _linea_agregada(ax, x[codigos == k], y[codigos == k], color, str(nombre))
+                ax.legend(title=hue)
+            else:
+                _linea_agregada(ax, x, y)
+    elif estilo == 'scatter':
+        sns.scatterplot(data=df, x=columna_x, y=columna_y, hue=hue, 
+                        palette='deep' if hue else None, alpha=0.7, ax=ax)
     elif estilo == 'line':
-        sns.relplot(data=df, x=columna_x, y=columna_y, hue=hue, 
-                   kind='line', palette='deep', height=6, aspect=1.5)
-    
-    plt.xlabel(columna_x, fontweight='bold', fontsize=12)
-    plt.ylabel(columna_y, fontweight='bold', fontsize=12)
-    plt.title(f'Gráfica Relacional: {columna_x} vs {columna_y}', 
-             fontsize=14, fontweight='bold')
+        sns.lineplot(data=df, x=columna_x, y=columna_y, hue=hue, 
+                     palette='deep' if hue else None, ax=ax)
     
-    if archivo_salida:
-        plt.savefig(archivo_salida, dpi=300, bbox_inches='tight')
-        print(f"✓ Gráfica guardada en: {archivo_salida}")
+    ax.set_xlabel(columna_x, fontweight='bold', fontsize=12)
+    ax.set_ylabel(columna_y, fontweight='bold', fontsize=12)
+    ax.set_title(f'Gráfica Relacional: {columna_x} vs {columna_y}', 
+                 fontsize=14, fontweight='bold')
     
-    plt.show()
+    return _finalizar(fig, archivo_salida)
 
 
+@_cachear(columnas=('columna_categoria', 'columna_valor'), opcionales=('columna_valor',))
 def grafica_barras_categorias(df, columna_categoria, columna_valor=None, 
                                agregacion='count', archivo_salida=None):
     """
@@ -186,17 +467,21 @@ def grafica_barras_categorias(df, columna_categoria, columna_valor=None,
         columna_valor (str): Columna de valores a agregar (opcional)
         agregacion (str): 'count', 'sum', 'mean', 'median'
         archivo_salida (str): Ruta para guardar la imagen (opcional)
+        
+    Returns:
+        Figure: Figura generada (ya cerrada)
     """
     if columna_categoria not in df.columns:
-        print(f"✗ Columna '{columna_categoria}' no encontrada")
+        reportar(f"✗ Columna '{columna_categoria}' no encontrada")
         return
     
-    plt.figure(figsize=(12, 6))
+    fig = _nueva_figura(figsize=(12, 6))
+    ax = fig.subplots()
     
     if agregacion == 'count':
         datos = df[columna_categoria].value_counts().sort_values(ascending=False)
-        sns.barplot(x=datos.index, y=datos.values, palette='viridis')
-        plt.ylabel('Cantidad', fontweight='bold', fontsize=12)
+        sns.barplot(x=datos.index, y=datos.values, palette='viridis', ax=ax)
+        ax.set_ylabel('Cantidad', fontweight='bold', fontsize=12)
     elif columna_valor and columna_valor in df.columns:
         if agregacion == 'sum':
             datos = df.groupby(columna_categoria)[columna_valor].sum().sort_values(ascending=False)
@@ -205,26 +490,24 @@ def grafica_barras_categorias(df, columna_categoria, columna_valor=None,
         elif agregacion == 'median':
             datos = df.groupby(columna_categoria)[columna_valor].median().sort_values(ascending=False)
         
-        sns.barplot(x=datos.index, y=datos.values, palette='mako')
-        plt.ylabel(f'{agregacion.capitalize()} de {columna_valor}', fontweight='bold', fontsize=12)
+        sns.barplot(x=datos.index, y=datos.values, palette='mako', ax=ax)
+        ax.set_ylabel(f'{agregacion.capitalize()} de {columna_valor}', fontweight='bold', fontsize=12)
     else:
-        print(f"✗ Columna de valores '{columna_valor}' no encontrada")
+        reportar(f"✗ Columna de valores '{columna_valor}' no encontrada")
+        plt.close(fig)
         return
     
-    plt.xlabel(columna_categoria, fontweight='bold', fontsize=12)
-    plt.title(f'Análisis por {columna_categoria}', fontsize=14, fontweight='bold')
-    plt.xticks(rotation=45, ha='right')
-    plt.grid(True, alpha=0.3, axis='y')
-    plt.tight_layout()
-    
-    if archivo_salida:
-        plt.savefig(archivo_salida, dpi=300, bbox_inches='tight')
-        print(f"✓ Gráfica guardada en: {archivo_salida}")
+    ax.set_xlabel(columna_categoria, fontweight='bold', fontsize=12)
+    ax.set_title(f'Análisis por {columna_categoria}', fontsize=14, fontweight='bold')
+    plt.setp(ax.get_xticklabels(), rotation=45, ha='right')
+    ax.grid(True, alpha=0.3, axis='y')
+    fig.tight_layout()
     
-    plt.show()
+    return _finalizar(fig, archivo_salida)
 
 
-def pairplot_seaborn(df, columnas=None, hue=None, archivo_salida=None):
+@_cachear(columnas=('columnas', 'hue'), opcionales=('hue',))
+def pairplot_seaborn(df, columnas=None, hue=None, archivo_salida=None, agregar=None):
     """
     Crea matriz de gráficas de relaciones entre múltiples variables
     
@@ -233,39 +516,51 @@ def pairplot_seaborn(df, columnas=None, hue=None, archivo_salida=None):
         columnas (list): Lista de columnas a incluir
         hue (str): Columna para colorear (opcional)
         archivo_salida (str): Ruta para guardar la imagen (opcional)
+        agregar (bool): Densidades 2-D e histogramas en vez de un punto por
+            fila y KDE (None = solo con más de UMBRAL_AGREGACION filas)
+        
+    Returns:
+        Figure: Figura generada (ya cerrada)
     """
     if columnas:
         df_subset = df[columnas + ([hue] if hue and hue not in columnas else [])]
     else:
         df_subset = df.select_dtypes(include=[np.number])
     
-    g = sns.pairplot(df_subset, hue=hue, palette='husl', 
-                     plot_kws={'alpha': 0.6}, diag_kind='kde', height=2.5)
-    g.fig.suptitle('Matriz de Relaciones entre Variables', 
-                   fontsize=16, fontweight='bold', y=1.01)
-    
-    if archivo_salida:
-        plt.savefig(archivo_salida, dpi=300, bbox_inches='tight')
-        print(f"✓ Gráfica guardada en: {archivo_salida}")
+    if _usar_agregacion(len(df_subset), agregar):
+        fig = _pairplot_agregado(df_subset, hue)
+    else:
+        g = sns.pairplot(df_subset, hue=hue, palette='husl' if hue else None, 
+                         plot_kws={'alpha': 0.6}, diag_kind='kde', height=2.5)
+        fig = g.figure
+    fig.suptitle('Matriz de Relaciones entre Variables', 
+                 fontsize=16, fontweight='bold', y=1.01)
     
-    plt.show()
+    return _finalizar(fig, archivo_salida)
 
 
-def dashboard_completo(df, archivo_salida=None):
+@_cachear(columnas=(), fijas=COLUMNAS_DASHBOARD)
+def dashboard_completo(df, archivo_salida=None, agregar=None):
     """
     Crea un dashboard completo con múltiples visualizaciones
     
     Args:
         df (pd.DataFrame): DataFrame con los datos
         archivo_salida (str): Ruta para guardar la imagen (opcional)
+        agregar (bool): Panel edad vs monto como densidad por celdas (None =
+            solo con más de UMBRAL_AGREGACION filas)
+        
+    Returns:
+        Figure: Figura generada (ya cerrada)
     """
-    fig = plt.figure(figsize=(18, 12))
+    fig = _nueva_figura(figsize=(18, 12))
     gs = fig.add_gridspec(3, 3, hspace=0.3, wspace=0.3)
     
     # 1. Distribución de montos
     ax1 = fig.add_subplot(gs[0, :2])
     if 'montO_TOTAL' in df.columns:
-        df['montO_TOTAL'].hist(bins=30, ax=ax1, color='steelblue', edgecolor='black', alpha=0.7)
+        # ax.hist y no Series.hist, que abre una figura de pyplot aunque reciba ax
+        ax1.hist(df['montO_TOTAL'].dropna(), bins=30, color='steelblue', edgecolor='black', alpha=0.7)
         ax1.set_title('Distribución de Montos Totales', fontweight='bold', fontsize=12)
         ax1.set_xlabel('Monto Total', fontweight='bold')
         ax1.set_ylabel('Frecuencia', fontweight='bold')
@@ -290,7 +585,11 @@ def dashboard_completo(df, archivo_salida=None):
     # 4. Dispersión edad vs monto
     ax4 = fig.add_subplot(gs[2, 0])
     if 'edaD_PACIENTE' in df.columns and 'montO_TOTAL' in df.columns:
-        ax4.scatter(df['edaD_PACIENTE'], df['montO_TOTAL'], alpha=0.5, color='purple')
+        if _usar_agregacion(len(df), agregar):
+            _dibujar_densidad(ax4, _numerica(df['edaD_PACIENTE']), _numerica(df['montO_TOTAL']),
+                              cmap='Purples', barra=False)
+        else:
+            ax4.scatter(df['edaD_PACIENTE'], df['montO_TOTAL'], alpha=0.5, color='purple')
         ax4.set_title('Edad vs Monto Total', fontweight='bold', fontsize=12)
         ax4.set_xlabel('Edad Paciente', fontweight='bold')
         ax4.set_ylabel('Monto Total', fontweight='bold')
@@ -317,11 +616,7 @@ def dashboard_completo(df, archivo_salida=None):
     fig.suptitle('Dashboard de Análisis de Facturación Médica', 
                 fontsize=18, fontweight='bold', y=0.995)
     
-    if archivo_salida:
-        plt.savefig(archivo_salida, dpi=300, bbox_inches='tight')
-        print(f"✓ Dashboard guardado en: {archivo_salida}")
-    
-    plt.show()
+    return _finalizar(fig, archivo_salida, 'Dashboard')
 
 
 if __name__ == "__main__":
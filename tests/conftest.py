@@ -0,0 +1,5 @@
+"""Configuración de pytest: los módulos de src/ se importan por su nombre, como en los benchmarks"""
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
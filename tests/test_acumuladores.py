@@ -0,0 +1,182 @@
+"""
+Pruebas de los acumuladores combinables contra los cálculos de pandas
+
+Uso: python -m pytest tests/test_acumuladores.py
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from acumuladores import (AcumuladorMomentos, AcumuladorCovarianza, acumular_momentos,
+                          acumular_momentos_paralelo, acumular_covarianza, covarianza_por_particion)
+
+
+def generar_datos(n_filas=5_000, desplazamiento=0.0, semilla=0):
+    """Montos asimétricos con un 5% de nulos, opcionalmente desplazados"""
+    rng = np.random.default_rng(semilla)
+    montos = rng.lognormal(3, 0.8, size=n_filas)
+    montos[rng.random(n_filas) < 0.05] = np.nan
+    return pd.DataFrame({
+        'monto': montos + desplazamiento,
+        'dias': rng.poisson(4, size=n_filas).astype(float),
+    })
+
+
+def dividir(df, n_bloques, semilla=1):
+    """Parte un DataFrame en bloques consecutivos de tamaño desigual"""
+    rng = np.random.default_rng(semilla)
+    cortes = np.sort(rng.choice(np.arange(1, len(df)), size=n_bloques - 1, replace=False))
+    return [df.iloc[inicio:fin] for inicio, fin in zip([0, *cortes], [*cortes, len(df)])]
+
+
+def comprobar_momentos(acumulador, serie, rtol=1e-9):
+    """Compara conteo, media, var, skew y kurt del acumulador con pandas"""
+    assert acumulador.n == serie.count()
+    assert acumulador.media == pytest.approx(serie.mean(), rel=1e-12)
+    assert acumulador.varianza() == pytest.approx(serie.var(), rel=rtol)
+    assert acumulador.asimetria() == pytest.approx(serie.skew(), rel=rtol)
+    assert acumulador.curtosis() == pytest.approx(serie.kurt(), rel=rtol)
+    assert acumulador.minimo == serie.min()
+    assert acumulador.maximo == serie.max()
+
+
+def test_update_por_bloques_coincide_con_pandas():
+    df = generar_datos()
+    acumulador = AcumuladorMomentos()
+    for bloque in dividir(df, 7):
+        acumulador.update(bloque['monto'])
+    comprobar_momentos(acumulador, df['monto'])
+
+
+def test_acumular_momentos_por_bloques():
+    df = generar_datos()
+    acumuladores = acumular_momentos(df, tamano_bloque=333)
+    assert set(acumuladores) == {'monto', 'dias'}
+    for col, acumulador in acumuladores.items():
+        comprobar_momentos(acumulador, df[col])
+
+
+def test_merge_es_exacto_en_cualquier_orden():
+    df = generar_datos()
+    parciales = [AcumuladorMomentos().update(bloque['monto']) for bloque in dividir(df, 5)]
+    
+    en_orden = AcumuladorMomentos()
+    for parcial in parciales:
+        en_orden.merge(parcial)
+    # Combinación en árbol: (0+1) + ((2+3) + 4)
+    izquierda = AcumuladorMomentos().merge(parciales[0]).merge(parciales[1])
+    derecha = AcumuladorMomentos().merge(parciales[2]).merge(parciales[3]).merge(parciales[4])
+    en_arbol = izquierda.merge(derecha)
+    
+    comprobar_momentos(en_orden, df['monto'])
+    comprobar_momentos(en_arbol, df['monto'])
+
+
+def test_merge_con_acumulador_vacio():
+    serie = generar_datos()['monto']
+    acumulador = AcumuladorMomentos().update(serie)
+    acumulador.merge(AcumuladorMomentos())
+    acumulador.merge(AcumuladorMomentos().update([np.nan, np.nan]))
+    comprobar_momentos(acumulador, serie)
+    comprobar_momentos(AcumuladorMomentos().merge(acumulador), serie)
+
+
+def test_acumular_momentos_paralelo():
+    df = generar_datos()
+    acumuladores = acumular_momentos_paralelo(dividir(df, 4), procesos=2)
+    for col in ['monto', 'dias']:
+        comprobar_momentos(acumuladores[col], df[col])
+
+
+def test_datos_desplazados_no_pierden_precision():
+    # Con un desplazamiento de 1e9 las fórmulas de sumas de potencias
+    # pierden todos los dígitos; los momentos centrados no
+    df = generar_datos(desplazamiento=1e9)
+    acumulador = AcumuladorMomentos()
+    for bloque in dividir(df, 9):
+        acumulador.update(bloque['monto'])
+    comprobar_momentos(acumulador, df['monto'], rtol=1e-6)
+    
+    sin_desplazar = AcumuladorMomentos().update(generar_datos()['monto'])
+    assert acumulador.varianza() == pytest.approx(sin_desplazar.varianza(), rel=1e-6)
+    assert acumulador.asimetria() == pytest.approx(sin_desplazar.asimetria(), rel=1e-4)
+    assert acumulador.curtosis() == pytest.approx(sin_desplazar.curtosis(), rel=1e-4)
+
+
+def test_pocos_datos_devuelven_nan():
+    acumulador = AcumuladorMomentos().update([1.0, 2.0, np.nan])
+    assert acumulador.varianza() == pytest.approx(0.5)
+    assert np.isnan(acumulador.asimetria())
+    assert np.isnan(acumulador.curtosis())
+    assert np.isnan(AcumuladorMomentos().varianza())
+
+
+def generar_tabla(n_filas=4_000, semilla=0):
+    """Columnas correlacionadas, filas con nulos, una columna constante y una partición"""
+    rng = np.random.default_rng(semilla)
+    base = rng.normal(size=n_filas)
+    df = pd.DataFrame({
+        'centro': rng.choice(['A', 'B', 'C', 'D'], size=n_filas),
+        'importe': 1e6 + 50 * base + rng.normal(size=n_filas),
+        'dias': 3 * base + rng.normal(size=n_filas),
+        'coste': rng.lognormal(2, 0.5, size=n_filas),
+    })
+    for col in ['importe', 'dias', 'coste']:
+        df.loc[rng.random(n_filas) < 0.03, col] = np.nan
+    return df
+
+
+COLUMNAS_COVARIANZA = ['importe', 'dias', 'coste']
+
+
+def comprobar_covarianza(acumulador, df, columnas=COLUMNAS_COVARIANZA):
+    """Compara covarianza y correlación del acumulador con dropna().cov()/.corr()"""
+    completas = df[columnas].dropna()
+    assert acumulador.n == len(completas)
+    pd.testing.assert_frame_equal(acumulador.covarianza(), completas.cov(), rtol=1e-9)
+    pd.testing.assert_frame_equal(acumulador.correlacion(), completas.corr(), rtol=1e-9)
+
+
+def test_covarianza_por_bloques_ignora_filas_con_nulos():
+    df = generar_tabla()
+    acumulador = AcumuladorCovarianza(COLUMNAS_COVARIANZA)
+    for bloque in dividir(df, 6):
+        acumulador.update(bloque)
+    comprobar_covarianza(acumulador, df)
+    comprobar_covarianza(acumular_covarianza(df, COLUMNAS_COVARIANZA, tamano_bloque=250), df)
+
+
+def test_merge_covarianza():
+    df = generar_tabla()
+    parciales = [AcumuladorCovarianza(COLUMNAS_COVARIANZA).update(bloque) for bloque in dividir(df, 5)]
+    total = AcumuladorCovarianza(COLUMNAS_COVARIANZA)
+    for parcial in reversed(parciales):
+        total.merge(parcial)
+    total.merge(AcumuladorCovarianza(COLUMNAS_COVARIANZA))
+    comprobar_covarianza(total, df)
+
+
+def test_merge_covarianza_con_otras_columnas():
+    with pytest.raises(ValueError):
+        AcumuladorCovarianza(['importe']).merge(AcumuladorCovarianza(['dias']))
+
+
+def test_covarianza_con_columna_constante():
+    df = generar_tabla().assign(constante=7.0)
+    columnas = COLUMNAS_COVARIANZA + ['constante']
+    acumulador = AcumuladorCovarianza(columnas)
+    for bloque in dividir(df, 4):
+        acumulador.update(bloque)
+    completas = df[columnas].dropna()
+    pd.testing.assert_frame_equal(acumulador.covarianza(), completas.cov(), rtol=1e-9, atol=1e-12)
+    # Correlación indefinida en la fila y columna de la constante, como pandas
+    pd.testing.assert_frame_equal(acumulador.correlacion(), completas.corr(), rtol=1e-9)
+
+
+def test_covarianza_por_particion():
+    df = generar_tabla()
+    total, por_particion = covarianza_por_particion(df, 'centro', procesos=2)
+    assert list(por_particion) == ['A', 'B', 'C', 'D']
+    comprobar_covarianza(total, df)
+    for centro, acumulador in por_particion.items():
+        comprobar_covarianza(acumulador, df[df['centro'] == centro])
@@ -0,0 +1,119 @@
+"""
+Pruebas del bootstrap por pesos contra el remuestreo explícito
+
+Uso: python -m pytest tests/test_bootstrap.py
+"""
+import numpy as np
+import pandas as pd
+import pytest
+from scipy import stats
+
+from reporte import silencio
+from bootstrap import (_preparar, _correlaciones_ponderadas, _jackknife, _pesos_remuestreo,
+                       _especificar, _estadisticos_ponderados, _jackknife_estadisticos,
+                       bootstrap_correlacion, bootstrap_matriz_correlacion, bootstrap_intervalos)
+
+
+def generar_datos(n_filas=60, n_columnas=3, semilla=0):
+    """Columnas correlacionadas; la última con empates"""
+    rng = np.random.default_rng(semilla)
+    base = rng.normal(size=(n_filas, 1))
+    datos = base + rng.normal(size=(n_filas, n_columnas))
+    datos[:, -1] = np.round(datos[:, -1])
+    return datos
+
+
+def remuestreos(n, replicas, semilla=1):
+    """Índices de remuestreo explícitos y sus pesos (veces que aparece cada fila)"""
+    indices = np.random.default_rng(semilla).integers(0, n, size=(replicas, n))
+    pesos = np.stack([np.bincount(fila, minlength=n) for fila in indices]).astype(float)
+    return indices, pesos
+
+
+@pytest.mark.parametrize('metodo', ['pearson', 'spearman'])
+def test_correlaciones_ponderadas_coinciden_con_remuestreo(metodo):
+    datos = generar_datos()
+    indices, pesos = remuestreos(len(datos), 25)
+    replicas = _correlaciones_ponderadas(_preparar(datos, metodo), pesos)
+    for indices_replica, replica in zip(indices, replicas):
+        muestra = pd.DataFrame(datos[indices_replica])
+        np.testing.assert_allclose(replica, muestra.corr(method=metodo).to_numpy(), rtol=1e-10, atol=1e-12)
+
+
+def test_pesos_remuestreo_suman_n():
+    pesos = _pesos_remuestreo(np.random.default_rng(0), 50, 30)
+    assert pesos.shape == (30, 50)
+    np.testing.assert_array_equal(pesos.sum(axis=1), 50)
+
+
+@pytest.mark.parametrize('metodo', ['pearson', 'spearman'])
+def test_jackknife_coincide_con_dejar_fuera_cada_fila(metodo):
+    datos = generar_datos(n_filas=40)
+    jackknife = _jackknife(_preparar(datos, metodo), len(datos), grupos=len(datos))
+    for i, estimacion in enumerate(jackknife):
+        muestra = pd.DataFrame(np.delete(datos, i, axis=0))
+        np.testing.assert_allclose(estimacion, muestra.corr(method=metodo).to_numpy(), rtol=1e-10, atol=1e-12)
+
+
+def test_bootstrap_correlacion_no_depende_de_los_procesos():
+    df = pd.DataFrame(generar_datos(n_filas=200), columns=['a', 'b', 'c'])
+    with silencio():
+        serie = bootstrap_correlacion(df, 'a', 'b', n_replicas=400, replicas_por_bloque=50, procesos=1)
+        paralelo = bootstrap_correlacion(df, 'a', 'b', n_replicas=400, replicas_por_bloque=50, procesos=2)
+    assert serie['coeficiente'] == pytest.approx(stats.pearsonr(df['a'], df['b'])[0], rel=1e-12)
+    for clave in ['ic_percentil', 'ic_bca']:
+        assert serie[clave] == pytest.approx(paralelo[clave], rel=1e-12)
+    assert serie['ic_bca'][0] < serie['coeficiente'] < serie['ic_bca'][1]
+
+
+def test_bootstrap_matriz_argumentos_invalidos():
+    df = pd.DataFrame(generar_datos(), columns=['a', 'b', 'c'])
+    with silencio():
+        assert bootstrap_matriz_correlacion(df, metodo='kendall') is None
+        assert bootstrap_matriz_correlacion(df, nivel_confianza=1.5) is None
+
+
+def especificacion_completa(proporcion_recorte=0.1):
+    """Media, mediana, media recortada y percentiles 5 y 90"""
+    return _especificar(('media', 'mediana', 'media_recortada'), (5, 90), proporcion_recorte)
+
+
+def estadisticos_explicitos(muestra, proporcion_recorte=0.1):
+    """Los mismos estadísticos calculados sobre la muestra con numpy y scipy"""
+    return [muestra.mean(), np.median(muestra), stats.trim_mean(muestra, proporcion_recorte),
+            np.percentile(muestra, 5), np.percentile(muestra, 90)]
+
+
+@pytest.mark.parametrize('n, decimales', [(57, None), (120, 0)])
+def test_estadisticos_ponderados_coinciden_con_remuestreo(n, decimales):
+    valores = np.random.default_rng(2).lognormal(3, 1, n)
+    if decimales is not None:
+        valores = valores.round(decimales)
+    ordenados = np.sort(valores)
+    indices, pesos = remuestreos(n, 40)
+    replicas = _estadisticos_ponderados(ordenados, pesos, especificacion_completa())
+    esperado = np.array([estadisticos_explicitos(ordenados[fila]) for fila in indices])
+    np.testing.assert_allclose(replicas, esperado, rtol=1e-10, atol=1e-12)
+
+
+def test_jackknife_estadisticos_coincide_con_dejar_fuera_cada_valor():
+    ordenados = np.sort(np.random.default_rng(3).normal(size=45).round(1))
+    jackknife = _jackknife_estadisticos(ordenados, especificacion_completa(0.2))
+    esperado = np.array([estadisticos_explicitos(np.delete(ordenados, i), 0.2) for i in range(len(ordenados))])
+    np.testing.assert_allclose(jackknife, esperado, rtol=1e-10, atol=1e-12)
+
+
+def test_bootstrap_intervalos_por_grupo():
+    rng = np.random.default_rng(4)
+    df = pd.DataFrame({'monto': rng.lognormal(3, 1, 300), 'grupo': rng.choice(['x', 'y'], 300)})
+    with silencio():
+        tabla = bootstrap_intervalos(df, 'monto', ('media', 'mediana'), percentiles=(90,),
+                                     columna_grupos='grupo', n_replicas=300, procesos=1)
+        assert bootstrap_intervalos(df, 'monto', ('moda',)) is None
+        assert bootstrap_intervalos(df, 'monto', percentiles=(120,)) is None
+    assert len(tabla) == 6
+    for _, fila in tabla.iterrows():
+        muestra = df.loc[df['grupo'] == fila['grupo'], 'monto']
+        esperado = {'media': muestra.mean(), 'mediana': muestra.median(), 'p90': np.percentile(muestra, 90)}
+        assert fila['estimado'] == pytest.approx(esperado[fila['estadistico']], rel=1e-12)
+        assert fila['bca_inferior'] <= fila['estimado'] <= fila['bca_superior']
@@ -0,0 +1,68 @@
+"""
+Pruebas de la caché de resultados
+
+Uso: python -m pytest tests/test_cache.py
+"""
+import pandas as pd
+import pytest
+
+import cache
+from cache import memorizar, configurar_cache, limpiar_cache, estadisticas_cache
+
+
+@pytest.fixture
+def cache_en_disco(tmp_path):
+    configurar_cache(directorio=str(tmp_path))
+    limpiar_cache()
+    yield tmp_path
+    limpiar_cache(disco=True)
+    configurar_cache(activa=False)
+
+
+def definir_suma(incremento):
+    """La misma función (mismo nombre) con otro cuerpo, como tras cambiar su código"""
+    if incremento == 0:
+        def suma(df, columna):
+            return float(df[columna].sum())
+    else:
+        def suma(df, columna):
+            return float(df[columna].sum()) + 1
+    return memorizar(columnas=('columna',))(suma)
+
+
+def test_cambio_de_codigo_invalida_la_cache_en_disco(cache_en_disco):
+    df = pd.DataFrame({'a': [1.0, 2.0, 3.0]})
+    assert definir_suma(0)(df, 'a') == 6.0
+    limpiar_cache()
+    # Mismo nombre, datos y argumentos pero otro código: no se lee el pickle anterior
+    assert definir_suma(1)(df, 'a') == 7.0
+    assert estadisticas_cache()['aciertos_disco'] == 0
+
+
+def test_cambio_de_version_invalida_la_cache_en_disco(cache_en_disco, monkeypatch):
+    suma = definir_suma(0)
+    df = pd.DataFrame({'a': [1.0, 2.0, 3.0]})
+    suma(df, 'a')
+    limpiar_cache()
+    suma(df, 'a')
+    assert estadisticas_cache()['aciertos_disco'] == 1
+    
+    limpiar_cache()
+    monkeypatch.setattr(cache, 'VERSION_CACHE', cache.VERSION_CACHE + 1)
+    suma(df, 'a')
+    assert estadisticas_cache()['aciertos_disco'] == 0
+    assert estadisticas_cache()['fallos'] == 1
+
+
+def test_columnas_fijas_limitan_la_huella(cache_en_disco):
+    @memorizar(columnas=(), fijas=('a',))
+    def total(df):
+        return float(df['a'].sum())
+    
+    df = pd.DataFrame({'a': [1.0, 2.0], 'b': [3.0, 4.0]})
+    total(df)
+    # Cambiar una columna que no lee no invalida el resultado; cambiar 'a' sí
+    total(df.assign(b=[5.0, 6.0]))
+    assert estadisticas_cache()['aciertos'] == 1
+    assert total(df.assign(a=[1.0, 5.0])) == 6.0
+    assert estadisticas_cache()['fallos'] == 2
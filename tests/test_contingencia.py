@@ -0,0 +1,102 @@
+"""
+Pruebas de las tablas de contingencia dispersas contra pandas y scipy
+
+Uso: python -m pytest tests/test_contingencia.py
+"""
+import numpy as np
+import pandas as pd
+import pytest
+from scipy.stats import chi2_contingency
+from scipy.stats.contingency import association
+
+import contingencia
+from contingencia import tabla_contingencia
+from reporte import silencio
+from inferencia import test_chi_cuadrado as prueba_chi_cuadrado
+
+
+def generar_datos(n_filas=3_000, categorias1=6, categorias2=9, semilla=0):
+    """Dos variables categóricas dependientes, con nulos"""
+    rng = np.random.default_rng(semilla)
+    x = rng.integers(0, categorias1, n_filas)
+    y = (x + rng.integers(0, 3, n_filas)) % categorias2
+    df = pd.DataFrame({'aseguradora': [f'A{v}' for v in x], 'servicio': [f'S{v}' for v in y]})
+    df.loc[rng.random(n_filas) < 0.05, 'aseguradora'] = None
+    df.loc[rng.random(n_filas) < 0.05, 'servicio'] = None
+    return df
+
+
+def test_tabla_densa_coincide_con_crosstab():
+    df = generar_datos()
+    tabla = tabla_contingencia(df, 'aseguradora', 'servicio')
+    esperado = pd.crosstab(df['aseguradora'], df['servicio'])
+    pd.testing.assert_frame_equal(tabla.densa(), esperado, check_names=False, check_dtype=False)
+    assert tabla.n == esperado.to_numpy().sum()
+
+
+@pytest.mark.parametrize('correccion', [True, False])
+def test_chi_cuadrado_coincide_con_scipy(correccion):
+    df = generar_datos()
+    tabla = tabla_contingencia(df, 'aseguradora', 'servicio')
+    esperado = chi2_contingency(pd.crosstab(df['aseguradora'], df['servicio']), correction=correccion)
+    chi2, p_valor, gl = tabla.chi_cuadrado(correccion=correccion)
+    assert chi2 == pytest.approx(esperado.statistic, rel=1e-10)
+    assert p_valor == pytest.approx(esperado.pvalue, rel=1e-8, abs=1e-300)
+    assert gl == esperado.dof
+    assert tabla.cramer_v() == pytest.approx(association(pd.crosstab(df['aseguradora'], df['servicio']),
+                                                         method='cramer'), rel=1e-10)
+
+
+@pytest.mark.parametrize('semilla', [0, 1, 2])
+@pytest.mark.parametrize('correccion', [True, False])
+def test_tabla_2x2_con_correccion_de_yates(semilla, correccion):
+    # Tablas 2x2 chicas, donde la corrección de Yates cambia el resultado
+    df = generar_datos(n_filas=40, categorias1=2, categorias2=2, semilla=semilla)
+    tabla = tabla_contingencia(df, 'aseguradora', 'servicio')
+    esperado = chi2_contingency(pd.crosstab(df['aseguradora'], df['servicio']), correction=correccion)
+    chi2, p_valor, gl = tabla.chi_cuadrado(correccion=correccion)
+    assert gl == 1
+    assert chi2 == pytest.approx(esperado.statistic, rel=1e-10, abs=1e-12)
+    assert p_valor == pytest.approx(esperado.pvalue, rel=1e-10)
+
+
+def test_2x2_con_celda_vacia():
+    df = pd.DataFrame({'a': ['x'] * 10 + ['y'] * 6, 'b': ['u'] * 10 + ['u'] * 2 + ['v'] * 4})
+    tabla = tabla_contingencia(df, 'a', 'b')
+    esperado = chi2_contingency(pd.crosstab(df['a'], df['b']))
+    assert tabla.chi_cuadrado()[0] == pytest.approx(esperado.statistic, rel=1e-10)
+    assert tabla.chi_cuadrado()[1] == pytest.approx(esperado.pvalue, rel=1e-10)
+
+
+def test_ruta_dispersa_para_tablas_grandes(monkeypatch):
+    # Con el umbral bajo se cuenta con np.unique en lugar de bincount
+    df = generar_datos()
+    densa = tabla_contingencia(df, 'aseguradora', 'servicio')
+    monkeypatch.setattr(contingencia, 'MAXIMO_CELDAS_DENSAS', 10)
+    dispersa = tabla_contingencia(df, 'aseguradora', 'servicio')
+    pd.testing.assert_frame_equal(dispersa.densa(), densa.densa())
+    assert dispersa.chi_cuadrado() == pytest.approx(densa.chi_cuadrado())
+
+
+def test_residuos_ajustados():
+    df = generar_datos()
+    tabla = tabla_contingencia(df, 'aseguradora', 'servicio')
+    observados = tabla.densa().to_numpy().astype(float)
+    n = observados.sum()
+    filas, columnas = observados.sum(axis=1, keepdims=True), observados.sum(axis=0, keepdims=True)
+    esperados = filas * columnas / n
+    ajustados = (observados - esperados) / np.sqrt(esperados * (1 - filas / n) * (1 - columnas / n))
+    
+    residuos = tabla.residuos()
+    posiciones = (tabla.filas.get_indexer(residuos['fila']), tabla.columnas.get_indexer(residuos['columna']))
+    np.testing.assert_allclose(residuos['residuo_ajustado'], ajustados[posiciones], rtol=1e-10)
+    assert len(residuos) == (observados > 0).sum()
+
+
+def test_prueba_chi_cuadrado_devuelve_la_tabla_densa():
+    df = generar_datos(categorias1=30, categorias2=25)
+    with silencio():
+        resultado = prueba_chi_cuadrado(df, 'aseguradora', 'servicio')
+    # Más de 400 celdas: no se muestra completa, pero se devuelve
+    pd.testing.assert_frame_equal(resultado['tabla_contingencia'], pd.crosstab(df['aseguradora'], df['servicio']),
+                                  check_names=False, check_dtype=False)
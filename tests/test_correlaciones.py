@@ -0,0 +1,72 @@
+"""
+Pruebas de las correlaciones por pares contra DataFrame.corr y scipy
+
+Uso: python -m pytest tests/test_correlaciones.py
+"""
+import numpy as np
+import pandas as pd
+import pytest
+from scipy import stats
+
+from reporte import silencio
+from correlaciones import correlaciones_por_pares, matriz_correlacion
+
+
+def generar_datos(n_filas=400, n_columnas=6, proporcion_nulos=0.1, semilla=0):
+    """Columnas correlacionadas con nulos dispersos, una con empates y una constante"""
+    rng = np.random.default_rng(semilla)
+    base = rng.normal(size=(n_filas, 1))
+    datos = base + rng.normal(size=(n_filas, n_columnas))
+    datos[rng.random(datos.shape) < proporcion_nulos] = np.nan
+    df = pd.DataFrame(datos, columns=[f'variable_{i}' for i in range(n_columnas)])
+    df['con_empates'] = np.round(base[:, 0] * 2) + rng.integers(0, 2, n_filas)
+    df.loc[rng.random(n_filas) < 0.1, 'con_empates'] = np.nan
+    df['constante'] = 3.0
+    return df
+
+
+@pytest.mark.parametrize('metodo', ['pearson', 'spearman'])
+@pytest.mark.parametrize('proporcion_nulos', [0.0, 0.1, 0.4])
+def test_coeficientes_coinciden_con_dataframe_corr(metodo, proporcion_nulos):
+    df = generar_datos(proporcion_nulos=proporcion_nulos)
+    resultado = correlaciones_por_pares(df, metodo=metodo)
+    esperado = df.corr(method=metodo)
+    pd.testing.assert_frame_equal(resultado['coeficientes'], esperado, rtol=1e-10, atol=1e-12)
+
+
+def test_nulos_por_bloques_y_columna_sin_datos():
+    # Patrones de nulos en bloques (varias filas comparten patrón) y una columna vacía
+    df = generar_datos(proporcion_nulos=0.0)
+    df.loc[:99, 'variable_0'] = np.nan
+    df.loc[50:199, 'variable_1'] = np.nan
+    df.loc[300:, ['variable_2', 'variable_3']] = np.nan
+    df['vacia'] = np.nan
+    for metodo in ['pearson', 'spearman']:
+        resultado = correlaciones_por_pares(df, metodo=metodo)
+        pd.testing.assert_frame_equal(resultado['coeficientes'], df.corr(method=metodo),
+                                      rtol=1e-10, atol=1e-12)
+
+
+def test_n_es_el_numero_de_filas_completas_de_cada_par():
+    df = generar_datos()
+    resultado = correlaciones_por_pares(df, metodo='spearman')
+    validos = df.notna().to_numpy().astype(int)
+    esperado = pd.DataFrame(validos.T @ validos, index=df.columns, columns=df.columns)
+    pd.testing.assert_frame_equal(resultado['n'], esperado, check_dtype=False)
+
+
+@pytest.mark.parametrize('metodo, prueba', [('pearson', stats.pearsonr), ('spearman', stats.spearmanr)])
+def test_p_valores_coinciden_con_scipy(metodo, prueba):
+    df = generar_datos()
+    resultado = correlaciones_por_pares(df, metodo=metodo)
+    for col1, col2 in [('variable_0', 'variable_1'), ('variable_2', 'con_empates')]:
+        completas = df[[col1, col2]].dropna()
+        esperado = prueba(completas[col1], completas[col2])
+        assert resultado['coeficientes'].loc[col1, col2] == pytest.approx(esperado[0], rel=1e-10)
+        assert resultado['p_valores'].loc[col1, col2] == pytest.approx(esperado[1], rel=1e-8)
+
+
+def test_metodo_invalido_devuelve_none():
+    with silencio():
+        assert correlaciones_por_pares(generar_datos(), metodo='kendall') is None
+        assert matriz_correlacion(generar_datos(), metodo='kendall') is None
@@ -0,0 +1,38 @@
+"""
+Pruebas de las pruebas de hipótesis contra scipy
+
+Uso: python -m pytest tests/test_inferencia.py
+"""
+import numpy as np
+import pandas as pd
+import pytest
+from scipy.stats import mannwhitneyu
+
+from reporte import silencio
+from inferencia import test_mann_whitney as prueba_mann_whitney
+
+
+def generar_grupos(n1, n2, semilla=0, decimales=None):
+    """Dos grupos en un DataFrame con columna de grupo; decimales redondea para forzar empates"""
+    rng = np.random.default_rng(semilla)
+    valores = rng.normal(size=n1 + n2)
+    if decimales is not None:
+        valores = valores.round(decimales)
+    return pd.DataFrame({'valor': valores, 'grupo': ['a'] * n1 + ['b'] * n2})
+
+
+@pytest.mark.parametrize('n1, n2, decimales', [
+    (8, 20, None),    # frontera del p-valor exacto de scipy
+    (5, 30, None),
+    (9, 20, None),    # aproximación normal
+    (8, 20, 0),       # con empates scipy usa la aproximación normal
+    (40, 60, 1),
+])
+def test_mann_whitney_coincide_con_scipy(n1, n2, decimales):
+    df = generar_grupos(n1, n2, decimales=decimales)
+    with silencio():
+        resultado = prueba_mann_whitney(df, 'valor', 'a', 'b', columna_grupos='grupo')
+    esperado = mannwhitneyu(df.loc[df['grupo'] == 'a', 'valor'], df.loc[df['grupo'] == 'b', 'valor'],
+                            alternative='two-sided')
+    assert resultado['u_stat'] == pytest.approx(esperado.statistic)
+    assert resultado['p_valor'] == pytest.approx(esperado.pvalue, rel=1e-9)
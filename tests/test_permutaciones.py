@@ -0,0 +1,107 @@
+"""
+Pruebas de permutación contra la enumeración por fuerza bruta
+
+Uso: python -m pytest tests/test_permutaciones.py
+"""
+from itertools import combinations
+
+import numpy as np
+import pandas as pd
+import pytest
+from scipy import stats
+
+from reporte import silencio
+from permutaciones import prueba_permutacion, pruebas_permutacion
+from inferencia import comparaciones_permutacion
+
+
+def estadistico_completo(grupo1, grupo2, estadistico):
+    """|t| de Student con varianza combinada o |U - n1 n2 / 2| de Mann-Whitney"""
+    if estadistico == 'media':
+        return abs(stats.ttest_ind(grupo1, grupo2).statistic)
+    u = stats.mannwhitneyu(grupo1, grupo2, method='asymptotic').statistic
+    return abs(u - len(grupo1) * len(grupo2) / 2)
+
+
+def p_valor_fuerza_bruta(grupo1, grupo2, estadistico):
+    """Proporción de todas las asignaciones con estadístico al menos tan extremo como el observado"""
+    valores = np.concatenate([grupo1, grupo2])
+    n1 = len(grupo1)
+    observado = estadistico_completo(grupo1, grupo2, estadistico)
+    extremos = total = 0
+    for seleccion in combinations(range(len(valores)), n1):
+        resto = np.delete(valores, seleccion)
+        extremos += estadistico_completo(valores[list(seleccion)], resto, estadistico) >= observado * (1 - 1e-9)
+        total += 1
+    return extremos / total
+
+
+def generar_grupos(n1, n2, decimales=None, semilla=0):
+    """Dos grupos con medias distintas; decimales redondea para forzar empates"""
+    rng = np.random.default_rng(semilla)
+    grupo1, grupo2 = rng.normal(0, 1, n1), rng.normal(0.8, 1, n2)
+    if decimales is not None:
+        grupo1, grupo2 = grupo1.round(decimales), grupo2.round(decimales)
+    return grupo1, grupo2
+
+
+@pytest.mark.parametrize('estadistico', ['media', 'rangos'])
+@pytest.mark.parametrize('n1, n2, decimales', [(5, 6, None), (4, 7, 0), (6, 6, 1)])
+def test_p_valor_exacto_coincide_con_fuerza_bruta(estadistico, n1, n2, decimales):
+    grupo1, grupo2 = generar_grupos(n1, n2, decimales)
+    resultado = prueba_permutacion(grupo1, grupo2, estadistico, procesos=1)
+    assert resultado['exacta']
+    assert resultado['n_permutaciones'] == len(list(combinations(range(n1 + n2), n1)))
+    assert resultado['p_valor'] == pytest.approx(p_valor_fuerza_bruta(grupo1, grupo2, estadistico), abs=1e-12)
+
+
+@pytest.mark.parametrize('estadistico', ['media', 'rangos'])
+def test_montecarlo_cerca_del_exacto(estadistico):
+    # 48620 asignaciones: con 20000 permutaciones se estima por Monte Carlo
+    grupo1, grupo2 = generar_grupos(9, 9, semilla=1)
+    exacto = prueba_permutacion(grupo1, grupo2, estadistico, n_permutaciones=50_000, procesos=1)
+    estimado = prueba_permutacion(grupo1, grupo2, estadistico, n_permutaciones=20_000, alfa=None, procesos=1)
+    assert exacto['exacta'] and not estimado['exacta']
+    assert estimado['n_permutaciones'] == 20_000
+    error = 4 * np.sqrt(exacto['p_valor'] * (1 - exacto['p_valor']) / 20_000) + 1 / 20_000
+    assert estimado['p_valor'] == pytest.approx(exacto['p_valor'], abs=error)
+    assert estimado['ic_p_valor'][0] <= exacto['p_valor'] <= estimado['ic_p_valor'][1]
+
+
+def test_resultado_no_depende_de_los_procesos():
+    grupo1, grupo2 = generar_grupos(30, 30, semilla=2)
+    serie = prueba_permutacion(grupo1, grupo2, n_permutaciones=4_000, alfa=None, procesos=1)
+    paralelo = prueba_permutacion(grupo1, grupo2, n_permutaciones=4_000, alfa=None, procesos=2)
+    assert serie == paralelo
+    por_lotes = pruebas_permutacion([(grupo1, grupo2)] * 2, n_permutaciones=4_000, alfa=None, procesos=2)
+    assert por_lotes[0]['n_permutaciones'] == por_lotes[1]['n_permutaciones'] == 4_000
+
+
+def test_parada_temprana_lejos_del_umbral():
+    grupo1, grupo2 = generar_grupos(40, 40, semilla=3)
+    lejano = prueba_permutacion(grupo1, grupo2 + 3, n_permutaciones=20_000, procesos=1)
+    assert lejano['parada_temprana'] and lejano['n_permutaciones'] < 20_000
+    assert lejano['p_valor'] < 0.05
+
+
+def test_comparaciones_no_cortan_p_valores_entre_umbrales():
+    # a-b tiene p-valor cercano a 0.02: entre alfa / m (0.0167) y alfa, donde
+    # decide la corrección, así que debe usar todas las permutaciones
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({'valor': np.concatenate([rng.normal(m, 1, 60) for m in (0, 0.4, 1.5)]),
+                       'grupo': np.repeat(list('abc'), 60)})
+    with silencio():
+        tabla = comparaciones_permutacion(df, 'valor', 'grupo', n_permutaciones=10_000, procesos=1)
+    par = tabla[(tabla['grupo1'] == 'a') & (tabla['grupo2'] == 'b')].iloc[0]
+    assert 0.05 / 3 < par['p_valor'] < 0.05
+    assert par['n_permutaciones'] == 10_000
+    # Los pares muy alejados del rango sí se detienen antes
+    assert (tabla.loc[tabla['grupo2'] == 'c', 'n_permutaciones'] < 10_000).all()
+
+
+def test_argumentos_invalidos_devuelven_none():
+    grupo1, grupo2 = generar_grupos(5, 5)
+    with silencio():
+        assert prueba_permutacion(grupo1, grupo2, 'moda') is None
+        assert prueba_permutacion(grupo1, [], 'media') is None
+        assert pruebas_permutacion([(grupo1, grupo2)], 'moda') is None
@@ -0,0 +1,158 @@
+"""
+Pruebas de los sketches HyperLogLog contra conteos exactos de distintos
+
+Uso: python -m pytest tests/test_sketches.py
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from sketches import (SketchDistintos, pares_por_codigo, estimar_pares, distintos_por_codigo,
+                      distintos_moviles)
+from series_tiempo import AgregadoTemporal
+
+
+# Margen de las comparaciones con el conteo exacto, en errores típicos
+SIGMAS = 4
+
+
+def generar_visitas(n_filas=60_000, n_pacientes=20_000, n_dias=30, semilla=0):
+    """Visitas de pacientes por aseguradora y día, con pacientes repetidos"""
+    rng = np.random.default_rng(semilla)
+    dias = pd.Timestamp('2024-01-01') + pd.to_timedelta(rng.integers(0, n_dias, n_filas), unit='D')
+    return pd.DataFrame({
+        'fechA_CREACION': dias.strftime('%Y%m%d'),
+        'aseguradora': rng.choice(['FONASA', 'ISAPRE', 'PARTICULAR'], size=n_filas, p=[0.6, 0.3, 0.1]),
+        'doC_PACIENTE': rng.integers(0, n_pacientes, n_filas),
+    })
+
+
+def comprobar_estimacion(estimacion, exacto, precision):
+    """El error relativo está dentro de SIGMAS errores típicos (exacto si no hay valores)"""
+    if exacto == 0:
+        assert estimacion == 0
+        return
+    assert abs(estimacion - exacto) / exacto < SIGMAS * 1.04 / np.sqrt(1 << precision)
+
+
+@pytest.mark.parametrize('n_distintos', [10, 500, 5_000, 100_000])
+@pytest.mark.parametrize('precision', [10, 12, 14])
+def test_estimacion_dentro_del_error(n_distintos, precision):
+    valores = np.repeat([f'P{i}' for i in range(n_distintos)], 3)
+    sketch = SketchDistintos(precision).update(valores)
+    comprobar_estimacion(sketch.estimar(), n_distintos, precision)
+
+
+def test_conteos_pequenos_casi_exactos():
+    # Con pocos valores manda el conteo lineal y el error es mucho menor
+    for n_distintos in (1, 2, 20, 100):
+        sketch = SketchDistintos(14).update([f'P{i}' for i in range(n_distintos)])
+        assert sketch.estimar() == pytest.approx(n_distintos, rel=0.01)
+    assert SketchDistintos().estimar() == 0
+
+
+def test_nulos_y_texto_equivalente():
+    sketch = SketchDistintos().update(pd.Series([7589711, '7589711', None, np.nan, 12]))
+    assert sketch.estimar() == pytest.approx(2, rel=0.01)
+
+
+@pytest.mark.parametrize('n_distintos', [50, 700])
+def test_disperso_y_denso_dan_la_misma_estimacion(n_distintos):
+    disperso = SketchDistintos(12).update(np.arange(n_distintos))
+    assert not disperso.denso
+    denso = disperso.copia()
+    denso._densificar()
+    assert denso.estimar() == pytest.approx(disperso.estimar(), rel=1e-12)
+
+
+def test_pasa_a_denso_sobre_el_umbral():
+    sketch = SketchDistintos(10).update(np.arange(10_000))
+    assert sketch.denso
+    comprobar_estimacion(sketch.estimar(), 10_000, 10)
+
+
+@pytest.mark.parametrize('tamanos', [(100, 200), (100, 20_000), (20_000, 30_000)])
+def test_merge_equivale_a_la_union(tamanos):
+    rng = np.random.default_rng(1)
+    # Conjuntos solapados: parte de los valores está en ambos
+    a = rng.integers(0, 2 * sum(tamanos), tamanos[0])
+    b = rng.integers(0, 2 * sum(tamanos), tamanos[1])
+    union = SketchDistintos(12).update(np.concatenate([a, b]))
+
+    for primero, segundo in ((a, b), (b, a)):
+        combinado = SketchDistintos(12).update(primero).merge(SketchDistintos(12).update(segundo))
+        assert combinado.estimar() == pytest.approx(union.estimar(), rel=1e-12)
+    comprobar_estimacion(union.estimar(), len(np.union1d(a, b)), 12)
+
+
+def test_merge_rechaza_precision_distinta():
+    with pytest.raises(ValueError):
+        SketchDistintos(10).merge(SketchDistintos(12))
+
+
+@pytest.mark.parametrize('n_distintos', [30, 5_000])
+def test_serializacion_conserva_el_sketch(n_distintos):
+    sketch = SketchDistintos(12).update(np.arange(n_distintos))
+    copia = SketchDistintos.desde_dict(sketch.a_dict())
+    assert copia.denso == sketch.denso
+    assert copia.estimar() == sketch.estimar()
+
+
+def test_sketches_por_codigo_igualan_a_sketches_separados():
+    visitas = generar_visitas()
+    codigos, grupos = pd.factorize(visitas['aseguradora'])
+    sketches = distintos_por_codigo(visitas['doC_PACIENTE'], codigos, len(grupos))
+    estimaciones = estimar_pares(*pares_por_codigo(visitas['doC_PACIENTE'], codigos)[::2], len(grupos))
+
+    for codigo, grupo in enumerate(grupos):
+        pacientes = visitas.loc[visitas['aseguradora'] == grupo, 'doC_PACIENTE']
+        separado = SketchDistintos().update(pacientes)
+        assert sketches[codigo].estimar() == pytest.approx(separado.estimar(), rel=1e-12)
+        assert estimaciones[codigo] == pytest.approx(separado.estimar(), rel=1e-12)
+        comprobar_estimacion(estimaciones[codigo], pacientes.nunique(), 12)
+
+
+def test_codigos_sin_valores_y_sin_grupo():
+    # El grupo 1 no tiene valores y los códigos -1 no pertenecen a ninguno
+    codigos = np.array([0, 0, -1, 2, -1])
+    estimaciones = estimar_pares(*pares_por_codigo(['a', 'b', 'c', 'd', 'e'], codigos)[::2], 3)
+    assert estimaciones == pytest.approx([2, 0, 1], rel=0.01)
+
+
+@pytest.mark.parametrize('ventana', [1, 7])
+def test_distintos_moviles_igualan_a_combinar_periodos(ventana):
+    visitas = generar_visitas(n_filas=20_000, n_dias=20)
+    tiempos = pd.to_datetime(visitas['fechA_CREACION']).dt.day.to_numpy() - 1
+    codigos, grupos = pd.factorize(visitas['aseguradora'])
+    n_tiempos = tiempos.max() + 1
+
+    # Pares (periodo, grupo, registro) con su mayor rango
+    combinados, registros, rangos = pares_por_codigo(visitas['doC_PACIENTE'], tiempos * len(grupos) + codigos)
+    estimaciones = distintos_moviles(combinados // len(grupos), combinados % len(grupos), registros, rangos,
+                                     ventana, n_tiempos, len(grupos))
+
+    for fin in range(n_tiempos):
+        en_ventana = (tiempos > fin - ventana) & (tiempos <= fin)
+        for codigo in range(len(grupos)):
+            pacientes = visitas.loc[en_ventana & (codigos == codigo), 'doC_PACIENTE']
+            sketch = SketchDistintos()
+            for periodo in range(max(0, fin - ventana + 1), fin + 1):
+                sketch.merge(SketchDistintos().update(pacientes[tiempos[pacientes.index] == periodo]))
+            assert estimaciones[fin, codigo] == pytest.approx(sketch.estimar(), rel=1e-9)
+            comprobar_estimacion(estimaciones[fin, codigo], pacientes.nunique(), 12)
+
+
+def test_ventana_movil_del_agregado_dentro_del_error():
+    visitas = generar_visitas()
+    agregado = AgregadoTemporal('fechA_CREACION', claves=['aseguradora'], ventanas=(7,),
+                                columnas_distintas=['doC_PACIENTE'])
+    for inicio in range(0, len(visitas), 15_000):
+        agregado.update(visitas.iloc[inicio:inicio + 15_000])
+    tabla = agregado.ventana_movil(7)
+
+    fechas = pd.to_datetime(visitas['fechA_CREACION'])
+    for (fin, aseguradora), fila in tabla.iterrows():
+        en_ventana = ((fechas > fin - pd.Timedelta(days=7)) & (fechas <= fin)
+                      & (visitas['aseguradora'] == aseguradora))
+        assert fila['n'] == en_ventana.sum()
+        comprobar_estimacion(fila['distintos_doC_PACIENTE'], visitas.loc[en_ventana, 'doC_PACIENTE'].nunique(), 12)